@@ -0,0 +1,161 @@
+"""
+Benchmark : statistiques du rapport consolidé sur une campagne synthétique.
+
+Compare, pour N entités (500 par défaut) :
+- AVANT : une requête de stats + une requête de domaines par entité, puis une
+  nouvelle requête de stats par entité pour ``entities_at_risk`` (N+1)
+- APRÈS : requêtes groupées par ``audit.entity_id``
+  (_calculate_entities_statistics / _calculate_entities_domain_scores)
+
+Les données sont créées dans un schéma PostgreSQL temporaire (supprimé en fin
+d'exécution) contenant uniquement les tables lues par ces requêtes.
+
+Usage:
+    DATABASE_URL=postgresql://... python Scripts/benchmarks/bench_consolidated_stats.py [--entities 500] [--questions 150]
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from src.database import engine
+from src.services.report_service import ReportService
+
+SCHEMA = "bench_consolidated_stats"
+CHOICES = ["Oui", "Non", "Partiellement", "NA", None]
+
+
+def create_schema(db: Session) -> None:
+    db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    db.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    db.execute(text(f"SET search_path TO {SCHEMA}, public"))
+    db.execute(text("""
+        CREATE TABLE campaign (id uuid PRIMARY KEY, questionnaire_id uuid NOT NULL);
+        CREATE TABLE domain (id uuid PRIMARY KEY, title text, code_officiel text, code text);
+        CREATE TABLE requirement (id uuid PRIMARY KEY, domain_id uuid NOT NULL);
+        CREATE TABLE question (id uuid PRIMARY KEY, questionnaire_id uuid NOT NULL, requirement_id uuid NOT NULL);
+        CREATE TABLE audit (id uuid PRIMARY KEY, entity_id uuid NOT NULL);
+        CREATE TABLE question_answer (
+            id uuid PRIMARY KEY,
+            audit_id uuid NOT NULL,
+            question_id uuid NOT NULL,
+            campaign_id uuid NOT NULL,
+            is_current boolean NOT NULL DEFAULT true,
+            answer_value jsonb,
+            compliance_status text
+        );
+        CREATE INDEX ON question_answer (campaign_id, is_current);
+        CREATE INDEX ON question_answer (audit_id);
+        CREATE INDEX ON audit (entity_id);
+    """))
+
+
+def seed(db: Session, n_entities: int, n_questions: int, n_domains: int = 10) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    rnd = random.Random(42)
+    campaign_id, questionnaire_id = uuid.uuid4(), uuid.uuid4()
+    db.execute(text("INSERT INTO campaign VALUES (:id, :q)"), {"id": campaign_id, "q": questionnaire_id})
+
+    domains = [uuid.uuid4() for _ in range(n_domains)]
+    db.execute(
+        text("INSERT INTO domain VALUES (:id, :title, NULL, :code)"),
+        [{"id": d, "title": f"Domaine {i}", "code": f"D{i:02d}"} for i, d in enumerate(domains)]
+    )
+
+    questions = []
+    for i in range(n_questions):
+        requirement_id = uuid.uuid4()
+        db.execute(
+            text("INSERT INTO requirement VALUES (:id, :d)"),
+            {"id": requirement_id, "d": domains[i % n_domains]}
+        )
+        questions.append(uuid.uuid4())
+        db.execute(
+            text("INSERT INTO question VALUES (:id, :q, :r)"),
+            {"id": questions[-1], "q": questionnaire_id, "r": requirement_id}
+        )
+
+    entity_ids = [uuid.uuid4() for _ in range(n_entities)]
+    for entity_id in entity_ids:
+        audit_id = uuid.uuid4()
+        db.execute(text("INSERT INTO audit VALUES (:id, :e)"), {"id": audit_id, "e": entity_id})
+        answers = []
+        for question_id in questions:
+            choice = rnd.choice(CHOICES)
+            if choice is None:
+                continue
+            answers.append({
+                "id": uuid.uuid4(), "a": audit_id, "q": question_id, "c": campaign_id,
+                "v": f'{{"choice": "{choice}"}}'
+            })
+        db.execute(
+            text("INSERT INTO question_answer (id, audit_id, question_id, campaign_id, answer_value) "
+                 "VALUES (:id, :a, :q, :c, CAST(:v AS jsonb))"),
+            answers
+        )
+
+    db.execute(text("ANALYZE"))
+    return campaign_id, entity_ids
+
+
+def run_before(service: ReportService, campaign_id, entity_ids) -> dict:
+    stats = {}
+    for eid in entity_ids:
+        stats[str(eid)] = service._calculate_entity_statistics(campaign_id, eid)
+        service._calculate_entity_domain_scores(campaign_id, eid)
+    sum(1 for eid in entity_ids if service._is_entity_at_risk(campaign_id, eid))
+    return stats
+
+
+def run_after(service: ReportService, campaign_id, entity_ids) -> dict:
+    stats = service._calculate_entities_statistics(campaign_id, entity_ids)
+    service._calculate_entities_domain_scores(campaign_id, entity_ids)
+    sum(1 for eid in entity_ids if service._is_at_risk(stats.get(str(eid), {})))
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=150)
+    args = parser.parse_args()
+
+    query_count = 0
+
+    def count_queries(*_):
+        nonlocal query_count
+        query_count += 1
+
+    with Session(engine) as db:
+        try:
+            create_schema(db)
+            campaign_id, entity_ids = seed(db, args.entities, args.questions)
+            service = ReportService(db)
+            event.listen(engine, "before_cursor_execute", count_queries)
+
+            print(f"Campagne synthétique: {args.entities} entités x {args.questions} questions")
+            print(f"{'mode':<8} {'requêtes':>10} {'durée (s)':>10}")
+            results = {}
+            for label, runner in (("avant", run_before), ("après", run_after)):
+                query_count = 0
+                start = time.perf_counter()
+                results[label] = runner(service, campaign_id, entity_ids)
+                print(f"{label:<8} {query_count:>10} {time.perf_counter() - start:>10.2f}")
+
+            event.remove(engine, "before_cursor_execute", count_queries)
+            assert results["avant"] == results["après"], "Résultats différents entre les deux modes"
+            print("✅ Statistiques identiques")
+        finally:
+            db.rollback()
+            db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
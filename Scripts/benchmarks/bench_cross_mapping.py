@@ -0,0 +1,58 @@
+"""
+Benchmark : top-k cosinus par blocs du mapping cross-référentiel.
+
+Simule l'import d'un référentiel de N exigences (1 000 par défaut) comparé à
+un catalogue de M exigences (20 000 par défaut), embeddings 768 dimensions :
+- blockwise_top_k : produit matriciel par blocs + argpartition
+- par ligne : un calcul de similarité + tri par exigence source (équivalent
+  en calcul de l'ancienne boucle, hors aller-retours SQL)
+
+Usage:
+    python Scripts/benchmarks/bench_cross_mapping.py [--source 1000] [--catalogue 20000] [--k 10]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+
+from src.utils.vector_similarity import blockwise_top_k, normalize_rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", type=int, default=1000)
+    parser.add_argument("--catalogue", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rnd = np.random.default_rng(42)
+    source = normalize_rows(rnd.standard_normal((args.source, args.dim)).astype(np.float32))
+    target = normalize_rows(rnd.standard_normal((args.catalogue, args.dim)).astype(np.float32))
+
+    start = time.perf_counter()
+    indices, _ = blockwise_top_k(source, target, k=args.k)
+    blockwise = time.perf_counter() - start
+
+    sample = min(100, args.source)
+    start = time.perf_counter()
+    for i in range(sample):
+        sims = target @ source[i]
+        np.argsort(-sims)[:args.k]
+    per_row = (time.perf_counter() - start) / sample * args.source
+
+    expected = np.argsort(-(source[:sample] @ target.T), axis=1)[:, :args.k]
+    identical = bool(np.array_equal(indices[:sample], expected))
+
+    print(f"{args.source} x {args.catalogue} exigences, dim={args.dim}, k={args.k}")
+    print(f"  blockwise_top_k : {blockwise:8.2f} s")
+    print(f"  par ligne       : {per_row:8.2f} s (extrapolé depuis {sample} lignes)")
+    print(f"  résultats identiques : {identical}")
+
+
+if __name__ == "__main__":
+    main()
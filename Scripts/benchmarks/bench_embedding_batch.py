@@ -0,0 +1,77 @@
+"""
+Benchmark : débit d'EmbeddingService.batch_generate_embeddings sur CPU.
+
+Mesure le nombre de textes vectorisés par seconde pour des tailles de lot
+1, 8, 32 et 64 (une passe du modèle par lot, padding + mean pooling masqué).
+La taille 1 correspond à l'ancien comportement (une passe par texte).
+
+Vérifie aussi que l'embedding d'un texte est identique seul ou dans un lot
+(le padding ne doit pas influencer le pooling).
+
+Usage:
+    python Scripts/benchmarks/bench_embedding_batch.py [--texts 256] [--threads 4] [--batch-sizes 1 8 32 64]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+import torch
+
+from src.services.embedding_service import EmbeddingService
+
+SAMPLES = [
+    "Politique de sécurité de l'information approuvée par la direction",
+    "Information security policy reviewed at planned intervals",
+    "Gestion des accès et des identités, revue périodique des droits",
+    "Les sauvegardes sont testées régulièrement et conservées hors site",
+    "Multi-factor authentication is enforced for all remote access",
+    "Journalisation centralisée des événements de sécurité et conservation 12 mois",
+    "Supplier relationships are assessed for information security risks",
+    "Plan de continuité d'activité documenté et testé annuellement",
+]
+
+
+def build_texts(n: int) -> list[str]:
+    """Textes de longueurs variées (1 à 6 phrases)."""
+    rnd = random.Random(42)
+    return [" ".join(rnd.choices(SAMPLES, k=rnd.randint(1, 6))) for _ in range(n)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=0, help="torch.set_num_threads (0 = défaut)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+
+    service = EmbeddingService()
+    texts = build_texts(args.texts)
+
+    # Cohérence : embedding seul == embedding dans un lot paddé
+    single = np.array(service.generate_embedding(texts[0]))
+    batched = np.array(service.batch_generate_embeddings(texts[:16], batch_size=16)[0])
+    max_diff = float(np.abs(single - batched).max())
+    print(f"Écart max seul vs lot: {max_diff:.2e}")
+
+    # Préchauffage
+    service.batch_generate_embeddings(texts[:8], batch_size=8)
+
+    print(f"{args.texts} textes, threads torch={torch.get_num_threads()}, device={service.device}")
+    print(f"{'batch':>6} {'durée (s)':>10} {'textes/s':>10}")
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        service.batch_generate_embeddings(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>6} {elapsed:>10.2f} {args.texts / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
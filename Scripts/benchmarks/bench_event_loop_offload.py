@@ -0,0 +1,104 @@
+"""
+Benchmark : latence p99 des requêtes rapides sous trafic mixte lent/rapide.
+
+Compare deux variantes d'un même endpoint "lent" (requête SQL bloquante simulée
+par time.sleep) :
+- AVANT : handler ``async def`` qui appelle du code bloquant → bloque la boucle
+- APRÈS : handler ``def`` exécuté dans le threadpool (modèle actuel des routes v1)
+
+Les requêtes rapides sont mesurées pendant que des requêtes lentes sont en vol.
+Aucune dépendance externe (BDD, Redis) : l'app est appelée via ASGITransport.
+
+Usage:
+    python Scripts/benchmarks/bench_event_loop_offload.py [--slow-ms 200] [--fast 400] [--slow 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI
+
+# Une requête rapide toutes les 2 ms
+FAST_INTERVAL_S = 0.002
+
+
+def build_app(slow_ms: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before/slow")
+    async def slow_blocking():
+        time.sleep(slow_ms / 1000)  # Session SQLAlchemy bloquante dans un handler async
+        return {"ok": True}
+
+    @app.get("/after/slow")
+    def slow_offloaded():
+        time.sleep(slow_ms / 1000)  # Même travail, exécuté dans le threadpool
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    return app
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_scenario(app: FastAPI, slow_path: str, n_fast: int, n_slow: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def fast_call(scheduled_at: float):
+            await client.get("/fast")
+            # Latence mesurée depuis l'instant d'arrivée prévu (boucle ouverte) :
+            # le temps passé à attendre une boucle bloquée est compté
+            latencies.append((time.perf_counter() - scheduled_at) * 1000)
+
+        async def fast_stream():
+            start = time.perf_counter()
+            tasks = []
+            for i in range(n_fast):
+                scheduled_at = start + i * FAST_INTERVAL_S
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(fast_call(scheduled_at)))
+            await asyncio.gather(*tasks)
+
+        slow_calls = [client.get(slow_path) for _ in range(n_slow)]
+        await asyncio.gather(fast_stream(), *slow_calls)
+
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slow-ms", type=int, default=200)
+    parser.add_argument("--fast", type=int, default=400)
+    parser.add_argument("--slow", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=50)
+    args = parser.parse_args()
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    app = build_app(args.slow_ms)
+
+    print(f"Trafic: {args.fast} requêtes rapides + {args.slow} requêtes lentes ({args.slow_ms} ms)")
+    print(f"{'mode':<8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+    for label, path in (("avant", "/before/slow"), ("après", "/after/slow")):
+        latencies = await run_scenario(app, path, args.fast, args.slow)
+        print(
+            f"{label:<8} {statistics.median(latencies):>10.2f} "
+            f"{percentile(latencies, 99):>10.2f} {max(latencies):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
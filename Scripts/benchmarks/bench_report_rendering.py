@@ -0,0 +1,121 @@
+"""
+Benchmark : rendu HTML d'un rapport consolidé volumineux (~200 pages).
+
+Simule un rapport consolidé de N entités (50 par défaut) : page de garde,
+sommaire, puis par entité une section, des paragraphes avec variables
+%xxx.yyy%, un tableau de non-conformités et un saut de page, et un plan
+d'action global (~2 000 lignes au total). Mesure :
+- compilation du plan de rendu (tri des widgets, configurations)
+- premier rendu (compilation + rendu)
+- rendus suivants avec le plan en cache (aperçu HTML consulté plusieurs fois)
+
+Usage:
+    python Scripts/benchmarks/bench_report_rendering.py [--entities 50] [--nc 40] [--repeat 5]
+"""
+import argparse
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.widget_renderer import (
+    RenderPlan,
+    clear_render_plans,
+    get_render_plan,
+    render_template_to_html
+)
+
+
+def build_template(entities: int) -> dict:
+    structure = [
+        {"id": "cover", "widget_type": "cover", "position": 0,
+         "config": {"title": "%report.title%", "subtitle": "Campagne %campaign.name%"}},
+        {"id": "toc", "widget_type": "toc", "position": 1, "config": {"title": "Sommaire"}},
+    ]
+    position = 2
+    for i in range(entities):
+        widgets = [
+            ("section", {"title": f"Entité {i + 1}", "level": 1}),
+            ("paragraph", {"text": "Organisation %organization.name% - campagne %campaign.name% (%stats.total_questions% questions)"}),
+            ("metrics", {"metrics": [{"label": "Score", "value": "%scores.global%"}]}),
+            ("nc_table", {"severity": "all"}),
+            ("paragraph", {"text": "Synthèse de l'entité au %report.generated_at%."}),
+            ("page_break", {}),
+        ]
+        for widget_type, config in widgets:
+            structure.append({"id": str(uuid.uuid4()), "widget_type": widget_type, "position": position, "config": config})
+            position += 1
+    structure.append({"id": "actions", "widget_type": "actions_table", "position": position, "config": {}})
+
+    return {
+        "id": str(uuid.uuid4()),
+        "updated_at": datetime(2026, 1, 1).isoformat(),
+        "name": "Consolidé",
+        "color_scheme": {"primary": "#8B5CF6", "danger": "#EF4444", "warning": "#F59E0B",
+                         "success": "#22C55E", "text": "#1F2937"},
+        "fonts": {name: {"family": "Helvetica", "size": 10, "weight": "normal"} for name in ("title", "heading1", "heading2", "heading3", "body")},
+        "structure": structure,
+    }
+
+
+def build_data(nc_rows: int, actions: int) -> dict:
+    return {
+        "report": {"title": "Rapport consolidé", "generated_at": "01/01/2026"},
+        "campaign": {"name": "Campagne 2026"},
+        "organization": {"name": "ACME"},
+        "stats": {"total_questions": 250},
+        "scores": {"global": 72},
+        "nc_list": [
+            {"domain_name": f"Domaine {i % 12}", "question_text": "Question de contrôle " * 8,
+             "severity": "CRITIQUE" if i % 3 == 0 else "MINEURE", "comment": "Commentaire " * 10}
+            for i in range(nc_rows)
+        ],
+        "actions": [
+            {"title": f"Action {i}", "severity": ("critical", "major", "minor")[i % 3],
+             "priority": f"P{i % 3 + 1}", "due_days": 30}
+            for i in range(actions)
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, default=50)
+    parser.add_argument("--nc", type=int, default=40)
+    parser.add_argument("--actions", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    template = build_template(args.entities)
+    data = build_data(args.nc, args.actions)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        RenderPlan(template["structure"])
+    compile_time = (time.perf_counter() - start) / args.repeat
+
+    clear_render_plans()
+    start = time.perf_counter()
+    html = render_template_to_html(template, data)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        render_template_to_html(template, data)
+    cached = (time.perf_counter() - start) / args.repeat
+
+    plan = get_render_plan(template["id"], template["updated_at"], template["structure"])
+    print(f"{len(plan.widgets)} widgets, {args.entities} entités x {args.nc} NC, {args.actions} actions "
+          f"(~{args.entities * 4} pages), HTML {len(html) / 1e6:.1f} Mo")
+    print(f"  compilation du plan      : {compile_time * 1000:8.2f} ms")
+    print(f"  premier rendu            : {first * 1000:8.2f} ms")
+    print(f"  rendu, plan en cache     : {cached * 1000:8.2f} ms (moyenne sur {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark : persistance des vulnérabilités d'un scan externe.
+
+Pour 10, 500 et 5 000 vulnérabilités synthétiques (ports, CVE, références) :
+- ligne à ligne : un INSERT par vulnérabilité (ancien _save_vulnerabilities,
+  listes d'énumérations reconstruites et JSON sérialisé à chaque ligne)
+- en masse : _save_vulnerabilities (normalisation du lot puis INSERT
+  multi-lignes via jsonb_to_recordset)
+
+Chaque mesure s'exécute dans une transaction annulée en fin de mesure : les
+vulnérabilités sont rattachées à un scan existant (--scan-id, ou le plus
+récent) sans rien laisser en base.
+
+Usage:
+    DATABASE_URL=postgresql://... python Scripts/benchmarks/bench_scan_vulnerability_insert.py \
+        [--sizes 10 500 5000] [--repeat 3] [--scan-id <uuid>]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.database import engine
+from src.models.external_scan import SeverityLevel, VulnerabilityType
+from src.tasks.external_scan_tasks import _save_vulnerabilities
+
+
+def make_vulnerabilities(n: int, seed: int = 42) -> list[dict]:
+    rnd = random.Random(seed)
+    severities = ["CRITICAL", "HIGH", "MEDIUM", "LOW", "INFO", "unknown"]
+    vulns = []
+    for i in range(n):
+        port = rnd.choice([22, 80, 443, 3306, 8080, 8443])
+        cves = [f"CVE-20{rnd.randint(10, 25)}-{rnd.randint(1000, 99999)}" for _ in range(rnd.randint(0, 3))]
+        vulns.append({
+            "port": port,
+            "protocol": "tcp",
+            "service_name": rnd.choice(["ssh", "http", "https", "mysql"]),
+            "service_version": f"{rnd.randint(1, 9)}.{rnd.randint(0, 30)}",
+            "service_banner": "Server: nginx/1.18.0 (Ubuntu)",
+            "vulnerability_type": rnd.choice(["SERVICE_VULN", "PORT_EXPOSED", "TLS_WEAK", "OTHER"]),
+            "severity": rnd.choice(severities),
+            "cve_ids": cves,
+            "cvss_score": round(rnd.uniform(0, 10), 1),
+            "cvss_vector": "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
+            "title": f"Vulnérabilité {i} sur le port {port}",
+            "description": "Description détaillée " * 10,
+            "recommendation": "Mettre à jour le service.",
+            "references": [f"https://nvd.nist.gov/vuln/detail/{cve}" for cve in cves],
+        })
+    return vulns
+
+
+def save_row_by_row(db: Session, scan_id: str, tenant_id: str, vulnerabilities: list[dict]) -> None:
+    """Ancienne implémentation (un INSERT par vulnérabilité)."""
+    for vuln in vulnerabilities:
+        vuln_type = vuln.get("vulnerability_type", "MISCONFIGURATION")
+        if vuln_type not in [e.value for e in VulnerabilityType]:
+            vuln_type = "MISCONFIGURATION"
+        severity = vuln.get("severity", "INFO").upper()
+        if severity not in [e.value for e in SeverityLevel]:
+            severity = "INFO"
+
+        db.execute(text("""
+            INSERT INTO external_service_vulnerability (
+                id, external_scan_id, tenant_id,
+                port, protocol, service_name, service_version, service_banner,
+                vulnerability_type, severity,
+                cve_ids, cvss_score, cvss_vector,
+                title, description, recommendation,
+                "references",
+                created_at
+            ) VALUES (
+                CAST(:id AS uuid), CAST(:scan_id AS uuid), CAST(:tenant_id AS uuid),
+                :port, :protocol, :service_name, :service_version, :service_banner,
+                :vuln_type, :severity,
+                CAST(:cve_ids AS jsonb), :cvss_score, :cvss_vector,
+                :title, :description, :recommendation,
+                CAST(:refs AS jsonb),
+                NOW()
+            )
+        """), {
+            "id": str(uuid.uuid4()),
+            "scan_id": scan_id,
+            "tenant_id": tenant_id,
+            "port": vuln.get("port"),
+            "protocol": vuln.get("protocol", "tcp"),
+            "service_name": vuln.get("service_name"),
+            "service_version": vuln.get("service_version"),
+            "service_banner": vuln.get("service_banner"),
+            "vuln_type": vuln_type,
+            "severity": severity,
+            "cve_ids": json.dumps(vuln.get("cve_ids", [])),
+            "cvss_score": vuln.get("cvss_score"),
+            "cvss_vector": vuln.get("cvss_vector"),
+            "title": vuln.get("title", "Vulnérabilité détectée"),
+            "description": vuln.get("description"),
+            "recommendation": vuln.get("recommendation"),
+            "refs": json.dumps(vuln.get("references", [])),
+        })
+
+
+def measure(func, scan_id: str, tenant_id: str, vulns: list[dict], repeat: int) -> float:
+    """Durée médiane (s) d'écriture du lot, transaction annulée à chaque essai."""
+    durations = []
+    for _ in range(repeat):
+        with Session(engine) as db:
+            start = time.perf_counter()
+            func(db, scan_id, tenant_id, vulns)
+            db.flush()
+            durations.append(time.perf_counter() - start)
+            db.rollback()
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scan-id", default=None)
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        row = db.execute(text(f"""
+            SELECT id, tenant_id FROM external_scan
+            {"WHERE id = CAST(:scan_id AS uuid)" if args.scan_id else ""}
+            ORDER BY created_at DESC
+            LIMIT 1
+        """), {"scan_id": args.scan_id}).fetchone()
+    if not row:
+        sys.exit("Aucun scan externe en base (--scan-id requis)")
+    scan_id, tenant_id = str(row.id), str(row.tenant_id)
+
+    print(f"{'vulns':>6} | {'ligne à ligne':>14} | {'en masse':>10} | gain")
+    for size in args.sizes:
+        vulns = make_vulnerabilities(size)
+        row_by_row = measure(save_row_by_row, scan_id, tenant_id, vulns, args.repeat)
+        bulk = measure(_save_vulnerabilities, scan_id, tenant_id, vulns, args.repeat)
+        print(
+            f"{size:>6} | {row_by_row * 1000:>11.1f} ms | {bulk * 1000:>7.1f} ms | "
+            f"x{row_by_row / bulk:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
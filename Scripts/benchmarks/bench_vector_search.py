@@ -0,0 +1,147 @@
+"""
+Benchmark : recherche exacte vs ANN (HNSW cosinus) sur pgvector.
+
+Pour 10k et 100k vecteurs (768 dimensions, données groupées en clusters pour
+approcher des embeddings de textes réels) :
+- vérité terrain : top-k cosinus exact calculé en NumPy
+- EXACT : ORDER BY <=> LIMIT k sans index (parcours séquentiel)
+- HNSW : même requête avec index vector_cosine_ops, pour plusieurs ef_search
+Mesure le rappel@k et la latence médiane / p95 par requête.
+
+Compare aussi le coût de liaison du vecteur de requête : littéral texte
+'[v1,...]' casté en vector vs tableau real[] lié par le driver.
+
+Les données sont créées dans un schéma PostgreSQL temporaire (supprimé en fin
+d'exécution).
+
+Usage:
+    DATABASE_URL=postgresql://... python Scripts/benchmarks/bench_vector_search.py \
+        [--sizes 10000 100000] [--queries 100] [--k 10] [--ef-search 20 40 100 200]
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.database import engine
+from src.services.vector_index_service import apply_ef_search, to_vector_param, vector_param
+
+SCHEMA = "bench_vector_search"
+
+
+def make_vectors(n: int, dim: int, seed: int, n_clusters: int = 200) -> np.ndarray:
+    """Vecteurs normalisés autour de n_clusters centres."""
+    rnd = np.random.default_rng(seed)
+    centers = rnd.standard_normal((n_clusters, dim)).astype(np.float32)
+    vectors = centers[rnd.integers(0, n_clusters, n)] + 0.6 * rnd.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load(db: Session, vectors: np.ndarray, dim: int) -> None:
+    db.execute(text(f"DROP TABLE IF EXISTS {SCHEMA}.items"))
+    db.execute(text(f"CREATE TABLE {SCHEMA}.items (id int PRIMARY KEY, v vector({dim}))"))
+    buf = io.StringIO()
+    for i, vec in enumerate(vectors):
+        buf.write(f"{i}\t[{','.join(f'{x:.6f}' for x in vec)}]\n")
+    buf.seek(0)
+    raw = db.connection().connection
+    with raw.cursor() as cur:
+        cur.copy_expert(f"COPY {SCHEMA}.items (id, v) FROM STDIN", buf)
+    db.commit()
+
+
+def run_queries(db: Session, queries: np.ndarray, k: int, ef_search=None, exact=False, literal=False):
+    if literal:
+        sql = text(f"SELECT id FROM {SCHEMA}.items ORDER BY v <=> CAST(:qv AS vector) LIMIT :k")
+    else:
+        sql = text(f"SELECT id FROM {SCHEMA}.items ORDER BY v <=> {vector_param('qv')} LIMIT :k")
+
+    results, latencies = [], []
+    for q in queries:
+        qv = "[" + ",".join(f"{x:.6f}" for x in q) + "]" if literal else to_vector_param(q)
+        start = time.perf_counter()
+        if exact:
+            db.execute(text("SET LOCAL enable_indexscan = off"))
+        elif ef_search:
+            apply_ef_search(db, ef_search)
+        ids = [r[0] for r in db.execute(sql, {"qv": qv, "k": k})]
+        latencies.append((time.perf_counter() - start) * 1000)
+        db.rollback()
+        results.append(ids)
+    return results, latencies
+
+
+def recall(results, truth) -> float:
+    return float(np.mean([len(set(r) & set(t)) / len(t) for r, t in zip(results, truth)]))
+
+
+def report(label: str, results, latencies, truth) -> None:
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    print(f"  {label:<22} rappel={recall(results, truth):.3f}  "
+          f"médiane={statistics.median(latencies):7.2f} ms  p95={p95:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[20, 40, 100, 200])
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    args = parser.parse_args()
+
+    db = Session(bind=engine)
+    try:
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        db.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        db.commit()
+
+        for size in args.sizes:
+            vectors = make_vectors(size, args.dim, seed=size)
+            # Requêtes : points du jeu bruités (même distribution que les données)
+            rnd = np.random.default_rng(0)
+            queries = vectors[rnd.integers(0, size, args.queries)]
+            queries = queries + 0.3 * rnd.standard_normal(queries.shape).astype(np.float32) / np.sqrt(args.dim)
+            queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+            truth = [list(np.argsort(-(vectors @ q))[:args.k]) for q in queries]
+
+            print(f"\n{size} vecteurs, dim={args.dim}, {args.queries} requêtes, k={args.k}")
+            load(db, vectors, args.dim)
+
+            results, latencies = run_queries(db, queries, args.k, exact=True)
+            report("EXACT (seq scan)", results, latencies, truth)
+
+            start = time.perf_counter()
+            db.execute(text(f"""
+                CREATE INDEX ON {SCHEMA}.items USING hnsw (v vector_cosine_ops)
+                WITH (m = {args.m}, ef_construction = {args.ef_construction})
+            """))
+            db.commit()
+            print(f"  construction HNSW: {time.perf_counter() - start:.1f}s")
+
+            for ef in args.ef_search:
+                results, latencies = run_queries(db, queries, args.k, ef_search=ef)
+                report(f"HNSW ef_search={ef}", results, latencies, truth)
+
+            results, latencies = run_queries(db, queries, args.k, ef_search=args.ef_search[0], literal=True)
+            report("HNSW littéral texte", results, latencies, truth)
+    finally:
+        db.rollback()
+        db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
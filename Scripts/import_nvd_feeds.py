@@ -0,0 +1,41 @@
+"""
+Initialisation / mise à jour de la base CVE locale à partir des flux NVD.
+
+Importe les fichiers nvdcve-2.0-*.json[.gz] de NVD_FEEDS_DIR (un flux déjà
+importé et inchangé est ignoré). Avec --download, télécharge d'abord les flux
+demandés (depuis une machine ayant accès à nvd.nist.gov).
+
+Usage:
+    python Scripts/import_nvd_feeds.py [--dir ./data/nvd] [--download 2002 ... 2026 modified recent]
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from src.services.external_scanner.nvd_store import download_feeds, nvd_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", default=None, help="Répertoire des flux (défaut: NVD_FEEDS_DIR)")
+    parser.add_argument("--download", nargs="*", default=None,
+                        help="Flux à télécharger (années, modified, recent)")
+    args = parser.parse_args()
+
+    if args.download is not None:
+        download_feeds(args.download or ["modified", "recent"], directory=args.dir)
+
+    results = nvd_store.import_feeds(directory=args.dir)
+    for name, count in results.items():
+        print(f"{name:<32} {count}")
+
+
+if __name__ == "__main__":
+    main()
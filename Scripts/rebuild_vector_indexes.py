@@ -0,0 +1,52 @@
+"""
+Création / reconstruction des index HNSW des tables d'embeddings.
+
+À lancer après un import massif d'embeddings (régénération complète d'un
+référentiel) ou pour changer les paramètres m / ef_construction.
+Remplace les anciens index ivfflat.
+
+Usage:
+    python Scripts/rebuild_vector_indexes.py [--rebuild] [--m 16] [--ef-construction 64]
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from src.services.vector_index_service import ensure_vector_indexes, get_vector_index_status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rebuild", action="store_true", help="REINDEX des index existants")
+    parser.add_argument("--m", type=int, default=None)
+    parser.add_argument("--ef-construction", type=int, default=None)
+    args = parser.parse_args()
+
+    engine = create_engine(os.getenv('DATABASE_URL'))
+    Session = sessionmaker(bind=engine)
+    db = Session()
+
+    try:
+        actions = ensure_vector_indexes(
+            db, rebuild=args.rebuild, m=args.m, ef_construction=args.ef_construction
+        )
+        for table, action in actions.items():
+            print(f"{table:<28} {action}")
+        print()
+        for index in get_vector_index_status(db):
+            print(f"{index['indexname']:<40} {index['size']:>10}  {index['indexdef']}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
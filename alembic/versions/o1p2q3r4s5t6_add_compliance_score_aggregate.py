@@ -0,0 +1,74 @@
+"""Add compliance_score_aggregate table (dashboard score counters)
+
+Revision ID: o1p2q3r4s5t6
+Revises: n1o2p3q4r5s6
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'o1p2q3r4s5t6'
+down_revision: Union[str, None] = 'n1o2p3q4r5s6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Compteurs de réponses courantes par (campagne, entité, domaine)
+    op.create_table(
+        'compliance_score_aggregate',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('campaign_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('campaign.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('domain_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('compliant_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('minor_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('major_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('not_applicable_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('answer_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+    )
+
+    op.create_index('ix_compliance_score_aggregate_campaign_entity', 'compliance_score_aggregate', ['campaign_id', 'entity_id'])
+    op.create_index('ix_compliance_score_aggregate_entity_id', 'compliance_score_aggregate', ['entity_id'])
+
+    # Index pour la détection des réponses modifiées (rafraîchissement périodique)
+    op.create_index('ix_question_answer_updated_at', 'question_answer', ['updated_at'])
+
+    # Initialisation à partir des réponses existantes
+    op.execute("""
+        INSERT INTO compliance_score_aggregate (
+            campaign_id, entity_id, domain_id,
+            compliant_count, minor_count, major_count, not_applicable_count, answer_count,
+            updated_at
+        )
+        SELECT
+            qa.campaign_id,
+            a.entity_id,
+            r.domain_id,
+            COUNT(*) FILTER (WHERE qa.compliance_status = 'compliant'),
+            COUNT(*) FILTER (WHERE qa.compliance_status = 'non_compliant_minor'),
+            COUNT(*) FILTER (WHERE qa.compliance_status = 'non_compliant_major'),
+            COUNT(*) FILTER (WHERE qa.compliance_status = 'not_applicable'),
+            COUNT(*),
+            NOW()
+        FROM question_answer qa
+        LEFT JOIN audit a ON a.id = qa.audit_id
+        JOIN question q ON q.id = qa.question_id
+        LEFT JOIN requirement r ON r.id = q.requirement_id
+        WHERE qa.campaign_id IS NOT NULL
+          AND qa.is_current = true
+        GROUP BY qa.campaign_id, a.entity_id, r.domain_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_answer_updated_at', table_name='question_answer')
+    op.drop_index('ix_compliance_score_aggregate_entity_id', table_name='compliance_score_aggregate')
+    op.drop_index('ix_compliance_score_aggregate_campaign_entity', table_name='compliance_score_aggregate')
+    op.drop_table('compliance_score_aggregate')
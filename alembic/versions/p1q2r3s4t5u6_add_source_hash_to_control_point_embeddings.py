@@ -0,0 +1,26 @@
+"""Add source_hash to control_point_embeddings (stale embedding detection)
+
+Revision ID: p1q2r3s4t5u6
+Revises: o1p2q3r4s5t6
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'p1q2r3s4t5u6'
+down_revision: Union[str, None] = 'o1p2q3r4s5t6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SHA-256 du texte source complet (source_text est tronqué à 1000 caractères)
+    op.add_column('control_point_embeddings', sa.Column('source_hash', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('control_point_embeddings', 'source_hash')
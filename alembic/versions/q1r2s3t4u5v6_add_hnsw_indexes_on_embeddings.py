@@ -0,0 +1,54 @@
+"""Add HNSW cosine indexes on embedding tables (replace ivfflat)
+
+Revision ID: q1r2s3t4u5v6
+Revises: p1q2r3s4t5u6
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'q1r2s3t4u5v6'
+down_revision: Union[str, None] = 'p1q2r3s4t5u6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (colonne vecteur, index HNSW, ancien index ivfflat)
+INDEXES = {
+    'control_point_embeddings': ('embedding_vector', 'ix_control_point_embeddings_hnsw', 'idx_control_point_embeddings_vector'),
+    'requirement_embeddings': ('embedding_vector', 'ix_requirement_embeddings_hnsw', 'idx_requirement_embeddings_vector'),
+    'response_embeddings': ('embedding', 'ix_response_embeddings_hnsw', 'idx_respemb_vec'),
+}
+
+
+def upgrade() -> None:
+    # HNSW requiert pgvector >= 0.5 ; vector_cosine_ops = opérateur <=> des recherches
+    for table, (column, index_name, legacy) in INDEXES.items():
+        op.execute(f'DROP INDEX IF EXISTS {legacy}')
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF to_regclass('{table}') IS NOT NULL THEN
+                    CREATE INDEX IF NOT EXISTS {index_name} ON {table}
+                    USING hnsw ({column} vector_cosine_ops)
+                    WITH (m = 16, ef_construction = 64);
+                END IF;
+            END $$;
+        """)
+
+
+def downgrade() -> None:
+    for table, (column, index_name, legacy) in INDEXES.items():
+        op.execute(f'DROP INDEX IF EXISTS {index_name}')
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF to_regclass('{table}') IS NOT NULL THEN
+                    CREATE INDEX IF NOT EXISTS {legacy} ON {table}
+                    USING ivfflat ({column} vector_cosine_ops)
+                    WITH (lists = 100);
+                END IF;
+            END $$;
+        """)
@@ -0,0 +1,68 @@
+"""Add local NVD CVE store (nvd_cve, nvd_cpe_match, nvd_feed_state)
+
+Revision ID: r1s2t3u4v5w6
+Revises: q1r2s3t4u5v6
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'r1s2t3u4v5w6'
+down_revision: Union[str, None] = 'q1r2s3t4u5v6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CVE importées des flux JSON NVD
+    op.create_table(
+        'nvd_cve',
+        sa.Column('cve_id', sa.String(32), primary_key=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('cvss_score', sa.Numeric(3, 1), nullable=True),
+        sa.Column('cvss_vector', sa.String(255), nullable=True),
+        sa.Column('cvss_version', sa.String(8), nullable=True),
+        sa.Column('severity', sa.String(16), nullable=True),
+        sa.Column('published_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_modified', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('references', postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column('cwe_ids', postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+    )
+
+    # Critères CPE vulnérables (version exacte ou plage)
+    op.create_table(
+        'nvd_cpe_match',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('cve_id', sa.String(32), sa.ForeignKey('nvd_cve.cve_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('vendor', sa.String(255), nullable=False),
+        sa.Column('product', sa.String(255), nullable=False),
+        sa.Column('version', sa.String(100), nullable=True),
+        sa.Column('version_start_including', sa.String(100), nullable=True),
+        sa.Column('version_start_excluding', sa.String(100), nullable=True),
+        sa.Column('version_end_including', sa.String(100), nullable=True),
+        sa.Column('version_end_excluding', sa.String(100), nullable=True),
+    )
+    op.create_index('ix_nvd_cpe_match_product_vendor', 'nvd_cpe_match', ['product', 'vendor'])
+    op.create_index('ix_nvd_cpe_match_cve_id', 'nvd_cpe_match', ['cve_id'])
+
+    # Empreinte des flux importés (import incrémental)
+    op.create_table(
+        'nvd_feed_state',
+        sa.Column('feed_name', sa.String(64), primary_key=True),
+        sa.Column('sha256', sa.String(64), nullable=False),
+        sa.Column('cve_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('imported_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('nvd_feed_state')
+    op.drop_index('ix_nvd_cpe_match_cve_id', table_name='nvd_cpe_match')
+    op.drop_index('ix_nvd_cpe_match_product_vendor', table_name='nvd_cpe_match')
+    op.drop_table('nvd_cpe_match')
+    op.drop_table('nvd_cve')
@@ -0,0 +1,60 @@
+"""Add external scan campaigns (fan-out of an ecosystem-wide rescan)
+
+Revision ID: s1t2u3v4w5x6
+Revises: r1s2t3u4v5w6
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 's1t2u3v4w5x6'
+down_revision: Union[str, None] = 'r1s2t3u4v5w6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Campagne de scan: un lot de cibles d'un tenant scannées en parallèle
+    op.create_table(
+        'external_scan_campaign',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(255), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='PENDING'),  # PENDING, RUNNING, SUCCESS, PARTIAL, ERROR
+        sa.Column('trigger_type', sa.String(50), nullable=False, server_default='manual'),  # manual, scheduled
+        sa.Column('triggered_by', postgresql.UUID(as_uuid=True), nullable=True),
+        # Périmètre demandé (None = toutes les cibles actives du tenant)
+        sa.Column('target_filter', postgresql.JSONB(), nullable=True),
+        # Compteurs
+        sa.Column('targets_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('scans_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('deduplicated_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('success_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        # Plan (cibles dédupliquées, adresses résolues) et agrégats de fin
+        sa.Column('summary', postgresql.JSONB(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_external_scan_campaign_tenant_created', 'external_scan_campaign', ['tenant_id', 'created_at'])
+
+    op.add_column('external_scan', sa.Column(
+        'campaign_id', postgresql.UUID(as_uuid=True),
+        sa.ForeignKey('external_scan_campaign.id', ondelete='SET NULL'),
+        nullable=True
+    ))
+    op.create_index('ix_external_scan_campaign', 'external_scan', ['campaign_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_external_scan_campaign', table_name='external_scan')
+    op.drop_column('external_scan', 'campaign_id')
+    op.drop_index('ix_external_scan_campaign_tenant_created', table_name='external_scan_campaign')
+    op.drop_table('external_scan_campaign')
@@ -0,0 +1,126 @@
+"""Add external_scan_latest (latest successful scan per target, typed columns)
+
+Revision ID: t1u2v3w4x5y6
+Revises: s1t2u3v4w5x6
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 't1u2v3w4x5y6'
+down_revision: Union[str, None] = 's1t2u3v4w5x6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Dernier scan réussi de chaque cible, maintenu à chaque scan réussi
+    # (rapports écosystème, dashboard et vue écosystème du scanner)
+    op.create_table(
+        'external_scan_latest',
+        sa.Column('external_target_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('external_target.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('scan_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('external_scan.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('scans_count', sa.Integer(), nullable=False, server_default='0'),
+        # Résumé du scan (summary JSONB typé)
+        sa.Column('exposure_score', sa.Integer(), nullable=True),
+        sa.Column('tls_grade', sa.String(5), nullable=True),
+        sa.Column('nb_vuln_critical', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('nb_vuln_high', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('nb_vuln_medium', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('nb_vuln_low', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('nb_services_exposed', sa.Integer(), nullable=False, server_default='0'),
+        # Constats du scan (positionnement: nombre et CVSS moyen)
+        sa.Column('nb_findings', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('avg_cvss', sa.Numeric(4, 2), nullable=False, server_default='0'),
+        # Constats non remédiés (dashboard, vue écosystème)
+        sa.Column('open_critical', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_high', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_medium', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_low', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    # Dernier scan par entité (DISTINCT ON entity_id, finished_at DESC)
+    op.create_index(
+        'ix_external_scan_latest_tenant_entity', 'external_scan_latest',
+        ['tenant_id', 'entity_id', sa.text('finished_at DESC')]
+    )
+    # Classement par score d'exposition (top cibles, positionnement)
+    op.create_index(
+        'ix_external_scan_latest_tenant_score', 'external_scan_latest',
+        ['tenant_id', sa.text('exposure_score DESC')]
+    )
+    op.create_index('ix_external_scan_latest_scan', 'external_scan_latest', ['scan_id'])
+
+    # Historique (tendances) des scans réussis d'une entité
+    op.create_index(
+        'ix_external_scan_entity_success', 'external_scan',
+        ['tenant_id', 'entity_id', sa.text('finished_at DESC')],
+        postgresql_where=sa.text("status = 'SUCCESS'")
+    )
+
+    # Initialisation depuis les scans existants
+    op.execute("""
+        INSERT INTO external_scan_latest (
+            external_target_id, tenant_id, entity_id, scan_id, finished_at, scans_count,
+            exposure_score, tls_grade,
+            nb_vuln_critical, nb_vuln_high, nb_vuln_medium, nb_vuln_low, nb_services_exposed,
+            nb_findings, avg_cvss,
+            open_critical, open_high, open_medium, open_low, open_total
+        )
+        SELECT
+            ls.external_target_id, ls.tenant_id, ls.entity_id, ls.id, ls.finished_at, ls.scans_count,
+            ROUND((ls.summary->>'exposure_score')::numeric)::int,
+            ls.summary->>'tls_grade',
+            COALESCE((ls.summary->>'nb_vuln_critical')::int, 0),
+            COALESCE((ls.summary->>'nb_vuln_high')::int, 0),
+            COALESCE((ls.summary->>'nb_vuln_medium')::int, 0),
+            COALESCE((ls.summary->>'nb_vuln_low')::int, 0),
+            COALESCE((ls.summary->>'nb_services_exposed')::int, 0),
+            COALESCE(v.nb_findings, 0),
+            COALESCE(v.avg_cvss, 0),
+            COALESCE(v.open_critical, 0),
+            COALESCE(v.open_high, 0),
+            COALESCE(v.open_medium, 0),
+            COALESCE(v.open_low, 0),
+            COALESCE(v.open_total, 0)
+        FROM (
+            SELECT DISTINCT ON (es.external_target_id)
+                es.*,
+                COUNT(*) OVER (PARTITION BY es.external_target_id) as scans_count
+            FROM external_scan es
+            WHERE es.status = 'SUCCESS'
+              AND es.external_target_id IS NOT NULL
+            ORDER BY es.external_target_id, es.finished_at DESC NULLS LAST
+        ) ls
+        LEFT JOIN LATERAL (
+            SELECT
+                COUNT(*) as nb_findings,
+                ROUND(AVG(esv.cvss_score)::numeric, 2) as avg_cvss,
+                COUNT(*) FILTER (WHERE esv.severity = 'CRITICAL' AND esv.is_remediated IS NOT TRUE) as open_critical,
+                COUNT(*) FILTER (WHERE esv.severity = 'HIGH' AND esv.is_remediated IS NOT TRUE) as open_high,
+                COUNT(*) FILTER (WHERE esv.severity = 'MEDIUM' AND esv.is_remediated IS NOT TRUE) as open_medium,
+                COUNT(*) FILTER (WHERE esv.severity = 'LOW' AND esv.is_remediated IS NOT TRUE) as open_low,
+                COUNT(*) FILTER (WHERE esv.is_remediated IS NOT TRUE) as open_total
+            FROM external_service_vulnerability esv
+            WHERE esv.external_scan_id = ls.id
+        ) v ON true
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_external_scan_entity_success', table_name='external_scan')
+    op.drop_index('ix_external_scan_latest_scan', table_name='external_scan_latest')
+    op.drop_index('ix_external_scan_latest_tenant_score', table_name='external_scan_latest')
+    op.drop_index('ix_external_scan_latest_tenant_entity', table_name='external_scan_latest')
+    op.drop_table('external_scan_latest')
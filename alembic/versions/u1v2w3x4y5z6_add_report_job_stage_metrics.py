@@ -0,0 +1,30 @@
+"""Add stage_metrics to report_generation_job (per-stage and per-widget timings)
+
+Revision ID: u1v2w3x4y5z6
+Revises: t1u2v3w4x5y6
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'u1v2w3x4y5z6'
+down_revision: Union[str, None] = 't1u2v3w4x5y6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Mesures du job (ex: latence de génération de chaque widget IA)
+    op.add_column(
+        'report_generation_job',
+        sa.Column('stage_metrics', postgresql.JSONB(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('report_generation_job', 'stage_metrics')
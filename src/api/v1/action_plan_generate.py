@@ -281,7 +281,7 @@ async def generate_action_plan_stream(
 
 
 @router.get("/{campaign_id}/action-plan/items")
-async def get_action_plan_items(
+def get_action_plan_items(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("ACTION_PLAN_READ")),
     db: Session = Depends(get_db)
@@ -553,7 +553,7 @@ async def get_action_plan_items(
 
 
 @router.put("/action-plan/items/{item_id}")
-async def update_action_plan_item(
+def update_action_plan_item(
     item_id: UUID,
     update_data: dict,
     current_user: User = Depends(require_permission("ACTION_PLAN_UPDATE")),
@@ -648,7 +648,7 @@ async def update_action_plan_item(
 
 
 @router.post("/{campaign_id}/action-plan/publish")
-async def publish_action_plan(
+def publish_action_plan(
     campaign_id: UUID,
     action_plan_data: dict,
     current_user: User = Depends(require_permission("ACTION_PLAN_CREATE")),
@@ -1117,7 +1117,7 @@ async def create_action_plan_item(
 
 
 @router.delete("/action-plan/items/{item_id}")
-async def delete_action_plan_item(
+def delete_action_plan_item(
     item_id: UUID,
     current_user: User = Depends(require_permission("ACTION_PLAN_DELETE")),
     db: Session = Depends(get_db)
@@ -1191,7 +1191,7 @@ async def delete_action_plan_item(
 
 
 @router.delete("/{campaign_id}/action-plan")
-async def delete_action_plan(
+def delete_action_plan(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("ACTION_PLAN_DELETE")),
     db: Session = Depends(get_db)
@@ -1288,7 +1288,7 @@ async def delete_action_plan(
 
 
 @router.get("/{campaign_id}/questions-with-control-points")
-async def get_campaign_questions_with_control_points(
+def get_campaign_questions_with_control_points(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("ACTION_PLAN_READ")),
     db: Session = Depends(get_db)
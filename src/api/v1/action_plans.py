@@ -37,7 +37,7 @@ router = APIRouter(prefix="/campaigns", tags=["Action Plans"])
 # ============================================================================
 
 @router.get("/{campaign_id}/action-plan", response_model=ActionPlanGetResponse)
-async def get_action_plan(
+def get_action_plan(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("ACTION_PLAN_READ")),
     db: Session = Depends(get_db)
@@ -168,7 +168,7 @@ class PublishToActionsResponse(BaseModel):
 # ============================================================================
 
 @router.post("/{campaign_id}/action-plan/publish-to-actions", response_model=PublishToActionsResponse)
-async def publish_action_plan_to_actions(
+def publish_action_plan_to_actions(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("ACTION_PLAN_PUBLISH")),
     db: Session = Depends(get_db)
@@ -418,7 +418,7 @@ class UnpublishActionsResponse(BaseModel):
 # ============================================================================
 
 @router.delete("/{campaign_id}/action-plan/unpublish")
-async def unpublish_action_plan(
+def unpublish_action_plan(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("ACTION_PLAN_PUBLISH")),
     db: Session = Depends(get_db)
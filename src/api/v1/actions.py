@@ -287,7 +287,7 @@ def fetch_source_question_details(db: Session, source_question_ids: List[UUID])
 # ============================================================================
 
 @router.get("", response_model=ActionsListResponse)
-async def get_actions(
+def get_actions(
     status: Optional[str] = Query(None, description="Filtrer par statut (pending, in_progress, completed, blocked)"),
     priority: Optional[str] = Query(None, description="Filtrer par priorité (P1, P2, P3)"),
     severity: Optional[str] = Query(None, description="Filtrer par sévérité (critical, major, minor, info)"),
@@ -682,7 +682,7 @@ class UsersByRoleResponse(BaseModel):
 # ============================================================================
 
 @router.get("/scope-entities", response_model=ScopeEntitiesResponse)
-async def get_scope_entities(
+def get_scope_entities(
     current_user: User = Depends(require_permission("ACTIONS_READ")),
     db: Session = Depends(get_db)
 ):
@@ -776,7 +776,7 @@ async def get_scope_entities(
 # ============================================================================
 
 @router.get("/roles/list", response_model=RolesListResponse)
-async def get_roles(
+def get_roles(
     current_user: User = Depends(require_permission("ACTIONS_READ")),
     db: Session = Depends(get_db)
 ):
@@ -836,7 +836,7 @@ async def get_roles(
 
 
 @router.get("/roles/{role_code}/users", response_model=UsersByRoleResponse)
-async def get_users_by_role(
+def get_users_by_role(
     role_code: str,
     current_user: User = Depends(require_permission("ACTIONS_READ")),
     db: Session = Depends(get_db)
@@ -912,7 +912,7 @@ async def get_users_by_role(
 # ============================================================================
 
 @router.get("/{action_id}", response_model=PublishedActionResponse)
-async def get_action(
+def get_action(
     action_id: UUID,
     current_user: User = Depends(require_permission("ACTIONS_READ")),
     db: Session = Depends(get_db)
@@ -1045,7 +1045,7 @@ async def get_action(
 
 @router.patch("/{action_id}", response_model=ActionUpdateResponse)
 @router.put("/{action_id}", response_model=ActionUpdateResponse)
-async def update_action(
+def update_action(
     action_id: UUID,
     update_data: ActionUpdateRequest,
     current_user: User = Depends(require_permission("ACTIONS_WRITE")),
@@ -1318,7 +1318,7 @@ class CreateStandaloneActionResponse(BaseModel):
 # ============================================================================
 
 @router.post("", response_model=CreateStandaloneActionResponse)
-async def create_standalone_action(
+def create_standalone_action(
     action_data: CreateStandaloneActionRequest,
     current_user: User = Depends(require_permission("ACTIONS_WRITE")),
     db: Session = Depends(get_db)
@@ -1543,7 +1543,7 @@ class DeleteActionResponse(BaseModel):
 
 
 @router.delete("/{action_id}", response_model=DeleteActionResponse)
-async def delete_action(
+def delete_action(
     action_id: UUID,
     current_user: User = Depends(require_permission("ACTIONS_WRITE")),
     db: Session = Depends(get_db)
@@ -50,7 +50,7 @@ def generate_temp_password(length: int = 12) -> str:
 # ============================================================================
 
 @router.get("/organizations", response_model=OrganizationListResponse)
-async def list_organizations(
+def list_organizations(
     is_active: Optional[bool] = Query(None),
     subscription_type: Optional[str] = Query(None),
     sector: Optional[str] = Query(None),
@@ -126,7 +126,7 @@ async def list_organizations(
 
 
 @router.post("/organizations", response_model=OrganizationResponse, status_code=status.HTTP_201_CREATED)
-async def create_organization(
+def create_organization(
     organization: OrganizationCreate,
     create_tenant: bool = Query(True, description="Créer automatiquement un tenant associé"),
     admin_email: Optional[str] = Query(None, description="Email de l'utilisateur admin à créer"),
@@ -275,7 +275,7 @@ async def create_organization(
 
 
 @router.get("/organizations/{organization_id}", response_model=OrganizationResponse)
-async def get_organization(
+def get_organization(
     organization_id: UUID,
     current_user: User = Depends(require_role("SUPER_ADMIN")),
     db: Session = Depends(get_db)
@@ -294,7 +294,7 @@ async def get_organization(
 
 
 @router.patch("/organizations/{organization_id}", response_model=OrganizationResponse)
-async def update_organization(
+def update_organization(
     organization_id: UUID,
     organization_update: OrganizationUpdate,
     current_user: User = Depends(require_role("SUPER_ADMIN")),
@@ -345,7 +345,7 @@ async def update_organization(
 
 
 @router.delete("/organizations/{organization_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_organization(
+def delete_organization(
     organization_id: UUID,
     force: bool = Query(False, description="Forcer la suppression même si l'organisation a des données"),
     delete_tenant: bool = Query(False, description="Supprimer aussi le tenant associé"),
@@ -387,7 +387,7 @@ async def delete_organization(
 
 
 @router.post("/organizations/{organization_id}/activate", response_model=OrganizationResponse)
-async def activate_organization(
+def activate_organization(
     organization_id: UUID,
     current_user: User = Depends(require_role("SUPER_ADMIN")),
     db: Session = Depends(get_db)
@@ -424,7 +424,7 @@ async def activate_organization(
 
 
 @router.post("/organizations/{organization_id}/deactivate", response_model=OrganizationResponse)
-async def deactivate_organization(
+def deactivate_organization(
     organization_id: UUID,
     current_user: User = Depends(require_role("SUPER_ADMIN")),
     db: Session = Depends(get_db)
@@ -465,7 +465,7 @@ async def deactivate_organization(
 # ============================================================================
 
 @router.get("/organizations/stats/overview", response_model=OrganizationStats)
-async def get_organizations_stats(
+def get_organizations_stats(
     current_user: User = Depends(require_role("SUPER_ADMIN")),
     db: Session = Depends(get_db)
 ):
@@ -52,7 +52,7 @@ def generate_temp_password(length: int = 12) -> str:
 # ============================================================================
 
 @router.get("/organizations", response_model=OrganizationListResponse)
-async def list_organizations(
+def list_organizations(
     is_active: Optional[bool] = Query(None),
     subscription_type: Optional[str] = Query(None),
     sector: Optional[str] = Query(None),
@@ -360,7 +360,7 @@ async def create_organization(
 
 
 @router.get("/organizations/{organization_id}", response_model=OrganizationResponse)
-async def get_organization(
+def get_organization(
     organization_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -378,7 +378,7 @@ async def get_organization(
 
 
 @router.patch("/organizations/{organization_id}", response_model=OrganizationResponse)
-async def update_organization(
+def update_organization(
     organization_id: UUID,
     organization_update: OrganizationUpdate,
     db: Session = Depends(get_db)
@@ -460,7 +460,7 @@ async def update_organization(
 
 
 @router.delete("/organizations/{organization_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_organization(
+def delete_organization(
     organization_id: UUID,
     force: bool = Query(False, description="Forcer la suppression même si l'organisation a des données"),
     delete_tenant: bool = Query(False, description="Supprimer aussi le tenant associé"),
@@ -496,7 +496,7 @@ async def delete_organization(
 
 
 @router.post("/organizations/{organization_id}/activate", response_model=OrganizationResponse)
-async def activate_organization(
+def activate_organization(
     organization_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -527,7 +527,7 @@ async def activate_organization(
 
 
 @router.post("/organizations/{organization_id}/deactivate", response_model=OrganizationResponse)
-async def deactivate_organization(
+def deactivate_organization(
     organization_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -562,7 +562,7 @@ async def deactivate_organization(
 # ============================================================================
 
 @router.get("/organizations/stats/overview", response_model=OrganizationStats)
-async def get_organizations_stats(
+def get_organizations_stats(
     db: Session = Depends(get_db)
 ):
     """Récupère les statistiques globales des organizations"""
@@ -129,7 +129,7 @@ def create_default_templates_for_tenant(db: Session, tenant_id: UUID, tenant_nam
 # ============================================================================
 
 @router.get("/", response_model=ClientListResponse)
-async def list_clients(
+def list_clients(
     is_active: Optional[bool] = Query(None),
     subscription_type: Optional[str] = Query(None),
     size_category: Optional[str] = Query(None),
@@ -186,7 +186,7 @@ async def list_clients(
 
 
 @router.post("/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
-async def create_client(
+def create_client(
     client: ClientCreate,
     create_tenant: bool = Query(True, description="Créer automatiquement un tenant associé"),
     db: Session = Depends(get_db)
@@ -264,7 +264,7 @@ async def create_client(
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
-async def get_client(
+def get_client(
     client_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -281,7 +281,7 @@ async def get_client(
 
 
 @router.patch("/{client_id}", response_model=ClientResponse)
-async def update_client(
+def update_client(
     client_id: UUID,
     client_update: ClientUpdate,
     db: Session = Depends(get_db)
@@ -342,7 +342,7 @@ async def update_client(
 
 
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_client(
+def delete_client(
     client_id: UUID,
     force: bool = Query(False, description="Forcer la suppression même si le client a des dépendances"),
     delete_tenant: bool = Query(True, description="Supprimer également le tenant associé"),
@@ -385,7 +385,7 @@ async def delete_client(
 # ============================================================================
 
 @router.get("/stats/overview", response_model=ClientStats)
-async def get_clients_stats(db: Session = Depends(get_db)):
+def get_clients_stats(db: Session = Depends(get_db)):
     """Récupère les statistiques globales des clients"""
     
     # Total clients
@@ -422,7 +422,7 @@ async def get_clients_stats(db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.post("/{client_id}/activate", response_model=ClientResponse)
-async def activate_client(
+def activate_client(
     client_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -458,7 +458,7 @@ async def activate_client(
 
 
 @router.post("/{client_id}/deactivate", response_model=ClientResponse)
-async def deactivate_client(
+def deactivate_client(
     client_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -94,7 +94,7 @@ def _legacy_to_current_payload(data: Dict[str, Any]) -> Dict[str, Any]:
 # ============================================================================
 
 @router.get("/", response_model=OrganizationListResponse)
-async def list_organizations(
+def list_organizations(
     is_active: Optional[bool] = Query(None),
     subscription_type: Optional[Literal["starter", "professional", "enterprise"]] = Query(None),
     # recherche plein texte
@@ -163,7 +163,7 @@ async def list_organizations(
 
 
 @router.post("/", response_model=OrganizationResponse, status_code=status.HTTP_201_CREATED)
-async def create_organization(
+def create_organization(
     organization: OrganizationCreate,
     create_tenant: bool = Query(True, description="Créer automatiquement un tenant associé"),
     db: Session = Depends(get_db),
@@ -246,7 +246,7 @@ async def create_organization(
 
 
 @router.get("/{organization_id}/admin-info")
-async def get_organization_admin_info(
+def get_organization_admin_info(
     organization_id: UUID, db: Session = Depends(get_db)
 ):
     """
@@ -351,7 +351,7 @@ async def get_organization_admin_info(
 
 
 @router.get("/{organization_id}", response_model=OrganizationResponse)
-async def get_organization(
+def get_organization(
     organization_id: UUID, db: Session = Depends(get_db)
 ):
     """Récupère une organization par son ID."""
@@ -364,7 +364,7 @@ async def get_organization(
 
 
 @router.patch("/{organization_id}", response_model=OrganizationResponse)
-async def update_organization(
+def update_organization(
     organization_id: UUID,
     organization_update: OrganizationUpdate,
     db: Session = Depends(get_db),
@@ -406,7 +406,7 @@ async def update_organization(
 
 
 @router.delete("/{organization_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_organization(
+def delete_organization(
     organization_id: UUID,
     force: bool = Query(False, description="Forcer la suppression même avec des données liées"),
     db: Session = Depends(get_db),
@@ -540,7 +540,7 @@ async def delete_organization(
 
 
 @router.patch("/{organization_id}/toggle-active", response_model=OrganizationResponse)
-async def toggle_organization_active(
+def toggle_organization_active(
     organization_id: UUID, 
     db: Session = Depends(get_db)
 ):
@@ -631,7 +631,7 @@ def get_organizations_overview(db: Session = Depends(get_db)) -> "OrganizationSt
 
 
 @router.get("/stats/by-subscription")
-async def get_stats_by_subscription(db: Session = Depends(get_db)):
+def get_stats_by_subscription(db: Session = Depends(get_db)):
     """Statistiques par type d'abonnement."""
     rows = db.execute(
         select(
@@ -659,7 +659,7 @@ async def get_stats_by_subscription(db: Session = Depends(get_db)):
 
 
 @router.get("/stats/by-sector")
-async def get_stats_by_sector(db: Session = Depends(get_db)):
+def get_stats_by_sector(db: Session = Depends(get_db)):
     """Top secteurs d'activité (libellé NAF, champ `activity`)."""
     rows = db.execute(
         select(Organization.activity, func.count(Organization.id).label("count"))
@@ -676,7 +676,7 @@ async def get_stats_by_sector(db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.get("/search")
-async def search_organizations(
+def search_organizations(
     q: str = Query(..., min_length=2, description="Terme de recherche"),
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db),
@@ -709,7 +709,7 @@ async def search_organizations(
 
 
 @router.get("/export")
-async def export_organizations(
+def export_organizations(
     format: str = Query("json", pattern="^(json|csv)$"),
     is_active: Optional[bool] = Query(None),
     subscription_type: Optional[str] = Query(None),
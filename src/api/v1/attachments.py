@@ -8,6 +8,7 @@ Endpoints API pour la gestion des pièces jointes d'audit
 """
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, status, Form, Query
 from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import Optional, List
@@ -174,7 +175,9 @@ async def upload_attachment(
 
         # 4. Upload vers MinIO
         file_data = io.BytesIO(await file.read())
-        object_path, checksum, file_size = storage_service.upload_file(
+        # Client MinIO bloquant → exécuté dans le threadpool pour ne pas figer la boucle
+        object_path, checksum, file_size = await run_in_threadpool(
+            storage_service.upload_file,
             file_data=file_data,
             original_filename=file.filename,
             tenant_id=tenant_id,
@@ -195,7 +198,7 @@ async def upload_attachment(
 
         # Si infecté, supprimer immédiatement
         if virus_scan_status == "infected":
-            storage_service.delete_file(object_path, tenant_id)
+            await run_in_threadpool(storage_service.delete_file, object_path, tenant_id)
             raise HTTPException(
                 status_code=400,
                 detail="Fichier infecté détecté et supprimé"
@@ -252,8 +255,8 @@ async def upload_attachment(
         )
 
         # 8. Générer URL download temporaire (1h)
-        download_url = storage_service.get_presigned_url(
-            object_path, tenant_id
+        download_url = await run_in_threadpool(
+            storage_service.get_presigned_url, object_path, tenant_id
         )
 
         logger.info(
@@ -284,7 +287,7 @@ async def upload_attachment(
 
 
 @router.get("/{attachment_id}/download")
-async def download_attachment(
+def download_attachment(
     attachment_id: UUID,
     inline: bool = Query(False, description="Si True, affiche le fichier en ligne (preview) au lieu de forcer le téléchargement"),
     current_user: User = Depends(require_permission("GED_READ")),
@@ -26,6 +26,7 @@ import logging
 import os
 import json
 
+from src.services.compliance_score_service import ComplianceScoreService
 from src.services.email_service import (
     send_audite_submission_email,
     send_auditeur_submission_email,
@@ -79,7 +80,7 @@ async def check_campaign_frozen(campaign_id: UUID, db: Session) -> None:
 # ============================================================================
 
 @router.get("/campaign/{campaign_id}/questionnaire/{questionnaire_id}", response_model=QuestionnaireForAuditeResponse)
-async def get_questionnaire_for_campaign(
+def get_questionnaire_for_campaign(
     campaign_id: UUID,
     questionnaire_id: UUID,
     db: Session = Depends(get_db),
@@ -599,7 +600,7 @@ async def get_questionnaire_for_campaign(
 
 
 @router.get("/{audit_id}/questionnaire/{questionnaire_id}", response_model=QuestionnaireForAuditeResponse)
-async def get_questionnaire_for_audite(
+def get_questionnaire_for_audite(
     audit_id: UUID,
     questionnaire_id: UUID,
     db: Session = Depends(get_db),
@@ -921,7 +922,7 @@ def _build_domain_tree(
 # ============================================================================
 
 @router.post("/answers", response_model=QuestionAnswerResponse)
-async def save_answer(
+def save_answer(
     answer_data: QuestionAnswerCreate,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_keycloak)
@@ -1116,6 +1117,12 @@ async def save_answer(
         )
 
     db.add(new_answer)
+    db.flush()
+
+    # Agrégats de conformité du dashboard (même transaction que la réponse)
+    if answer_data.campaign_id:
+        ComplianceScoreService(db).refresh_audit_scores(answer_data.audit_id, answer_data.campaign_id)
+
     db.commit()
     db.refresh(new_answer)
 
@@ -1127,7 +1134,7 @@ async def save_answer(
 # ============================================================================
 
 @router.post("/{audit_id}/submit", response_model=SubmitAuditResponse)
-async def submit_audit(
+def submit_audit(
     audit_id: UUID,
     request: SubmitAuditRequest,
     db: Session = Depends(get_db),
@@ -1304,6 +1311,10 @@ async def submit_audit(
         answer.status = "submitted"
         answer.submitted_at = submitted_at
         db.add(answer)
+    db.flush()
+
+    # Agrégats de conformité du dashboard (même transaction que la soumission)
+    ComplianceScoreService(db).refresh_audit_scores(audit_id, campaign_id_from_answers)
 
     db.commit()
 
@@ -1512,7 +1523,7 @@ async def submit_audit(
 # ============================================================================
 
 @router.get("/{audit_id}/progress/{questionnaire_id}", response_model=ProgressResponse)
-async def get_progress(
+def get_progress(
     audit_id: UUID,
     questionnaire_id: UUID,
     db: Session = Depends(get_db)
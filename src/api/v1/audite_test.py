@@ -19,7 +19,7 @@ router = APIRouter()
 
 
 @router.get("/test/{questionnaire_id}", response_model=QuestionnaireForAuditeResponse)
-async def get_test_questionnaire(
+def get_test_questionnaire(
     questionnaire_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -296,7 +296,7 @@ def _build_fallback_flat_tree(
 
 
 @router.get("/list-questionnaires")
-async def list_questionnaires_for_test(db: Session = Depends(get_db)):
+def list_questionnaires_for_test(db: Session = Depends(get_db)):
     """
     Liste tous les questionnaires disponibles pour test
     Accepte tous les statuts (draft, published) pour faciliter les tests
@@ -50,7 +50,7 @@ class ChangePasswordRequest(BaseModel):
 # ============================================================================
 
 @router.get("/login-url")
-async def get_login_url(
+def get_login_url(
     redirect_uri: str = "http://localhost:3000/auth/callback",
     keycloak: KeycloakService = Depends(get_keycloak_service)
 ):
@@ -255,7 +255,7 @@ async def logout(
 
 
 @router.get("/me")
-async def get_current_user_info(
+def get_current_user_info(
     current_user = Depends(get_current_user_keycloak),
     db: Session = Depends(get_db)
 ):
@@ -369,7 +369,7 @@ async def get_current_user_info(
 
 
 @router.get("/me/permissions")
-async def get_current_user_permissions(
+def get_current_user_permissions(
     current_user = Depends(get_current_user_keycloak),
     db: Session = Depends(get_db)
 ):
@@ -469,7 +469,7 @@ async def get_current_user_permissions(
 
 
 @router.get("/config")
-async def get_keycloak_config(
+def get_keycloak_config(
     keycloak: KeycloakService = Depends(get_keycloak_service)
 ):
     """
@@ -68,7 +68,7 @@ class CampaignScopeListResponse(BaseModel):
 
 @router.get("", response_model=CampaignScopeListResponse)
 @cache_result(ttl=600, key_prefix="campaign_scopes_list")  # Cache 10min
-async def list_campaign_scopes(
+def list_campaign_scopes(
     is_active: Optional[bool] = Query(None, description="Filtrer par statut actif/inactif"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -160,7 +160,7 @@ async def list_campaign_scopes(
 
 @router.get("/{scope_id}", response_model=CampaignScopeResponse)
 @cache_result(ttl=600, key_prefix="campaign_scope_detail")  # Cache 10min
-async def get_campaign_scope(
+def get_campaign_scope(
     scope_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -390,7 +390,7 @@ async def update_campaign_scope(
 
 
 @router.delete("/{scope_id}", status_code=http_status.HTTP_204_NO_CONTENT)
-async def delete_campaign_scope(
+def delete_campaign_scope(
     scope_id: UUID,
     db: Session = Depends(get_db)
 ):
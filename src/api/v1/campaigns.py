@@ -53,7 +53,7 @@ router = APIRouter(prefix="/campaigns", tags=["Campaigns"])
 # ============================================================================
 
 @router.get("", response_model=CampaignListResponse)
-async def list_campaigns(
+def list_campaigns(
     status: Optional[str] = Query(None, description="Filtrer par statut"),
     recurrence_type: Optional[str] = Query(None, description="Filtrer par type de récurrence"),
     skip: int = Query(0, ge=0),
@@ -236,7 +236,7 @@ async def list_campaigns(
 
 
 @router.get("/stats", response_model=CampaignStatsResponse)
-async def get_campaigns_stats(
+def get_campaigns_stats(
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
 ):
@@ -285,7 +285,7 @@ async def get_campaigns_stats(
 
 
 @router.get("/{campaign_id}", response_model=CampaignResponse)
-async def get_campaign(
+def get_campaign(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -880,7 +880,7 @@ async def launch_campaign(
 
 
 @router.get("/{campaign_id}/contacts-count")
-async def get_campaign_contacts_count(
+def get_campaign_contacts_count(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -1067,7 +1067,7 @@ async def update_campaign(
 
 
 @router.delete("/{campaign_id}", status_code=http_status.HTTP_204_NO_CONTENT)
-async def delete_campaign(
+def delete_campaign(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_DELETE")),
     db: Session = Depends(get_db)
@@ -1116,7 +1116,7 @@ class CampaignUserResponse(BaseModel):
 
 
 @router.post("/{campaign_id}/users", response_model=CampaignUserResponse, status_code=http_status.HTTP_201_CREATED)
-async def add_campaign_user(
+def add_campaign_user(
     campaign_id: UUID,
     user_data: CampaignUserCreate,
     current_user: User = Depends(require_permission("CAMPAIGN_UPDATE")),
@@ -1237,7 +1237,7 @@ class AuditeDomainScopeResponse(BaseModel):
 
 
 @router.post("/{campaign_id}/domain-scope", response_model=AuditeDomainScopeResponse, status_code=http_status.HTTP_201_CREATED)
-async def set_audite_domain_scope(
+def set_audite_domain_scope(
     campaign_id: UUID,
     scope_data: AuditeDomainScopeCreate,
     current_user: User = Depends(require_permission("CAMPAIGN_UPDATE")),
@@ -1382,7 +1382,7 @@ async def set_audite_domain_scope(
 
 
 @router.get("/{campaign_id}/domain-scope/{entity_member_id}", response_model=Optional[AuditeDomainScopeResponse])
-async def get_audite_domain_scope(
+def get_audite_domain_scope(
     campaign_id: UUID,
     entity_member_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
@@ -1449,7 +1449,7 @@ async def get_audite_domain_scope(
 
 
 @router.get("/{campaign_id}/details", response_model=CampaignDetailsResponse)
-async def get_campaign_details(
+def get_campaign_details(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -1701,7 +1701,7 @@ async def get_campaign_details(
 # ============================================================================
 
 @router.get("/{campaign_id}/progress", response_model=CampaignProgressResponse)
-async def get_campaign_progress(
+def get_campaign_progress(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -1815,7 +1815,7 @@ async def get_campaign_progress(
 # ============================================================================
 
 @router.post("/{campaign_id}/entities/{entity_id}/remind")
-async def send_campaign_reminder(
+def send_campaign_reminder(
     campaign_id: UUID,
     entity_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_UPDATE")),
@@ -2023,7 +2023,7 @@ async def send_campaign_reminder(
 # ============================================================================
 
 @router.get("/{campaign_id}/scope", response_model=CampaignScopeResponse)
-async def get_campaign_scope(
+def get_campaign_scope(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -2103,7 +2103,7 @@ async def get_campaign_scope(
 
 
 @router.get("/{campaign_id}/entities", response_model=List[dict])
-async def get_campaign_entities(
+def get_campaign_entities(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -2167,7 +2167,7 @@ async def get_campaign_entities(
 # ============================================================================
 
 @router.get("/{campaign_id}/cross-referential-coverage", response_model=CampaignCrossReferentialResponse)
-async def get_campaign_cross_referential_coverage(
+def get_campaign_cross_referential_coverage(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -2325,7 +2325,7 @@ async def get_campaign_cross_referential_coverage(
 
 
 @router.get("/{campaign_id}/documents", response_model=CampaignDocumentsResponse)
-async def get_campaign_documents(
+def get_campaign_documents(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -2558,7 +2558,7 @@ async def get_campaign_documents(
 # ============================================================================
 
 @router.post("/{campaign_id}/freeze", response_model=CampaignFreezeResponse)
-async def freeze_campaign(
+def freeze_campaign(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_UPDATE")),
     db: Session = Depends(get_db)
@@ -2662,7 +2662,7 @@ async def freeze_campaign(
 # ============================================================================
 
 @router.get("/{campaign_id}/entities")
-async def get_campaign_entities(
+def get_campaign_entities(
     campaign_id: UUID,
     current_user: User = Depends(require_permission("CAMPAIGN_READ")),
     db: Session = Depends(get_db)
@@ -58,7 +58,7 @@ class CategoryWithParentsResponse(BaseModel):
 # ============================================================================
 
 @router.get("/categories/{category_id}/parents", response_model=List[dict])
-async def get_category_parents(
+def get_category_parents(
     category_id: str,
     current_user: User = Depends(require_permission("REFERENTIAL_READ")),
     db: Session = Depends(get_db)
@@ -115,7 +115,7 @@ async def get_category_parents(
 
 
 @router.get("/categories/{category_id}/contexts", response_model=dict)
-async def get_category_contexts(
+def get_category_contexts(
     category_id: str,
     current_user: User = Depends(require_permission("REFERENTIAL_READ")),
     db: Session = Depends(get_db)
@@ -210,7 +210,7 @@ async def get_category_contexts(
 
 
 @router.post("/categories/relationships", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def create_category_relationship(
+def create_category_relationship(
     relationship_data: CategoryRelationshipCreate,
     current_user: User = Depends(require_permission("REFERENTIAL_READ")),
     db: Session = Depends(get_db)
@@ -345,7 +345,7 @@ async def create_category_relationship(
 
 
 @router.delete("/categories/relationships/{relationship_id}", status_code=status.HTTP_200_OK)
-async def delete_category_relationship(
+def delete_category_relationship(
     relationship_id: str,
     current_user: User = Depends(require_permission("REFERENTIAL_READ")),
     db: Session = Depends(get_db)
@@ -459,7 +459,7 @@ async def delete_category_relationship(
 
 
 @router.patch("/categories/relationships/{relationship_id}/promote", status_code=status.HTTP_200_OK)
-async def promote_relationship_to_primary(
+def promote_relationship_to_primary(
     relationship_id: str,
     current_user: User = Depends(require_permission("REFERENTIAL_READ")),
     db: Session = Depends(get_db)
@@ -57,7 +57,7 @@ def _get_user_org_id(db: Session, user: User) -> Optional[str]:
 # GET /client/questionnaires - Liste
 # ==========================================
 @router.get("/", status_code=status.HTTP_200_OK)
-async def list_client_questionnaires(
+def list_client_questionnaires(
     limit: int = Query(default=100, le=500),
     offset: int = Query(default=0, ge=0),
     search: Optional[str] = Query(default=None),
@@ -232,7 +232,7 @@ async def list_client_questionnaires(
 # GET /client/questionnaires/stats
 # ==========================================
 @router.get("/stats", status_code=status.HTTP_200_OK)
-async def get_client_questionnaires_stats(
+def get_client_questionnaires_stats(
     current_user: User = Depends(require_permission("QUESTIONNAIRE_READ")),
     db: Session = Depends(get_db),
 ):
@@ -308,7 +308,7 @@ async def get_client_questionnaires_stats(
 # GET /client/questionnaires/{id}
 # ==========================================
 @router.get("/{questionnaire_id}", status_code=status.HTTP_200_OK)
-async def get_client_questionnaire(
+def get_client_questionnaire(
     questionnaire_id: str,
     include_questions: bool = Query(False),
     current_user: User = Depends(require_permission("QUESTIONNAIRE_READ")),
@@ -435,7 +435,7 @@ async def get_client_questionnaire(
 # POST /client/questionnaires/duplicate
 # ==========================================
 @router.post("/duplicate", status_code=status.HTTP_201_CREATED)
-async def duplicate_questionnaire(
+def duplicate_questionnaire(
     source_questionnaire_id: str = Query(..., description="ID du questionnaire à dupliquer"),
     new_name: Optional[str] = Query(None, description="Nouveau nom (optionnel)"),
     current_user: User = Depends(require_permission("QUESTIONNAIRE_CREATE")),
@@ -617,7 +617,7 @@ async def duplicate_questionnaire(
 # DELETE /client/questionnaires/{id}
 # ==========================================
 @router.delete("/{questionnaire_id}", status_code=status.HTTP_200_OK)
-async def delete_client_questionnaire(
+def delete_client_questionnaire(
     questionnaire_id: str,
     current_user: User = Depends(require_permission("QUESTIONNAIRE_DELETE")),
     db: Session = Depends(get_db),
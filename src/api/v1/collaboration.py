@@ -35,7 +35,7 @@ router = APIRouter(prefix="/collaboration", tags=["Collaboration"])
 # ============================================================================
 
 @router.post("/audits/{audit_id}/collaborators/create", response_model=CollaboratorResponse, status_code=http_status.HTTP_201_CREATED)
-async def create_and_add_collaborator(
+def create_and_add_collaborator(
     audit_id: UUID,
     collaborator_data: CollaboratorCreate,
     db: Session = Depends(get_db),
@@ -257,7 +257,7 @@ async def create_and_add_collaborator(
 
 
 @router.post("/audits/{audit_id}/collaborators", response_model=CollaboratorResponse, status_code=http_status.HTTP_201_CREATED)
-async def add_collaborator(
+def add_collaborator(
     audit_id: UUID,
     collaborator_data: CollaboratorAdd,
     db: Session = Depends(get_db),
@@ -440,7 +440,7 @@ async def add_collaborator(
 
 
 @router.get("/audits/{audit_id}/collaborators", response_model=List[CollaboratorResponse])
-async def list_collaborators(
+def list_collaborators(
     audit_id: UUID,
     question_id: Optional[UUID] = None,
     db: Session = Depends(get_db),
@@ -912,7 +912,7 @@ def extract_mentions(content: str) -> List[str]:
 
 
 @router.post("/comments", response_model=CommentResponse, status_code=http_status.HTTP_201_CREATED)
-async def create_comment(
+def create_comment(
     comment_data: CommentCreate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
@@ -1209,7 +1209,7 @@ async def create_comment(
 
 
 @router.get("/questions/{question_id}/comments", response_model=List[CommentResponse])
-async def list_comments(
+def list_comments(
     question_id: UUID,
     audit_id: UUID,
     db: Session = Depends(get_db),
@@ -1293,7 +1293,7 @@ async def list_comments(
 
 
 @router.get("/mentions/unread", response_model=UnreadMentionsResponse)
-async def get_unread_mentions(
+def get_unread_mentions(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
 ):
@@ -1461,7 +1461,7 @@ async def get_unread_mentions(
 
 
 @router.patch("/mentions/{mention_id}/read", response_model=MentionResponse)
-async def mark_mention_as_read(
+def mark_mention_as_read(
     mention_id: UUID,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
@@ -1507,7 +1507,7 @@ async def mark_mention_as_read(
 
 
 @router.get("/mentions/{mention_id}/access-link")
-async def get_mention_access_link(
+def get_mention_access_link(
     mention_id: UUID,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
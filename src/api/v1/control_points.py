@@ -594,7 +594,7 @@ async def generate_control_points_stream(
 
 
 @router.post("/control-points/{cp_id}/save-complementary", summary="Sauvegarder un PC complémentaire")
-async def save_complementary_control_point(
+def save_complementary_control_point(
     cp_id: str,
     complementary_data: dict,
     current_user: User = Depends(require_permission("REFERENTIAL_READ")),
@@ -727,7 +727,7 @@ def test_cp_query(framework_id: str, current_user: User = Depends(require_permis
 # LIGNE 486-686 : REMPLACER TOUTE LA FONCTION
 
 @router.post("/search-similar", summary="🔍 Rechercher des PCs similaires")
-async def search_similar_control_points(
+def search_similar_control_points(
     request: Dict[str, Any],
     current_user: User = Depends(require_permission("REFERENTIAL_READ")),
     db: Session = Depends(get_db)
@@ -1055,7 +1055,7 @@ async def generate_control_point_from_requirement(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/generator-status")
-async def get_generator_status(
+def get_generator_status(
     gen: DeepSeekControlPointGenerator = Depends(get_deepseek_generator)
 ):
     """
@@ -1086,7 +1086,7 @@ async def get_generator_status(
 # ============================================================================
 
 @router.post("/generate-embeddings", summary="Générer embeddings pour les PC")
-async def generate_embeddings(
+def generate_embeddings(
     db: Session = Depends(get_db),
     force_regenerate: bool = False,
     framework_id: Optional[str] = None,   # 👈 NEW
@@ -1180,7 +1180,7 @@ async def generate_embeddings(
 
 
 @router.post("/generate-embeddings/{cp_id}", summary="Générer embedding pour un PC")
-async def generate_embedding_for_cp(
+def generate_embedding_for_cp(
     cp_id: str,
     db: Session = Depends(get_db)
 ):
@@ -1294,7 +1294,7 @@ class SaveValidatedBody(BaseModel):
     control_points: List[dict]
 
 @router.post("/save-validated", summary="Sauvegarder les PC validés")
-async def save_validated(
+def save_validated(
     payload: SaveValidatedBody,
     db: Session = Depends(get_db)
 ):
@@ -2011,7 +2011,7 @@ async def generate_complementary_pcs(
 # backend/src/api/v1/control_points.py
 
 @router.put("/{cp_id}", summary="Mettre à jour un PC et générer son embedding")
-async def update_control_point(
+def update_control_point(
     cp_id: str,
     updates: dict,
     generate_embedding: bool = True,  # Par défaut, génère l'embedding
@@ -2090,7 +2090,7 @@ async def update_control_point(
 
 
 @router.post("/{cp_id}/apply-suggestion", summary="Appliquer une suggestion et générer embedding")
-async def apply_suggestion(
+def apply_suggestion(
     cp_id: str,
     suggestion: dict,
     db: Session = Depends(get_db)
@@ -2156,7 +2156,7 @@ async def apply_suggestion(
 
 
 @router.post("/{cp_id}/save-complementary", summary="Sauvegarder un PC complémentaire avec embedding")
-async def save_complementary_pc(
+def save_complementary_pc(
     cp_id: str,  # PC parent pour référence
     complementary_data: dict,
     db: Session = Depends(get_db)
@@ -2582,7 +2582,7 @@ def map_risk_to_criticality(risk_level: Optional[str]) -> str:
         return "low"
 
 @router.get("/framework/{framework_id}/orphan-requirements", summary="Exigences sans PC")
-async def get_orphan_requirements(
+def get_orphan_requirements(
     framework_id: str,
     db: Session = Depends(get_db)
 ):
@@ -2702,7 +2702,7 @@ def frameworks_dashboard(db: Session = Depends(get_db)):
     response_model=Dict[str, Any],
     summary="Supprimer un point de contrôle spécifique"
 )
-async def delete_control_point(
+def delete_control_point(
     control_point_id: str,
     db: Session = Depends(get_db),
 ):
@@ -3096,7 +3096,7 @@ def list_control_points(
     }
 
 @router.get("/frameworks-with-pc-embeddings")
-async def frameworks_with_pc_embeddings(
+def frameworks_with_pc_embeddings(
     limit: int = 50,
     offset: int = 0,
     db: Session = Depends(get_db),
@@ -3185,7 +3185,7 @@ async def frameworks_with_pc_embeddings(
 # ================================================================
 
 @router.post("/search-similar", summary="Rechercher des PCs similaires")
-async def search_similar_control_points(
+def search_similar_control_points(
     request: Dict[str, Any],
     db: Session = Depends(get_db)
 ):
@@ -3283,7 +3283,7 @@ async def search_similar_control_points(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{pc_id}/link-requirement", summary="Lier une exigence à un PC existant")
-async def link_requirement_to_existing_pc(
+def link_requirement_to_existing_pc(
     pc_id: str,
     request: Dict[str, Any],
     db: Session = Depends(get_db)
@@ -3333,7 +3333,7 @@ async def link_requirement_to_existing_pc(
 
         
 @router.post("/{control_point_id}/generate-embedding", status_code=200)
-async def generate_embedding_for_single_control_point(
+def generate_embedding_for_single_control_point(
     control_point_id: str,
     db: Session = Depends(get_db),
 ):
@@ -3376,7 +3376,7 @@ async def generate_embedding_for_single_control_point(
 # src/api/v1/control_points.py
 
 @router.get("/")
-async def list_control_points(
+def list_control_points(
     framework_id: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
@@ -3415,7 +3415,7 @@ async def list_control_points(
 # REMPLACER LA ROUTE À LA LIGNE 3100 (environ)
 
 @router.get("/{control_point_id}")
-async def get_control_point_by_id(
+def get_control_point_by_id(
     control_point_id: str,
     db: Session = Depends(get_db)
 ):
@@ -3811,7 +3811,7 @@ async def analyze_referential_for_mapping(
 
 
 @router.post("/mapping/save-validated", response_model=SaveMappingsResponse, summary="Sauvegarder les mappings validés")
-async def save_validated_mappings(
+def save_validated_mappings(
     request: SaveMappingsRequest,
     db: Session = Depends(get_db)
 ):
@@ -21,7 +21,7 @@ router = APIRouter()
 
 @router.get("/overview")
 @cache_result(ttl=1800, key_prefix="cross_ref_overview")  # ✅ Cache 30min
-async def get_cross_ref_overview(db: Session = Depends(get_db)):
+def get_cross_ref_overview(db: Session = Depends(get_db)):
     """
     Vue d'ensemble des cross-référentiels
     Statistiques globales sur les PCs partagés entre frameworks
@@ -87,7 +87,7 @@ async def get_cross_ref_overview(db: Session = Depends(get_db)):
 
 @router.get("/coverage-matrix")
 @cache_result(ttl=1800, key_prefix="cross_ref_coverage_matrix")  # ✅ Cache 30min
-async def get_coverage_matrix(db: Session = Depends(get_db)):
+def get_coverage_matrix(db: Session = Depends(get_db)):
     """
     Matrice de couverture entre frameworks
     Montre combien de PCs sont partagés entre chaque paire de frameworks
@@ -186,7 +186,7 @@ async def get_coverage_matrix(db: Session = Depends(get_db)):
 
 @router.get("/shared-control-points")
 @cache_result(ttl=1800, key_prefix="cross_ref_shared_pcs")  # ✅ Cache 30min
-async def get_shared_control_points(
+def get_shared_control_points(
     source_framework_id: Optional[str] = None,
     target_framework_id: Optional[str] = None,
     db: Session = Depends(get_db)
@@ -285,7 +285,7 @@ async def get_shared_control_points(
 
 @router.get("/statistics")
 @cache_result(ttl=1800, key_prefix="cross_ref_statistics")  # ✅ Cache 30min
-async def get_statistics(db: Session = Depends(get_db)):
+def get_statistics(db: Session = Depends(get_db)):
     """
     Statistiques détaillées sur les cross-référentiels
     """
@@ -386,7 +386,7 @@ async def get_statistics(db: Session = Depends(get_db)):
 
 @router.get("/frameworks")
 @cache_result(ttl=1800, key_prefix="cross_ref_frameworks")  # ✅ Cache 30min
-async def get_frameworks_for_filter(db: Session = Depends(get_db)):
+def get_frameworks_for_filter(db: Session = Depends(get_db)):
     """
     Liste des frameworks pour les filtres
     """
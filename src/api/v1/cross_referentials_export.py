@@ -495,7 +495,7 @@ def create_statistics_sheet(wb: Workbook, db: Session):
 
 
 @router.get("/export")
-async def export_cross_referentials(db: Session = Depends(get_db)):
+def export_cross_referentials(db: Session = Depends(get_db)):
     """
     Exporter l'analyse cross-référentielle en Excel
     """
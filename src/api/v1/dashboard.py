@@ -22,6 +22,7 @@ from datetime import datetime, timedelta
 
 from src.database import get_db
 from src.dependencies_keycloak import get_current_user_keycloak
+from src.services.compliance_score_service import ComplianceScoreService, score_sql
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +62,7 @@ def get_user_tenant_id(current_user: dict, db: Session) -> str:
 
 
 @router.get("/stats")
-async def get_dashboard_stats(
+def get_dashboard_stats(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
 ):
@@ -71,124 +72,20 @@ async def get_dashboard_stats(
     try:
         tenant_id = get_user_tenant_id(current_user, db)
 
-        # DEBUG: Vérifier les données disponibles
-        # audit_type est maintenant sur la table CAMPAIGN (pas audit)
-        debug_query = text("""
-            SELECT
-                c.id as campaign_id,
-                c.title,
-                c.status as campaign_status,
-                COALESCE(c.audit_type, 'external') as audit_type,
-                COUNT(qa.id) as total_answers,
-                COUNT(qa.compliance_status) as answers_with_status,
-                COUNT(CASE WHEN qa.compliance_status = 'compliant' THEN 1 END) as compliant,
-                COUNT(CASE WHEN qa.compliance_status = 'non_compliant_minor' THEN 1 END) as minor,
-                COUNT(CASE WHEN qa.compliance_status = 'non_compliant_major' THEN 1 END) as major
-            FROM campaign c
-            LEFT JOIN question_answer qa ON qa.campaign_id = c.id
-            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
-              AND c.status IN ('ongoing', 'late', 'completed', 'frozen')
-            GROUP BY c.id, c.title, c.status, c.audit_type
-            ORDER BY c.title
-        """)
-        debug_results = db.execute(debug_query, {"tenant_id": tenant_id}).fetchall()
-        for row in debug_results:
-            logger.info(f"📊 DEBUG Dashboard - Campaign: {row.title} | Status: {row.campaign_status} | Type: {row.audit_type} | Answers: {row.total_answers} | With status: {row.answers_with_status} | Compliant: {row.compliant} | Minor: {row.minor} | Major: {row.major}")
-
         # ============================================================
         # 1. SCORE DE CONFORMITÉ GLOBAL (Interne + Externe)
         # ============================================================
-        # compliance_status: compliant, non_compliant_minor, non_compliant_major, not_applicable, pending
-        # Statuts campagne: draft, ongoing, late, frozen, completed, cancelled
-        # audit_type est maintenant sur la table CAMPAIGN (pas audit)
-        # Valeurs: 'internal' (interne) ou 'external' (externe), défaut='external'
-
-        # Score Global (toutes campagnes)
-        score_query = text("""
-            SELECT
-                COALESCE(AVG(
-                    CASE
-                        WHEN qa.compliance_status = 'compliant' THEN 100
-                        WHEN qa.compliance_status = 'non_compliant_minor' THEN 50
-                        WHEN qa.compliance_status = 'non_compliant_major' THEN 0
-                        ELSE NULL
-                    END
-                ), 0) as avg_score
-            FROM question_answer qa
-            JOIN campaign c ON qa.campaign_id = c.id
-            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
-              AND c.status IN ('ongoing', 'late', 'completed', 'frozen')
-              AND qa.compliance_status IS NOT NULL
-              AND qa.compliance_status NOT IN ('not_applicable', 'pending')
-        """)
-        score_result = db.execute(score_query, {"tenant_id": tenant_id}).fetchone()
-        global_score = round(score_result.avg_score, 1) if score_result and score_result.avg_score else 0
-
-        # Score Interne (campaign.audit_type = 'internal')
-        internal_score_query = text("""
-            SELECT
-                COALESCE(AVG(
-                    CASE
-                        WHEN qa.compliance_status = 'compliant' THEN 100
-                        WHEN qa.compliance_status = 'non_compliant_minor' THEN 50
-                        WHEN qa.compliance_status = 'non_compliant_major' THEN 0
-                        ELSE NULL
-                    END
-                ), 0) as avg_score
-            FROM question_answer qa
-            JOIN campaign c ON qa.campaign_id = c.id
-            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
-              AND c.status IN ('ongoing', 'late', 'completed', 'frozen')
-              AND c.audit_type = 'internal'
-              AND qa.compliance_status IS NOT NULL
-              AND qa.compliance_status NOT IN ('not_applicable', 'pending')
-        """)
-        internal_result = db.execute(internal_score_query, {"tenant_id": tenant_id}).fetchone()
-        internal_score = round(internal_result.avg_score, 1) if internal_result and internal_result.avg_score else 0
-
-        # Score Externe (campaign.audit_type = 'external' OU NULL - défaut)
-        external_score_query = text("""
-            SELECT
-                COALESCE(AVG(
-                    CASE
-                        WHEN qa.compliance_status = 'compliant' THEN 100
-                        WHEN qa.compliance_status = 'non_compliant_minor' THEN 50
-                        WHEN qa.compliance_status = 'non_compliant_major' THEN 0
-                        ELSE NULL
-                    END
-                ), 0) as avg_score
-            FROM question_answer qa
-            JOIN campaign c ON qa.campaign_id = c.id
-            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
-              AND c.status IN ('ongoing', 'late', 'completed', 'frozen')
-              AND (c.audit_type = 'external' OR c.audit_type IS NULL)
-              AND qa.compliance_status IS NOT NULL
-              AND qa.compliance_status NOT IN ('not_applicable', 'pending')
-        """)
-        external_result = db.execute(external_score_query, {"tenant_id": tenant_id}).fetchone()
-        external_score = round(external_result.avg_score, 1) if external_result and external_result.avg_score else 0
-
-        # Calcul du trend (comparaison avec les 3 derniers mois)
-        trend_query = text("""
-            SELECT
-                COALESCE(AVG(
-                    CASE
-                        WHEN qa.compliance_status = 'compliant' THEN 100
-                        WHEN qa.compliance_status = 'non_compliant_minor' THEN 50
-                        WHEN qa.compliance_status = 'non_compliant_major' THEN 0
-                        ELSE NULL
-                    END
-                ), 0) as avg_score
-            FROM question_answer qa
-            JOIN campaign c ON qa.campaign_id = c.id
-            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
-              AND c.status IN ('ongoing', 'late', 'completed', 'frozen')
-              AND c.created_at < NOW() - INTERVAL '3 months'
-              AND qa.compliance_status IS NOT NULL
-              AND qa.compliance_status NOT IN ('not_applicable', 'pending')
-        """)
-        trend_result = db.execute(trend_query, {"tenant_id": tenant_id}).fetchone()
-        previous_score = round(trend_result.avg_score, 1) if trend_result and trend_result.avg_score else 0
+        # Lu depuis compliance_score_aggregate (compteurs par campagne/entité/domaine
+        # maintenus à l'écriture des réponses) : O(campagnes) et non O(réponses).
+        # Statuts campagne retenus: ongoing, late, completed, frozen
+        # audit_type est sur la table CAMPAIGN: 'internal' ou 'external' (défaut)
+        scores = ComplianceScoreService(db).get_tenant_scores(tenant_id)
+        global_score = scores["global_score"]
+        internal_score = scores["internal_score"]
+        external_score = scores["external_score"]
+
+        # Calcul du trend (comparaison avec les campagnes de plus de 3 mois)
+        previous_score = scores["previous_score"]
         score_trend = round(global_score - previous_score, 1) if previous_score > 0 else 0
 
         # Dernière campagne terminée ou figée
@@ -249,27 +146,18 @@ async def get_dashboard_stats(
         # ============================================================
         # 3. CONFORMITÉ PAR RÉFÉRENTIEL
         # ============================================================
-        referentials_query = text("""
+        referentials_query = text(f"""
             SELECT
                 r.name as referential_name,
                 r.code as referential_code,
-                COALESCE(AVG(
-                    CASE
-                        WHEN qa.compliance_status = 'compliant' THEN 100
-                        WHEN qa.compliance_status = 'non_compliant_minor' THEN 50
-                        WHEN qa.compliance_status = 'non_compliant_major' THEN 0
-                        ELSE NULL
-                    END
-                ), 0) as score
+                {score_sql()} as score
             FROM referential r
-            LEFT JOIN questionnaire q ON q.referential_id = r.id
-            LEFT JOIN campaign c ON c.questionnaire_id = q.id AND c.tenant_id = CAST(:tenant_id AS uuid)
-            LEFT JOIN question_answer qa ON qa.campaign_id = c.id
-                AND qa.compliance_status IS NOT NULL
-                AND qa.compliance_status NOT IN ('not_applicable', 'pending')
+            JOIN questionnaire q ON q.referential_id = r.id
+            JOIN campaign c ON c.questionnaire_id = q.id AND c.tenant_id = CAST(:tenant_id AS uuid)
+            JOIN compliance_score_aggregate s ON s.campaign_id = c.id
             WHERE r.is_active = true
             GROUP BY r.id, r.name, r.code
-            HAVING COUNT(qa.id) > 0
+            HAVING SUM(s.compliant_count + s.minor_count + s.major_count) > 0
             ORDER BY score ASC
             LIMIT 6
         """)
@@ -369,36 +257,19 @@ async def get_dashboard_stats(
         # ============================================================
         # 5. ENTITÉS À RISQUE
         # ============================================================
-        entities_at_risk_query = text("""
+        entities_at_risk_query = text(f"""
             SELECT
                 ee.id,
                 ee.name as entity_name,
-                COALESCE(AVG(
-                    CASE
-                        WHEN qa.compliance_status = 'compliant' THEN 100
-                        WHEN qa.compliance_status = 'non_compliant_minor' THEN 50
-                        WHEN qa.compliance_status = 'non_compliant_major' THEN 0
-                        ELSE NULL
-                    END
-                ), 0) as score
+                {score_sql()} as score
             FROM ecosystem_entity ee
-            LEFT JOIN question_answer qa ON qa.entity_id = ee.id
-                AND qa.compliance_status IS NOT NULL
-                AND qa.compliance_status NOT IN ('not_applicable', 'pending')
-            LEFT JOIN campaign c ON qa.campaign_id = c.id
+            JOIN compliance_score_aggregate s ON s.entity_id = ee.id
+            JOIN campaign c ON c.id = s.campaign_id AND c.tenant_id = CAST(:tenant_id AS uuid)
             WHERE ee.tenant_id = CAST(:tenant_id AS uuid)
               AND ee.deleted_at IS NULL
-              AND (c.id IS NULL OR c.tenant_id = CAST(:tenant_id AS uuid))
             GROUP BY ee.id, ee.name
-            HAVING COUNT(qa.id) > 0
-               AND COALESCE(AVG(
-                    CASE
-                        WHEN qa.compliance_status = 'compliant' THEN 100
-                        WHEN qa.compliance_status = 'non_compliant_minor' THEN 50
-                        WHEN qa.compliance_status = 'non_compliant_major' THEN 0
-                        ELSE NULL
-                    END
-                ), 100) < 70
+            HAVING SUM(s.compliant_count + s.minor_count + s.major_count) > 0
+               AND {score_sql()} < 70
             ORDER BY score ASC
             LIMIT 5
         """)
@@ -226,7 +226,7 @@ def get_unread_count(db: Session, conversation_id: UUID, user_id: UUID) -> int:
 # ============================================================================
 
 @router.get("", response_model=ConversationListResponse)
-async def list_conversations(
+def list_conversations(
     type: Optional[ConversationType] = Query(None, description="Filtrer par type"),
     campaign_id: Optional[UUID] = Query(None, description="Filtrer par campagne"),
     unread_only: bool = Query(False, description="Uniquement les non lus"),
@@ -331,7 +331,7 @@ async def list_conversations(
 
 
 @router.post("", response_model=ConversationResponse, status_code=http_status.HTTP_201_CREATED)
-async def create_conversation(
+def create_conversation(
     data: ConversationCreateDirect,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
@@ -450,7 +450,7 @@ async def create_conversation(
 
 
 @router.get("/{conversation_id}", response_model=ConversationDetailResponse)
-async def get_conversation(
+def get_conversation(
     conversation_id: UUID,
     limit: int = Query(50, ge=1, le=100, description="Nombre de messages"),
     offset: int = Query(0, ge=0, description="Offset pour pagination des messages"),
@@ -584,7 +584,7 @@ async def get_conversation(
 # ============================================================================
 
 @router.post("/{conversation_id}/messages", response_model=MessageResponse, status_code=http_status.HTTP_201_CREATED)
-async def create_message(
+def create_message(
     conversation_id: UUID,
     data: MessageCreate,
     db: Session = Depends(get_db),
@@ -753,7 +753,7 @@ async def create_message(
 # ============================================================================
 
 @router.get("/notifications/unread", response_model=UnreadNotificationsResponse)
-async def get_unread_notifications(
+def get_unread_notifications(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
 ):
@@ -818,7 +818,7 @@ async def get_unread_notifications(
 
 
 @router.patch("/notifications/{notification_id}/read")
-async def mark_notification_read(
+def mark_notification_read(
     notification_id: UUID,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
@@ -868,7 +868,7 @@ async def mark_notification_read(
 # ============================================================================
 
 @router.delete("/{conversation_id}")
-async def delete_conversation(
+def delete_conversation(
     conversation_id: UUID,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
@@ -955,7 +955,7 @@ async def delete_conversation(
 # ============================================================================
 
 @router.get("/{conversation_id}/participants", response_model=List[ParticipantResponse])
-async def get_participants(
+def get_participants(
     conversation_id: UUID,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
@@ -992,7 +992,7 @@ async def get_participants(
 
 
 @router.get("/members/search", response_model=List[ParticipantResponse])
-async def search_members(
+def search_members(
     q: str = Query(..., min_length=2, description="Recherche par nom ou email"),
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db),
@@ -1082,7 +1082,7 @@ class RightsRequestResponse(BaseModel):
 
 
 @router.post("/rights-request", response_model=RightsRequestResponse, status_code=http_status.HTTP_201_CREATED)
-async def create_rights_request(
+def create_rights_request(
     data: RightsRequestCreate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_keycloak)
@@ -1282,7 +1282,7 @@ class RightsRequestActionResponse(BaseModel):
 
 
 @router.post("/{conversation_id}/rights-action", response_model=RightsRequestActionResponse)
-async def process_rights_request(
+def process_rights_request(
     conversation_id: UUID,
     data: RightsRequestAction,
     db: Session = Depends(get_db),
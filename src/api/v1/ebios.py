@@ -593,7 +593,7 @@ def update_workshop_progress(db: Session, project_id: str, workshop_type: str =
 # ==============================================================================
 
 @router.post("/projects", response_model=RiskProjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_project(
+def create_project(
     project: RiskProjectCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("EBIOS_CREATE"))
@@ -705,7 +705,7 @@ async def create_project(
 
 
 @router.get("/projects", response_model=RiskProjectListResponse)
-async def list_projects(
+def list_projects(
     status_filter: Optional[str] = Query(None, alias="status", description="Filtrer par statut"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
@@ -832,7 +832,7 @@ async def list_projects(
 
 
 @router.get("/projects/{project_id}", response_model=RiskProjectResponse)
-async def get_project(
+def get_project(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("EBIOS_READ"))
@@ -916,7 +916,7 @@ async def get_project(
 
 
 @router.post("/projects/{project_id}/populate-at1")
-async def populate_at1_from_ai_context(
+def populate_at1_from_ai_context(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("EBIOS_UPDATE"))
@@ -1143,7 +1143,7 @@ async def update_project(
 
 
 @router.delete("/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_project(
+def delete_project(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("EBIOS_DELETE"))
@@ -1202,7 +1202,7 @@ async def delete_project(
 # ==============================================================================
 
 @router.post("/projects/{project_id}/freeze", response_model=FreezeResponse)
-async def freeze_project(
+def freeze_project(
     project_id: UUID,
     request: FreezeRequest,
     db: Session = Depends(get_db),
@@ -1385,7 +1385,7 @@ async def freeze_project(
 # ==============================================================================
 
 @router.get("/projects/{project_id}/workshop/at1", response_model=AT1Response)
-async def get_workshop_at1(
+def get_workshop_at1(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("EBIOS_READ"))
@@ -1494,7 +1494,7 @@ async def get_workshop_at1(
 
 
 @router.post("/projects/{project_id}/workshop/at1/business-values", response_model=BusinessValueResponse, status_code=status.HTTP_201_CREATED)
-async def create_business_value(
+def create_business_value(
     project_id: UUID,
     item: BusinessValueCreate,
     db: Session = Depends(get_db),
@@ -1585,7 +1585,7 @@ async def create_business_value(
 
 
 @router.post("/projects/{project_id}/workshop/at1/assets", response_model=AssetResponse, status_code=status.HTTP_201_CREATED)
-async def create_asset(
+def create_asset(
     project_id: UUID,
     item: AssetCreate,
     db: Session = Depends(get_db),
@@ -1677,7 +1677,7 @@ async def create_asset(
 
 
 @router.post("/projects/{project_id}/workshop/at1/feared-events", response_model=FearedEventResponse, status_code=status.HTTP_201_CREATED)
-async def create_feared_event(
+def create_feared_event(
     project_id: UUID,
     item: FearedEventCreate,
     db: Session = Depends(get_db),
@@ -1795,7 +1795,7 @@ class ToggleSelectionResponse(BaseModel):
 
 
 @router.patch("/projects/{project_id}/workshop/at1/toggle-selection", response_model=ToggleSelectionResponse)
-async def toggle_at1_selection(
+def toggle_at1_selection(
     project_id: UUID,
     request: ToggleSelectionRequest,
     db: Session = Depends(get_db),
@@ -1893,7 +1893,7 @@ async def toggle_at1_selection(
 # ==============================================================================
 
 @router.get("/projects/{project_id}/workshop/at2", response_model=AT2Response)
-async def get_workshop_at2(
+def get_workshop_at2(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("EBIOS_READ"))
@@ -2379,7 +2379,7 @@ class RiskSourceCreate(BaseModel):
 
 
 @router.post("/projects/{project_id}/risk-sources")
-async def create_risk_source(
+def create_risk_source(
     project_id: UUID,
     request: RiskSourceCreate,
     db: Session = Depends(get_db),
@@ -2567,7 +2567,7 @@ async def create_risk_source(
 
 
 @router.delete("/projects/{project_id}/risk-sources/{source_id}")
-async def delete_risk_source(
+def delete_risk_source(
     project_id: UUID,
     source_id: UUID,
     db: Session = Depends(get_db),
@@ -2625,7 +2625,7 @@ async def delete_risk_source(
 # ==============================================================================
 
 @router.get("/projects/{project_id}/matrix", response_model=MatrixResponse)
-async def get_risk_matrix(
+def get_risk_matrix(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("EBIOS_READ"))
@@ -2738,7 +2738,7 @@ async def get_risk_matrix(
 # ==============================================================================
 
 @router.put("/projects/{project_id}/risks/{risk_id}/residual", response_model=RiskResponse)
-async def update_residual_risk(
+def update_residual_risk(
     project_id: UUID,
     risk_id: UUID,
     update: RiskUpdateResidual,
@@ -3277,7 +3277,7 @@ FORMAT DE SORTIE STRICT JSON (pas de texte avant ou après) :
 
 
 @router.get("/projects/{project_id}/workshop/at3", response_model=AT3WorkshopResponse)
-async def get_workshop_at3(
+def get_workshop_at3(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("risk_project:read"))
@@ -3677,7 +3677,7 @@ Génère maintenant les scénarios stratégiques au format JSON strict."""
 
 
 @router.delete("/projects/{project_id}/strategic-scenarios/{scenario_id}")
-async def delete_strategic_scenario(
+def delete_strategic_scenario(
     project_id: UUID,
     scenario_id: UUID,
     db: Session = Depends(get_db),
@@ -3822,7 +3822,7 @@ FORMAT JSON STRICT :
 
 
 @router.get("/projects/{project_id}/workshop/at4", response_model=AT4WorkshopResponse)
-async def get_workshop_at4(
+def get_workshop_at4(
     project_id: UUID,
     strategic_scenario_id: Optional[UUID] = None,
     db: Session = Depends(get_db),
@@ -4365,7 +4365,7 @@ Réponds uniquement avec le JSON valide."""
 
 
 @router.delete("/projects/{project_id}/operational-scenarios/{scenario_id}")
-async def delete_operational_scenario(
+def delete_operational_scenario(
     project_id: UUID,
     scenario_id: UUID,
     db: Session = Depends(get_db),
@@ -4508,7 +4508,7 @@ def build_risk_matrix(scenarios: List[dict]) -> tuple[List[dict], dict]:
 
 
 @router.get("/projects/{project_id}/workshop/at5", response_model=AT5WorkshopResponse)
-async def get_workshop_at5(
+def get_workshop_at5(
     project_id: UUID,
     view_type: str = "operational",  # 'strategic', 'operational', 'combined'
     db: Session = Depends(get_db),
@@ -5199,7 +5199,7 @@ class GetActionsResponse(BaseModel):
 
 
 @router.get("/projects/{project_id}/actions", response_model=GetActionsResponse)
-async def get_project_actions(
+def get_project_actions(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_permission("risk_project:read"))
@@ -5367,7 +5367,7 @@ class ActionResponse(BaseModel):
 
 
 @router.put("/projects/{project_id}/actions/{action_id}", response_model=ActionResponse)
-async def update_project_action(
+def update_project_action(
     project_id: UUID,
     action_id: int,
     action_data: UpdateActionRequest,
@@ -5492,7 +5492,7 @@ async def update_project_action(
 
 
 @router.delete("/projects/{project_id}/actions/{action_id}", response_model=ActionResponse)
-async def delete_project_action(
+def delete_project_action(
     project_id: UUID,
     action_id: int,
     db: Session = Depends(get_db),
@@ -5589,7 +5589,7 @@ class CreateActionRequest(BaseModel):
 
 
 @router.post("/projects/{project_id}/actions", response_model=ActionResponse)
-async def create_project_action(
+def create_project_action(
     project_id: UUID,
     action_data: CreateActionRequest,
     db: Session = Depends(get_db),
@@ -5752,7 +5752,7 @@ class ScopeEntitiesResponse(BaseModel):
 
 
 @router.get("/projects/{project_id}/scope-entities", response_model=ScopeEntitiesResponse)
-async def get_project_scope_entities(
+def get_project_scope_entities(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_permission("risk_project:read"))
@@ -6071,8 +6071,8 @@ async def generate_report(
         if request.format == 'pdf':
             logger.info("📄 Conversion en PDF...")
             try:
-                from xhtml2pdf import pisa
-                from io import BytesIO
+                from fastapi.concurrency import run_in_threadpool
+                from src.services.render_pool import RenderError, render_pdf
 
                 # Créer le fichier PDF dans un dossier temporaire
                 reports_dir = os_module.path.join(tempfile.gettempdir(), 'ebios_reports')
@@ -6084,18 +6084,17 @@ async def generate_report(
                 filename = f"EBIOS_RM_{safe_name}_{timestamp}.pdf"
                 file_path = os_module.path.join(reports_dir, filename)
 
-                # Générer le PDF avec xhtml2pdf
-                with open(file_path, "wb") as pdf_file:
-                    pisa_status = pisa.CreatePDF(
-                        html_content,
-                        dest=pdf_file,
-                        encoding='utf-8'
-                    )
-
-                if pisa_status.err:
-                    logger.error(f"Erreur xhtml2pdf: {pisa_status.err}")
+                # Générer le PDF avec xhtml2pdf (pool de rendu)
+                try:
+                    # Hors de la boucle d'événements: le rendu attend le pool de rendu
+                    pdf_bytes = await run_in_threadpool(render_pdf, html_content)
+                except RenderError as render_error:
+                    logger.error(f"Erreur xhtml2pdf: {render_error}")
                     raise Exception("Erreur lors de la conversion HTML vers PDF")
 
+                with open(file_path, "wb") as pdf_file:
+                    pdf_file.write(pdf_bytes)
+
                 logger.info(f"✅ PDF généré: {file_path}")
 
                 # Enregistrer le rapport dans la table generated_report
@@ -6215,7 +6214,7 @@ async def generate_report(
     "/reports/download/{filename}",
     summary="Télécharger un rapport EBIOS RM"
 )
-async def download_report(
+def download_report(
     filename: str,
     current_user: User = Depends(require_permission("RISK_PROJECTS_READ"))
 ):
@@ -6292,7 +6291,7 @@ class EbiosReportsListResponse(BaseModel):
     response_model=EbiosReportsListResponse,
     summary="Liste les rapports générés pour un projet EBIOS"
 )
-async def list_project_reports(
+def list_project_reports(
     project_id: UUID,
     current_user: User = Depends(require_permission("RISK_PROJECTS_READ")),
     db: Session = Depends(get_db)
@@ -6546,7 +6545,7 @@ async def preview_ebios_report_html(
     "/reports/{report_id}/download",
     summary="Télécharger un rapport EBIOS RM par ID"
 )
-async def download_report_by_id(
+def download_report_by_id(
     report_id: UUID,
     current_user: User = Depends(require_permission("RISK_PROJECTS_READ")),
     db: Session = Depends(get_db)
@@ -6625,7 +6624,7 @@ async def download_report_by_id(
     "/reports/{report_id}",
     summary="Supprimer un rapport EBIOS RM"
 )
-async def delete_ebios_report(
+def delete_ebios_report(
     report_id: UUID,
     current_user: User = Depends(require_permission("RISK_PROJECTS_DELETE")),
     db: Session = Depends(get_db)
@@ -44,6 +44,7 @@ from src.schemas.ecosystem import (
 )
 
 from src.services.insee_service import get_insee_service
+from src.services.compliance_score_service import score_sql
 
 # ✅ REDIS CACHE
 from src.utils.redis_manager import cache_result, redis_manager
@@ -94,7 +95,7 @@ VALID_INSEE_FIELDS = {
 
 @router.get("/domains")
 @cache_result(ttl=1800, key_prefix="ecosystem_domains")  # ✅ Cache 30min
-async def list_domains(
+def list_domains(
     client_organization_id: Optional[str] = Query(None, description="ID de l'organisation cliente"),
     tenant_id: Optional[UUID] = Query(None, description="ID du tenant"),
     stakeholder_type: Optional[Literal["internal", "external"]] = Query(None),
@@ -131,7 +132,7 @@ async def list_domains(
 
 
 @router.get("/domains/{domain_id}")
-async def get_domain(
+def get_domain(
     domain_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -148,7 +149,7 @@ async def get_domain(
 
 
 @router.post("/domains", status_code=status.HTTP_201_CREATED)
-async def create_domain(
+def create_domain(
     domain_data: Dict[str, Any],
     db: Session = Depends(get_db)
 ):
@@ -202,7 +203,7 @@ async def create_domain(
 
 @router.get("/relationship-types", response_model=List[RelationshipTypeResponse])
 @cache_result(ttl=3600, key_prefix="relationship_types")  # ✅ Cache 1h (données de référence)
-async def list_relationship_types(
+def list_relationship_types(
     is_active: Optional[bool] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -221,7 +222,7 @@ async def list_relationship_types(
 
 
 @router.post("/relationship-types", response_model=RelationshipTypeResponse, status_code=status.HTTP_201_CREATED)
-async def create_relationship_type(
+def create_relationship_type(
     relationship_type: RelationshipTypeCreate,
     db: Session = Depends(get_db)
 ):
@@ -247,7 +248,7 @@ async def create_relationship_type(
 
 
 @router.get("/relationship-types/{relationship_type_id}", response_model=RelationshipTypeResponse)
-async def get_relationship_type(
+def get_relationship_type(
     relationship_type_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -264,7 +265,7 @@ async def get_relationship_type(
 
 
 @router.put("/relationship-types/{relationship_type_id}", response_model=RelationshipTypeResponse)
-async def update_relationship_type(
+def update_relationship_type(
     relationship_type_id: UUID,
     relationship_type: RelationshipTypeUpdate,
     db: Session = Depends(get_db)
@@ -290,7 +291,7 @@ async def update_relationship_type(
 
 
 @router.delete("/relationship-types/{relationship_type_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_relationship_type(
+def delete_relationship_type(
     relationship_type_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -342,7 +343,7 @@ def sanitize_entity_data(data: dict) -> dict:
 
 @router.get("/entities", response_model=EcosystemEntityListResponse)
 # @cache_result(ttl=900, key_prefix="ecosystem_entities")  # ⏸️ Cache désactivé temporairement pour debug member_count
-async def list_entities(
+def list_entities(
     stakeholder_type: Optional[Literal["internal", "external"]] = Query(None),
     is_active: Optional[bool] = Query(None),
     is_domain: Optional[bool] = Query(None),
@@ -734,7 +735,7 @@ async def create_entity(
     return db_entity
 
 @router.get("/entities/{entity_id}", response_model=EcosystemEntityResponse)
-async def get_entity(
+def get_entity(
     entity_id: UUID,
     current_user: User = Depends(require_permission("ECOSYSTEM_READ")),
     db: Session = Depends(get_db)
@@ -768,7 +769,7 @@ async def get_entity(
 
 
 @router.put("/entities/{entity_id}", response_model=EcosystemEntityResponse)
-async def update_entity(
+def update_entity(
     entity_id: UUID,
     entity: EcosystemEntityUpdate,
     current_user: User = Depends(require_permission("ECOSYSTEM_UPDATE")),
@@ -813,7 +814,7 @@ async def update_entity(
 
 
 @router.delete("/entities/{entity_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_entity(
+def delete_entity(
     entity_id: UUID,
     current_user: User = Depends(require_permission("ECOSYSTEM_DELETE")),
     db: Session = Depends(get_db)
@@ -847,7 +848,7 @@ async def delete_entity(
 
 
 @router.get("/entities/{entity_id}/hierarchy")
-async def get_entity_hierarchy(
+def get_entity_hierarchy(
     entity_id: UUID,
     direction: Literal["ancestors", "descendants", "both"] = Query("both"),
     current_user: User = Depends(require_permission("ECOSYSTEM_READ")),
@@ -984,7 +985,7 @@ async def enrich_with_insee(
 # ============================================================================
 
 @router.get("/entities/{entity_id}/members", response_model=List[EntityMemberResponse])
-async def list_entity_members(
+def list_entity_members(
     entity_id: UUID,
     current_user: User = Depends(require_permission("ECOSYSTEM_READ")),
     db: Session = Depends(get_db)
@@ -1020,7 +1021,7 @@ async def list_entity_members(
 
 
 @router.post("/entities/{entity_id}/members", response_model=EntityMemberResponse, status_code=status.HTTP_201_CREATED)
-async def add_entity_member(
+def add_entity_member(
     entity_id: UUID,
     member: EntityMemberCreate,
     current_user: User = Depends(require_permission("ECOSYSTEM_CREATE")),
@@ -1061,7 +1062,7 @@ async def add_entity_member(
 
 
 @router.put("/entities/{entity_id}/members/{member_id}", response_model=EntityMemberResponse)
-async def update_entity_member(
+def update_entity_member(
     entity_id: UUID,
     member_id: UUID,
     member: EntityMemberUpdate,
@@ -1110,7 +1111,7 @@ async def update_entity_member(
 
 
 @router.delete("/entities/{entity_id}/members/{member_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def remove_entity_member(
+def remove_entity_member(
     entity_id: UUID,
     member_id: UUID,
     current_user: User = Depends(require_permission("ECOSYSTEM_DELETE")),
@@ -1161,7 +1162,7 @@ async def remove_entity_member(
 
 @router.get("/categories", response_model=List[dict])
 # @cache_result(ttl=1800, key_prefix="ecosystem_categories")  # ❌ DÉSACTIVÉ: problème isolation multi-tenant
-async def get_categories(
+def get_categories(
     stakeholder_type: Optional[str] = Query(None, description="Filtrer par type: internal ou external"),
     client_organization_id: Optional[str] = Query(None, description="ID de l'organisation cliente (pour filtrer par tenant)"),
     tenant_id: Optional[str] = Query(None, description="🔒 SÉCURITÉ: ID du tenant cible (pour isolation cache)"),
@@ -1272,7 +1273,7 @@ async def get_categories(
 
 @router.get("/poles", response_model=PoleListResponse)
 @cache_result(ttl=1800, key_prefix="ecosystem_poles")  # ✅ Cache 30min
-async def list_poles(
+def list_poles(
     client_organization_id: Optional[str] = Query(None, description="ID de l'organisation cliente"),
     is_active: Optional[bool] = Query(None),
     search: Optional[str] = Query(None, description="Recherche par nom ou short_code"),
@@ -1328,7 +1329,7 @@ async def list_poles(
 
 
 @router.post("/poles", response_model=PoleResponse, status_code=status.HTTP_201_CREATED)
-async def create_pole_with_tenant(
+def create_pole_with_tenant(
     pole: PoleCreateWithTenant,
     db: Session = Depends(get_db),
     x_tenant_id: Optional[str] = Header(None, description="ID du tenant (depuis le JWT ou header)")
@@ -1431,7 +1432,7 @@ async def create_pole_with_tenant(
 
 
 @router.get("/poles/{pole_id}", response_model=PoleResponse)
-async def get_pole(
+def get_pole(
     pole_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -1448,7 +1449,7 @@ async def get_pole(
 
 
 @router.put("/poles/{pole_id}", response_model=PoleResponse)
-async def update_pole(
+def update_pole(
     pole_id: UUID,
     pole: PoleUpdate,
     db: Session = Depends(get_db)
@@ -1474,7 +1475,7 @@ async def update_pole(
 
 
 @router.delete("/poles/{pole_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_pole(
+def delete_pole(
     pole_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -1498,7 +1499,7 @@ async def delete_pole(
 # ============================================================================
 
 @router.get("/entities-with-details", response_model=EcosystemEntityListResponse)
-async def list_entities_with_details(
+def list_entities_with_details(
     client_organization_id: Optional[str] = Query(None, description="ID de l'organisation cliente"),
     tenant_id: Optional[UUID] = Query(None, description="ID du tenant"),
     stakeholder_type: Optional[Literal["internal", "external"]] = Query(None),
@@ -1699,7 +1700,7 @@ async def list_entities_with_details(
 # ============================================================================
 
 @router.get("/stats")
-async def get_ecosystem_stats(
+def get_ecosystem_stats(
     client_organization_id: Optional[str] = Query(None, description="ID de l'organisation cliente"),
     db: Session = Depends(get_db)
 ):
@@ -1919,7 +1920,7 @@ async def get_ecosystem_stats(
 #     return response
 
 @router.post("/categories", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def create_category_with_tenant(
+def create_category_with_tenant(
     # ✅ Utiliser CategoryCreateData (existe déjà dans ecosystem.py)
     category_data: CategoryCreateData,
     db: Session = Depends(get_db),
@@ -2043,7 +2044,7 @@ async def create_category_with_tenant(
 # ============================================================================
 
 @router.get("/poles", response_model=PoleListResponse)
-async def list_poles_with_tenant(
+def list_poles_with_tenant(
     tenant_id: Optional[UUID] = Query(None, description="Filtrer par tenant (null pour universels)"),
     include_universal: bool = Query(True, description="Inclure les templates universels"),
     is_active: Optional[bool] = Query(None),
@@ -2131,7 +2132,7 @@ async def list_poles_with_tenant(
 # ============================================================================
 
 @router.get("/entities/{entity_id}/members")
-async def get_entity_members(
+def get_entity_members(
     entity_id: UUID,
     campaign_id: Optional[UUID] = Query(None, description="ID de campagne pour déterminer le type (interne/externe)"),
     action_item_id: Optional[UUID] = Query(None, description="ID de l'action pour filtrer par domaines des questions sources"),
@@ -2246,7 +2247,7 @@ async def get_entity_members(
 # ============================================================================
 
 @router.get("/entities/{entity_id}/members")
-async def get_entity_members_by_role(
+def get_entity_members_by_role(
     entity_id: UUID,
     role: Optional[str] = Query(None, description="Filtrer par rôle (audite_resp, audite_contrib, etc.)"),
     current_user: User = Depends(require_permission("ECOSYSTEM_READ")),
@@ -2345,7 +2346,7 @@ async def get_entity_members_by_role(
 # ============================================================================
 
 @router.get("/entities/{entity_id}/kpis")
-async def get_entity_kpis(
+def get_entity_kpis(
     entity_id: UUID,
     current_user: User = Depends(require_permission("ECOSYSTEM_READ")),
     db: Session = Depends(get_db)
@@ -2376,8 +2377,8 @@ async def get_entity_kpis(
 
         # Requête KPIs agrégés
         # NOTE: campaign.scope_id → campaign_scope.id (relation correcte)
-        # Tables utilisées: question_answer, published_action, generated_report
-        kpi_query = text("""
+        # Tables utilisées: compliance_score_aggregate, published_action, generated_report
+        kpi_query = text(f"""
             WITH entity_members AS (
                 SELECT COUNT(*) as count
                 FROM entity_member em
@@ -2409,21 +2410,11 @@ async def get_entity_kpis(
                   AND c.tenant_id = CAST(:tenant_id AS uuid)
             ),
             entity_conformity AS (
-                SELECT
-                    COALESCE(AVG(
-                        CASE
-                            WHEN qa.compliance_status = 'compliant' THEN 100
-                            WHEN qa.compliance_status = 'partial' THEN 50
-                            WHEN qa.compliance_status = 'non_compliant' THEN 0
-                            ELSE NULL
-                        END
-                    ), 0) as compliance_level
-                FROM question_answer qa
-                JOIN campaign c ON qa.campaign_id = c.id
-                JOIN campaign_scope cs ON c.scope_id = cs.id
-                WHERE CAST(:entity_id AS uuid) = ANY(cs.entity_ids)
+                SELECT {score_sql()} as compliance_level
+                FROM compliance_score_aggregate s
+                JOIN campaign c ON c.id = s.campaign_id
+                WHERE s.entity_id = CAST(:entity_id AS uuid)
                   AND c.tenant_id = CAST(:tenant_id AS uuid)
-                  AND qa.compliance_status IS NOT NULL
             ),
             entity_reports AS (
                 SELECT
@@ -2491,7 +2482,7 @@ async def get_entity_kpis(
 
 
 @router.get("/entities/{entity_id}/campaigns")
-async def get_entity_campaigns(
+def get_entity_campaigns(
     entity_id: UUID,
     status_filter: Optional[str] = Query(None, description="Filtrer par statut"),
     limit: int = Query(20, ge=1, le=100),
@@ -2659,7 +2650,7 @@ async def get_entity_campaigns(
 
 
 @router.get("/entities/{entity_id}/actions")
-async def get_entity_actions(
+def get_entity_actions(
     entity_id: UUID,
     status_filter: Optional[str] = Query(None, description="Filtrer par statut: todo, in_progress, done"),
     priority_filter: Optional[str] = Query(None, description="Filtrer par priorité: P1, P2, P3"),
@@ -2797,7 +2788,7 @@ async def get_entity_actions(
 
 
 @router.get("/entities/{entity_id}/conformity")
-async def get_entity_conformity(
+def get_entity_conformity(
     entity_id: UUID,
     campaign_id: Optional[UUID] = Query(None, description="Filtrer par campagne"),
     current_user: User = Depends(require_permission("ECOSYSTEM_READ")),
@@ -2812,62 +2803,22 @@ async def get_entity_conformity(
         raise HTTPException(status_code=400, detail="Tenant ID requis")
 
     try:
-        # NOTE: campaign.scope_id → campaign_scope.id (relation correcte)
-        # Table: question_answer (pas question_response)
-        # Statuts de conformité réels: 'compliant', 'non_compliant_major', 'non_compliant_minor', 'partial'
-        # Les questions n'ont pas toujours un chapter rempli, donc on calcule le score global directement
-
-        # 1. Score global sans regroupement par domaine
-        global_query = text("""
-            SELECT
-                COUNT(DISTINCT qa.id) as total_answers,
-                COUNT(DISTINCT CASE WHEN qa.compliance_status = 'compliant' THEN qa.id END) as compliant_count,
-                COUNT(DISTINCT CASE WHEN qa.compliance_status = 'partial' THEN qa.id END) as partial_count,
-                COUNT(DISTINCT CASE WHEN qa.compliance_status IN ('non_compliant', 'non_compliant_major', 'non_compliant_minor') THEN qa.id END) as non_compliant_count
-            FROM question_answer qa
-            JOIN campaign c ON qa.campaign_id = c.id
-            JOIN campaign_scope cs ON c.scope_id = cs.id
-            WHERE CAST(:entity_id AS uuid) = ANY(cs.entity_ids)
-              AND c.tenant_id = CAST(:tenant_id AS uuid)
-              AND (:campaign_id IS NULL OR c.id = CAST(:campaign_id AS uuid))
-              AND qa.compliance_status IS NOT NULL
-              AND qa.compliance_status != ''
-        """)
-
-        global_result = db.execute(global_query, {
-            "entity_id": str(entity_id),
-            "tenant_id": tenant_id,
-            "campaign_id": str(campaign_id) if campaign_id else None
-        }).mappings().first()
-
-        total_answers = global_result["total_answers"] if global_result else 0
-        compliant = global_result["compliant_count"] if global_result else 0
-        partial = global_result["partial_count"] if global_result else 0
-        non_compliant = global_result["non_compliant_count"] if global_result else 0
-
-        # Calcul du score: compliant=100%, partial=50%, non_compliant=0%
-        if total_answers > 0:
-            global_score = round((compliant * 100 + partial * 50) / total_answers, 1)
-        else:
-            global_score = 0
-
-        # 2. Regroupement par campagne (comme proxy pour les "domaines")
+        # Compteurs lus depuis compliance_score_aggregate (réponses courantes de
+        # l'entité, par campagne) : compliant=100%, non_compliant_minor=50%, major=0%
+        # Les questions n'ont pas toujours un chapter rempli : regroupement par campagne
         campaign_query = text("""
             SELECT
                 c.id as campaign_id,
                 c.title as campaign_name,
-                COUNT(DISTINCT qa.id) as total_questions,
-                COUNT(DISTINCT CASE WHEN qa.compliance_status = 'compliant' THEN qa.id END) as compliant_count,
-                COUNT(DISTINCT CASE WHEN qa.compliance_status = 'partial' THEN qa.id END) as partial_count,
-                COUNT(DISTINCT CASE WHEN qa.compliance_status IN ('non_compliant', 'non_compliant_major', 'non_compliant_minor') THEN qa.id END) as non_compliant_count
-            FROM question_answer qa
-            JOIN campaign c ON qa.campaign_id = c.id
-            JOIN campaign_scope cs ON c.scope_id = cs.id
-            WHERE CAST(:entity_id AS uuid) = ANY(cs.entity_ids)
+                SUM(s.compliant_count) as compliant_count,
+                SUM(s.minor_count) as partial_count,
+                SUM(s.major_count) as non_compliant_count,
+                SUM(s.not_applicable_count) as not_applicable_count
+            FROM compliance_score_aggregate s
+            JOIN campaign c ON c.id = s.campaign_id
+            WHERE s.entity_id = CAST(:entity_id AS uuid)
               AND c.tenant_id = CAST(:tenant_id AS uuid)
-              AND (:campaign_id IS NULL OR c.id = CAST(:campaign_id AS uuid))
-              AND qa.compliance_status IS NOT NULL
-              AND qa.compliance_status != ''
+              AND (CAST(:campaign_id AS uuid) IS NULL OR c.id = CAST(:campaign_id AS uuid))
             GROUP BY c.id, c.title
             ORDER BY c.title
         """)
@@ -2878,24 +2829,37 @@ async def get_entity_conformity(
             "campaign_id": str(campaign_id) if campaign_id else None
         }).mappings().all()
 
+        def _score(compliant: int, partial: int, non_compliant: int) -> float:
+            scored = compliant + partial + non_compliant
+            return round((compliant * 100 + partial * 50) / scored, 1) if scored > 0 else 0
+
         domains = []
+        totals = {"compliant": 0, "partial": 0, "non_compliant": 0, "answers": 0}
         for r in campaign_result:
-            total = r["total_questions"]
-            if total > 0:
-                score = round((r["compliant_count"] * 100 + r["partial_count"] * 50) / total, 1)
-            else:
-                score = 0
+            compliant = int(r["compliant_count"] or 0)
+            partial = int(r["partial_count"] or 0)
+            non_compliant = int(r["non_compliant_count"] or 0)
+            total = compliant + partial + non_compliant + int(r["not_applicable_count"] or 0)
+
+            totals["compliant"] += compliant
+            totals["partial"] += partial
+            totals["non_compliant"] += non_compliant
+            totals["answers"] += total
+
             domains.append({
                 "id": str(r["campaign_id"]),
                 "name": r["campaign_name"],
                 "code": "",
                 "total_questions": total,
-                "compliant": r["compliant_count"],
-                "partial": r["partial_count"],
-                "non_compliant": r["non_compliant_count"],
-                "score": score
+                "compliant": compliant,
+                "partial": partial,
+                "non_compliant": non_compliant,
+                "score": _score(compliant, partial, non_compliant)
             })
 
+        global_score = _score(totals["compliant"], totals["partial"], totals["non_compliant"])
+        total_answers = totals["answers"]
+
         return {
             "global_score": global_score,
             "total_questions": total_answers,
@@ -2910,7 +2874,7 @@ async def get_entity_conformity(
 
 
 @router.get("/entities/{entity_id}/history")
-async def get_entity_history(
+def get_entity_history(
     entity_id: UUID,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
@@ -5,6 +5,7 @@ Endpoints API pour le module Scan Externe (ASM).
 Routes:
 - /external-targets: Gestion des cibles
 - /external-scans: Gestion des scans
+- /external-scanner/campaigns: Campagnes de scan (toutes les cibles d'un tenant)
 - /external-scanner/dashboard: Statistiques
 
 Toutes les routes sont sécurisées par tenant.
@@ -15,6 +16,7 @@ Note: Le worker Celery doit être démarré via Docker (docker-compose.scanner.y
 import json
 import logging
 import os
+import time
 import traceback
 import uuid
 from datetime import datetime, timezone
@@ -32,6 +34,7 @@ from src.schemas.external_scan import (
     ExternalTargetCreate,
     ExternalTargetUpdate,
     ScanLaunchRequest,
+    ScanCampaignCreate,
     VulnerabilityMarkRemediated,
     # Response schemas
     ExternalTargetResponse,
@@ -39,6 +42,8 @@ from src.schemas.external_scan import (
     ExternalScanResponse,
     ExternalScanListResponse,
     ScanLaunchResponse,
+    ScanCampaignResponse,
+    ScanCampaignListResponse,
     VulnerabilityResponse,
     VulnerabilityListResponse,
     ScanDetailResponse,
@@ -54,10 +59,11 @@ from src.schemas.external_scan import (
 # Import conditionnel de Celery (disponible uniquement dans le container scanner)
 # Si Celery n'est pas disponible, utiliser Redis directement
 try:
-    from src.tasks.external_scan_tasks import scan_external_target_task
+    from src.tasks.external_scan_tasks import launch_scan_campaign_task, scan_external_target_task
     CELERY_AVAILABLE = True
 except ImportError:
     scan_external_target_task = None
+    launch_scan_campaign_task = None
     CELERY_AVAILABLE = False
 
 # Fonction pour envoyer une tâche via Redis sans dépendre de Celery
@@ -138,6 +144,8 @@ logger = logging.getLogger(__name__)
 
 # Import du service IA pour les justifications Scanner
 from src.services.scan_ai_justification_service import ScanAIJustificationService
+from src.services.scan_campaign_service import ScanCampaignService
+from src.services.scan_ecosystem_service import refresh_latest_scan_findings
 
 router = APIRouter(prefix="/external-scanner", tags=["External Scanner"])
 
@@ -147,7 +155,7 @@ router = APIRouter(prefix="/external-scanner", tags=["External Scanner"])
 # ==============================================================================
 
 @router.post("/targets", response_model=ExternalTargetResponse, status_code=status.HTTP_201_CREATED)
-async def create_target(
+def create_target(
     target: ExternalTargetCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_WRITE"))
@@ -244,7 +252,7 @@ async def create_target(
 
 
 @router.get("/targets", response_model=ExternalTargetListResponse)
-async def list_targets(
+def list_targets(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ")),
     type: Optional[str] = Query(None, description="Filtrer par type"),
@@ -298,7 +306,7 @@ async def list_targets(
 
 
 @router.get("/targets/{target_id}", response_model=ExternalTargetResponse)
-async def get_target(
+def get_target(
     target_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ"))
@@ -326,7 +334,7 @@ async def get_target(
 
 
 @router.patch("/targets/{target_id}", response_model=ExternalTargetResponse)
-async def update_target(
+def update_target(
     target_id: str,
     update: ExternalTargetUpdate,
     db: Session = Depends(get_db),
@@ -405,7 +413,7 @@ async def update_target(
 
 
 @router.delete("/targets/{target_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_target(
+def delete_target(
     target_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_DELETE"))
@@ -437,7 +445,7 @@ async def delete_target(
 # ==============================================================================
 
 @router.post("/targets/{target_id}/scan", response_model=ScanLaunchResponse)
-async def launch_scan(
+def launch_scan(
     target_id: str,
     request: ScanLaunchRequest = None,
     db: Session = Depends(get_db),
@@ -516,7 +524,8 @@ async def launch_scan(
         task = scan_external_target_task.delay(
             target_id=target_id,
             scan_id=scan_id,
-            triggered_by=user_id
+            triggered_by=user_id,
+            queued_at=time.time()
         )
         task_id = task.id
         logger.info(f"🚀 Scan lancé via Celery: target={target_id}, scan={scan_id}, task={task_id}")
@@ -528,7 +537,8 @@ async def launch_scan(
             kwargs={
                 "target_id": target_id,
                 "scan_id": scan_id,
-                "triggered_by": user_id
+                "triggered_by": user_id,
+                "queued_at": time.time()
             }
         )
         logger.info(f"🚀 Scan lancé via Redis: target={target_id}, scan={scan_id}, task={task_id}")
@@ -542,8 +552,100 @@ async def launch_scan(
     )
 
 
+# ==============================================================================
+# CAMPAIGNS ENDPOINTS
+# ==============================================================================
+
+@router.post("/campaigns", response_model=ScanCampaignResponse, status_code=status.HTTP_202_ACCEPTED)
+def launch_scan_campaign(
+    request: ScanCampaignCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("SCANNER_EXECUTE"))
+):
+    """
+    Lance une campagne de scan sur les cibles actives du tenant.
+
+    Les cibles qui résolvent vers la même IP ne sont scannées qu'une fois ;
+    les scans s'exécutent en parallèle dans la limite des plafonds global,
+    par tenant, par IP et par ASN.
+    """
+    tenant_id = str(current_user.tenant_id) if current_user.tenant_id else None
+    user_id = str(current_user.id) if current_user.id else None
+
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant ID requis")
+
+    service = ScanCampaignService(db)
+    campaign_id = service.create_campaign(
+        tenant_id,
+        triggered_by=user_id,
+        name=request.name,
+        target_ids=request.target_ids,
+        entity_ids=request.entity_ids
+    )
+    db.commit()
+
+    # Planification et fan-out côté worker (résolution DNS, chord Celery)
+    if CELERY_AVAILABLE:
+        task_id = launch_scan_campaign_task.delay(campaign_id=campaign_id).id
+    else:
+        task_id = send_celery_task_via_redis(
+            task_name="src.tasks.external_scan_tasks.launch_scan_campaign_task",
+            args=[],
+            kwargs={"campaign_id": campaign_id}
+        )
+    logger.info(f"🚀 Campagne de scan lancée: campaign={campaign_id}, task={task_id}")
+
+    campaign = service.get_campaign(tenant_id, campaign_id)
+    response = ScanCampaignResponse.model_validate(campaign)
+    response.task_id = task_id
+    return response
+
+
+@router.get("/campaigns", response_model=ScanCampaignListResponse)
+def list_scan_campaigns(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("SCANNER_READ")),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Liste les campagnes de scan du tenant."""
+    tenant_id = str(current_user.tenant_id) if current_user.tenant_id else None
+
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant ID requis")
+
+    rows, total = ScanCampaignService(db).list_campaigns(tenant_id, limit=limit, offset=offset)
+
+    return ScanCampaignListResponse(
+        items=[ScanCampaignResponse.model_validate(row) for row in rows],
+        total=total,
+        limit=limit,
+        offset=offset
+    )
+
+
+@router.get("/campaigns/{campaign_id}", response_model=ScanCampaignResponse)
+def get_scan_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("SCANNER_READ"))
+):
+    """Récupère l'avancement d'une campagne de scan."""
+    tenant_id = str(current_user.tenant_id) if current_user.tenant_id else None
+
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant ID requis")
+
+    campaign = ScanCampaignService(db).get_campaign(tenant_id, campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campagne de scan non trouvée")
+
+    return ScanCampaignResponse.model_validate(campaign)
+
+
 @router.get("/scans", response_model=ExternalScanListResponse)
-async def list_scans(
+def list_scans(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ")),
     target_id: Optional[str] = Query(None, description="Filtrer par cible"),
@@ -626,7 +728,7 @@ async def list_scans(
 
 
 @router.get("/scans/{scan_id}", response_model=ExternalScanResponse)
-async def get_scan(
+def get_scan(
     scan_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ"))
@@ -662,7 +764,7 @@ async def get_scan(
 
 
 @router.get("/scans/{scan_id}/detail", response_model=ScanDetailResponse)
-async def get_scan_detail(
+def get_scan_detail(
     scan_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ"))
@@ -744,7 +846,7 @@ async def get_scan_detail(
 # ==============================================================================
 
 @router.get("/scans/{scan_id}/vulnerabilities", response_model=VulnerabilityListResponse)
-async def list_vulnerabilities(
+def list_vulnerabilities(
     scan_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ")),
@@ -823,7 +925,7 @@ async def list_vulnerabilities(
 
 
 @router.patch("/vulnerabilities/{vuln_id}/remediate", response_model=VulnerabilityResponse)
-async def mark_remediated(
+def mark_remediated(
     vuln_id: str,
     request: VulnerabilityMarkRemediated,
     db: Session = Depends(get_db),
@@ -848,6 +950,9 @@ async def mark_remediated(
         "is_remediated": request.is_remediated,
         "user_id": user_id
     }).fetchone()
+    if row:
+        # Compteurs de constats non remédiés du dernier scan de la cible
+        refresh_latest_scan_findings(db, str(row.external_scan_id))
     db.commit()
 
     if not row:
@@ -997,7 +1102,7 @@ async def generate_report(
 # ==============================================================================
 
 @router.get("/dashboard", response_model=DashboardResponse)
-async def get_dashboard(
+def get_dashboard(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ"))
 ):
@@ -1027,35 +1132,32 @@ async def get_dashboard(
     """)
     scans_stats = db.execute(scans_query, {"tenant_id": tenant_id}).fetchone()
 
-    # Stats vulnérabilités
+    # Stats vulnérabilités (non remédiées, dernier scan de chaque cible)
     vulns_query = text("""
         SELECT
-            COUNT(CASE WHEN severity = 'CRITICAL' THEN 1 END) as critical,
-            COUNT(CASE WHEN severity = 'HIGH' THEN 1 END) as high,
-            COUNT(CASE WHEN severity = 'MEDIUM' THEN 1 END) as medium,
-            COUNT(CASE WHEN severity = 'LOW' THEN 1 END) as low
-        FROM external_service_vulnerability
-        WHERE tenant_id = CAST(:tenant_id AS uuid)
-        AND is_remediated = false
+            SUM(l.open_critical) as critical,
+            SUM(l.open_high) as high,
+            SUM(l.open_medium) as medium,
+            SUM(l.open_low) as low
+        FROM external_scan_latest l
+        JOIN external_target et ON et.id = l.external_target_id
+        WHERE l.tenant_id = CAST(:tenant_id AS uuid)
+        AND et.deleted_at IS NULL
     """)
     vulns_stats = db.execute(vulns_query, {"tenant_id": tenant_id}).fetchone()
 
     # Top cibles vulnérables
     top_targets_query = text("""
         SELECT
-            et.id, et.value, et.type, et.last_exposure_score, et.last_scan_at,
-            COUNT(CASE WHEN esv.severity = 'CRITICAL' THEN 1 END) as critical_count,
-            COUNT(CASE WHEN esv.severity = 'HIGH' THEN 1 END) as high_count
-        FROM external_target et
-        LEFT JOIN external_scan es ON es.external_target_id = et.id
-            AND es.status = 'SUCCESS'
-        LEFT JOIN external_service_vulnerability esv ON esv.external_scan_id = es.id
-            AND esv.is_remediated = false
-        WHERE et.tenant_id = CAST(:tenant_id AS uuid)
+            et.id, et.value, et.type, l.exposure_score, et.last_scan_at,
+            l.open_critical as critical_count,
+            l.open_high as high_count
+        FROM external_scan_latest l
+        JOIN external_target et ON et.id = l.external_target_id
+        WHERE l.tenant_id = CAST(:tenant_id AS uuid)
         AND et.deleted_at IS NULL
-        AND et.last_exposure_score IS NOT NULL
-        GROUP BY et.id, et.value, et.type, et.last_exposure_score, et.last_scan_at
-        ORDER BY et.last_exposure_score DESC
+        AND l.exposure_score IS NOT NULL
+        ORDER BY l.exposure_score DESC
         LIMIT 5
     """)
     top_targets = db.execute(top_targets_query, {"tenant_id": tenant_id}).fetchall()
@@ -1087,7 +1189,7 @@ async def get_dashboard(
                 target_id=row.id,
                 target_value=row.value,
                 target_type=row.type,
-                exposure_score=row.last_exposure_score or 0,
+                exposure_score=row.exposure_score or 0,
                 critical_count=row.critical_count or 0,
                 high_count=row.high_count or 0,
                 last_scan_at=row.last_scan_at
@@ -1714,7 +1816,7 @@ async def generate_scan_action_plan(
 
 
 @router.get("/scans/{scan_id}/action-plan", response_model=ScanActionPlanDetailResponse)
-async def get_scan_action_plan(
+def get_scan_action_plan(
     scan_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ"))
@@ -1795,7 +1897,7 @@ async def get_scan_action_plan(
 
 
 @router.patch("/scans/{scan_id}/action-plan/items/{item_id}")
-async def update_scan_action_plan_item(
+def update_scan_action_plan_item(
     scan_id: str,
     item_id: str,
     request: UpdateScanActionItemRequest,
@@ -1868,7 +1970,7 @@ async def update_scan_action_plan_item(
 
 
 @router.post("/scans/{scan_id}/publish-actions", response_model=PublishScanActionsResponse)
-async def publish_scan_actions(
+def publish_scan_actions(
     scan_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_WRITE"))
@@ -2082,7 +2184,7 @@ class UnpublishScanActionsResponse(BaseModel):
 
 
 @router.post("/scans/{scan_id}/unpublish-actions", response_model=UnpublishScanActionsResponse)
-async def unpublish_scan_actions(
+def unpublish_scan_actions(
     scan_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_WRITE"))
@@ -2271,7 +2373,7 @@ def _calculate_weighted_cvss(critical: int, high: int, medium: int, low: int) ->
 
 
 @router.get("/ecosystem", response_model=EcosystemResponse)
-async def get_ecosystem_view(
+def get_ecosystem_view(
     entity_type: Optional[str] = Query(None, description="Filtrer par type: internal, external"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("SCANNER_READ"))
@@ -2296,7 +2398,8 @@ async def get_ecosystem_view(
         raise HTTPException(status_code=400, detail="Tenant ID requis")
 
     # Requête pour agréger les données par entité
-    # On récupère les entités qui ont des cibles avec des scans
+    # On récupère les entités qui ont des cibles, avec le dernier scan de
+    # chaque cible (table external_scan_latest)
     query = text("""
         WITH entity_vulns AS (
             -- Agrégation des vulnérabilités par entité
@@ -2304,22 +2407,21 @@ async def get_ecosystem_view(
                 ee.id as entity_id,
                 ee.name as entity_name,
                 ee.stakeholder_type,
-                COUNT(DISTINCT et.id) as targets_count,
-                COUNT(DISTINCT es.id) as scans_count,
-                COUNT(CASE WHEN esv.severity = 'CRITICAL' AND esv.is_remediated = false THEN 1 END) as critical_count,
-                COUNT(CASE WHEN esv.severity = 'HIGH' AND esv.is_remediated = false THEN 1 END) as high_count,
-                COUNT(CASE WHEN esv.severity = 'MEDIUM' AND esv.is_remediated = false THEN 1 END) as medium_count,
-                COUNT(CASE WHEN esv.severity = 'LOW' AND esv.is_remediated = false THEN 1 END) as low_count,
-                COUNT(CASE WHEN esv.is_remediated = false THEN 1 END) as total_vulns,
-                MAX(es.finished_at) as last_scan_at
+                COUNT(et.id) as targets_count,
+                COALESCE(SUM(l.scans_count), 0) as scans_count,
+                COALESCE(SUM(l.open_critical), 0) as critical_count,
+                COALESCE(SUM(l.open_high), 0) as high_count,
+                COALESCE(SUM(l.open_medium), 0) as medium_count,
+                COALESCE(SUM(l.open_low), 0) as low_count,
+                COALESCE(SUM(l.open_total), 0) as total_vulns,
+                MAX(l.finished_at) as last_scan_at
             FROM ecosystem_entity ee
             JOIN external_target et ON et.entity_id = ee.id AND et.deleted_at IS NULL
-            LEFT JOIN external_scan es ON es.external_target_id = et.id AND es.status = 'SUCCESS'
-            LEFT JOIN external_service_vulnerability esv ON esv.external_scan_id = es.id
+            LEFT JOIN external_scan_latest l ON l.external_target_id = et.id
             WHERE ee.tenant_id = CAST(:tenant_id AS uuid)
             AND ee.is_active = true
             GROUP BY ee.id, ee.name, ee.stakeholder_type
-            HAVING COUNT(DISTINCT et.id) > 0
+            HAVING COUNT(et.id) > 0
         )
         SELECT
             entity_id,
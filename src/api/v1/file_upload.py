@@ -2,6 +2,7 @@
 API endpoints pour l'upload de fichiers (pièces jointes des questionnaires)
 """
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from uuid import UUID
@@ -93,7 +94,8 @@ async def upload_file(
         logger.info(f"📤 Upload fichier: {file.filename} ({file_size} bytes) pour question {question_id}")
 
         # Upload vers MinIO
-        object_path, checksum, uploaded_size = file_storage.upload_file(
+        object_path, checksum, uploaded_size = await run_in_threadpool(
+            file_storage.upload_file,
             file_data=file.file,
             original_filename=file.filename,
             tenant_id=UUID(tenant_id),
@@ -129,7 +131,7 @@ async def upload_file(
 
 
 @router.get("/upload/{file_path:path}/download")
-async def download_file(
+def download_file(
     file_path: str,
     tenant_id: Optional[str] = None,  # TODO: Récupérer depuis l'auth
     db: Session = Depends(get_db)
@@ -195,7 +197,7 @@ async def download_file(
 
 
 @router.delete("/upload/{file_path:path}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_file(
+def delete_file(
     file_path: str,
     tenant_id: Optional[str] = None,  # TODO: Récupérer depuis l'auth
     db: Session = Depends(get_db)
@@ -245,7 +247,7 @@ async def delete_file(
 
 
 @router.get("/upload/audit/{audit_id}", response_model=List[FileMetadata])
-async def list_files_by_audit(
+def list_files_by_audit(
     audit_id: str,
     tenant_id: Optional[str] = None,  # TODO: Récupérer depuis l'auth
     db: Session = Depends(get_db)
@@ -145,7 +145,7 @@ async def upload_excel_referentiel(
 
 @router.get("/")
 @cache_result(ttl=1800, key_prefix="frameworks_list")  # ✅ Cache 30 minutes
-async def list_frameworks(db: Session = Depends(get_db)):
+def list_frameworks(db: Session = Depends(get_db)):
     """Liste des référentiels importés depuis la base de données avec statistiques d'embeddings"""
     
     try:
@@ -220,7 +220,7 @@ async def list_frameworks(db: Session = Depends(get_db)):
 
 @router.get("/{framework_id}")
 @cache_result(ttl=1800, key_prefix="framework_detail")  # ✅ Cache 30min
-async def get_framework(framework_id: str, db: Session = Depends(get_db)):
+def get_framework(framework_id: str, db: Session = Depends(get_db)):
     """Détail d'un référentiel avec ses exigences"""
     
     try:
@@ -311,7 +311,7 @@ async def get_framework(framework_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Erreur récupération framework: {str(e)}")
 
 @router.post("/{framework_id}/generate-embeddings")
-async def generate_embeddings_manual(framework_id: str, db: Session = Depends(get_db)):
+def generate_embeddings_manual(framework_id: str, db: Session = Depends(get_db)):
     """Génération manuelle des embeddings pour un référentiel spécifique"""
     
     try:
@@ -367,7 +367,7 @@ async def export_framework_legacy_alias(
 
 
 @router.get("/template/excel/download")
-async def download_excel_template():
+def download_excel_template():
     """
     Télécharger le template Excel avec hiérarchie domain (0-4 niveaux)
     Inclut des exemples et une feuille d'instructions
@@ -600,7 +600,7 @@ async def download_excel_template():
 # Remplacer TOUTES les définitions existantes de /{framework_id}/export et /frameworks/{framework_id}/export par celle-ci
 
 @router.get("/{framework_id}/export")
-async def export_framework(framework_id: str, format: str = "xlsx", db: Session = Depends(get_db)):
+def export_framework(framework_id: str, format: str = "xlsx", db: Session = Depends(get_db)):
     """
     Export d'un référentiel avec structure identique au template d'import.
     Détection automatique de la profondeur hiérarchique.
@@ -831,7 +831,7 @@ async def export_framework(framework_id: str, format: str = "xlsx", db: Session
         raise HTTPException(status_code=500, detail=f"Erreur export: {str(e)}")
     
 @router.get("/{framework_id}/embeddings/stats")
-async def get_embeddings_stats(framework_id: str, db: Session = Depends(get_db)):
+def get_embeddings_stats(framework_id: str, db: Session = Depends(get_db)):
     """Statistiques détaillées des embeddings pour un référentiel"""
     
     try:
@@ -1017,7 +1017,7 @@ async def upload_csv_cross_referentiel(
 
 # 2. NOUVEAU ENDPOINT : Statut cross-référentiel
 @router.get("/{framework_id}/cross-status")
-async def get_cross_referential_status(framework_id: str, db: Session = Depends(get_db)):
+def get_cross_referential_status(framework_id: str, db: Session = Depends(get_db)):
     """Obtenir le statut cross-référentiel d'un framework"""
     
     try:
@@ -1107,7 +1107,7 @@ async def get_cross_referential_status(framework_id: str, db: Session = Depends(
 
 # 3. NOUVEAU ENDPOINT : Mappings en attente
 @router.get("/{framework_id}/pending-mappings")
-async def get_pending_mappings(
+def get_pending_mappings(
     framework_id: str, 
     limit: int = 20,
     db: Session = Depends(get_db)
@@ -1188,7 +1188,7 @@ async def upload_excel_alias(
 
 
 @router.post("/mappings/{mapping_id}/validate")
-async def validate_cross_mapping(
+def validate_cross_mapping(
     mapping_id: str,
     approved: bool,
     rationale: str = None,
@@ -1223,7 +1223,7 @@ async def validate_cross_mapping(
 
 # 5. NOUVEAU ENDPOINT : Test de similarité
 @router.post("/test-similarity")
-async def test_similarity_search(
+def test_similarity_search(
     query_text: str,
     framework_id: str = None,
     limit: int = 5,
@@ -1254,7 +1254,7 @@ async def test_similarity_search(
 
 # 6. NOUVEAU ENDPOINT : Reprocesser les mappings
 @router.post("/{framework_id}/reprocess-mappings")
-async def reprocess_cross_mappings(
+def reprocess_cross_mappings(
     framework_id: str,
     similarity_threshold: float = 0.75,
     db: Session = Depends(get_db)
@@ -1309,7 +1309,7 @@ async def reprocess_cross_mappings(
 # 🔧 CORRECTION COMPLÈTE de l'endpoint admin cross-referential-summary
 
 @router.get("/admin/cross-referential-summary")
-async def get_cross_referential_summary(db: Session = Depends(get_db)) -> Dict[str, Any]:
+def get_cross_referential_summary(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Admin summary of cross-referential data: global stats and per-framework details.
     Safe version: no hard dependency on service methods; checks table presence defensively.
@@ -1465,7 +1465,7 @@ async def generate_control_points(framework_id: str, db: Session = Depends(get_d
         raise HTTPException(status_code=500, detail=f"Erreur génération: {str(e)}")
     
 @router.get("/frameworks/{framework_id}")
-async def get_framework(
+def get_framework(
     framework_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -1512,7 +1512,7 @@ async def get_framework(
 # ============ RÉCUPÉRER LA HIÉRARCHIE D'UN RÉFÉRENTIEL ============
 
 @router.get("/{framework_id}/hierarchy")
-async def get_framework_hierarchy(framework_id: str, db: Session = Depends(get_db)):
+def get_framework_hierarchy(framework_id: str, db: Session = Depends(get_db)):
     """Récupère la hiérarchie complète d'un référentiel (domaines + exigences)"""
     
     try:
@@ -1669,7 +1669,7 @@ async def get_framework_hierarchy(framework_id: str, db: Session = Depends(get_d
         raise HTTPException(status_code=500, detail=f"Erreur récupération hiérarchie: {str(e)}")
 
 @router.patch("/{framework_id}/toggle-active")
-async def toggle_framework_active(
+def toggle_framework_active(
     framework_id: UUID,
     payload: Dict[str, bool],
     db: Session = Depends(get_db)
@@ -1715,7 +1715,7 @@ async def toggle_framework_active(
 
 
 @router.delete("/{framework_id}")
-async def delete_framework(framework_id: str, db: Session = Depends(get_db)):
+def delete_framework(framework_id: str, db: Session = Depends(get_db)):
     """
     Supprime un référentiel et toutes ses données associées :
     - requirement_mapping (source/target) si la table existe
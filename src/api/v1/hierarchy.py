@@ -33,7 +33,7 @@ router = APIRouter(tags=["Hiérarchie"])
 
 @router.get("/domains", response_model=List[dict])
 @cache_result(ttl=3600, key_prefix="hierarchy_domains")  # ✅ Cache 1h
-async def get_domains(db: Session = Depends(get_db)):
+def get_domains(db: Session = Depends(get_db)):
     """
     Récupère tous les domaines (Interne et Externe)
     """
@@ -59,7 +59,7 @@ async def get_domains(db: Session = Depends(get_db)):
 
 
 @router.get("/categories", response_model=List[dict])
-async def get_categories(
+def get_categories(
     stakeholder_type: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
@@ -103,7 +103,7 @@ async def get_categories(
 
 
 @router.get("/poles", response_model=List[dict])
-async def get_poles(
+def get_poles(
     db: Session = Depends(get_db)
 ):
     """
@@ -138,7 +138,7 @@ async def get_poles(
 
 @router.get("/tree", response_model=dict)
 @cache_result(ttl=3600, key_prefix="hierarchy_tree")  # ✅ Cache 1h
-async def get_hierarchy_tree(db: Session = Depends(get_db)):
+def get_hierarchy_tree(db: Session = Depends(get_db)):
     """
     Récupère l'arbre hiérarchique complet
     """
@@ -200,7 +200,7 @@ async def get_hierarchy_tree(db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.post("/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
-async def create_category(
+def create_category(
     category_data: CategoryCreate,
     db: Session = Depends(get_db)
 ):
@@ -385,7 +385,7 @@ async def create_category(
 # ============================================================================
 
 @router.get("/categories/{category_id}/children", response_model=List[dict])
-async def get_category_children(
+def get_category_children(
     category_id: str,
     client_organization_id: Optional[str] = Query(None, description="ID de l'organisation cliente (pour filtrer par tenant)"),
     current_user: User = Depends(require_permission("ECOSYSTEM_READ")),
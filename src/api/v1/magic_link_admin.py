@@ -43,7 +43,7 @@ class TokenStatsResponse(BaseModel):
 
 
 @router.post("/reset", status_code=status.HTTP_200_OK)
-async def reset_token_usage(
+def reset_token_usage(
     payload: TokenResetRequest,
     db: Session = Depends(get_db)
 ):
@@ -149,7 +149,7 @@ async def reset_token_usage(
 
 
 @router.patch("/{token_jti}", status_code=status.HTTP_200_OK)
-async def update_token(
+def update_token(
     token_jti: UUID,
     payload: TokenUpdateRequest,
     db: Session = Depends(get_db)
@@ -237,7 +237,7 @@ async def update_token(
 
 
 @router.delete("/{token_jti}", status_code=status.HTTP_200_OK)
-async def delete_token(
+def delete_token(
     token_jti: UUID,
     db: Session = Depends(get_db)
 ):
@@ -291,7 +291,7 @@ async def delete_token(
 
 
 @router.get("/list", status_code=status.HTTP_200_OK)
-async def list_tokens(
+def list_tokens(
     campaign_id: Optional[UUID] = Query(None, description="Filtrer par campagne"),
     user_email: Optional[str] = Query(None, description="Filtrer par email"),
     revoked: Optional[bool] = Query(None, description="Filtrer par statut révoqué"),
@@ -404,7 +404,7 @@ async def list_tokens(
 
 
 @router.get("/stats", response_model=TokenStatsResponse)
-async def get_tokens_stats(
+def get_tokens_stats(
     campaign_id: Optional[UUID] = Query(None, description="Filtrer par campagne"),
     db: Session = Depends(get_db)
 ):
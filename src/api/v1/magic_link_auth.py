@@ -340,7 +340,7 @@ async def exchange_magic_link_for_keycloak_token(
 
 
 @router.get("/validate")
-async def validate_magic_link_token(
+def validate_magic_link_token(
     token: str,
     db: Session = Depends(get_db)
 ):
@@ -0,0 +1,34 @@
+"""
+Endpoints de monitoring des modèles d'embedding et des index vectoriels
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.database import get_db
+from src.services.model_registry import model_registry
+from src.services.vector_index_service import get_vector_index_status
+
+router = APIRouter()
+
+
+@router.get("/models/stats", tags=["Monitoring"])
+def models_stats():
+    """
+    Récupère l'état du registre des modèles d'embedding
+
+    Returns:
+        Modèles chargés dans ce process, empreinte mémoire et temps de chargement
+    """
+    return model_registry.get_stats()
+
+
+@router.get("/models/vector-indexes", tags=["Monitoring"])
+def vector_indexes(db: Session = Depends(get_db)):
+    """
+    Liste les index vectoriels (HNSW / ivfflat) des tables d'embeddings
+
+    Returns:
+        Table, nom, taille et définition de chaque index
+    """
+    return get_vector_index_status(db)
@@ -154,7 +154,7 @@ def _legacy_to_current_payload(data: Dict[str, Any]) -> Dict[str, Any]:
 # ============================================================================
 
 @router.get("/", response_model=OrganizationListResponse)
-async def list_organizations(
+def list_organizations(
     is_active: Optional[bool] = Query(None),
     subscription_type: Optional[Literal["starter", "professional", "enterprise"]] = Query(None),
     # recherche plein texte
@@ -365,7 +365,7 @@ async def create_organization(
 
 
 @router.get("/{organization_id}/admin-info")
-async def get_organization_admin_info(
+def get_organization_admin_info(
     organization_id: UUID,
     current_user: User = Depends(require_permission("ORGANIZATION_READ")),
     db: Session = Depends(get_db)
@@ -475,7 +475,7 @@ async def get_organization_admin_info(
 
 
 @router.get("/{organization_id}", response_model=OrganizationResponse)
-async def get_organization(
+def get_organization(
     organization_id: UUID,
     current_user: User = Depends(require_permission("ORGANIZATION_READ")),
     db: Session = Depends(get_db)
@@ -874,7 +874,7 @@ def get_organizations_overview(
 
 
 @router.get("/stats/by-subscription")
-async def get_stats_by_subscription(
+def get_stats_by_subscription(
     tenant_id: Optional[UUID] = Query(None, description="[Super-admin only] Filter par tenant spécifique"),
     current_user: User = Depends(require_permission("ORGANIZATION_READ")),
     db: Session = Depends(get_db)
@@ -933,7 +933,7 @@ async def get_stats_by_subscription(
 
 
 @router.get("/stats/by-sector")
-async def get_stats_by_sector(
+def get_stats_by_sector(
     tenant_id: Optional[UUID] = Query(None, description="[Super-admin only] Filter par tenant spécifique"),
     current_user: User = Depends(require_permission("ORGANIZATION_READ")),
     db: Session = Depends(get_db)
@@ -981,7 +981,7 @@ async def get_stats_by_sector(
 # ============================================================================
 
 @router.get("/search")
-async def search_organizations(
+def search_organizations(
     q: str = Query(..., min_length=2, description="Terme de recherche"),
     limit: int = Query(10, ge=1, le=50),
     tenant_id: Optional[UUID] = Query(None, description="[Super-admin only] Filter par tenant spécifique"),
@@ -1038,7 +1038,7 @@ async def search_organizations(
 
 
 @router.get("/export")
-async def export_organizations(
+def export_organizations(
     format: str = Query("json", pattern="^(json|csv)$"),
     is_active: Optional[bool] = Query(None),
     subscription_type: Optional[str] = Query(None),
@@ -22,7 +22,7 @@ router = APIRouter(prefix="/question-types", tags=["question-types"])
 
 
 @router.get("", response_model=QuestionTypeListResponse, status_code=status.HTTP_200_OK)
-async def list_question_types(
+def list_question_types(
     active_only: bool = True,
     db: Session = Depends(get_db)
 ):
@@ -50,7 +50,7 @@ async def list_question_types(
 
 
 @router.get("/public", response_model=List[QuestionTypePublic], status_code=status.HTTP_200_OK)
-async def list_question_types_public(db: Session = Depends(get_db)):
+def list_question_types_public(db: Session = Depends(get_db)):
     """
     Liste publique simplifiée des types de questions actifs.
 
@@ -70,7 +70,7 @@ async def list_question_types_public(db: Session = Depends(get_db)):
 
 
 @router.get("/{code}", response_model=QuestionTypeResponse, status_code=status.HTTP_200_OK)
-async def get_question_type(
+def get_question_type(
     code: str,
     db: Session = Depends(get_db)
 ):
@@ -99,7 +99,7 @@ async def get_question_type(
 
 
 @router.post("", response_model=QuestionTypeResponse, status_code=status.HTTP_201_CREATED)
-async def create_question_type(
+def create_question_type(
     question_type_data: QuestionTypeCreate,
     db: Session = Depends(get_db)
 ):
@@ -134,7 +134,7 @@ async def create_question_type(
 
 
 @router.patch("/{code}", response_model=QuestionTypeResponse, status_code=status.HTTP_200_OK)
-async def update_question_type(
+def update_question_type(
     code: str,
     question_type_data: QuestionTypeUpdate,
     db: Session = Depends(get_db)
@@ -173,7 +173,7 @@ async def update_question_type(
 
 
 @router.delete("/{code}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_question_type(
+def delete_question_type(
     code: str,
     force: bool = False,
     db: Session = Depends(get_db)
@@ -221,7 +221,7 @@ async def delete_question_type(
 
 
 @router.post("/{code}/activate", response_model=QuestionTypeResponse, status_code=status.HTTP_200_OK)
-async def activate_question_type(
+def activate_question_type(
     code: str,
     db: Session = Depends(get_db)
 ):
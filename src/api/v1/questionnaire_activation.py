@@ -32,7 +32,7 @@ router = APIRouter(prefix="/admin/questionnaires", tags=["Questionnaire Activati
     response_model=QuestionnaireActivationResponse,
     status_code=status.HTTP_201_CREATED
 )
-async def activate_questionnaire_for_organization(
+def activate_questionnaire_for_organization(
     org_id: UUID,
     questionnaire_id: UUID,
     request: QuestionnaireActivationCreate,
@@ -156,7 +156,7 @@ async def activate_questionnaire_for_organization(
     "/organizations/{org_id}/questionnaires/{questionnaire_id}/deactivate",
     status_code=status.HTTP_204_NO_CONTENT
 )
-async def deactivate_questionnaire_for_organization(
+def deactivate_questionnaire_for_organization(
     org_id: UUID,
     questionnaire_id: UUID,
     db: Session = Depends(get_db)
@@ -206,7 +206,7 @@ async def deactivate_questionnaire_for_organization(
     "/organizations/{org_id}/questionnaires",
     response_model=QuestionnaireActivationList
 )
-async def list_questionnaires_for_organization(
+def list_questionnaires_for_organization(
     org_id: UUID,
     active_only: bool = Query(True, description="Afficher seulement les questionnaires actifs"),
     db: Session = Depends(get_db)
@@ -290,7 +290,7 @@ async def list_questionnaires_for_organization(
     "/{questionnaire_id}/organizations",
     response_model=List[OrganizationWithActivation]
 )
-async def list_organizations_with_questionnaire(
+def list_organizations_with_questionnaire(
     questionnaire_id: UUID,
     active_only: bool = Query(True, description="Afficher seulement les activations actives"),
     db: Session = Depends(get_db)
@@ -368,7 +368,7 @@ async def list_organizations_with_questionnaire(
     "/available",
     response_model=List[dict]
 )
-async def list_available_questionnaires(
+def list_available_questionnaires(
     status_filter: Optional[str] = Query("published", description="Filtrer par statut"),
     db: Session = Depends(get_db)
 ):
@@ -18,7 +18,7 @@ router = APIRouter()
 
 
 @router.get("/preview/{questionnaire_id}", response_model=QuestionnaireForAuditeResponse)
-async def preview_questionnaire(
+def preview_questionnaire(
     questionnaire_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -257,7 +257,7 @@ async def generate_questions_stream(
 
 
 @router.get("/stats", status_code=status.HTTP_200_OK)
-async def questionnaires_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+def questionnaires_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     KPI globaux alignés avec l'ancien contrat.
     """
@@ -293,7 +293,7 @@ async def questionnaires_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
 
 # LIGNE 96-150 : CONSERVER LA ROUTE GET / (avec stats)
 @router.post("/{questionnaire_id}/generate-embeddings", status_code=status.HTTP_200_OK)
-async def generate_embeddings(
+def generate_embeddings(
     questionnaire_id: str,
     db: Session = Depends(get_db)
 ):
@@ -379,7 +379,7 @@ async def generate_embeddings(
         raise HTTPException(status_code=500, detail="Erreur lors de la génération des embeddings")
 
 @router.get("/frameworks-eligible", status_code=status.HTTP_200_OK)
-async def get_frameworks_eligible_for_generation(
+def get_frameworks_eligible_for_generation(
     limit: int = Query(50, le=200),
     offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
@@ -569,7 +569,7 @@ async def get_frameworks_eligible_for_generation(
 @router.get("/", status_code=status.HTTP_200_OK)
 # TODO: Réactiver le cache une fois l'authentification optionnelle validée
 # @cache_result(ttl=900, key_prefix="questionnaires_list")  # ✅ Cache 15min (données modifiées fréquemment)
-async def list_questionnaires(
+def list_questionnaires(
     limit: int = Query(default=100, le=500),
     offset: int = Query(default=0, ge=0),
     search: Optional[str] = Query(default=None),
@@ -862,7 +862,7 @@ def get_questionnaire(
 # Route frameworks-eligible déplacée plus haut dans le fichier
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_questionnaire(
+def create_questionnaire(
     payload: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db),
 ) -> Dict[str, Any]:
@@ -909,7 +909,7 @@ async def create_questionnaire(
 
 
 @router.put("/{questionnaire_id}", status_code=status.HTTP_200_OK)
-async def update_questionnaire(
+def update_questionnaire(
     questionnaire_id: str,
     payload: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db),
@@ -958,7 +958,7 @@ async def update_questionnaire(
 
 
 @router.delete("/{questionnaire_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_questionnaire(
+def delete_questionnaire(
     questionnaire_id: str,
     db: Session = Depends(get_db),
 ):
@@ -1029,7 +1029,7 @@ async def delete_questionnaire(
 # ============================================================================
 
 @router.get("/{id_or_name}/questions")
-async def get_questionnaire_questions(id_or_name: str, db: Session = Depends(get_db)):
+def get_questionnaire_questions(id_or_name: str, db: Session = Depends(get_db)):
     """
     Récupère les questions avec enrichissement domain/subdomain via hiérarchie récursive
     """
@@ -1165,7 +1165,7 @@ async def get_questionnaire_questions(id_or_name: str, db: Session = Depends(get
 
 
 @router.get("/{id_or_name}/questions-with-control-points")
-async def get_questionnaire_questions_with_control_points(
+def get_questionnaire_questions_with_control_points(
     id_or_name: str,
     db: Session = Depends(get_db)
 ):
@@ -1254,7 +1254,7 @@ async def get_questionnaire_questions_with_control_points(
 
 
 @router.get("/{id_or_name}/domains")
-async def get_questionnaire_domains(
+def get_questionnaire_domains(
     id_or_name: str,
     language: Optional[str] = Query("fr", description="Code langue pour traductions"),
     db: Session = Depends(get_db)
@@ -1347,7 +1347,7 @@ async def get_questionnaire_domains(
         raise HTTPException(status_code=500, detail="Erreur serveur")
 
 @router.post("/{id_or_name}/questions", status_code=status.HTTP_201_CREATED)
-async def create_question_for_questionnaire(
+def create_question_for_questionnaire(
     id_or_name: str,
     payload: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db),
@@ -1535,7 +1535,7 @@ async def create_question_for_questionnaire(
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
 
 @router.post("/create-from-generation", status_code=status.HTTP_201_CREATED)
-async def create_from_generation(
+def create_from_generation(
     payload: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db)
 ):
@@ -1989,7 +1989,7 @@ async def create_from_generation(
 
 
 @router.put("/{id_or_name}/questions/{question_id}", status_code=status.HTTP_200_OK)
-async def update_question_for_questionnaire(
+def update_question_for_questionnaire(
     id_or_name: str,
     question_id: str,
     payload: Dict[str, Any] = Body(...),
@@ -2101,7 +2101,7 @@ async def update_question_for_questionnaire(
 
 
 @router.delete("/{id_or_name}/questions/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_question_for_questionnaire(
+def delete_question_for_questionnaire(
     id_or_name: str,
     question_id: str,
     db: Session = Depends(get_db),
@@ -2346,7 +2346,7 @@ async def duplicate_questionnaire(
 
 
 @router.get("/{questionnaire_id}/duplicate/stream")
-async def duplicate_questionnaire_stream(
+def duplicate_questionnaire_stream(
     questionnaire_id: str,
     request: Request,
     translate_to: Optional[str] = Query(default=None, description="Code langue cible (en, es, de, it, pt, ar)"),
@@ -3,15 +3,18 @@ Endpoints de monitoring et gestion Redis
 """
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from typing import Dict, Any, Optional
 
 from src.utils.redis_manager import redis_manager
+from src.services.external_scanner.cve_cache import get_cache_stats as get_cve_cache_stats
+from src.services.scan_metrics_service import render_prometheus as render_scan_metrics
 
 router = APIRouter()
 
 
 @router.get("/redis/health", tags=["Monitoring"])
-async def redis_health():
+def redis_health():
     """
     Vérifie l'état de santé de Redis
 
@@ -33,7 +36,7 @@ async def redis_health():
 
 
 @router.get("/redis/stats", tags=["Monitoring"])
-async def redis_stats():
+def redis_stats():
     """
     Récupère les statistiques Redis
 
@@ -54,8 +57,43 @@ async def redis_stats():
     }
 
 
+@router.get("/redis/cve-cache", tags=["Monitoring"])
+def cve_cache_stats():
+    """
+    Récupère les statistiques du cache CVE partagé des scans externes
+
+    Returns:
+        Hits, cache négatif, requêtes coalescées, misses et taux de succès
+    """
+    if not redis_manager.is_connected:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Redis non disponible"
+        )
+
+    return get_cve_cache_stats()
+
+
+@router.get("/redis/scan-metrics", tags=["Monitoring"], response_class=PlainTextResponse)
+def scan_worker_metrics():
+    """
+    Métriques des workers de scan externe (format Prometheus)
+
+    Returns:
+        Histogrammes de durée par étape (attente en file, nmap, TLS, CVE,
+        persistance) et nombre de tâches par statut
+    """
+    if not redis_manager.is_connected:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Redis non disponible"
+        )
+
+    return PlainTextResponse(render_scan_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @router.delete("/redis/cache", tags=["Monitoring"])
-async def clear_cache(pattern: str = "*"):
+def clear_cache(pattern: str = "*"):
     """
     Efface le cache Redis
 
@@ -72,7 +110,7 @@ async def clear_cache(pattern: str = "*"):
         )
 
     # Sécurité: limite les patterns autorisés
-    allowed_patterns = ["cache:*", "ai:*", "session:*", "rate_limit:*", "*"]
+    allowed_patterns = ["cache:*", "ai:*", "session:*", "rate_limit:*", "cve:lookup:*", "scan:ecosystem:*", "chart:png:*", "report:snapshot:*", "*"]
     if pattern not in allowed_patterns:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -89,7 +127,7 @@ async def clear_cache(pattern: str = "*"):
 
 
 @router.delete("/redis/cache/ai", tags=["Monitoring"])
-async def clear_ai_cache(model: Optional[str] = None):
+def clear_ai_cache(model: Optional[str] = None):
     """
     Efface le cache des résultats IA
 
@@ -115,7 +153,7 @@ async def clear_ai_cache(model: Optional[str] = None):
 
 
 @router.get("/redis/keys", tags=["Monitoring"])
-async def list_keys(pattern: str = "*", limit: int = 100):
+def list_keys(pattern: str = "*", limit: int = 100):
     """
     Liste les clés Redis correspondant au pattern
 
@@ -15,7 +15,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, and_, desc, func
 from typing import List, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
 from ...database import get_db
@@ -57,21 +57,74 @@ from ...schemas.report import (
     JobStatus
 )
 from ...dependencies_keycloak import get_current_user_keycloak, require_permission
+from ...config import settings
 
 logger = logging.getLogger(__name__)
 
+# Import conditionnel de Celery : sans worker, les jobs sont traités dans l'API
+try:
+    from src.tasks.report_tasks import enqueue_report_jobs
+    CELERY_AVAILABLE = True
+except ImportError:
+    enqueue_report_jobs = None
+    CELERY_AVAILABLE = False
+
 router = APIRouter(
     prefix="/reports",
     tags=["Reports"]
 )
 
 
+def _dispatch_report_jobs(job_ids: List[UUID]) -> bool:
+    """
+    Envoie les jobs de génération aux workers Celery (queue report_generation).
+
+    Returns:
+        True si les jobs ont été mis en file, False si le traitement doit être
+        fait dans l'API (Celery absent, désactivé ou broker injoignable)
+    """
+    if not CELERY_AVAILABLE or not settings.report_async_generation:
+        return False
+
+    try:
+        enqueue_report_jobs(job_ids)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Broker Celery indisponible ({e}) - génération dans l'API")
+        return False
+
+
+def _process_report_jobs_inline(job_ids: List[UUID]) -> int:
+    """
+    Fallback sans worker : traite les jobs séquentiellement avec une session dédiée.
+
+    Returns:
+        Nombre de jobs traités avec succès
+    """
+    from ...database import SessionLocal
+    from ...services.report_job_processor import ReportJobProcessor
+
+    success_count = 0
+    db = SessionLocal()
+    try:
+        processor = ReportJobProcessor(db)
+        for job_id in job_ids:
+            try:
+                if processor.process_job(job_id):
+                    success_count += 1
+            except Exception as e:
+                logger.error(f"❌ Erreur génération job {job_id}: {str(e)}", exc_info=True)
+    finally:
+        db.close()
+    return success_count
+
+
 # ============================================================================
 # TEMPLATES DE RAPPORTS
 # ============================================================================
 
 @router.get("/templates", response_model=ReportTemplateListResponse)
-async def list_templates(
+def list_templates(
     template_type: Optional[TemplateType] = Query(None, description="Filtrer par type"),
     template_category: Optional[str] = Query(None, description="Filtrer par catégorie (audit, ebios, scan)"),
     report_scope: Optional[TemplateScope] = Query(None, description="Filtrer par scope (consolidated, entity, both)"),
@@ -232,7 +285,7 @@ async def list_templates(
 
 
 @router.get("/templates/{template_id}", response_model=ReportTemplateResponse)
-async def get_template(
+def get_template(
     template_id: UUID,
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -282,7 +335,7 @@ async def get_template(
 
 
 @router.post("/templates", response_model=ReportTemplateResponse, status_code=http_status.HTTP_201_CREATED)
-async def create_template(
+def create_template(
     template_data: ReportTemplateCreate,
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -331,7 +384,7 @@ async def create_template(
 
 
 @router.put("/templates/{template_id}", response_model=ReportTemplateResponse)
-async def update_template(
+def update_template(
     template_id: UUID,
     template_data: ReportTemplateUpdate,
     current_user: User = Depends(require_permission("REPORT_READ")),
@@ -392,6 +445,9 @@ async def update_template(
                 value = value.value if hasattr(value, 'value') else value
             setattr(template, field, value)
 
+        # Version du template (clé des plans de rendu compilés)
+        template.updated_at = datetime.now(timezone.utc)
+
         db.commit()
         db.refresh(template)
 
@@ -411,7 +467,7 @@ async def update_template(
 
 
 @router.delete("/templates/{template_id}", status_code=http_status.HTTP_204_NO_CONTENT)
-async def delete_template(
+def delete_template(
     template_id: UUID,
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -467,7 +523,7 @@ async def delete_template(
 
 
 @router.post("/templates/{template_id}/duplicate", response_model=ReportTemplateResponse, status_code=http_status.HTTP_201_CREATED)
-async def duplicate_template(
+def duplicate_template(
     template_id: UUID,
     new_name: str = Query(..., description="Nom du template dupliqué"),
     current_user: User = Depends(require_permission("REPORT_READ")),
@@ -631,7 +687,7 @@ async def upload_template_logo(
 
 
 @router.delete("/templates/{template_id}/logo", response_model=ReportTemplateResponse)
-async def delete_template_logo(
+def delete_template_logo(
     template_id: UUID,
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -690,7 +746,7 @@ async def delete_template_logo(
 # ============================================================================
 
 @router.post("/campaigns/{campaign_id}/generate", response_model=GenerateReportResponse, status_code=http_status.HTTP_202_ACCEPTED)
-async def generate_report(
+def generate_report(
     campaign_id: UUID,
     request: GenerateReportRequest,
     current_user: User = Depends(require_permission("REPORT_READ")),
@@ -847,24 +903,16 @@ async def generate_report(
         scope_label = "consolidé" if request.report_scope == ReportScope.CONSOLIDATED else f"individuel ({entity_name})"
         logger.info(f"📄 Génération de rapport {scope_label} démarrée - Job: {job.id}, Report: {new_report.id}")
 
-        # Exécuter le job de génération de manière synchrone
-        # TODO: Remplacer par Celery pour exécution asynchrone en production
-        try:
-            from ...services.report_job_processor import ReportJobProcessor
-
-            processor = ReportJobProcessor(db)
-            success = processor.process_job(job.id)
-
-            if success:
+        # Envoyer le job aux workers de génération (ou traitement dans l'API en fallback)
+        if _dispatch_report_jobs([job.id]):
+            logger.info(f"📤 Job {job.id} mis en file (report_generation)")
+        else:
+            if _process_report_jobs_inline([job.id]):
                 logger.info(f"✅ Rapport généré avec succès - Job: {job.id}")
-                # Recharger le job pour avoir le statut à jour
-                db.refresh(job)
             else:
                 logger.warning(f"⚠️ Échec génération rapport - Job: {job.id}")
-
-        except Exception as e:
-            logger.error(f"❌ Erreur lors de la génération du rapport: {str(e)}", exc_info=True)
-            # Le job est déjà marqué comme failed par le processor
+            # Recharger le job pour avoir le statut à jour
+            db.refresh(job)
 
         return GenerateReportResponse(
             job_id=job.id,
@@ -914,7 +962,7 @@ class BulkGenerateResponse(BaseModel):
 
 
 @router.post("/campaigns/{campaign_id}/generate-bulk", response_model=BulkGenerateResponse, status_code=http_status.HTTP_202_ACCEPTED)
-async def generate_bulk_reports(
+def generate_bulk_reports(
     campaign_id: UUID,
     request: BulkGenerateRequest,
     current_user: User = Depends(require_permission("REPORT_READ")),
@@ -925,8 +973,8 @@ async def generate_bulk_reports(
 
     DEPRECATED: Utiliser /generate-bulk/stream pour la génération avec SSE.
 
-    Cette fonction crée les jobs mais ne les exécute pas.
-    Retourne immédiatement les job_ids pour suivi via SSE.
+    Cette fonction crée les jobs et les envoie aux workers de génération.
+    Retourne immédiatement les job_ids pour suivi via /jobs/{job_id}.
     """
     try:
         # ==============================================================
@@ -1048,45 +1096,35 @@ async def generate_bulk_reports(
         db.commit()
 
         # ==============================================================
-        # 6. LANCER LA GÉNÉRATION DE MANIÈRE SYNCHRONE
+        # 6. ENVOYER LES JOBS AUX WORKERS
         # ==============================================================
-        # Traiter chaque job séquentiellement dans la même requête
-        # Le frontend attend la fin de tous les rapports
-        from ...services.report_job_processor import ReportJobProcessor
+        # Les rapports sont générés en parallèle par les workers de la queue
+        # report_generation ; la progression se suit via /jobs/{job_id} ou le SSE
+        job_ids = [UUID(job_info["job_id"]) for job_info in jobs_created]
 
-        processor = ReportJobProcessor(db)
-        success_count = 0
-        failed_count = 0
+        if _dispatch_report_jobs(job_ids):
+            reports_count = len(job_ids)
+            message = f"📤 {reports_count} rapport(s) en file de génération"
+        else:
+            # Fallback : génération séquentielle dans la requête
+            success_count = _process_report_jobs_inline(job_ids)
+            failed_count = len(job_ids) - success_count
+            reports_count = success_count
 
-        for job_info in jobs_created:
-            try:
-                logger.info(f"🔄 Traitement rapport pour {job_info['entity_name']}...")
-                success = processor.process_job(UUID(job_info["job_id"]))
-                if success:
-                    logger.info(f"✅ Rapport généré pour {job_info['entity_name']}")
-                    success_count += 1
-                else:
-                    logger.warning(f"⚠️ Échec pour {job_info['entity_name']}")
-                    failed_count += 1
-            except Exception as e:
-                logger.error(f"❌ Erreur génération {job_info['entity_name']}: {str(e)}")
-                failed_count += 1
+            if failed_count == 0:
+                message = f"✅ {success_count} rapport(s) généré(s) avec succès"
+            elif success_count == 0:
+                message = f"❌ Échec de génération pour {failed_count} rapport(s)"
+            else:
+                message = f"⚠️ {success_count} rapport(s) généré(s), {failed_count} en échec"
 
-        logger.info(f"📊 Génération bulk terminée: {success_count} succès, {failed_count} échecs")
+        logger.info(f"📊 Génération bulk: {message}")
 
         # Convertir les dicts en objets BulkJobInfo pour la sérialisation
         jobs_info = [BulkJobInfo(**job) for job in jobs_created]
 
-        # Message de résultat
-        if failed_count == 0:
-            message = f"✅ {success_count} rapport(s) généré(s) avec succès"
-        elif success_count == 0:
-            message = f"❌ Échec de génération pour {failed_count} rapport(s)"
-        else:
-            message = f"⚠️ {success_count} rapport(s) généré(s), {failed_count} en échec"
-
         return BulkGenerateResponse(
-            reports_count=success_count,
+            reports_count=reports_count,
             jobs=jobs_info,
             message=message
         )
@@ -1107,9 +1145,20 @@ async def generate_bulk_reports(
 # ============================================================================
 
 from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 import json
 import asyncio
 
+from ...services.report_progress import (
+    TERMINAL_STATUSES,
+    build_job_event,
+    subscribe_job_events,
+)
+
+# Suivi SSE de la génération bulk
+REPORT_STREAM_RECONCILE_SECONDS = 5.0
+REPORT_STREAM_TIMEOUT_SECONDS = 3600
+
 @router.get("/campaigns/{campaign_id}/generate-bulk/stream")
 async def generate_bulk_reports_stream(
     campaign_id: UUID,
@@ -1123,7 +1172,9 @@ async def generate_bulk_reports_stream(
     avec progression en temps réel via Server-Sent Events (SSE).
 
     Cette route maintient la connexion ouverte et envoie des événements
-    de progression pour chaque rapport généré.
+    de progression pour chaque rapport généré. Les rapports sont générés
+    en parallèle par les workers Celery (queue report_generation) ; leur
+    progression est relayée depuis Redis pub/sub.
 
     Événements SSE:
     - started: Début de la génération
@@ -1204,23 +1255,11 @@ async def generate_bulk_reports_stream(
             yield f"data: {json.dumps({'status': 'started', 'total_entities': total_entities, 'entities': [{'id': str(e.id), 'name': e.name} for e in entities]})}\n\n"
 
             # ==============================================================
-            # 5. CRÉER ET TRAITER CHAQUE RAPPORT
+            # 5. CRÉER LES RAPPORTS ET LES JOBS
             # ==============================================================
-            from ...services.report_job_processor import ReportJobProcessor
-            processor = ReportJobProcessor(db)
-
-            success_count = 0
-            failed_count = 0
-            results = []
-
-            for idx, entity in enumerate(entities):
-                entity_index = idx + 1
-
-                # Envoyer l'événement de début pour cette entité
-                yield f"data: {json.dumps({'status': 'entity_started', 'entity_index': entity_index, 'entity_id': str(entity.id), 'entity_name': entity.name, 'total_entities': total_entities})}\n\n"
-
-                try:
-                    # Créer le rapport
+            def _create_jobs() -> List[dict]:
+                created = []
+                for idx, entity in enumerate(entities):
                     new_report = GeneratedReport(
                         tenant_id=current_user.tenant_id,
                         campaign_id=campaign_id,
@@ -1239,7 +1278,6 @@ async def generate_bulk_reports_stream(
                     db.add(new_report)
                     db.flush()
 
-                    # Créer le job
                     job = ReportGenerationJob(
                         tenant_id=current_user.tenant_id,
                         report_id=new_report.id,
@@ -1248,66 +1286,164 @@ async def generate_bulk_reports_stream(
                     )
                     db.add(job)
                     db.flush()
-                    db.commit()
-
-                    # Envoyer progression: collecte des données
-                    yield f"data: {json.dumps({'status': 'entity_progress', 'entity_index': entity_index, 'entity_name': entity.name, 'step': 'collecting_data', 'step_label': 'Collecte des données...'})}\n\n"
-
-                    # Traiter le job
-                    logger.info(f"🔄 SSE: Traitement rapport pour {entity.name}...")
-                    success = processor.process_job(job.id)
 
-                    if success:
-                        logger.info(f"✅ SSE: Rapport généré pour {entity.name}")
-                        success_count += 1
-
-                        # Récupérer le rapport mis à jour
-                        db.refresh(new_report)
-
-                        yield f"data: {json.dumps({'status': 'entity_completed', 'entity_index': entity_index, 'entity_id': str(entity.id), 'entity_name': entity.name, 'report_id': str(new_report.id), 'success': True, 'total_entities': total_entities, 'success_count': success_count, 'failed_count': failed_count})}\n\n"
-
-                        results.append({
-                            'entity_id': str(entity.id),
-                            'entity_name': entity.name,
-                            'report_id': str(new_report.id),
-                            'success': True
-                        })
-                    else:
-                        logger.warning(f"⚠️ SSE: Échec pour {entity.name}")
-                        failed_count += 1
-
-                        yield f"data: {json.dumps({'status': 'entity_failed', 'entity_index': entity_index, 'entity_id': str(entity.id), 'entity_name': entity.name, 'error': 'Échec de génération', 'total_entities': total_entities, 'success_count': success_count, 'failed_count': failed_count})}\n\n"
+                    created.append({
+                        'job_id': str(job.id),
+                        'report_id': str(new_report.id),
+                        'entity_id': str(entity.id),
+                        'entity_name': entity.name,
+                        'entity_index': idx + 1,
+                    })
+                db.commit()
+                return created
 
-                        results.append({
-                            'entity_id': str(entity.id),
-                            'entity_name': entity.name,
-                            'success': False,
-                            'error': 'Échec de génération'
-                        })
+            jobs_created = await run_in_threadpool(_create_jobs)
+            jobs_by_id = {job_info['job_id']: job_info for job_info in jobs_created}
+            job_ids = [UUID(job_id) for job_id in jobs_by_id]
 
-                except Exception as e:
-                    logger.error(f"❌ SSE: Erreur génération {entity.name}: {str(e)}")
-                    failed_count += 1
-                    db.rollback()
+            # ==============================================================
+            # 6. ENVOYER LES JOBS AUX WORKERS
+            # ==============================================================
+            inline_task = None
+            if not await run_in_threadpool(_dispatch_report_jobs, job_ids):
+                # Fallback sans worker : traitement séquentiel en arrière-plan
+                inline_task = asyncio.create_task(run_in_threadpool(_process_report_jobs_inline, job_ids))
 
-                    yield f"data: {json.dumps({'status': 'entity_failed', 'entity_index': entity_index, 'entity_id': str(entity.id), 'entity_name': entity.name, 'error': str(e), 'total_entities': total_entities, 'success_count': success_count, 'failed_count': failed_count})}\n\n"
+            # ==============================================================
+            # 7. RELAYER LA PROGRESSION (Redis pub/sub + réconciliation BDD)
+            # ==============================================================
+            job_states = {job_id: JobStatus.QUEUED.value for job_id in jobs_by_id}
+            counters = {'success': 0, 'failed': 0}
+            results = []
 
+            def _to_sse(event: dict) -> List[str]:
+                job_info = jobs_by_id.get(event.get('job_id'))
+                if not job_info:
+                    return []
+
+                job_id = job_info['job_id']
+                previous = job_states[job_id]
+                status = event.get('status')
+                if previous in TERMINAL_STATUSES:
+                    return []
+
+                base = {
+                    'entity_index': job_info['entity_index'],
+                    'entity_id': job_info['entity_id'],
+                    'entity_name': job_info['entity_name'],
+                    'total_entities': total_entities,
+                }
+                messages = []
+
+                if previous == JobStatus.QUEUED.value and status != JobStatus.QUEUED.value:
+                    messages.append({'status': 'entity_started', **base})
+
+                if status == JobStatus.PROCESSING.value:
+                    messages.append({
+                        'status': 'entity_progress',
+                        **base,
+                        'step': event.get('step'),
+                        'step_label': event.get('step_label'),
+                        'progress': event.get('progress'),
+                    })
+                elif status == JobStatus.COMPLETED.value:
+                    counters['success'] += 1
+                    messages.append({
+                        'status': 'entity_completed',
+                        **base,
+                        'report_id': job_info['report_id'],
+                        'success': True,
+                        'success_count': counters['success'],
+                        'failed_count': counters['failed'],
+                    })
                     results.append({
-                        'entity_id': str(entity.id),
-                        'entity_name': entity.name,
+                        'entity_id': job_info['entity_id'],
+                        'entity_name': job_info['entity_name'],
+                        'report_id': job_info['report_id'],
+                        'success': True
+                    })
+                elif status in (JobStatus.FAILED.value, JobStatus.CANCELLED.value):
+                    counters['failed'] += 1
+                    error = event.get('error') or 'Échec de génération'
+                    messages.append({
+                        'status': 'entity_failed',
+                        **base,
+                        'error': error,
+                        'success_count': counters['success'],
+                        'failed_count': counters['failed'],
+                    })
+                    results.append({
+                        'entity_id': job_info['entity_id'],
+                        'entity_name': job_info['entity_name'],
                         'success': False,
-                        'error': str(e)
+                        'error': error
                     })
 
-                # Petit délai pour permettre au client de traiter
-                await asyncio.sleep(0.1)
+                job_states[job_id] = status or previous
+                return [f"data: {json.dumps(message)}\n\n" for message in messages]
+
+            def _poll_jobs() -> List[dict]:
+                jobs = db.execute(
+                    select(ReportGenerationJob)
+                    .where(ReportGenerationJob.id.in_(job_ids))
+                    .execution_options(populate_existing=True)
+                ).scalars().all()
+                events = [build_job_event(job) for job in jobs]
+                db.commit()
+                return events
+
+            async def _event_source():
+                try:
+                    async for event in subscribe_job_events(jobs_by_id.keys()):
+                        yield event
+                except Exception as e:
+                    logger.warning(f"⚠️ SSE: pub/sub Redis indisponible ({e}) - polling BDD")
+                while True:
+                    await asyncio.sleep(1.0)
+                    yield None
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + REPORT_STREAM_TIMEOUT_SECONDS
+            last_reconcile = 0.0
+            source = _event_source()
+            try:
+                async for event in source:
+                    if event is not None:
+                        for message in _to_sse(event):
+                            yield message
+                    else:
+                        # Keep-alive SSE (commentaire ignoré par EventSource)
+                        yield ": keep-alive\n\n"
+
+                    # Réconciliation périodique : événements publiés avant l'abonnement
+                    # ou perdus, Redis absent, worker redémarré... Cadencée par le temps
+                    # écoulé, pour qu'un flux continu d'événements des autres jobs ne
+                    # la retarde pas
+                    if loop.time() - last_reconcile >= REPORT_STREAM_RECONCILE_SECONDS:
+                        last_reconcile = loop.time()
+                        for polled in await run_in_threadpool(_poll_jobs):
+                            if polled['status'] != job_states.get(polled['job_id']):
+                                for message in _to_sse(polled):
+                                    yield message
+
+                    if all(state in TERMINAL_STATUSES for state in job_states.values()):
+                        break
+                    if loop.time() > deadline:
+                        logger.warning(f"⚠️ SSE: délai de suivi dépassé pour la campagne {campaign_id}")
+                        break
+            finally:
+                await source.aclose()
+                if inline_task is not None and inline_task.done():
+                    inline_task.result()
 
             # ==============================================================
-            # 6. ENVOYER L'ÉVÉNEMENT DE FIN
+            # 8. ENVOYER L'ÉVÉNEMENT DE FIN
             # ==============================================================
+            success_count = counters['success']
+            failed_count = counters['failed']
             logger.info(f"📊 SSE: Génération bulk terminée: {success_count} succès, {failed_count} échecs")
 
-            if failed_count == 0:
+            if failed_count == 0 and success_count == total_entities:
                 message = f"✅ {success_count} rapport(s) généré(s) avec succès"
             elif success_count == 0:
                 message = f"❌ Échec de génération pour {failed_count} rapport(s)"
@@ -1334,7 +1470,7 @@ async def generate_bulk_reports_stream(
 
 
 @router.get("/jobs/{job_id}", response_model=ReportGenerationJobResponse)
-async def get_job_status(
+def get_job_status(
     job_id: UUID,
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -1369,7 +1505,7 @@ async def get_job_status(
 
 
 @router.get("/campaigns/{campaign_id}/reports", response_model=GeneratedReportListResponse)
-async def list_campaign_reports(
+def list_campaign_reports(
     campaign_id: UUID,
     report_scope: Optional[ReportScope] = Query(None, description="Filtrer par scope (consolidated ou entity)"),
     entity_id: Optional[UUID] = Query(None, description="Filtrer par entité (pour rapports individuels)"),
@@ -1445,7 +1581,7 @@ async def list_campaign_reports(
 # ============================================================================
 
 @router.get("/widgets/types", response_model=WidgetTypesResponse)
-async def get_widget_types(
+def get_widget_types(
     current_user: User = Depends(require_permission("REPORT_READ"))
 ):
     """Liste tous les types de widgets disponibles, organisés par catégorie."""
@@ -1510,7 +1646,7 @@ async def get_widget_types(
 # ============================================================================
 
 @router.get("/reports/{report_id}/preview-html")
-async def preview_report_html(
+def preview_report_html(
     report_id: UUID,
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -1527,7 +1663,8 @@ async def preview_report_html(
     try:
         from fastapi.responses import HTMLResponse
         from ...services.report_service import ReportService
-        from ...services.widget_renderer import WidgetRenderer
+        from ...services.report_snapshot_service import get_snapshot
+        from ...services.widget_renderer import WidgetRenderer, get_render_plan
         from datetime import datetime, timezone
 
         # 1. Récupérer le rapport
@@ -1561,7 +1698,10 @@ async def preview_report_html(
         report_service = ReportService(db)
 
         if report.report_scope == ReportScope.CONSOLIDATED.value:
-            data = report_service.collect_consolidated_data(report.campaign_id)
+            data = get_snapshot(
+                db, "consolidated", report.campaign_id, None,
+                lambda: report_service.collect_consolidated_data(report.campaign_id)
+            )
 
             # Normaliser les données consolidées pour compatibilité avec les widgets
             # Les widgets attendent 'stats' et 'scores', pas 'global_stats'
@@ -1638,9 +1778,9 @@ async def preview_report_html(
 
         else:
             # Rapport entity (campagne)
-            data = report_service.collect_entity_data(
-                report.campaign_id,
-                report.entity_id
+            data = get_snapshot(
+                db, "entity", report.campaign_id, report.entity_id,
+                lambda: report_service.collect_entity_data(report.campaign_id, report.entity_id)
             )
 
             # Normaliser nc_count pour les widgets
@@ -1753,31 +1893,9 @@ async def preview_report_html(
         data['ai_contents'] = ai_contents
         logger.info(f"📊 Preview ai_contents final: {list(ai_contents.keys())}")
 
-        # 6. Récupérer et rendre la structure
-        structure = template.structure or []
-        if isinstance(structure, str):
-            import json
-            structure = json.loads(structure)
-
-        # Passer la structure du template dans data pour que render_toc puisse générer la TOC
-        data['_template_structure'] = structure
-
-        widgets_html = []
-        for widget in sorted(structure, key=lambda w: w.get('position', 0)):
-            widget_type = widget.get('widget_type', '')
-            config = widget.get('config', {}).copy()  # Copier pour ne pas modifier l'original
-
-            # IMPORTANT: Inclure l'ID du widget dans la config pour le rendu
-            # Cela permet aux widgets IA de récupérer leur contenu depuis ai_contents
-            if widget.get('id'):
-                config['id'] = widget.get('id')
-
-            try:
-                html = renderer.render_widget(widget_type, config, data)
-                widgets_html.append(html)
-            except Exception as e:
-                logger.warning(f"Erreur rendu widget {widget_type}: {e}")
-                widgets_html.append(f"<!-- Erreur widget {widget_type}: {e} -->")
+        # 6. Rendre la structure (compilée une fois par version du template)
+        plan = get_render_plan(template.id, template.updated_at, template.structure)
+        widgets_html = plan.render_widgets(renderer, data)
 
         # 7. Assembler le HTML final
         primary_color = color_scheme.get('primary', '#8B5CF6')
@@ -1889,7 +2007,7 @@ async def preview_report_html(
 # ============================================================================
 
 @router.get("/reports/{report_id}/download")
-async def download_report(
+def download_report(
     report_id: UUID,
     inline: bool = False,
     current_user: User = Depends(require_permission("REPORT_READ")),
@@ -2044,7 +2162,7 @@ async def download_report(
 
 
 @router.get("/reports/{report_id}")
-async def get_report(
+def get_report(
     report_id: UUID,
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -2081,7 +2199,7 @@ async def get_report(
 
 
 @router.delete("/reports/{report_id}", status_code=http_status.HTTP_204_NO_CONTENT)
-async def delete_report(
+def delete_report(
     report_id: UUID,
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -2188,7 +2306,7 @@ async def delete_report(
 
 
 @router.post("/scans/ecosystem/generate", response_model=GenerateReportResponse, status_code=http_status.HTTP_202_ACCEPTED)
-async def generate_scan_ecosystem_report(
+def generate_scan_ecosystem_report(
     request: GenerateScanReportRequest,
     entity_id: Optional[UUID] = Query(None, description="Filtrer par entité (optionnel)"),
     current_user: User = Depends(require_permission("REPORT_READ")),
@@ -2333,7 +2451,7 @@ async def generate_scan_ecosystem_report(
 
 
 @router.post("/scans/{scan_id}/generate", response_model=GenerateReportResponse, status_code=http_status.HTTP_202_ACCEPTED)
-async def generate_scan_report(
+def generate_scan_report(
     scan_id: UUID,
     request: GenerateReportRequest,
     current_user: User = Depends(require_permission("REPORT_READ")),
@@ -2513,7 +2631,7 @@ async def generate_scan_report(
 # pour éviter que FastAPI interprète "ecosystem" comme un scan_id
 
 @router.get("/scans/ecosystem/reports", response_model=GeneratedReportListResponse)
-async def list_scan_ecosystem_reports(
+def list_scan_ecosystem_reports(
     status: Optional[ReportStatus] = Query(None, description="Filtrer par statut"),
     current_user: User = Depends(require_permission("REPORT_READ")),
     db: Session = Depends(get_db)
@@ -2550,7 +2668,7 @@ async def list_scan_ecosystem_reports(
 
 
 @router.get("/scans/{scan_id}/reports", response_model=GeneratedReportListResponse)
-async def list_scan_reports(
+def list_scan_reports(
     scan_id: UUID,
     status: Optional[ReportStatus] = Query(None, description="Filtrer par statut"),
     current_user: User = Depends(require_permission("REPORT_READ")),
@@ -147,7 +147,7 @@ class AssignPermissionsRequest(BaseModel):
     summary="Lister toutes les permissions",
     description="Récupère la liste de toutes les permissions disponibles"
 )
-async def list_permissions(
+def list_permissions(
     permission_type: Optional[str] = Query(None, description="Filtrer par type (general/workflow)"),
     module: Optional[str] = Query(None, description="Filtrer par module"),
     current_user: dict = Depends(require_permission("ROLE_READ")),
@@ -210,7 +210,7 @@ async def list_permissions(
     summary="Permissions groupées par module",
     description="Récupère les permissions groupées par module et type, avec leurs dépendances"
 )
-async def get_permissions_grouped(
+def get_permissions_grouped(
     current_user: dict = Depends(require_permission("ROLE_READ")),
     db: Session = Depends(get_db)
 ):
@@ -296,7 +296,7 @@ async def get_permissions_grouped(
     summary="Créer une permission",
     description="Crée une nouvelle permission"
 )
-async def create_permission(
+def create_permission(
     permission: PermissionCreate,
     current_user: dict = Depends(require_permission("ROLE_READ")),
     db: Session = Depends(get_db)
@@ -358,7 +358,7 @@ async def create_permission(
     summary="Supprimer une permission",
     description="Supprime une permission (et ses associations avec les rôles)"
 )
-async def delete_permission(
+def delete_permission(
     permission_id: UUID,
     current_user: dict = Depends(require_permission("ROLE_READ")),
     db: Session = Depends(get_db)
@@ -407,7 +407,7 @@ async def delete_permission(
     summary="Lister tous les rôles",
     description="Récupère la liste de tous les rôles disponibles pour le tenant"
 )
-async def list_roles(
+def list_roles(
     tenant_id: UUID = Query(..., description="ID du tenant"),
     include_system: bool = Query(True, description="Inclure les rôles système"),
     current_user: dict = Depends(require_permission("ROLE_READ")),
@@ -503,7 +503,7 @@ async def list_roles(
     summary="Statistiques des rôles",
     description="Récupère les statistiques globales des rôles"
 )
-async def get_roles_stats(
+def get_roles_stats(
     tenant_id: UUID = Query(..., description="ID du tenant"),
     current_user: dict = Depends(require_permission("ROLE_READ")),
     db: Session = Depends(get_db)
@@ -567,7 +567,7 @@ async def get_roles_stats(
     summary="Liste simple des rôles",
     description="Récupère une liste simplifiée des rôles (id, code, name) pour les sélecteurs"
 )
-async def list_roles_simple(
+def list_roles_simple(
     include_system: bool = Query(False, description="Inclure les rôles système"),
     current_user: dict = Depends(require_permission("ROLE_READ")),
     db: Session = Depends(get_db)
@@ -611,7 +611,7 @@ async def list_roles_simple(
     summary="Détail d'un rôle",
     description="Récupère les détails d'un rôle spécifique avec ses permissions"
 )
-async def get_role(
+def get_role(
     role_id: UUID,
     tenant_id: UUID = Query(..., description="ID du tenant"),
     current_user: dict = Depends(require_permission("ROLE_READ")),
@@ -720,7 +720,7 @@ async def get_role(
     summary="Créer un rôle",
     description="Crée un nouveau rôle personnalisé"
 )
-async def create_role(
+def create_role(
     role: RoleCreate,
     current_user: dict = Depends(require_permission("ROLE_READ")),
     db: Session = Depends(get_db)
@@ -798,7 +798,7 @@ async def create_role(
     summary="Modifier un rôle",
     description="Modifie un rôle existant (sauf les rôles système)"
 )
-async def update_role(
+def update_role(
     role_id: UUID,
     role_update: RoleUpdate,
     tenant_id: UUID = Query(..., description="ID du tenant"),
@@ -905,7 +905,7 @@ async def update_role(
     summary="Supprimer un rôle",
     description="Supprime un rôle personnalisé (sauf les rôles système)"
 )
-async def delete_role(
+def delete_role(
     role_id: UUID,
     tenant_id: UUID = Query(..., description="ID du tenant"),
     current_user: dict = Depends(require_permission("ROLE_READ")),
@@ -985,7 +985,7 @@ async def delete_role(
     summary="Lister les permissions d'un rôle",
     description="Récupère la liste des permissions assignées à un rôle"
 )
-async def get_role_permissions(
+def get_role_permissions(
     role_id: UUID,
     current_user: dict = Depends(require_permission("ROLE_READ")),
     db: Session = Depends(get_db)
@@ -1150,7 +1150,7 @@ async def assign_role_permissions(
     summary="Ajouter une permission à un rôle",
     description="Ajoute une permission spécifique à un rôle"
 )
-async def add_permission_to_role(
+def add_permission_to_role(
     role_id: UUID,
     permission_id: UUID,
     current_user: dict = Depends(require_permission("ROLE_READ")),
@@ -1214,7 +1214,7 @@ async def add_permission_to_role(
     summary="Retirer une permission d'un rôle",
     description="Retire une permission spécifique d'un rôle"
 )
-async def remove_permission_from_role(
+def remove_permission_from_role(
     role_id: UUID,
     permission_id: UUID,
     current_user: dict = Depends(require_permission("ROLE_READ")),
@@ -1265,7 +1265,7 @@ async def remove_permission_from_role(
     summary="Détail complet d'un rôle",
     description="Récupère les détails d'un rôle avec ses permissions"
 )
-async def get_role_detail(
+def get_role_detail(
     role_id: UUID,
     tenant_id: UUID = Query(..., description="ID du tenant"),
     current_user: dict = Depends(require_permission("ROLE_READ")),
@@ -148,7 +148,7 @@ class GenerateMagicLinkResponse(BaseModel):
 # ============================================================================
 
 @router.post("/validate-email", response_model=EmailValidationResponse)
-async def validate_email(
+def validate_email(
     request: EmailValidationRequest,
     db: Session = Depends(get_db)
 ):
@@ -179,7 +179,7 @@ async def validate_email(
     return EmailValidationResponse(**validation_result)
 
 @router.post("/admin/create", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(
+def create_user(
     user: UserCreate,
     db: Session = Depends(get_db)
 ):
@@ -558,7 +558,7 @@ async def create_user(
 
 
 @router.get("/users", response_model=UserListResponse)
-async def list_users(
+def list_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     is_active: Optional[bool] = Query(None),
@@ -690,7 +690,7 @@ async def list_users(
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -707,7 +707,7 @@ async def get_user(
 
 
 @router.put("/users/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: UUID,
     user_update: UserUpdate,
     db: Session = Depends(get_db)
@@ -738,7 +738,7 @@ async def update_user(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
+def delete_user(
     user_id: UUID,
     db: Session = Depends(get_db)
 ):
@@ -779,7 +779,7 @@ async def delete_user(
 
 
 @router.post("/activate", status_code=status.HTTP_200_OK)
-async def activate_account(
+def activate_account(
     request: ActivateAccountRequest,
     db: Session = Depends(get_db)
 ):
@@ -791,7 +791,7 @@ async def activate_account(
 
 
 @router.post("/generate-magic-link", response_model=GenerateMagicLinkResponse, status_code=status.HTTP_201_CREATED)
-async def generate_and_send_magic_link(
+def generate_and_send_magic_link(
     request: GenerateMagicLinkRequest,
     db: Session = Depends(get_db)
 ):
@@ -48,7 +48,7 @@ router = APIRouter(tags=["Users"])
     include_args=True,
     version_sensitive=True
 )
-async def list_users(
+def list_users(
     tenant_id: Optional[UUID] = Query(None, description="Filtrer par tenant"),
     role: Optional[UserRole] = Query(None, description="Filtrer par rôle"),
     is_active: Optional[bool] = Query(None, description="Filtrer par statut"),
@@ -246,7 +246,7 @@ async def create_user(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: UUID,
     current_user: User = Depends(require_permission("USERS_READ")),
     db: Session = Depends(get_db)
@@ -262,7 +262,7 @@ async def get_user(
 
 
 @router.patch("/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: UUID,
     user_update: UserUpdate,
     current_user: User = Depends(require_permission("USERS_UPDATE")),
@@ -307,7 +307,7 @@ async def update_user(
 
 
 @router.patch("/{user_id}/password", response_model=UserResponse)
-async def update_user_password(
+def update_user_password(
     user_id: UUID,
     password_update: UserUpdatePassword,
     current_user: User = Depends(require_permission("USERS_UPDATE")),
@@ -341,7 +341,7 @@ async def update_user_password(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
+def delete_user(
     user_id: UUID,
     force: bool = Query(False, description="Force la suppression"),
     current_user: User = Depends(require_permission("USERS_DELETE")),
@@ -372,7 +372,7 @@ async def delete_user(
 
 
 @router.post("/{user_id}/toggle-status", response_model=UserResponse)
-async def toggle_user_status(
+def toggle_user_status(
     user_id: UUID,
     current_user: User = Depends(require_permission("USERS_UPDATE")),
     db: Session = Depends(get_db)
@@ -401,7 +401,7 @@ async def toggle_user_status(
 # ============================================================================
 
 @router.get("/tenant/{tenant_id}/admins", response_model=UserListResponse)
-async def get_tenant_admins(
+def get_tenant_admins(
     tenant_id: UUID,
     current_user: User = Depends(require_permission("USERS_READ")),
     db: Session = Depends(get_db)
@@ -429,7 +429,7 @@ async def get_tenant_admins(
 
 
 @router.get("/tenant/{tenant_id}/stats")
-async def get_tenant_user_stats(
+def get_tenant_user_stats(
     tenant_id: UUID,
     current_user: User = Depends(require_permission("USERS_READ")),
     db: Session = Depends(get_db)
@@ -477,7 +477,7 @@ async def get_tenant_user_stats(
     }
 
 @router.get("/me")
-async def get_current_user_info(
+def get_current_user_info(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -549,7 +549,7 @@ async def get_current_user_info(
 
 
 @router.get("/count/by-organization/{organization_id}")
-async def count_users_by_organization(
+def count_users_by_organization(
     organization_id: UUID,
     current_user: User = Depends(require_permission("USERS_READ")),
     db: Session = Depends(get_db)
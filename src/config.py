@@ -43,6 +43,15 @@ class Settings(BaseSettings):
     pg_db: Optional[str] = Field(default=None, alias="POSTGRES_DB")
     pg_user: Optional[str] = Field(default=None, alias="POSTGRES_USER")
     pg_password: Optional[str] = Field(default=None, alias="POSTGRES_PASSWORD")
+    # Pool de connexions de l'engine, par process (API : une connexion par
+    # handler synchrone ; worker de scan prefork : une tâche à la fois, un
+    # petit pool suffit, ex. DB_POOL_SIZE=2 DB_MAX_OVERFLOW=2)
+    db_pool_size: int = Field(default=20, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=30, alias="DB_MAX_OVERFLOW")
+    # -1 = pas de recyclage (défaut SQLAlchemy)
+    db_pool_recycle_seconds: int = Field(default=-1, alias="DB_POOL_RECYCLE_SECONDS")
+    # Taille du threadpool des handlers synchrones (≈ pool_size + max_overflow de l'engine)
+    threadpool_max_workers: int = Field(default=50, alias="THREADPOOL_MAX_WORKERS")
 
     # ==========================================
     # API CONFIGURATION
@@ -126,6 +135,14 @@ class Settings(BaseSettings):
     auto_generate_embeddings: bool = Field(default=True, alias="AUTO_GENERATE_EMBEDDINGS")
     embedding_model: str = Field(default="xlm-roberta-base", alias="EMBEDDING_MODEL")
     embedding_dimension: int = Field(default=768, alias="EMBEDDING_DIMENSION")
+    embedding_batch_size: int = Field(default=32, alias="EMBEDDING_BATCH_SIZE")
+    embedding_max_length: int = Field(default=512, alias="EMBEDDING_MAX_LENGTH")
+    embedding_num_threads: int = Field(default=0, alias="EMBEDDING_NUM_THREADS")  # 0 = défaut torch
+    embedding_warmup_on_startup: bool = Field(default=False, alias="EMBEDDING_WARMUP_ON_STARTUP")
+    embedding_quantize_int8: bool = Field(default=False, alias="EMBEDDING_QUANTIZE_INT8")  # CPU uniquement
+    vector_hnsw_m: int = Field(default=16, alias="VECTOR_HNSW_M")
+    vector_hnsw_ef_construction: int = Field(default=64, alias="VECTOR_HNSW_EF_CONSTRUCTION")
+    vector_ef_search: int = Field(default=40, alias="VECTOR_EF_SEARCH")  # rappel vs latence des recherches ANN
     models_cache_dir: str = Field(default="./models", alias="MODELS_CACHE_DIR")
 
     # ==========================================
@@ -148,6 +165,15 @@ class Settings(BaseSettings):
     redis_cache_ttl: int = Field(default=3600, alias="REDIS_CACHE_TTL")
     redis_session_ttl: int = Field(default=86400, alias="REDIS_SESSION_TTL")
 
+    # ==========================================
+    # REPORTS CONFIGURATION
+    # ==========================================
+    report_async_generation: bool = Field(
+        default=True,
+        alias="REPORT_ASYNC_GENERATION",
+        description="Envoyer les jobs de rapport aux workers Celery (queue report_generation)"
+    )
+
     # ==========================================
     # CACHE CONFIGURATION
     # ==========================================
@@ -349,6 +375,23 @@ class Settings(BaseSettings):
         description="Password admin pour l'administration Keycloak"
     )
 
+    # Fast path d'authentification (cache des tokens vérifiés)
+    auth_token_cache_size: int = Field(
+        default=2048,
+        alias="AUTH_TOKEN_CACHE_SIZE",
+        description="Nombre max de tokens vérifiés gardés en LRU par process"
+    )
+    auth_token_cache_max_ttl: int = Field(
+        default=300,
+        alias="AUTH_TOKEN_CACHE_MAX_TTL",
+        description="Durée max (s) de cache d'un token vérifié (bornée par exp)"
+    )
+    auth_session_sync_window: int = Field(
+        default=900,
+        alias="AUTH_SESSION_SYNC_WINDOW",
+        description="Fenêtre (s) entre deux synchronisations rôles/last_login si les rôles ne changent pas"
+    )
+
     @property
     def is_keycloak_configured(self) -> bool:
         """Vérifie si Keycloak est configuré et activé"""
@@ -24,8 +24,9 @@ if not DB_URL:
 # Crée l'engine (ne teste pas la connectivité à ce stade)
 engine = create_engine(
     DB_URL,
-    pool_size=20,
-    max_overflow=30,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle_seconds,
     pool_pre_ping=True,
     echo=False,
     future=True,
@@ -10,6 +10,8 @@ import logging
 from src.services.keycloak_service import get_keycloak_service, KeycloakService
 from src.database import get_db
 from src.models.audit import User
+from src.config import settings
+from src.utils.token_cache import token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +19,25 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
 
+async def _verify_token_cached(keycloak: KeycloakService, jwt_token: str) -> dict:
+    """
+    Vérifie un token Keycloak en passant par le cache des tokens vérifiés.
+
+    Un token déjà validé (LRU local ou Redis) n'est pas re-vérifié tant que
+    son ``exp`` n'est pas atteint. Les erreurs de validation ne sont jamais cachées.
+    """
+    if jwt_token.startswith("Bearer "):
+        jwt_token = jwt_token[len("Bearer "):].strip()
+
+    token_payload = token_cache.get(jwt_token)
+    if token_payload is not None:
+        return token_payload
+
+    token_payload = await keycloak.verify_token(jwt_token)
+    token_cache.set(jwt_token, token_payload)
+    return token_payload
+
+
 async def get_current_user_keycloak(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -76,7 +97,7 @@ async def get_current_user_keycloak(
 
     # 2. Valider le token avec Keycloak
     try:
-        token_payload = await keycloak.verify_token(jwt_token)
+        token_payload = await _verify_token_cached(keycloak, jwt_token)
         logger.debug(f"✅ Token Keycloak validé")
     except HTTPException:
         raise
@@ -135,23 +156,29 @@ async def get_current_user_keycloak(
         # Créer l'utilisateur s'il n'existe pas encore
         logger.info(f"👤 Création nouvel utilisateur: {email}")
         user = await _create_user_from_keycloak(db, user_claims)
+        token_cache.mark_role_synced(str(user.id), user_claims.get("roles", []), settings.auth_session_sync_window)
     else:
-        # Mettre à jour la dernière connexion
-        from datetime import datetime, timezone
-        user.last_login_at = datetime.now(timezone.utc)
-
-        # 🔒 Synchroniser les rôles à chaque authentification
         user_roles = user_claims.get("roles", [])
-        logger.debug(f"🔑 Rôles récupérés depuis user_claims pour {email}: {user_roles}")
-        _sync_user_roles_from_keycloak(db, user, user_roles)
 
-        db.commit()
+        # ⚡ Fast path : pas d'écriture si les rôles du token n'ont pas changé
+        # et qu'une synchronisation a eu lieu dans la fenêtre de session
+        if token_cache.needs_role_sync(str(user.id), user_roles, settings.auth_session_sync_window):
+            # Mettre à jour la dernière connexion
+            from datetime import datetime, timezone
+            user.last_login_at = datetime.now(timezone.utc)
+
+            # 🔒 Synchroniser les rôles depuis le token
+            logger.debug(f"🔑 Rôles récupérés depuis user_claims pour {email}: {user_roles}")
+            _sync_user_roles_from_keycloak(db, user, user_roles)
+
+            db.commit()
 
-        # 🔄 Recharger la relation roles après synchronisation
-        db.refresh(user)
+            # 🔄 Recharger la relation roles après synchronisation
+            db.refresh(user)
+            token_cache.mark_role_synced(str(user.id), user_roles, settings.auth_session_sync_window)
 
-        logger.debug(f"👤 Utilisateur existant: {email} (ID: {user.id}, Rôles synchronisés: {user_roles})")
-        logger.debug(f"👤 Rôles chargés depuis ORM: {[r.code for r in user.roles] if user.roles else []}")
+            logger.debug(f"👤 Utilisateur existant: {email} (ID: {user.id}, Rôles synchronisés: {user_roles})")
+            logger.debug(f"👤 Rôles chargés depuis ORM: {[r.code for r in user.roles] if user.roles else []}")
 
     return user
 
@@ -390,7 +417,7 @@ def require_role(required_role: str):
             )
 
         # Valider et extraire les rôles
-        token_payload = await keycloak.verify_token(jwt_token)
+        token_payload = await _verify_token_cached(keycloak, jwt_token)
         user_claims = keycloak.extract_user_claims(token_payload)
         roles = user_claims.get("roles", [])
 
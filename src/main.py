@@ -34,6 +34,7 @@ from src.api.v1 import (
     activation,
     admin,
     redis_monitoring,  # ✅ Monitoring Redis
+    model_monitoring,  # ✅ Monitoring des modèles d'embedding
     file_upload,  # ✅ Upload de fichiers pour pièces jointes
     questionnaire_activation,  # ✅ NOUVEAU : Activation questionnaires pour tenants
     campaigns,  # ✅ NOUVEAU : Gestion des campagnes d'audit
@@ -141,6 +142,7 @@ app.include_router(ecosystem.router, prefix="/api/v1", tags=["Ecosystem"])  # Le
 app.include_router(activation.router, prefix="/api/v1/activation", tags=["Activation"])
 app.include_router(admin.router, prefix="/api/v1", tags=["Admin"])
 app.include_router(redis_monitoring.router, prefix="/api/v1", tags=["Monitoring"])
+app.include_router(model_monitoring.router, prefix="/api/v1", tags=["Monitoring"])
 app.include_router(file_upload.router, prefix="/api/v1", tags=["File Upload"])
 app.include_router(questionnaire_activation.router, prefix="/api/v1", tags=["Questionnaire Activation"])
 app.include_router(campaigns.router, prefix="/api/v1", tags=["Campaigns"])
@@ -162,6 +164,13 @@ app.include_router(client_questionnaires.router, prefix="/api/v1", tags=["Client
 # Événement de démarrage
 @app.on_event("startup")
 async def startup_event():
+    # Dimensionner le threadpool des handlers synchrones (Session SQLAlchemy / MinIO bloquants)
+    # sur la taille du pool de connexions, au lieu des 40 threads par défaut d'AnyIO
+    import anyio.to_thread
+    from src.config import settings
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_max_workers
+    logger.info(f"✅ Threadpool handlers synchrones: {settings.threadpool_max_workers} workers")
+
     # Initialiser Redis
     from src.utils.redis_manager import redis_manager
     try:
@@ -182,6 +191,15 @@ async def startup_event():
         logger.error(f"❌ Erreur lors de l'initialisation de KeycloakService: {e}")
         raise
 
+    # Préchauffer le modèle d'embedding (sinon chargé à la première utilisation)
+    if settings.embedding_warmup_on_startup:
+        from starlette.concurrency import run_in_threadpool
+        from src.services.model_registry import model_registry
+        try:
+            await run_in_threadpool(model_registry.warmup)
+        except Exception as e:
+            logger.warning(f"⚠️ Préchauffage du modèle d'embedding impossible: {e}")
+
     logger.info("🚀 CYBERGARD AI API démarrée")
     logger.info("📚 Documentation disponible sur /docs")
 
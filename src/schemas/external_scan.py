@@ -137,6 +137,19 @@ class ScanLaunchRequest(BaseModel):
     )
 
 
+class ScanCampaignCreate(BaseModel):
+    """Requête pour lancer une campagne de scan (plusieurs cibles)."""
+    name: Optional[str] = Field(None, max_length=255)
+    target_ids: Optional[list[UUID]] = Field(
+        None,
+        description="Cibles à scanner (par défaut: toutes les cibles actives)"
+    )
+    entity_ids: Optional[list[UUID]] = Field(
+        None,
+        description="Limiter aux cibles de ces entités"
+    )
+
+
 class VulnerabilityMarkRemediated(BaseModel):
     """Marquer une vulnérabilité comme remédiée."""
     is_remediated: bool = True
@@ -236,6 +249,38 @@ class ScanLaunchResponse(BaseModel):
     task_id: Optional[str] = None
 
 
+class ScanCampaignResponse(BaseModel):
+    """Réponse pour une campagne de scan."""
+    id: UUID
+    tenant_id: UUID
+    name: Optional[str] = None
+    status: str
+    trigger_type: str = "manual"
+    triggered_by: Optional[UUID] = None
+    targets_count: int = 0
+    scans_count: int = 0
+    deduplicated_count: int = 0
+    success_count: int = 0
+    error_count: int = 0
+    summary: Optional[dict[str, Any]] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    task_id: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ScanCampaignListResponse(BaseModel):
+    """Liste de campagnes de scan."""
+    items: list[ScanCampaignResponse]
+    total: int
+    limit: int
+    offset: int
+
+
 class VulnerabilityResponse(BaseModel):
     """Réponse pour une vulnérabilité."""
     id: UUID
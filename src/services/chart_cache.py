@@ -0,0 +1,121 @@
+"""
+Cache des images de graphiques des rapports (PNG), adressé par contenu.
+
+Les mêmes graphiques reviennent d'un rapport à l'autre : régénération en
+masse des rapports d'entités, aperçu HTML consulté plusieurs fois. L'image
+est mise en cache sous une clé dérivée du type de graphique, de ses
+paramètres (données, titre, dimensions) et de la palette de couleurs :
+deux graphiques identiques partagent la même image, un changement de
+données ou de palette produit une nouvelle clé (pas d'invalidation).
+
+- Stockage Redis (``chart:png:<sha256>``), PNG encodé en base64, TTL
+  CHART_CACHE_TTL
+- Appliqué à toutes les méthodes ``generate_*`` de ChartGenerator via le
+  décorateur ``cached_chart`` : transparent pour les widgets ; le service
+  de rendu (render_pool.py) consulte le cache avant d'envoyer un graphique
+  à un process de rendu
+- Sans Redis (mode dégradé), les graphiques sont générés à chaque appel
+"""
+
+import base64
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+CHART_CACHE_ENABLED = os.getenv("CHART_CACHE_ENABLED", "true").lower() == "true"
+CHART_CACHE_TTL = int(os.getenv("CHART_CACHE_TTL", "604800"))  # 7 jours
+
+CACHE_KEY_PREFIX = "chart:png:"
+
+
+def chart_key(chart_type: str, params: Dict[str, Any], color_scheme: Optional[Dict[str, str]]) -> str:
+    """Clé de cache d'un graphique (type, paramètres, palette)."""
+    payload = json.dumps(
+        {"type": chart_type, "params": params, "colors": color_scheme or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return f"{CACHE_KEY_PREFIX}{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def get_chart(key: str) -> Optional[bytes]:
+    """Image en cache (None si absente ou Redis indisponible)."""
+    cached = redis_manager.get(key)
+    if not isinstance(cached, dict) or "png" not in cached:
+        return None
+    return base64.b64decode(cached["png"])
+
+
+def set_chart(key: str, img_bytes: bytes) -> None:
+    """Met une image en cache."""
+    redis_manager.set(key, {"png": base64.b64encode(img_bytes).decode("ascii")}, ttl=CHART_CACHE_TTL)
+
+
+def chart_params(method: Callable, *args, **kwargs) -> Dict[str, Any]:
+    """
+    Paramètres d'un appel de méthode generate_* normalisés (valeurs par
+    défaut comprises) : un appel positionnel et un appel nommé équivalents
+    partagent la même clé.
+    """
+    bound = inspect.signature(method).bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    return {name: value for name, value in bound.arguments.items() if name != "self"}
+
+
+def get_or_generate(
+    chart_type: str,
+    params: Dict[str, Any],
+    color_scheme: Optional[Dict[str, str]],
+    generate: Callable[[], bytes]
+) -> bytes:
+    """Image en cache, ou générée par generate puis mise en cache."""
+    if not CHART_CACHE_ENABLED or not redis_manager.is_connected:
+        return generate()
+
+    key = chart_key(chart_type, params, color_scheme)
+    img_bytes = get_chart(key)
+    if img_bytes is not None:
+        logger.debug(f"Graphique {chart_type} servi depuis le cache")
+        return img_bytes
+
+    img_bytes = generate()
+    set_chart(key, img_bytes)
+    return img_bytes
+
+
+def cached_chart(chart_type: str) -> Callable:
+    """
+    Décorateur des méthodes ChartGenerator.generate_* : l'image est lue dans
+    le cache, ou générée puis mise en cache.
+
+    La méthode d'origine reste accessible (``__wrapped__``) ainsi que le type
+    de graphique (``chart_type``).
+    """
+    def decorator(method: Callable[..., bytes]) -> Callable[..., bytes]:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs) -> bytes:
+            return get_or_generate(
+                chart_type,
+                chart_params(method, *args, **kwargs),
+                self.color_scheme,
+                lambda: method(self, *args, **kwargs)
+            )
+
+        wrapper.chart_type = chart_type
+        return wrapper
+
+    return decorator
+
+
+def clear_chart_cache() -> int:
+    """Vide les images en cache."""
+    return redis_manager.delete_pattern(f"{CACHE_KEY_PREFIX}*")
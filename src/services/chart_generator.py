@@ -3,6 +3,8 @@ Service de génération de graphiques pour les rapports.
 
 Génère des graphiques professionnels avec matplotlib/plotly
 pour inclusion dans les PDFs.
+
+Les images générées sont mises en cache par contenu (voir chart_cache.py).
 """
 
 from typing import Dict, Any, List, Optional, Tuple
@@ -25,12 +27,37 @@ except ImportError:
     MATPLOTLIB_AVAILABLE = False
     logging.warning("Matplotlib not installed. Chart generation unavailable.")
 
+from .chart_cache import cached_chart
+
 logger = logging.getLogger(__name__)
 
+_style_configured = False
+
+
+def _configure_matplotlib() -> None:
+    """Style matplotlib global, appliqué une fois par process."""
+    global _style_configured
+    if _style_configured:
+        return
+    plt.style.use('seaborn-v0_8-darkgrid')
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial']
+    plt.rcParams['font.size'] = 10
+    _style_configured = True
+
 
 class ChartGenerator:
     """Générateur de graphiques pour rapports."""
 
+    DEFAULT_COLOR_SCHEME = {
+        "primary": "#8B5CF6",
+        "secondary": "#3B82F6",
+        "accent": "#10B981",
+        "danger": "#EF4444",
+        "warning": "#F59E0B",
+        "success": "#22C55E"
+    }
+
     def __init__(self, color_scheme: Optional[Dict[str, str]] = None):
         """
         Initialise le générateur de graphiques.
@@ -41,21 +68,12 @@ class ChartGenerator:
         if not MATPLOTLIB_AVAILABLE:
             raise RuntimeError("Matplotlib not installed. Install with: pip install matplotlib")
 
-        self.color_scheme = color_scheme or {
-            "primary": "#8B5CF6",
-            "secondary": "#3B82F6",
-            "accent": "#10B981",
-            "danger": "#EF4444",
-            "warning": "#F59E0B",
-            "success": "#22C55E"
-        }
+        self.color_scheme = color_scheme or self.DEFAULT_COLOR_SCHEME
 
         # Configuration matplotlib
-        plt.style.use('seaborn-v0_8-darkgrid')
-        plt.rcParams['font.family'] = 'sans-serif'
-        plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial']
-        plt.rcParams['font.size'] = 10
+        _configure_matplotlib()
 
+    @cached_chart("radar")
     def generate_radar_chart(
         self,
         labels: List[str],
@@ -129,6 +147,7 @@ class ChartGenerator:
         logger.info(f"Radar chart généré ({len(img_bytes)} bytes)")
         return img_bytes
 
+    @cached_chart("bar")
     def generate_bar_chart(
         self,
         categories: List[str],
@@ -201,6 +220,7 @@ class ChartGenerator:
         logger.info(f"Bar chart généré ({len(img_bytes)} bytes)")
         return img_bytes
 
+    @cached_chart("pie")
     def generate_pie_chart(
         self,
         labels: List[str],
@@ -267,6 +287,7 @@ class ChartGenerator:
         logger.info(f"Pie chart généré ({len(img_bytes)} bytes)")
         return img_bytes
 
+    @cached_chart("gauge")
     def generate_gauge(
         self,
         value: float,
@@ -353,6 +374,7 @@ class ChartGenerator:
         logger.info(f"Gauge généré ({len(img_bytes)} bytes)")
         return img_bytes
 
+    @cached_chart("comparison")
     def generate_comparison_chart(
         self,
         categories: List[str],
@@ -0,0 +1,235 @@
+"""
+Agrégats de scores de conformité.
+
+La table ``compliance_score_aggregate`` maintient, par (campagne, entité,
+domaine), les compteurs de réponses courantes par compliance_status. Les
+dashboards lisent ces compteurs (O(campagnes)) au lieu d'agréger
+``question_answer`` à chaque appel (O(réponses)).
+
+Mise à jour :
+- à l'écriture (save_answer, submit) : recalcul des lignes de l'entité auditée,
+  dans la transaction de l'appelant
+- périodiquement (tâche Celery beat) : recalcul des couples (campagne, entité)
+  dont des réponses ont changé depuis le dernier calcul. Seules les réponses
+  modifiées depuis le dernier passage complet sont lues (plage sur l'index
+  ``ix_question_answer_updated_at``) ; ce repère est conservé dans Redis
+  (à défaut, fenêtre de COMPLIANCE_SCORE_LOOKBACK_SECONDS)
+
+Scoring : compliant = 100, non_compliant_minor = 50, non_compliant_major = 0
+(not_applicable et pending exclus).
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from uuid import UUID
+import logging
+import os
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.utils.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+# Fenêtre relue par le rafraîchissement périodique sans repère en Redis (24h)
+COMPLIANCE_SCORE_LOOKBACK_SECONDS = int(os.getenv("COMPLIANCE_SCORE_LOOKBACK_SECONDS", "86400"))
+# Marge pour les transactions encore ouvertes lors d'un passage
+COMPLIANCE_SCORE_REFRESH_MARGIN_SECONDS = 300
+# Conservation du repère (au-delà, retour à la fenêtre par défaut)
+COMPLIANCE_SCORE_WATERMARK_TTL = 7 * 86400
+
+WATERMARK_KEY = "compliance_score:refreshed_until"
+
+# Score (0-100) à partir des compteurs agrégés
+SCORE_SQL = """
+    COALESCE(
+        (SUM({p}compliant_count){f} * 100.0 + SUM({p}minor_count){f} * 50.0)
+        / NULLIF(SUM({p}compliant_count + {p}minor_count + {p}major_count){f}, 0),
+    0)
+"""
+
+
+def score_sql(prefix: str = "s.", where: Optional[str] = None) -> str:
+    """
+    Expression SQL du score pondéré sur les lignes d'agrégat.
+
+    Args:
+        prefix: Alias de la table compliance_score_aggregate (avec le point)
+        where: Condition FILTER optionnelle appliquée à chaque SUM
+    """
+    return SCORE_SQL.format(p=prefix, f=f" FILTER (WHERE {where})" if where else "")
+
+
+class ComplianceScoreService:
+    """Maintenance et lecture de la table compliance_score_aggregate."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ========================================================================
+    # MISE À JOUR
+    # ========================================================================
+
+    def refresh_scores(self, campaign_id: UUID, entity_id: Optional[UUID] = None) -> None:
+        """
+        Recalcule les lignes d'agrégat d'une campagne (ou d'une seule entité).
+
+        Ne commit pas : l'appelant reste maître de la transaction.
+
+        Args:
+            campaign_id: ID de la campagne
+            entity_id: Limite le recalcul à cette entité (None = toute la campagne)
+        """
+        params = {
+            "campaign_id": str(campaign_id),
+            "entity_id": str(entity_id) if entity_id else None,
+        }
+
+        # Sérialise les recalculs concurrents d'un même périmètre (delete + insert)
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:lock_key))"),
+            {"lock_key": f"compliance_score:{campaign_id}:{entity_id or '*'}"}
+        )
+
+        self.db.execute(text("""
+            DELETE FROM compliance_score_aggregate
+            WHERE campaign_id = CAST(:campaign_id AS uuid)
+              AND (CAST(:entity_id AS uuid) IS NULL OR entity_id = CAST(:entity_id AS uuid))
+        """), params)
+
+        self.db.execute(text("""
+            INSERT INTO compliance_score_aggregate (
+                campaign_id, entity_id, domain_id,
+                compliant_count, minor_count, major_count, not_applicable_count, answer_count,
+                updated_at
+            )
+            SELECT
+                qa.campaign_id,
+                a.entity_id,
+                r.domain_id,
+                COUNT(*) FILTER (WHERE qa.compliance_status = 'compliant'),
+                COUNT(*) FILTER (WHERE qa.compliance_status = 'non_compliant_minor'),
+                COUNT(*) FILTER (WHERE qa.compliance_status = 'non_compliant_major'),
+                COUNT(*) FILTER (WHERE qa.compliance_status = 'not_applicable'),
+                COUNT(*),
+                NOW()
+            FROM question_answer qa
+            LEFT JOIN audit a ON a.id = qa.audit_id
+            JOIN question q ON q.id = qa.question_id
+            LEFT JOIN requirement r ON r.id = q.requirement_id
+            WHERE qa.campaign_id = CAST(:campaign_id AS uuid)
+              AND qa.is_current = true
+              AND (CAST(:entity_id AS uuid) IS NULL OR a.entity_id = CAST(:entity_id AS uuid))
+            GROUP BY qa.campaign_id, a.entity_id, r.domain_id
+        """), params)
+
+    def refresh_audit_scores(self, audit_id: UUID, campaign_id: Optional[UUID] = None) -> None:
+        """
+        Recalcule les agrégats de l'entité d'un audit.
+
+        Args:
+            audit_id: ID de l'audit (porte l'entité)
+            campaign_id: ID de la campagne (déduit des réponses si absent)
+        """
+        row = self.db.execute(text("""
+            SELECT
+                a.entity_id,
+                COALESCE(
+                    CAST(:campaign_id AS uuid),
+                    (SELECT qa.campaign_id FROM question_answer qa
+                     WHERE qa.audit_id = a.id AND qa.campaign_id IS NOT NULL
+                     LIMIT 1)
+                ) as campaign_id
+            FROM audit a
+            WHERE a.id = CAST(:audit_id AS uuid)
+        """), {
+            "audit_id": str(audit_id),
+            "campaign_id": str(campaign_id) if campaign_id else None
+        }).fetchone()
+
+        if not row or not row.campaign_id or not row.entity_id:
+            return
+
+        self.refresh_scores(row.campaign_id, row.entity_id)
+
+    def refresh_stale_scores(self, limit: int = 200) -> int:
+        """
+        Recalcule les couples (campagne, entité) dont des réponses ont été
+        modifiées depuis leur dernier calcul (écritures hors save_answer/submit).
+
+        Seules les réponses modifiées depuis le repère du dernier passage
+        complet sont examinées. Le repère n'avance que si tous les couples
+        trouvés ont été recalculés (moins de ``limit``).
+
+        Returns:
+            Nombre de couples recalculés
+        """
+        started_at = self.db.execute(text("SELECT NOW()")).scalar()
+        since = self._refresh_watermark(started_at)
+
+        stale = self.db.execute(text("""
+            SELECT qa.campaign_id, a.entity_id
+            FROM question_answer qa
+            JOIN audit a ON a.id = qa.audit_id
+            LEFT JOIN (
+                SELECT campaign_id, entity_id, MAX(updated_at) as refreshed_at
+                FROM compliance_score_aggregate
+                GROUP BY campaign_id, entity_id
+            ) s ON s.campaign_id = qa.campaign_id AND s.entity_id = a.entity_id
+            WHERE qa.updated_at > :since
+              AND qa.campaign_id IS NOT NULL
+              AND qa.updated_at > COALESCE(s.refreshed_at, '-infinity'::timestamptz)
+            GROUP BY qa.campaign_id, a.entity_id
+            ORDER BY MAX(qa.updated_at)
+            LIMIT :limit
+        """), {"since": since, "limit": limit}).fetchall()
+
+        for row in stale:
+            self.refresh_scores(row.campaign_id, row.entity_id)
+
+        if len(stale) < limit:
+            redis_manager.set(
+                WATERMARK_KEY,
+                (started_at - timedelta(seconds=COMPLIANCE_SCORE_REFRESH_MARGIN_SECONDS)).isoformat(),
+                ttl=COMPLIANCE_SCORE_WATERMARK_TTL
+            )
+
+        return len(stale)
+
+    @staticmethod
+    def _refresh_watermark(now: datetime) -> datetime:
+        """Repère du dernier passage complet (ou début de la fenêtre par défaut)."""
+        stored = redis_manager.get(WATERMARK_KEY)
+        if isinstance(stored, str):
+            try:
+                return datetime.fromisoformat(stored)
+            except ValueError:
+                logger.warning(f"⚠️ Repère de rafraîchissement illisible: {stored}")
+        return now - timedelta(seconds=COMPLIANCE_SCORE_LOOKBACK_SECONDS)
+
+    # ========================================================================
+    # LECTURE
+    # ========================================================================
+
+    def get_tenant_scores(self, tenant_id: str) -> Dict[str, Any]:
+        """
+        Scores global / interne / externe du tenant et score des campagnes
+        de plus de 3 mois (tendance), en une requête sur les agrégats.
+        """
+        result = self.db.execute(text(f"""
+            SELECT
+                {score_sql()} as global_score,
+                {score_sql(where="c.audit_type = 'internal'")} as internal_score,
+                {score_sql(where="c.audit_type = 'external' OR c.audit_type IS NULL")} as external_score,
+                {score_sql(where="c.created_at < NOW() - INTERVAL '3 months'")} as previous_score
+            FROM compliance_score_aggregate s
+            JOIN campaign c ON c.id = s.campaign_id
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
+              AND c.status IN ('ongoing', 'late', 'completed', 'frozen')
+        """), {"tenant_id": tenant_id}).fetchone()
+
+        return {
+            key: round(float(getattr(result, key) or 0), 1) if result else 0
+            for key in ("global_score", "internal_score", "external_score", "previous_score")
+        }
@@ -5,14 +5,18 @@ Détecte automatiquement les équivalences sémantiques entre différents réfé
 """
 
 import logging
+import time
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime
 import uuid
 
+from ..config import settings
 from ..models.audit import Requirement, Framework
 from ..database import get_db
+from ..utils.vector_similarity import blockwise_top_k, normalize_rows, to_matrix
 from .embedding_service import RequirementEmbeddingService
 
 logger = logging.getLogger(__name__)
@@ -26,85 +30,109 @@ class CrossReferentialMappingService:
     
     def detect_cross_mappings(self, new_framework_id: str, 
                             similarity_threshold: float = 0.75,
-                            auto_validate_threshold: float = 0.95) -> Dict:
+                            auto_validate_threshold: float = 0.95,
+                            top_k: int = 10,
+                            target_framework_ids: Optional[List[str]] = None) -> Dict:
         """
         Détecter automatiquement les mappings lors d'un nouvel import de référentiel
+
+        Calcul matriciel : les embeddings stockés des exigences du nouveau
+        référentiel et des référentiels cibles sont chargés en matrices NumPy,
+        le top-k cosinus est calculé par blocs, puis les métadonnées
+        (référentiel, domaine) sont résolues en une seule jointure.
         
         Args:
             new_framework_id: ID du nouveau référentiel importé
             similarity_threshold: Seuil minimum de similarité pour créer un mapping
             auto_validate_threshold: Seuil pour validation automatique
+            top_k: Nombre maximum de correspondances par exigence source
+            target_framework_ids: Référentiels cibles (défaut: tous les autres)
             
         Returns:
             Dict avec résultats de la détection
         """
         
         try:
-            # Récupérer les nouvelles exigences
-            new_requirements = self.db.query(Requirement).filter_by(
-                framework_id=new_framework_id
-            ).all()
-            
-            if not new_requirements:
+            start = time.perf_counter()
+            new_framework_id = str(new_framework_id)
+
+            total_requirements = self.db.execute(text("""
+                SELECT COUNT(*) FROM requirement
+                WHERE framework_id = CAST(:fid AS uuid) AND is_active = true
+            """), {"fid": new_framework_id}).scalar() or 0
+
+            if not total_requirements:
                 return {"error": "No requirements found for framework"}
-            
-            mappings_detected = []
-            auto_validated = 0
-            pending_validation = 0
-            
-            for new_req in new_requirements:
-                # Chercher les exigences similaires dans les autres frameworks
-                similar_reqs = self.embedding_service.find_similar_requirements(
-                    query_text=self._create_embedding_text(new_req),
-                    limit=10
+
+            # 1) Matrice source (embeddings stockés du nouveau référentiel)
+            source_ids, source_matrix = self._load_embedding_matrix(framework_id=new_framework_id)
+            if len(source_ids) < total_requirements:
+                logger.info(
+                    f"🔄 {total_requirements - len(source_ids)} exigence(s) sans embedding, génération..."
                 )
-                
-                for similar in similar_reqs:
-                    similarity_score = similar.get('similarity_score', 0)
-                    
-                    # Filtrer par seuil et éviter l'auto-mapping
-                    if (similarity_score >= similarity_threshold and 
-                        similar['requirement_id'] != str(new_req.id)):
-                        
-                        # Vérifier que ce n'est pas du même framework
-                        target_req = self.db.query(Requirement).filter_by(
-                            id=similar['requirement_id']
-                        ).first()
-                        
-                        if target_req and target_req.framework_id != new_framework_id:
-                            mapping_data = {
-                                'source_requirement_id': str(new_req.id),
-                                'target_requirement_id': similar['requirement_id'],
-                                'mapping_type': self._determine_mapping_type(similarity_score),
-                                'semantic_similarity': similarity_score,
-                                'domain_match': self._check_domain_match(new_req, similar),
-                                'confidence_score': similarity_score,
-                                'mapping_rationale': self._generate_mapping_rationale(
-                                    new_req, similar, similarity_score
-                                ),
-                                'created_by': 'ai',
-                                'validation_status': 'approved' if similarity_score >= auto_validate_threshold else 'pending'
-                            }
-                            
-                            mappings_detected.append(mapping_data)
-                            
-                            if similarity_score >= auto_validate_threshold:
-                                auto_validated += 1
-                            else:
-                                pending_validation += 1
+                self.embedding_service.generate_requirement_embeddings(new_framework_id)
+                source_ids, source_matrix = self._load_embedding_matrix(framework_id=new_framework_id)
+
+            # 2) Matrice cible (catalogue des autres référentiels)
+            target_ids, target_matrix = self._load_embedding_matrix(
+                exclude_framework_id=new_framework_id,
+                framework_ids=target_framework_ids
+            )
+
+            # 3) Top-k cosinus par blocs
+            indices, scores = blockwise_top_k(
+                normalize_rows(source_matrix), normalize_rows(target_matrix), k=top_k
+            )
+            pairs = [
+                (source_ids[i], target_ids[j], float(score))
+                for i in range(indices.shape[0])
+                for j, score in zip(indices[i], scores[i])
+                if score >= similarity_threshold
+            ]
+
+            # 4) Métadonnées des exigences impliquées (une seule jointure)
+            metadata = self._load_requirements_metadata(
+                {src for src, _, _ in pairs} | {tgt for _, tgt, _ in pairs}
+            )
+
+            mappings_detected = []
+            for source_id, target_id, similarity_score in pairs:
+                source_data, target_data = metadata.get(source_id), metadata.get(target_id)
+                if not source_data or not target_data:
+                    continue
+                mappings_detected.append({
+                    'source_requirement_id': source_id,
+                    'target_requirement_id': target_id,
+                    'mapping_type': self._determine_mapping_type(similarity_score),
+                    'semantic_similarity': similarity_score,
+                    'domain_match': self._check_domain_match(source_data, target_data),
+                    'confidence_score': similarity_score,
+                    'mapping_rationale': self._generate_mapping_rationale(
+                        source_data, target_data, similarity_score
+                    ),
+                    'created_by': 'ai',
+                    'validation_status': 'approved' if similarity_score >= auto_validate_threshold else 'pending'
+                })
             
             # Éliminer les doublons
             unique_mappings = self._remove_duplicate_mappings(mappings_detected)
+            auto_validated = sum(1 for m in unique_mappings if m['validation_status'] == 'approved')
             
             # Stocker les mappings
             stored_mappings = self._store_mappings(unique_mappings)
+
+            logger.info(
+                f"✅ Mapping cross-référentiel {new_framework_id}: {len(source_ids)}x{len(target_ids)} "
+                f"exigences, {len(stored_mappings)} mapping(s) en {time.perf_counter() - start:.2f}s"
+            )
             
             return {
                 "framework_id": new_framework_id,
-                "total_requirements_analyzed": len(new_requirements),
+                "total_requirements_analyzed": len(source_ids),
+                "target_requirements": len(target_ids),
                 "mappings_detected": len(stored_mappings),
                 "auto_validated": auto_validated,
-                "pending_validation": pending_validation,
+                "pending_validation": len(unique_mappings) - auto_validated,
                 "similarity_threshold": similarity_threshold,
                 "status": "completed",
                 "mappings": stored_mappings[:10]  # Retourner les 10 premiers pour exemple
@@ -113,6 +141,64 @@ class CrossReferentialMappingService:
         except Exception as e:
             logger.error(f"Error detecting cross mappings: {str(e)}")
             raise
+
+    def _load_embedding_matrix(self, framework_id: Optional[str] = None,
+                               exclude_framework_id: Optional[str] = None,
+                               framework_ids: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Charge les embeddings stockés des exigences actives en matrice (n, d).
+
+        Les vecteurs sont lus au format texte pgvector et convertis par NumPy
+        (pas d'objets float Python intermédiaires).
+
+        Returns:
+            (liste des requirement_id, matrice float32)
+        """
+        filters = ["r.is_active = true", "f.is_active = true"]
+        params: Dict = {}
+        if framework_id:
+            filters.append("r.framework_id = CAST(:fid AS uuid)")
+            params["fid"] = str(framework_id)
+        if exclude_framework_id:
+            filters.append("r.framework_id <> CAST(:exclude_fid AS uuid)")
+            params["exclude_fid"] = str(exclude_framework_id)
+        if framework_ids:
+            filters.append("r.framework_id = ANY(CAST(:fids AS uuid[]))")
+            params["fids"] = [str(f) for f in framework_ids]
+
+        rows = self.db.execute(text(f"""
+            SELECT re.requirement_id, CAST(re.embedding_vector AS text) AS vec
+            FROM requirement_embeddings re
+            JOIN requirement r ON r.id = re.requirement_id
+            JOIN framework f   ON f.id = r.framework_id
+            WHERE {" AND ".join(filters)}
+            ORDER BY re.requirement_id
+        """), params).fetchall()
+
+        ids = [str(row.requirement_id) for row in rows]
+        return ids, to_matrix((row.vec for row in rows), settings.embedding_dimension)
+
+    def _load_requirements_metadata(self, requirement_ids) -> Dict[str, Dict]:
+        """Référentiel et domaine des exigences (une requête), indexés par requirement_id"""
+        if not requirement_ids:
+            return {}
+
+        rows = self.db.execute(text("""
+            SELECT
+                r.id AS requirement_id,
+                r.framework_id,
+                r.official_code,
+                r.chapter_path,
+                f.code AS framework_code,
+                COALESCE(dt.title, d.code) AS domain_label
+            FROM requirement r
+            JOIN framework f          ON f.id = r.framework_id
+            LEFT JOIN domain d        ON d.id = r.domain_id
+            LEFT JOIN domain_title dt ON dt.domain_id = d.id AND dt.is_primary = true AND dt.language = 'fr'
+            WHERE r.id = ANY(CAST(:ids AS uuid[]))
+        """), {"ids": list(requirement_ids)}).mappings().all()
+
+        return {str(row["requirement_id"]): dict(row) for row in rows}
     
     def _create_embedding_text(self, req: Requirement) -> str:
         """Créer le texte pour la similarité sans dépendre de req.domain/subdomain (supprimés)."""
@@ -137,25 +223,21 @@ class CrossReferentialMappingService:
         else:
             return 'weak_relation'
     
-    def _check_domain_match(self, req1: Requirement, req2_data: Dict) -> bool:
-        """Comparer les labels de domaine si disponibles dans target_data."""
-        label1 = getattr(req1, "domain_label", None) or getattr(req1, "chapter_path", None)
-        label2 = req2_data.get("domain_label") or req2_data.get("domain") or req2_data.get("chapter_path")
+    def _check_domain_match(self, req1_data: Dict, req2_data: Dict) -> bool:
+        """Comparer les labels de domaine (ou chapter_path) des deux exigences."""
+        label1 = req1_data.get("domain_label") or req1_data.get("chapter_path")
+        label2 = req2_data.get("domain_label") or req2_data.get("chapter_path")
         if label1 and label2:
             return str(label1).strip().lower() == str(label2).strip().lower()
         return False
 
     
-    def _generate_mapping_rationale(self, source_req: Requirement, target_data: Dict, similarity_score: float) -> str:
+    def _generate_mapping_rationale(self, source_data: Dict, target_data: Dict, similarity_score: float) -> str:
         """Explication du mapping (similarité + éventuel match de domaine)"""
         rationale_parts = [f"Semantic similarity: {similarity_score:.3f}"]
-        try:
-            src_dom = getattr(source_req, "domain_label", None) or getattr(source_req, "chapter_path", None)
-            tgt_dom = target_data.get("domain_label") or target_data.get("domain") or target_data.get("chapter_path")
-            if src_dom and tgt_dom and str(src_dom).strip().lower() == str(tgt_dom).strip().lower():
-                rationale_parts.append(f"Same domain: {src_dom}")
-        except Exception:
-            pass
+        if self._check_domain_match(source_data, target_data):
+            src_dom = source_data.get("domain_label") or source_data.get("chapter_path")
+            rationale_parts.append(f"Same domain: {src_dom}")
         return " | ".join(rationale_parts)
 
     
@@ -189,27 +271,12 @@ class CrossReferentialMappingService:
         """
         
         try:
-            stored_ids = []
-            
-            for mapping in mappings:
-                mapping_id = str(uuid.uuid4())
-                
-                # Stocker le mapping
-                self.db.execute(text("""
-                    INSERT INTO requirement_mapping 
-                    (id, source_requirement_id, target_requirement_id, mapping_type,
-                     confidence_score, semantic_similarity, domain_match, created_by,
-                     validation_status, mapping_rationale)
-                    VALUES (:id, :source_req_id, :target_req_id, :mapping_type,
-                            :confidence_score, :semantic_similarity, :domain_match,
-                            :created_by, :validation_status, :mapping_rationale)
-                    ON CONFLICT (source_requirement_id, target_requirement_id)
-                    DO UPDATE SET
-                        semantic_similarity = EXCLUDED.semantic_similarity,
-                        confidence_score = EXCLUDED.confidence_score,
-                        mapping_rationale = EXCLUDED.mapping_rationale
-                """), {
-                    "id": mapping_id,
+            if not mappings:
+                return []
+
+            params = [
+                {
+                    "id": str(uuid.uuid4()),
                     "source_req_id": mapping['source_requirement_id'],
                     "target_req_id": mapping['target_requirement_id'],
                     "mapping_type": mapping['mapping_type'],
@@ -219,9 +286,26 @@ class CrossReferentialMappingService:
                     "created_by": mapping['created_by'],
                     "validation_status": mapping['validation_status'],
                     "mapping_rationale": mapping['mapping_rationale']
-                })
-                
-                stored_ids.append(mapping_id)
+                }
+                for mapping in mappings
+            ]
+
+            # executemany : un seul aller-retour pour tous les mappings
+            self.db.execute(text("""
+                INSERT INTO requirement_mapping 
+                (id, source_requirement_id, target_requirement_id, mapping_type,
+                 confidence_score, semantic_similarity, domain_match, created_by,
+                 validation_status, mapping_rationale)
+                VALUES (:id, :source_req_id, :target_req_id, :mapping_type,
+                        :confidence_score, :semantic_similarity, :domain_match,
+                        :created_by, :validation_status, :mapping_rationale)
+                ON CONFLICT (source_requirement_id, target_requirement_id)
+                DO UPDATE SET
+                    semantic_similarity = EXCLUDED.semantic_similarity,
+                    confidence_score = EXCLUDED.confidence_score,
+                    mapping_rationale = EXCLUDED.mapping_rationale
+            """), params)
+            stored_ids = [p["id"] for p in params]
             
             self.db.commit()
             return stored_ids
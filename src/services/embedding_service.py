@@ -9,13 +9,12 @@ Supporte XLM-RoBERTa multilingue (FR/EN) pour :
 """
 
 import logging
-from typing import List, Dict, Optional, Tuple, Any
-from transformers import AutoTokenizer, AutoModel
+from typing import Callable, List, Dict, Optional, Tuple, Any
+import hashlib
 import numpy as np
 import torch
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-import os
 from datetime import datetime
 
 
@@ -23,410 +22,139 @@ from datetime import datetime
 from ..models.audit import Requirement, Framework
 from ..models.audit import ControlPoint, ControlPointEmbedding
 from ..database import get_db
+from .model_registry import model_registry
+from .vector_index_service import apply_ef_search, to_vector_param, vector_param
 
 logger = logging.getLogger(__name__)
 
 
-# ✅ CLASSE MANQUANTE À AJOUTER EN DÉBUT DE FICHIER
-
 class EmbeddingService:
     """Service de génération d'embeddings avec modèle local"""
 
     def __init__(self, model_path: Optional[str] = None):
-        if model_path:
-            self.model_path = model_path
-        else:
-            # Utiliser le chemin Hugging Face local
-            from ..config import settings
-            # Le modèle est dans le cache Hugging Face
-            self.model_path = "xlm-roberta-base"
-        
-            self.tokenizer = None
-            self.model = None
-            self._load_model()
-
-    def _load_model(self):
-        """Charge le modèle XLM-RoBERTa depuis le cache Hugging Face local"""
-        import torch
-        from transformers import AutoTokenizer, AutoModel
-        
-        # Configurer HF_HOME pour utiliser le cache local
         from ..config import settings
-        os.environ["HF_HOME"] = settings.hf_home
 
-        try:
-            logger.info(f"🔄 Chargement du modèle depuis le cache HF : {self.model_path}")
-            
-            # Charger depuis le cache Hugging Face (utilise automatiquement le cache local)
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_path, 
-                cache_dir=settings.models_cache_dir,
-                local_files_only=False  # Permet d'utiliser le cache local s'il existe
-            )
-            self.model = AutoModel.from_pretrained(
-                self.model_path, 
-                cache_dir=settings.models_cache_dir,
-                local_files_only=False  # Permet d'utiliser le cache local s'il existe
-            )
+        # Le modèle est dans le cache Hugging Face, chargé une fois par process
+        # par le registre, à la première génération d'embedding
+        self.model_path = model_path or settings.embedding_model
+        self.batch_size = max(1, settings.embedding_batch_size)
+        self.max_length = settings.embedding_max_length
+        self._loaded = None
 
-            # Force CPU si pas de GPU
-            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            self.model.to(device)
-            self.model.eval()
+    def _get_loaded(self):
+        """Modèle partagé (model_registry), chargé à la première utilisation"""
+        if self._loaded is None:
+            self._loaded = model_registry.get(self.model_path)
+        return self._loaded
 
-            logger.info(f"✅ Modèle chargé avec succès sur {device} : {self.model_path}")
+    @property
+    def tokenizer(self):
+        return self._get_loaded().tokenizer
 
-        except Exception as e:
-            logger.error(f"❌ Erreur chargement modèle : {e}")
-            raise RuntimeError(f"Échec chargement modèle ({self.model_path}): {e}")
+    @property
+    def model(self):
+        return self._get_loaded().model
+
+    @property
+    def device(self):
+        return self._get_loaded().device
 
-    
     def generate_embedding(self, text: str) -> List[float]:
         """Génère un embedding à partir d'un texte"""
-        try:
-            if not text or not text.strip():
-                raise ValueError("Texte vide")
-            
-            # Tokenization
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-                padding=True
-            )
-            
-            # Génération embedding
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-            
-            # Mean pooling sur les tokens
-            embeddings = outputs.last_hidden_state.mean(dim=1)
-            
-            # Conversion en liste Python
-            embedding_vector = embeddings[0].cpu().numpy().tolist()
-            
-            return embedding_vector
-            
-        except Exception as e:
-            logger.error(f"Erreur génération embedding : {e}")
-            raise
-    
-    def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
-        """Calcule la similarité cosine entre deux embeddings"""
-        try:
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
-            
-            # Produit scalaire
-            dot_product = np.dot(vec1, vec2)
-            
-            # Normes
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-            
-            # Similarité cosine
-            similarity = dot_product / (norm1 * norm2)
-            
-            return max(0.0, min(1.0, similarity))
-            
-        except Exception as e:
-            logger.error(f"Erreur calcul similarité : {e}")
-            return 0.0
-
+        if not text or not text.strip():
+            raise ValueError("Texte vide")
 
-# ✅ CLASSE EXISTANTE (ne pas toucher)
+        return self.batch_generate_embeddings([text])[0]
 
-class ControlPointEmbeddingService:
-    """Service spécialisé pour similarité et embeddings des points de contrôle."""
-
-    def __init__(self, db: Session):
-        self.db = db
-        self.embedding_service = EmbeddingService()
-
-    # ✅ CORRIGER LA SIGNATURE (chercher la ligne actuelle)
-    def search_similar(
+    def batch_generate_embeddings(
         self,
-        query_text: str,
-        min_similarity: float = 0.7,  # ✅ AJOUTER CE PARAMÈTRE
-        limit: int = 10                # ✅ RENOMMER top_k en limit
-    ) -> List[Dict[str, Any]]:
+        texts: List[str],
+        batch_size: Optional[int] = None
+    ) -> List[List[float]]:
         """
-        Retourne les PC les plus proches sémantiquement.
-        
+        Génère les embeddings de plusieurs textes par lots.
+
+        Chaque lot est tokenisé avec padding puis traité en une seule passe
+        du modèle ; le mean pooling ignore les tokens de padding (attention
+        mask). Les textes sont triés par longueur pour limiter le padding,
+        les résultats sont rendus dans l'ordre d'entrée.
+
         Args:
-            query_text: Texte de recherche
-            min_similarity: Seuil de similarité minimum (0.0 à 1.0)
-            limit: Nombre max de résultats
+            texts: Textes à vectoriser (non vides)
+            batch_size: Taille de lot (défaut: settings.embedding_batch_size)
+
+        Returns:
+            Liste des embeddings, dans l'ordre de ``texts``
         """
-        from sqlalchemy import text as sql_text
+        if not texts:
+            return []
+        if any(not t or not t.strip() for t in texts):
+            raise ValueError("Texte vide")
 
-        # 1) Tenter le calcul d'embedding de la requête
-        try:
-            q_vec = self.embedding_service.generate_embedding(query_text or "")
-            if not q_vec or (isinstance(q_vec, list) and len(q_vec) == 0):
-                raise RuntimeError("Vectorisation de la requête vide.")
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur génération embedding requête: {e}")
-            # Fallback ILIKE
-            like = f"%{(query_text or '').strip()}%"
-            sql_fb = sql_text("""
-                SELECT cp.id AS control_point_id, cp.code, cp.name, cp.description,
-                       0.0 AS similarity_score
-                FROM control_point cp
-                WHERE cp.is_active = true
-                  AND (cp.code ILIKE :q OR cp.name ILIKE :q OR cp.description ILIKE :q)
-                ORDER BY cp.updated_at DESC NULLS LAST, cp.created_at DESC NULLS LAST
-                LIMIT :k
-            """)
-            rows = self.db.execute(sql_fb, {"q": like, "k": limit}).mappings().all()
-            return [dict(r) for r in rows]
+        batch_size = max(1, batch_size or self.batch_size)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
 
-        # 2) Recherche pgvector avec filtrage par min_similarity
         try:
-            vec_lit = self._to_pgvector_literal(q_vec)
-
-            # ✅ AJOUT : Filtrage par min_similarity
-            sql = sql_text("""
-                SELECT 
-                    cp.id AS control_point_id,
-                    cp.code,
-                    cp.name,
-                    cp.description,
-                    (1 - (cpe.embedding_vector <-> CAST(:qv AS vector))) AS similarity_score
-                FROM control_point_embeddings cpe
-                JOIN control_point cp ON cp.id = cpe.control_point_id
-                WHERE cp.is_active = true
-                  AND (1 - (cpe.embedding_vector <-> CAST(:qv AS vector))) >= :min_sim
-                ORDER BY cpe.embedding_vector <-> CAST(:qv AS vector)
-                LIMIT :k
-            """)
+            for start in range(0, len(order), batch_size):
+                indices = order[start:start + batch_size]
 
-            rows = self.db.execute(sql, {
-                "qv": vec_lit, 
-                "min_sim": min_similarity,  # ✅ UTILISÉ
-                "k": limit
-            }).mappings().all()
-
-            # Si pas de résultat, fallback ILIKE
-            if not rows:
-                logger.info("⚠️ Aucun PC trouvé avec pgvector, fallback ILIKE")
-                like = f"%{(query_text or '').strip()}%"
-                sql_fb = sql_text("""
-                    SELECT cp.id AS control_point_id, cp.code, cp.name, cp.description,
-                           0.0 AS similarity_score
-                    FROM control_point cp
-                    WHERE cp.is_active = true
-                      AND (cp.code ILIKE :q OR cp.name ILIKE :q OR cp.description ILIKE :q)
-                    ORDER BY cp.updated_at DESC NULLS LAST, cp.created_at DESC NULLS LAST
-                    LIMIT :k
-                """)
-                rows = self.db.execute(sql_fb, {"q": like, "k": limit}).mappings().all()
-
-            # Normalisation
-            out = []
-            for r in rows:
-                out.append({
-                    "id": str(r["control_point_id"]),  # ✅ Clé 'id' pour cohérence
-                    "code": r.get("code"),
-                    "name": r.get("name"),
-                    "description": r.get("description"),
-                    "similarity_score": round(float(r.get("similarity_score") or 0.0), 4),
-                })
-            return out
+                inputs = self.tokenizer(
+                    [texts[i] for i in indices],
+                    return_tensors="pt",
+                    truncation=True,
+                    max_length=self.max_length,
+                    padding=True
+                )
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
-        except Exception as e:
-            logger.error(f"❌ Erreur recherche pgvector: {e}")
-            # Rollback transaction
-            try:
-                self.db.rollback()
-            except Exception:
-                pass
+                with torch.no_grad():
+                    outputs = self.model(**inputs)
 
-            # Fallback ILIKE après erreur
-            like = f"%{(query_text or '').strip()}%"
-            sql_fb = sql_text("""
-                SELECT cp.id AS control_point_id, cp.code, cp.name, cp.description,
-                       0.0 AS similarity_score
-                FROM control_point cp
-                WHERE cp.is_active = true
-                  AND (cp.code ILIKE :q OR cp.name ILIKE :q OR cp.description ILIKE :q)
-                ORDER BY cp.updated_at DESC NULLS LAST, cp.created_at DESC NULLS LAST
-                LIMIT :k
-            """)
-            rows = self.db.execute(sql_fb, {"q": like, "k": limit}).mappings().all()
-            return [dict(r) for r in rows]
+                    # Mean pooling sur les tokens réels uniquement
+                    mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+                    summed = (outputs.last_hidden_state * mask).sum(dim=1)
+                    counts = mask.sum(dim=1).clamp(min=1e-9)
+                    pooled = (summed / counts).cpu().numpy()
+
+                for i, vector in zip(indices, pooled):
+                    embeddings[i] = vector.tolist()
+
+                done = start + len(indices)
+                if len(texts) > batch_size and (done // batch_size) % 10 == 0:
+                    logger.info(f"… embeddings générés: {done}/{len(texts)}")
+
+            return embeddings
 
-    
-    def generate_embedding(self, text: str, language: str = "auto") -> List[float]:
-        """Générer un embedding pour un texte donné (multilingue)"""
-        
-        if self.model_type == "xlm-roberta":
-            return self._generate_xlm_roberta_embedding(text)
-        elif self.model_type == "openai":
-            return self._generate_openai_embedding(text)
-        else:
-            raise ValueError(f"Model type {self.model_type} not supported")
-    
-    def _generate_xlm_roberta_embedding(self, text: str) -> List[float]:
-        """Générer embedding avec XLM-RoBERTa multilingue"""
-        try:
-            import torch
-            
-            processed_text = self._preprocess_audit_text(text)
-            
-            inputs = self.tokenizer(
-                processed_text, 
-                return_tensors="pt", 
-                truncation=True, 
-                padding=True, 
-                max_length=512
-            )
-            
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                
-                embeddings = outputs.last_hidden_state
-                attention_mask = inputs['attention_mask']
-                
-                masked_embeddings = embeddings * attention_mask.unsqueeze(-1)
-                
-                summed = torch.sum(masked_embeddings, dim=1)
-                counts = torch.clamp(attention_mask.sum(dim=1, keepdim=True), min=1e-9)
-                mean_embeddings = summed / counts
-                
-                normalized = torch.nn.functional.normalize(mean_embeddings, p=2, dim=1)
-                
-                return normalized.cpu().numpy().tolist()[0]
-                
-        except Exception as e:
-            logger.error(f"XLM-RoBERTa embedding error: {str(e)}")
-            return self._generate_fallback_embedding(text)
-    
-    def _preprocess_audit_text(self, text: str) -> str:
-        """Preprocessing spécialisé pour les textes d'audit multilingues"""
-        processed = text.strip()
-        
-        replacements = {
-            " ssi ": " système de sécurité de l'information ",
-            " rgpd ": " règlement général sur la protection des données ",
-            " cnil ": " commission nationale informatique et libertés ",
-            " anssi ": " agence nationale sécurité systèmes information ",
-            " dpo ": " délégué à la protection des données ",
-            " ciso ": " responsable de la sécurité des systèmes d'information ",
-            " isms ": " information security management system ",
-            " gdpr ": " general data protection regulation ",
-            " soc ": " security operations center ",
-            " iam ": " identity and access management ",
-            " pki ": " public key infrastructure ",
-            " siem ": " security information event management ",
-            " mfa ": " multi-factor authentication ",
-            " rbac ": " role-based access control ",
-        }
-        
-        text_lower = processed.lower()
-        for abbr, full in replacements.items():
-            text_lower = text_lower.replace(abbr, full)
-        
-        if text_lower != processed.lower():
-            processed = text_lower
-        
-        return processed
-    
-    def _detect_language(self, text: str) -> str:
-        """Détecter la langue du texte (FR/EN)"""
-        french_keywords = [
-            "sécurité", "conformité", "exigence", "politique", "procédure",
-            "risque", "contrôle", "audit", "réglementation", "protection",
-            "données", "information", "système", "mesure", "gestion"
-        ]
-        
-        english_keywords = [
-            "security", "compliance", "requirement", "policy", "procedure",
-            "risk", "control", "audit", "regulation", "protection",
-            "data", "information", "system", "measure", "management"
-        ]
-        
-        text_lower = text.lower()
-        
-        french_score = sum(1 for keyword in french_keywords if keyword in text_lower)
-        english_score = sum(1 for keyword in english_keywords if keyword in text_lower)
-        
-        return "fr" if french_score > english_score else "en"
-    
-    def _generate_openai_embedding(self, text: str) -> List[float]:
-        """Générer embedding avec OpenAI"""
-        try:
-            import openai
-            
-            response = openai.Embedding.create(
-                model="text-embedding-ada-002",
-                input=text
-            )
-            return response['data'][0]['embedding']
         except Exception as e:
-            logger.error(f"OpenAI embedding error: {str(e)}")
-            return self._generate_fallback_embedding(text)
-    
-    def _generate_fallback_embedding(self, text: str) -> List[float]:
-        """Embedding de secours basique (hash + padding)"""
-        import hashlib
-        
-        hash_obj = hashlib.md5(text.encode())
-        hash_hex = hash_obj.hexdigest()
-        
-        embedding = []
-        for i in range(0, len(hash_hex), 2):
-            val = int(hash_hex[i:i+2], 16) / 255.0
-            embedding.append(val)
-        
-        while len(embedding) < 768:
-            embedding.append(0.0)
-        
-        return embedding[:768]
-    
+            logger.error(f"Erreur génération embeddings ({len(texts)} textes) : {e}")
+            raise
+
     def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
-        """Calculer la similarité cosinus entre deux embeddings"""
+        """Calcule la similarité cosine entre deux embeddings"""
         try:
             vec1 = np.array(embedding1)
             vec2 = np.array(embedding2)
             
+            # Produit scalaire
             dot_product = np.dot(vec1, vec2)
+            
+            # Normes
             norm1 = np.linalg.norm(vec1)
             norm2 = np.linalg.norm(vec2)
             
             if norm1 == 0 or norm2 == 0:
                 return 0.0
             
+            # Similarité cosine
             similarity = dot_product / (norm1 * norm2)
-            return float(similarity)
-        except Exception as e:
-            logger.error(f"Similarity computation error: {str(e)}")
-            return 0.0
-    
-    def batch_generate_embeddings(self, texts: List[str], batch_size: int = 8) -> List[List[float]]:
-        """Générer des embeddings par batch pour de meilleures performances"""
-        embeddings = []
-        
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_embeddings = []
             
-            for text in batch:
-                embedding = self.generate_embedding(text)
-                batch_embeddings.append(embedding)
-            
-            embeddings.extend(batch_embeddings)
+            return max(0.0, min(1.0, similarity))
             
-            if len(embeddings) % 50 == 0:
-                logger.info(f"Generated embeddings: {len(embeddings)}/{len(texts)}")
-        
-        return embeddings
+        except Exception as e:
+            logger.error(f"Erreur calcul similarité : {e}")
+            return 0.0
+
 
 # --- dans src/services/embedding_service.py ---
 
@@ -526,12 +254,78 @@ class RequirementEmbeddingService:
 
         return "\n".join(parts)
 
-    
+    def find_similar_requirements(
+        self,
+        query_text: str,
+        framework_id: Optional[str] = None,
+        limit: int = 10,
+        min_similarity: float = 0.0,
+        ef_search: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Exigences les plus proches sémantiquement (index HNSW cosinus).
+
+        Args:
+            query_text: Texte recherché
+            framework_id: Restreindre à un référentiel (optionnel)
+            limit: Nombre maximum de résultats
+            min_similarity: Similarité cosinus minimale
+            ef_search: hnsw.ef_search pour cette requête (défaut: VECTOR_EF_SEARCH)
+
+        Returns:
+            Liste de dicts (requirement_id, framework_id, official_code, title,
+            chapter_path, similarity_score) triés par similarité décroissante
+        """
+        q_vec = self.embedding_service.generate_embedding(query_text or "")
+        if not q_vec:
+            return []
+
+        framework_filter = "AND r.framework_id = CAST(:framework_id AS uuid)" if framework_id else ""
+        params = {"qv": to_vector_param(q_vec), "k": limit, "min_sim": min_similarity}
+        if framework_id:
+            params["framework_id"] = str(framework_id)
+
+        # Le filtre référentiel s'applique après le parcours de l'index :
+        # augmenter ef_search si le référentiel ciblé est minoritaire
+        apply_ef_search(self.db, ef_search)
+        rows = self.db.execute(text(f"""
+            SELECT * FROM (
+                SELECT
+                    r.id AS requirement_id,
+                    r.framework_id,
+                    r.official_code,
+                    r.title,
+                    r.chapter_path,
+                    1 - (re.embedding_vector <=> {vector_param("qv")}) AS similarity_score
+                FROM requirement_embeddings re
+                JOIN requirement r ON r.id = re.requirement_id
+                WHERE r.is_active = true
+                  {framework_filter}
+                ORDER BY re.embedding_vector <=> {vector_param("qv")}
+                LIMIT :k
+            ) nearest
+            WHERE similarity_score >= :min_sim
+            ORDER BY similarity_score DESC
+        """), params).mappings().all()
+
+        return [
+            {
+                "requirement_id": str(r["requirement_id"]),
+                "framework_id": str(r["framework_id"]),
+                "official_code": r["official_code"],
+                "title": r["title"],
+                "chapter_path": r["chapter_path"],
+                "similarity_score": float(r["similarity_score"] or 0.0),
+            }
+            for r in rows
+        ]
+
     def generate_requirement_embeddings(self, framework_id: str) -> dict:
         """
         Génère les embeddings pour toutes les exigences d'un framework.
         - Ne charge que les colonnes existantes en BDD (tolérant aux champs legacy)
         - Pas de SQL récursif pour le chemin de domaine (on s'en passe ici)
+        - Embeddings calculés par lots (une passe du modèle par lot)
         - SAVEPOINT par exigence pour éviter d'aborter toute la transaction
         - Commit par batch pour fiabiliser
         """
@@ -583,32 +377,45 @@ class RequirementEmbeddingService:
 
             logger.info(f"🚀 Génération embeddings: {len(requirements)} exigences à traiter")
 
-            for i, req in enumerate(requirements, start=1):
-                tx = self.db.begin_nested()  # SAVEPOINT (rollback local si échec)
-                try:
-                    # 2) Construire un texte sans dépendre d'un chemin de domaine calculé
-                    text_for_embedding = self._create_embedding_text(req, domain_path=None)
+            embed_batch_size = self.embedding_service.batch_size
 
-                    # 3) Générer l'embedding (utilise la config actuelle du service)
-                    vec = self.embedding_service.generate_embedding(text_for_embedding)
+            for start in range(0, len(requirements), embed_batch_size):
+                chunk = requirements[start:start + embed_batch_size]
 
-                    # 4) Stocker (UPSERT) l'embedding
-                    self._store_requirement_embedding(str(req.id), vec, text_for_embedding)
+                # 2) Construire les textes sans dépendre d'un chemin de domaine calculé
+                texts = [self._create_embedding_text(req, domain_path=None) for req in chunk]
+                valid = [(req, t) for req, t in zip(chunk, texts) if t and t.strip()]
+                errors += len(chunk) - len(valid)
 
-                    tx.commit()
-                    embeddings_generated += 1
+                # 3) Générer les embeddings du lot en une passe du modèle
+                try:
+                    vectors = self.embedding_service.batch_generate_embeddings([t for _, t in valid])
+                except Exception as e:
+                    errors += len(valid)
+                    logger.error(f"Erreur embedding du lot {start}-{start + len(chunk)}: {e}")
+                    continue
 
-                    if (i % 10) == 0:
-                        logger.info(f"… {i}/{len(requirements)} traitées ({embeddings_generated} embeddings ok)")
+                # 4) Stocker (UPSERT) chaque embedding
+                for (req, text_for_embedding), vec in zip(valid, vectors):
+                    tx = self.db.begin_nested()  # SAVEPOINT (rollback local si échec)
+                    try:
+                        self._store_requirement_embedding(str(req.id), vec, text_for_embedding)
+                        tx.commit()
+                        embeddings_generated += 1
 
-                    if (embeddings_generated % BATCH_SIZE) == 0:
-                        # sécuriser régulièrement : évite un gros rollback global
-                        self.db.commit()
+                        if (embeddings_generated % BATCH_SIZE) == 0:
+                            # sécuriser régulièrement : évite un gros rollback global
+                            self.db.commit()
 
-                except Exception as e:
-                    tx.rollback()
-                    errors += 1
-                    logger.error(f"Erreur embedding pour requirement {getattr(req, 'id', 'N/A')}: {e}")
+                    except Exception as e:
+                        tx.rollback()
+                        errors += 1
+                        logger.error(f"Erreur embedding pour requirement {getattr(req, 'id', 'N/A')}: {e}")
+
+                logger.info(
+                    f"… {start + len(chunk)}/{len(requirements)} traitées "
+                    f"({embeddings_generated} embeddings ok)"
+                )
 
             # 5) Commit final
             self.db.commit()
@@ -791,114 +598,94 @@ class ControlPointEmbeddingService:
 
         return " | ".join(parts) if parts else ""
 
-    # --------- Format pgvector ---------
-    def _to_pgvector_literal(self, vec: list[float]) -> str:
-        """Convertit une liste de floats en littéral pgvector '[v1,v2,...]'."""
-        if not vec:
-            return "[]"
-        return "[" + ",".join(f"{float(v):.6f}" for v in vec) + "]"
+    # --------- Recherche sémantique (pgvector HNSW + fallback ILIKE) ---------
+    def _search_fallback(self, query_text: str, limit: int) -> List[Dict[str, Any]]:
+        """Recherche textuelle ILIKE (pas d'embedding de requête ou d'embeddings PC)."""
+        like = f"%{(query_text or '').strip()}%"
+        rows = self.db.execute(text("""
+            SELECT cp.id AS control_point_id, cp.code, cp.name, cp.description,
+                   0.0 AS similarity_score
+            FROM control_point cp
+            WHERE cp.is_active = true
+              AND (cp.code ILIKE :q OR cp.name ILIKE :q OR cp.description ILIKE :q)
+            ORDER BY cp.updated_at DESC NULLS LAST, cp.created_at DESC NULLS LAST
+            LIMIT :k
+        """), {"q": like, "k": limit}).mappings().all()
+        return [self._format_search_row(r) for r in rows]
+
+    @staticmethod
+    def _format_search_row(r) -> Dict[str, Any]:
+        return {
+            "control_point_id": str(r["control_point_id"]),
+            "code": r.get("code"),
+            "name": r.get("name"),
+            "description": r.get("description"),
+            "similarity_score": float(r.get("similarity_score") or 0.0),
+        }
 
-    # --------- Recherche sémantique (pgvector + fallback ILIKE) ---------
     def search_similar(
-    self,
-    query_text: str,
-    min_similarity: float = 0.7,
-    limit: int = 10
-) -> List[Dict[str, Any]]:
-        """
-        Retourne les PC les plus proches sémantiquement (basé sur pgvector).
-        Requiert une table control_point_embeddings(control_point_id uuid, embedding_vector vector)
-        et control_point(id, code, name, description, is_active).
+        self,
+        query_text: str,
+        min_similarity: float = 0.7,
+        limit: int = 10,
+        ef_search: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
-        from sqlalchemy import text as sql_text
+        Retourne les PC les plus proches sémantiquement (index HNSW cosinus).
+
+        similarity_score = 1 - distance cosinus (``<=>``), seuillée par min_similarity.
 
-        # 1) Tenter le calcul d’embedding de la requête
+        Args:
+            query_text: Texte recherché
+            min_similarity: Similarité cosinus minimale
+            limit: Nombre maximum de résultats
+            ef_search: hnsw.ef_search pour cette requête (défaut: VECTOR_EF_SEARCH)
+        """
+        # 1) Embedding de la requête, fallback ILIKE s'il échoue
         try:
             q_vec = self.embedding_service.generate_embedding(query_text or "")
-            if not q_vec or (isinstance(q_vec, list) and len(q_vec) == 0):
+            if not q_vec:
                 raise RuntimeError("Vectorisation de la requête vide.")
         except Exception as e:
-            # Fallback direct ILIKE si l’embedding échoue
-            like = f"%{(query_text or '').strip()}%"
-            sql_fb = sql_text("""
-                SELECT cp.id AS control_point_id, cp.code, cp.name, cp.description,
-                       0.0 AS similarity_score
-                FROM control_point cp
-                WHERE cp.is_active = true
-                  AND (cp.code ILIKE :q OR cp.name ILIKE :q OR cp.description ILIKE :q)
-                ORDER BY cp.updated_at DESC NULLS LAST, cp.created_at DESC NULLS LAST
-                LIMIT :k
-            """)
-            rows = self.db.execute(sql, {"qv": vec_lit, "k": limit}).mappings().all()
-            return [dict(r) for r in rows]
+            logger.warning(f"⚠️ Embedding de requête indisponible, fallback ILIKE: {e}")
+            return self._search_fallback(query_text, limit)
 
-        # 2) Recherche pgvector
+        # 2) Recherche ANN : ORDER BY distance + LIMIT (parcours de l'index HNSW),
+        #    le seuil est appliqué sur les k plus proches
         try:
-            vec_lit = self._to_pgvector_literal(q_vec)
-
-            # Opérateur L2 '<->' (compatible partout). Si pgvector>=0.5, on peut utiliser '<=>'
-            sql = sql_text("""
-                SELECT 
-                    cp.id AS control_point_id,
-                    cp.code,
-                    cp.name,
-                    cp.description,
-                    (1 - (cpe.embedding_vector <-> :qv::vector)) AS similarity_score
-                FROM control_point_embeddings cpe
-                JOIN control_point cp ON cp.id = cpe.control_point_id
-                WHERE cp.is_active = true
-                ORDER BY cpe.embedding_vector <-> :qv::vector
-                LIMIT :k
-            """)
-
-            rows = self.db.execute(sql, {"qv": vec_lit, "k": limit}).mappings().all()
-
-            # Si pas de résultat (pas encore d’embeddings PC ?), fallback ILIKE
-            if not rows:
-                like = f"%{(query_text or '').strip()}%"
-                sql_fb = sql_text("""
-                    SELECT cp.id AS control_point_id, cp.code, cp.name, cp.description,
-                           0.0 AS similarity_score
-                    FROM control_point cp
+            apply_ef_search(self.db, ef_search)
+            rows = self.db.execute(text(f"""
+                SELECT * FROM (
+                    SELECT
+                        cp.id AS control_point_id,
+                        cp.code,
+                        cp.name,
+                        cp.description,
+                        1 - (cpe.embedding_vector <=> {vector_param("qv")}) AS similarity_score
+                    FROM control_point_embeddings cpe
+                    JOIN control_point cp ON cp.id = cpe.control_point_id
                     WHERE cp.is_active = true
-                      AND (cp.code ILIKE :q OR cp.name ILIKE :q OR cp.description ILIKE :q)
-                    ORDER BY cp.updated_at DESC NULLS LAST, cp.created_at DESC NULLS LAST
+                    ORDER BY cpe.embedding_vector <=> {vector_param("qv")}
                     LIMIT :k
-                """)
-                rows = self.db.execute(sql_fb, {"q": like, "k": limit}).mappings().all()
-
-            # Normalisation
-            out = []
-            for r in rows:
-                out.append({
-                    "control_point_id": str(r["control_point_id"]),
-                    "code": r.get("code"),
-                    "name": r.get("name"),
-                    "description": r.get("description"),
-                    "similarity_score": float(r.get("similarity_score") or 0.0),
-                })
-            return out
-
-        except Exception:
-            # Si la requête pgvector a levé une DatabaseError, la transaction est 'aborted'
-            try:
-                self.db.rollback()
-            except Exception:
-                pass
+                ) nearest
+                WHERE similarity_score >= :min_sim
+                ORDER BY similarity_score DESC
+            """), {"qv": to_vector_param(q_vec), "k": limit, "min_sim": min_similarity}).mappings().all()
+        except Exception as e:
+            # La transaction est 'aborted' après une DatabaseError
+            logger.error(f"❌ Erreur recherche pgvector: {e}")
+            self.db.rollback()
+            return self._search_fallback(query_text, limit)
 
-            # Fallback ILIKE après rollback
-            like = f"%{(query_text or '').strip()}%"
-            sql_fb = sql_text("""
-                SELECT cp.id AS control_point_id, cp.code, cp.name, cp.description,
-                       0.0 AS similarity_score
-                FROM control_point cp
-                WHERE cp.is_active = true
-                  AND (cp.code ILIKE :q OR cp.name ILIKE :q OR cp.description ILIKE :q)
-                ORDER BY cp.updated_at DESC NULLS LAST, cp.created_at DESC NULLS LAST
-                LIMIT :k
-            """)
-            rows = self.db.execute(sql_fb, {"q": like, "k": limit}).mappings().all()
-            return [dict(r) for r in rows]
+        # Pas encore d'embeddings PC : fallback ILIKE
+        if not rows:
+            has_embeddings = self.db.execute(
+                text("SELECT EXISTS (SELECT 1 FROM control_point_embeddings)")
+            ).scalar()
+            if not has_embeddings:
+                return self._search_fallback(query_text, limit)
+
+        return [self._format_search_row(r) for r in rows]
 
     # --------- Génération + stockage d’un embedding PC ---------
     def generate_and_store_embedding(self, cp_or_id: Any) -> Optional[Dict[str, Any]]:
@@ -907,7 +694,6 @@ class ControlPointEmbeddingService:
         Accepte soit un objet ControlPoint, soit un id (str/UUID).
         """
         from ..models.audit import ControlPoint
-        from sqlalchemy import text as sql_text
 
         # 1) Normaliser l'entrée -> (objet cp, id str)
         if isinstance(cp_or_id, ControlPoint):
@@ -928,124 +714,213 @@ class ControlPointEmbeddingService:
         if not vector or len(vector) == 0:
             raise ValueError(f"Embedding vide généré pour PC {cp_id_str}")
         
-        # 4) Convertir en format PostgreSQL vector: [v1,v2,v3,...]
-        vec_lit = self._to_pgvector_literal(vector)
+        try:
+            self._store_embedding(cp_id_str, vector, src_text)
+            self.db.commit()
+            
+            logger.info(f"✅ Embedding créé pour PC {cp_obj.code}")
+            return {"control_point_id": cp_id_str, "status": "ok"}
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur stockage embedding pour PC {cp_obj.code}: {e}")
+            raise
 
-        # 5) ✅ CORRECTION: Utiliser uniquement le style :param de SQLAlchemy text
+    def _store_embedding(self, cp_id_str: str, vector: List[float], src_text: str) -> None:
+        """Upsert d'un embedding dans control_point_embeddings (sans commit)."""
+        from sqlalchemy import text as sql_text
 
         upsert = sql_text("""
             INSERT INTO control_point_embeddings
-                (id, control_point_id, embedding_vector, source_text, created_at, updated_at)
+                (id, control_point_id, embedding_vector, source_text, source_hash, created_at, updated_at)
             VALUES
-                (gen_random_uuid(), :cp_id, CAST(:vec AS vector), :src, NOW(), NOW())
+                (gen_random_uuid(), :cp_id, CAST(CAST(:vec AS real[]) AS vector), :src, :hash, NOW(), NOW())
             ON CONFLICT (control_point_id) DO UPDATE
             SET embedding_vector = EXCLUDED.embedding_vector,
                 source_text      = EXCLUDED.source_text,
+                source_hash      = EXCLUDED.source_hash,
                 updated_at       = NOW()
         """)
 
-        
-        try:
-            # ✅ Exécuter avec le bon format de paramètres
-            self.db.execute(
-                upsert,
-                {
-                    "cp_id": cp_id_str,
-                    "vec": vec_lit,             # format "[v1,v2,...]"
-                    "src": src_text[:1000],
-                }
+        self.db.execute(
+            upsert,
+            {
+                "cp_id": cp_id_str,
+                "vec": to_vector_param(vector),
+                "src": src_text[:1000],
+                "hash": self._source_hash(src_text),
+            }
+        )
+
+    @staticmethod
+    def _source_hash(src_text: str) -> str:
+        """Empreinte du texte source (détection des embeddings périmés)."""
+        return hashlib.sha256(src_text.encode("utf-8")).hexdigest()
+
+    def _bulk_store_embeddings(self, items: List[Tuple[str, List[float], str]]) -> None:
+        """
+        Upsert multi-lignes dans control_point_embeddings (sans commit).
+
+        Args:
+            items: Liste de (control_point_id, vecteur, texte source)
+        """
+        from sqlalchemy import text as sql_text
+
+        if not items:
+            return
+
+        values = []
+        params: Dict[str, Any] = {}
+        for i, (cp_id_str, vector, src_text) in enumerate(items):
+            values.append(
+                f"(gen_random_uuid(), CAST(:cp_{i} AS uuid), {vector_param(f'vec_{i}')}, "
+                f":src_{i}, :hash_{i}, NOW(), NOW())"
             )
-            self.db.commit()
-            
-            logger.info(f"✅ Embedding créé pour PC {cp_obj.code}")
-            return {"control_point_id": cp_id_str, "status": "ok"}
-            
-        except Exception as e:
-            logger.error(f"❌ Erreur stockage embedding pour PC {cp_obj.code}: {e}")
-            raise
+            params[f"cp_{i}"] = cp_id_str
+            params[f"vec_{i}"] = to_vector_param(vector)
+            params[f"src_{i}"] = src_text[:1000]
+            params[f"hash_{i}"] = self._source_hash(src_text)
+
+        self.db.execute(sql_text(f"""
+            INSERT INTO control_point_embeddings
+                (id, control_point_id, embedding_vector, source_text, source_hash, created_at, updated_at)
+            VALUES {", ".join(values)}
+            ON CONFLICT (control_point_id) DO UPDATE
+            SET embedding_vector = EXCLUDED.embedding_vector,
+                source_text      = EXCLUDED.source_text,
+                source_hash      = EXCLUDED.source_hash,
+                updated_at       = NOW()
+        """), params)
 
     # --------- Batch embeddings (global ou par framework) ---------
+    def _find_pending_control_points(
+        self,
+        framework_id: Optional[str],
+        force_regenerate: bool
+    ) -> Tuple[List[Tuple[Any, str]], int]:
+        """
+        Sélectionne les PC dont l'embedding est absent ou périmé.
+
+        Une seule requête (PC LEFT JOIN embeddings) ; un embedding est périmé si
+        l'empreinte du texte source a changé. Les embeddings antérieurs à
+        source_hash sont comparés sur le texte source stocké.
+
+        Returns:
+            (liste de (pc, texte source) à vectoriser, nombre de PC du périmètre)
+        """
+        from sqlalchemy import text as sql_text
+
+        rows = self.db.execute(sql_text("""
+            SELECT
+                cp.id, cp.code, cp.name, cp.description, cp.implementation_guidance,
+                cp.category, cp.subcategory, cp.control_family, cp.risk_domains,
+                cp.implementation_level,
+                cpe.source_hash AS existing_hash,
+                cpe.source_text AS existing_text,
+                cpe.control_point_id IS NOT NULL AS has_embedding
+            FROM control_point cp
+            LEFT JOIN control_point_embeddings cpe ON cpe.control_point_id = cp.id
+            WHERE cp.is_active = true
+              AND (
+                  CAST(:framework_id AS uuid) IS NULL
+                  OR EXISTS (
+                      SELECT 1
+                      FROM requirement_control_point rcp
+                      JOIN requirement r ON r.id = rcp.requirement_id
+                      WHERE rcp.control_point_id = cp.id
+                        AND r.framework_id = CAST(:framework_id AS uuid)
+                  )
+              )
+            ORDER BY cp.id
+        """), {"framework_id": str(framework_id) if framework_id else None}).fetchall()
+
+        pending = []
+        for row in rows:
+            src_text = self._create_embedding_text(row)
+            if not src_text.strip():
+                continue
+
+            if not force_regenerate and row.has_embedding:
+                if row.existing_hash:
+                    if row.existing_hash == self._source_hash(src_text):
+                        continue
+                elif row.existing_text == src_text[:1000]:
+                    continue
+
+            pending.append((row, src_text))
+
+        return pending, len(rows)
+
     def generate_all_embeddings(
         self,
         framework_id: Optional[str] = None,
-        force_regenerate: bool = False
+        force_regenerate: bool = False,
+        progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> Dict[str, Any]:
         """
-        Génére les embeddings pour:
+        Génère les embeddings pour:
           - tous les PC actifs (par défaut), ou
           - uniquement les PC liés à un framework (si framework_id).
-        Si force_regenerate=False, on skippe les PC déjà vectorisés.
+
+        Seuls les PC sans embedding ou dont le texte source a changé sont
+        traités (sauf force_regenerate). Chaque lot est vectorisé en une passe
+        du modèle, écrit en un upsert multi-lignes puis commité : une exécution
+        interrompue reprend là où elle s'est arrêtée.
+
+        Args:
+            framework_id: Restreindre aux PC liés à ce framework
+            force_regenerate: Revectoriser tous les PC du périmètre
+            progress_callback: Appelée après chaque lot avec (traités, à traiter)
         """
-        from ..models.audit import ControlPoint, RequirementControlPoint, Requirement
-        from sqlalchemy import text as sql_text
+        scope_label = f"framework={framework_id}" if framework_id else "global"
 
-        # Sélection des PC selon le scope
-        if framework_id:
-            q = (
-                self.db.query(ControlPoint)
-                .join(RequirementControlPoint, RequirementControlPoint.control_point_id == ControlPoint.id)
-                .join(Requirement, Requirement.id == RequirementControlPoint.requirement_id)
-                .filter(Requirement.framework_id == framework_id, ControlPoint.is_active == True)
-                .distinct()
-            )
-            scope_label = f"framework={framework_id}"
-        else:
-            q = self.db.query(ControlPoint).filter_by(is_active=True)
-            scope_label = "global"
+        pending, total = self._find_pending_control_points(framework_id, force_regenerate)
+        skipped = total - len(pending)
 
-        cps = q.all()
-        if not cps:
+        if not pending:
             return {
-                "status": "ok",
+                "status": "ok" if total == 0 else "completed",
                 "scope": scope_label,
-                "total_control_points": 0,
+                "total_control_points": total,
                 "processed": 0,
-                "skipped": 0,
+                "skipped": skipped,
                 "errors": 0,
             }
 
+        logger.info(f"🚀 Embeddings PC ({scope_label}): {len(pending)} à générer, {skipped} à jour")
+
         processed = 0
-        skipped = 0
         errors = 0
+        batch_size = self.embedding_service.batch_size
 
-        for cp in cps:
-            try:
-                if not force_regenerate:
-                    # vérifier existence embedding
-                    exists = self.db.execute(
-                        sql_text("SELECT 1 FROM control_point_embeddings WHERE control_point_id = :id LIMIT 1"),
-                        {"id": str(cp.id)}
-                    ).first()
-                    if exists:
-                        skipped += 1
-                        continue
-
-                self.generate_and_store_embedding(cp)  # accepte objet ou id
-                processed += 1
-
-                if processed % 10 == 0:
-                    try:
-                        self.db.commit()
-                    except Exception:
-                        self.db.rollback()
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
 
+            try:
+                vectors = self.embedding_service.batch_generate_embeddings([t for _, t in chunk])
+                self._bulk_store_embeddings([
+                    (str(cp.id), vector, src_text)
+                    for (cp, src_text), vector in zip(chunk, vectors)
+                ])
+                self.db.commit()
+                processed += len(chunk)
             except Exception as e:
-                errors += 1
-                logger.warning(f"Erreur embedding pour PC {cp.id}: {e}")
+                errors += len(chunk)
+                logger.warning(f"Erreur embeddings PC (lot {start}-{start + len(chunk)}): {e}")
                 try:
                     self.db.rollback()
                 except Exception:
                     pass
 
-        try:
-            self.db.commit()
-        except Exception:
-            self.db.rollback()
+            done = start + len(chunk)
+            if progress_callback:
+                progress_callback(done, len(pending))
+            if (done // batch_size) % 10 == 0 or done == len(pending):
+                logger.info(f"… embeddings PC: {done}/{len(pending)} (ok={processed}, erreurs={errors})")
 
         return {
             "status": "completed",
             "scope": scope_label,
-            "total_control_points": len(cps),
+            "total_control_points": total,
             "processed": processed,
             "skipped": skipped,
             "errors": errors,
@@ -1060,30 +935,90 @@ class AuditResponseEmbeddingService:
         self.embedding_service = EmbeddingService()
     
     def generate_audit_embeddings(self, audit_id: str) -> Dict:
-        """Générer les embeddings pour toutes les réponses d'un audit"""
-        
-        logger.warning("AuditResponseEmbeddingService: Models not yet implemented")
+        """Générer les embeddings pour toutes les réponses courantes d'un audit"""
+
+        rows = self.db.execute(text("""
+            SELECT qa.id, qa.question_id, qa.answer_value, qa.comment, q.question_text
+            FROM question_answer qa
+            JOIN question q ON q.id = qa.question_id
+            WHERE qa.audit_id = CAST(:audit_id AS uuid)
+              AND qa.is_current = true
+        """), {"audit_id": str(audit_id)}).mappings().all()
+
+        pending = []
+        for r in rows:
+            source_text = self._create_response_text(r["question_text"], r["answer_value"], r["comment"])
+            if source_text:
+                pending.append((r, source_text))
+
+        processed = 0
+        errors = len(rows) - len(pending)
+        batch_size = self.embedding_service.batch_size
+
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            try:
+                vectors = self.embedding_service.batch_generate_embeddings([t for _, t in chunk])
+                for (r, source_text), vector in zip(chunk, vectors):
+                    self._store_response_embedding(
+                        str(r["id"]), vector, source_text, str(r["question_id"]), str(audit_id)
+                    )
+                self.db.commit()
+                processed += len(chunk)
+            except Exception as e:
+                self.db.rollback()
+                errors += len(chunk)
+                logger.error(f"Erreur embeddings réponses audit {audit_id} (lot {start}): {e}")
+
+        logger.info(f"✅ Embeddings réponses audit {audit_id}: ok={processed}, erreurs={errors}")
         return {
             "audit_id": audit_id,
-            "status": "pending",
-            "message": "Question and QuestionAnswer models not yet implemented"
+            "status": "completed",
+            "total_answers": len(rows),
+            "embeddings_generated": processed,
+            "errors": errors
         }
-    
+
+    @staticmethod
+    def _create_response_text(question_text: Optional[str], answer_value: Any, comment: Optional[str]) -> str:
+        """Texte source d'une réponse : question + valeur de réponse + commentaire."""
+        values = []
+        if isinstance(answer_value, dict):
+            for key, value in answer_value.items():
+                if key == "files" or value in (None, "", [], {}):
+                    continue
+                values.append(str(value))
+        elif answer_value not in (None, ""):
+            values.append(str(answer_value))
+
+        if not values and not comment:
+            return ""
+
+        parts = []
+        if question_text:
+            parts.append(f"Question: {question_text}")
+        if values:
+            parts.append(f"Réponse: {' ; '.join(values)}")
+        if comment:
+            parts.append(f"Commentaire: {comment}")
+        return "\n".join(parts)
+
     def _store_response_embedding(self, answer_id: str, embedding: List[float], 
                                 source_text: str, question_id: str, audit_id: str):
-        """Stocker l'embedding d'une réponse - Syntaxe corrigée"""
+        """Stocker l'embedding d'une réponse (upsert sur parent answer)"""
         
         try:
-            embedding_str = "[" + ",".join(map(str, embedding)) + "]"
-            
             sql = text("""
                 INSERT INTO response_embeddings 
-                (answer_id, question_id, audit_id, embedding_vector, source_text, created_at)
-                VALUES (:answer_id, :question_id, :audit_id, :embedding_vector::vector, :source_text, NOW())
-                ON CONFLICT (answer_id) 
+                (answer_id, question_id, audit_id, embedding, source_text,
+                 parent_type, parent_id, model, created_at, updated_at)
+                VALUES (:answer_id, :question_id, :audit_id, CAST(CAST(:embedding_vector AS real[]) AS vector), :source_text,
+                        'answer', :answer_id, :model, NOW(), NOW())
+                ON CONFLICT (parent_type, parent_id) 
                 DO UPDATE SET 
-                    embedding_vector = EXCLUDED.embedding_vector,
+                    embedding = EXCLUDED.embedding,
                     source_text = EXCLUDED.source_text,
+                    model = EXCLUDED.model,
                     updated_at = NOW()
             """)
             
@@ -1091,8 +1026,9 @@ class AuditResponseEmbeddingService:
                 "answer_id": answer_id,
                 "question_id": question_id,
                 "audit_id": audit_id,
-                "embedding_vector": embedding_str,
-                "source_text": source_text
+                "embedding_vector": to_vector_param(embedding),
+                "source_text": source_text,
+                "model": self.embedding_service.model_path
             })
             
         except Exception as e:
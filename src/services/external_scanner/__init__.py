@@ -10,6 +10,7 @@ Ce module fournit les outils pour scanner des cibles externes:
 
 V1 Features:
 - nmap_client: Wrapper Python pour nmap
+- nmap_stream: Backend nmap asyncio (sortie XML en flux)
 - tls_audit: Audit TLS/SSL complet
 - cve_enrichment: Enrichissement automatique des CVE
 - scoring: Calcul du score d'exposition (0-100)
@@ -17,6 +18,7 @@ V1 Features:
 """
 
 from .nmap_client import NmapClient
+from .nmap_stream import AsyncNmapClient
 from .tls_audit import TLSAuditor
 from .cve_enrichment import CVEEnrichment
 from .scoring import ExposureScoring
@@ -24,6 +26,7 @@ from .engine import ScanEngine
 
 __all__ = [
     "NmapClient",
+    "AsyncNmapClient",
     "TLSAuditor",
     "CVEEnrichment",
     "ExposureScoring",
@@ -0,0 +1,213 @@
+# backend/src/services/external_scanner/cve_cache.py
+"""
+Cache Redis partagé des recherches CVE (par CPE ou mot-clé).
+
+Les mêmes produits (nginx 1.18, OpenSSH 8.2...) reviennent dans les scans de
+nombreux tenants : le résultat d'une recherche CVE est mis en cache par clé
+de recherche, tous tenants confondus (données publiques NVD).
+
+- TTL positif (CVE_CACHE_TTL) et négatif plus court pour les recherches
+  sans résultat (CVE_CACHE_NEGATIVE_TTL)
+- Single-flight: un verrou Redis par clé ; les scans concurrents qui
+  demandent la même clé attendent le résultat de la recherche en cours au
+  lieu de relancer la même requête
+- Compteurs hits / misses / coalesced dans Redis (hash ``cve:stats``),
+  exposés par ``GET /redis/cve-cache``
+- Un client httpx.AsyncClient mutualisé par process worker (et par boucle
+  d'événements)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import uuid
+import weakref
+from dataclasses import asdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+import httpx
+from redis.exceptions import RedisError
+
+from src.utils.redis_manager import redis_manager
+
+if TYPE_CHECKING:
+    from .cve_enrichment import CVEInfo
+
+logger = logging.getLogger(__name__)
+
+CVE_CACHE_TTL = int(os.getenv("CVE_CACHE_TTL", "86400"))  # 24h
+CVE_CACHE_NEGATIVE_TTL = int(os.getenv("CVE_CACHE_NEGATIVE_TTL", "21600"))  # 6h
+CVE_CACHE_LOCK_TTL = int(os.getenv("CVE_CACHE_LOCK_TTL", "60"))
+
+CACHE_KEY_PREFIX = "cve:lookup:"
+LOCK_KEY_PREFIX = "cve:lock:"
+STATS_KEY = "cve:stats"
+
+# Attente d'une recherche en cours dans un autre scan
+WAIT_POLL_SECONDS = 0.2
+
+# Un client par boucle d'événements (un AsyncClient est lié à sa boucle) :
+# les clients des boucles disparues sont libérés avec elles
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_http_clients_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Client HTTP NVD mutualisé (keep-alive) de la boucle d'événements courante."""
+    loop = asyncio.get_running_loop()
+    with _http_clients_lock:
+        client = _http_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+            )
+            _http_clients[loop] = client
+        return client
+
+
+async def close_http_client() -> None:
+    """Ferme le client HTTP NVD de la boucle courante (arrêt du process worker)."""
+    with _http_clients_lock:
+        client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def lookup_key(kind: str, query: str) -> str:
+    """Clé de cache d'une recherche ("cpe" ou "keyword")."""
+    digest = hashlib.sha1(query.strip().lower().encode("utf-8")).hexdigest()
+    return f"{CACHE_KEY_PREFIX}{kind}:{digest}"
+
+
+def _serialize(cves: list["CVEInfo"]) -> list[dict]:
+    return [asdict(cve) for cve in cves]
+
+
+def _deserialize(items: list[dict]) -> list["CVEInfo"]:
+    from .cve_enrichment import CVEInfo
+
+    cves = []
+    for item in items:
+        for field_name in ("published_date", "last_modified"):
+            if item.get(field_name):
+                item[field_name] = datetime.fromisoformat(item[field_name])
+        cves.append(CVEInfo(**item))
+    return cves
+
+
+def _incr(field: str) -> None:
+    client = redis_manager.client
+    if client is None:
+        return
+    try:
+        client.hincrby(STATS_KEY, field, 1)
+    except RedisError:
+        pass
+
+
+async def cached_lookup(
+    kind: str,
+    query: str,
+    fetch: Callable[[], Awaitable[list["CVEInfo"]]]
+) -> list["CVEInfo"]:
+    """
+    Retourne le résultat en cache, ou exécute fetch une seule fois pour
+    l'ensemble des scans concurrents (single-flight).
+
+    Une exception levée par fetch n'est pas mise en cache (pas de cache
+    négatif sur une erreur réseau ou un rate limit NVD).
+
+    Args:
+        kind: Type de recherche ("cpe", "keyword")
+        query: CPE ou mot-clé
+        fetch: Recherche effective (base locale puis API NVD)
+    """
+    client = redis_manager.client
+    if client is None:
+        return await fetch()
+
+    key = lookup_key(kind, query)
+    lock_key = f"{LOCK_KEY_PREFIX}{key[len(CACHE_KEY_PREFIX):]}"
+
+    cached = redis_manager.get(key)
+    if cached is not None:
+        _incr("negative_hits" if not cached else "hits")
+        return _deserialize(cached)
+
+    token = uuid.uuid4().hex
+    try:
+        acquired = client.set(lock_key, token, nx=True, ex=CVE_CACHE_LOCK_TTL)
+    except RedisError:
+        acquired = True  # Mode dégradé: pas de coalescence
+
+    if not acquired:
+        # Une recherche identique est en cours: attendre son résultat
+        for _ in range(int(CVE_CACHE_LOCK_TTL / WAIT_POLL_SECONDS)):
+            await asyncio.sleep(WAIT_POLL_SECONDS)
+            cached = redis_manager.get(key)
+            if cached is not None:
+                _incr("coalesced")
+                return _deserialize(cached)
+            if not redis_manager.exists(lock_key):
+                break
+        # Verrou expiré sans résultat (recherche en échec): chercher soi-même
+
+    _incr("misses")
+    try:
+        cves = await fetch()
+        redis_manager.set(
+            key,
+            _serialize(cves),
+            ttl=CVE_CACHE_TTL if cves else CVE_CACHE_NEGATIVE_TTL
+        )
+        return cves
+    finally:
+        if acquired:
+            try:
+                # Ne libérer que notre propre verrou
+                if client.get(lock_key) == token:
+                    client.delete(lock_key)
+            except RedisError:
+                pass
+
+
+def clear_cache() -> int:
+    """Vide les résultats en cache (après mise à jour de la base CVE locale)."""
+    return redis_manager.delete_pattern(f"{CACHE_KEY_PREFIX}*")
+
+
+def get_cache_stats() -> dict:
+    """Compteurs du cache CVE (tous workers) et taux de succès."""
+    client = redis_manager.client
+    if client is None:
+        return {"status": "disconnected"}
+
+    try:
+        raw = client.hgetall(STATS_KEY)
+        cached_keys = sum(1 for _ in client.scan_iter(f"{CACHE_KEY_PREFIX}*", count=1000))
+    except RedisError as e:
+        return {"status": "error", "error": str(e)}
+
+    hits = int(raw.get("hits", 0))
+    negative_hits = int(raw.get("negative_hits", 0))
+    misses = int(raw.get("misses", 0))
+    coalesced = int(raw.get("coalesced", 0))
+    lookups = hits + negative_hits + misses + coalesced
+
+    return {
+        "status": "connected",
+        "hits": hits,
+        "negative_hits": negative_hits,
+        "misses": misses,
+        "coalesced": coalesced,
+        "hit_rate": round((hits + negative_hits + coalesced) / lookups, 4) if lookups else 0.0,
+        "cached_keys": cached_keys,
+        "ttl_seconds": CVE_CACHE_TTL,
+        "negative_ttl_seconds": CVE_CACHE_NEGATIVE_TTL,
+    }
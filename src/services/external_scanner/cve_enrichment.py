@@ -6,8 +6,13 @@ Utilise l'API NVD (National Vulnerability Database) pour:
 - Rechercher des CVE par CPE (Common Platform Enumeration)
 - Enrichir les services détectés avec leurs vulnérabilités connues
 - Récupérer les scores CVSS et les détails des CVE
+
+La base CVE locale (flux NVD importés, cf. nvd_store) est interrogée en
+premier ; l'API n'est appelée que si aucun flux n'a été importé.
+``CVE_OFFLINE_ONLY=true`` interdit tout appel réseau (workers en zone restreinte).
 """
 
+import asyncio
 import os
 import re
 import logging
@@ -15,13 +20,46 @@ import httpx
 from typing import Optional
 from dataclasses import dataclass, field
 from datetime import datetime
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+from .cve_cache import cached_lookup, get_http_client
 
 logger = logging.getLogger(__name__)
 
 # API NVD
 NVD_API_BASE = "https://services.nvd.nist.gov/rest/json/cves/2.0"
 NVD_API_KEY = os.getenv("NVD_API_KEY")
+CVE_OFFLINE_ONLY = os.getenv("CVE_OFFLINE_ONLY", "false").lower() == "true"
+
+
+def _is_transient_error(exc: BaseException) -> bool:
+    """Erreurs NVD à réessayer: réseau, rate limit (403/429), indisponibilité (5xx)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status in (403, 429) or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def extract_version(service_version: Optional[str], service_product: Optional[str] = None) -> Optional[str]:
+    """
+    Version numérique d'un service détecté par nmap.
+
+    Le pipeline de scan transmet "produit version" (ex: "nginx 1.18.0",
+    "OpenSSH 8.2p1 Ubuntu 4ubuntu0.5") : le produit est retiré puis la
+    première version pointée est retenue ("1.18.0", "8.2").
+    """
+    if not service_version:
+        return None
+    text = service_version.strip()
+    if service_product and text.lower().startswith(service_product.lower()):
+        text = text[len(service_product):]
+    match = re.search(r"\d+(?:\.\d+)*", text)
+    return match.group(0) if match else None
+
+
+def cpe_product_name(service_product: str) -> str:
+    """Nom de produit nmap au format CPE (ex: "ProFTPD" -> "proftpd")."""
+    return re.sub(r"\s+", "_", service_product.strip().lower())
 
 
 @dataclass
@@ -91,115 +129,158 @@ class CVEEnrichment:
             api_key: Clé API NVD (optionnelle mais recommandée pour rate limiting)
         """
         self.api_key = api_key or NVD_API_KEY
-        self.client = httpx.AsyncClient(timeout=30.0)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Client HTTP mutualisé du process (cf. cve_cache.get_http_client)."""
+        return get_http_client()
 
     async def close(self):
-        """Ferme le client HTTP."""
-        await self.client.aclose()
+        """Sans effet: le client HTTP est mutualisé et reste ouvert pour le process."""
+
+    @retry(
+        retry=retry_if_exception(_is_transient_error),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        reraise=True
+    )
+    async def _query_nvd(self, params: dict) -> list[CVEInfo]:
+        """Interroge l'API NVD (lève une exception en cas d'échec)."""
+        headers = {}
+        if self.api_key:
+            headers["apiKey"] = self.api_key
+
+        response = await self.client.get(
+            NVD_API_BASE,
+            params=params,
+            headers=headers
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        cves = []
+        for vuln in data.get("vulnerabilities", []):
+            cve_data = vuln.get("cve", {})
+            cve_info = self._parse_cve(cve_data)
+            if cve_info:
+                cves.append(cve_info)
+        return cves
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     async def search_by_cpe(
         self,
         cpe: str,
-        max_results: int = 20
+        max_results: int = 20,
+        raise_errors: bool = False
     ) -> list[CVEInfo]:
         """
-        Recherche les CVE pour un CPE donné.
+        Recherche les CVE pour un CPE donné (cache Redis partagé).
 
         Args:
             cpe: CPE string (ex: "cpe:2.3:a:apache:http_server:2.4.49:*:*:*:*:*:*:*")
             max_results: Nombre maximum de résultats
+            raise_errors: Lever l'erreur de recherche au lieu de retourner []
 
         Returns:
             Liste de CVEInfo
         """
-        logger.info(f"🔍 Recherche CVE pour: {cpe}")
-
-        headers = {}
-        if self.api_key:
-            headers["apiKey"] = self.api_key
-
-        params = {
-            "cpeName": cpe,
-            "resultsPerPage": max_results
-        }
-
-        try:
-            response = await self.client.get(
-                NVD_API_BASE,
-                params=params,
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            cves = []
-            for vuln in data.get("vulnerabilities", []):
-                cve_data = vuln.get("cve", {})
-                cve_info = self._parse_cve(cve_data)
-                if cve_info:
-                    cves.append(cve_info)
+        async def fetch() -> list[CVEInfo]:
+            local = await self._search_local(cpe=cpe, max_results=max_results)
+            if local is not None:
+                return local
 
+            logger.info(f"🔍 Recherche CVE pour: {cpe}")
+            cves = await self._query_nvd({"cpeName": cpe, "resultsPerPage": max_results})
             logger.info(f"✅ {len(cves)} CVE trouvées pour {cpe}")
             return cves
 
+        try:
+            return await cached_lookup("cpe", f"{cpe}|{max_results}", fetch)
         except httpx.HTTPStatusError as e:
             logger.error(f"❌ Erreur API NVD: {e}")
+            if raise_errors:
+                raise
             return []
         except Exception as e:
             logger.error(f"❌ Erreur recherche CVE: {e}")
+            if raise_errors:
+                raise
             return []
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     async def search_by_keyword(
         self,
         keyword: str,
-        max_results: int = 10
+        max_results: int = 10,
+        product: Optional[str] = None,
+        version: Optional[str] = None,
+        raise_errors: bool = False
     ) -> list[CVEInfo]:
         """
-        Recherche les CVE par mot-clé.
+        Recherche les CVE par mot-clé (cache Redis partagé).
 
         Args:
             keyword: Mot-clé de recherche (ex: "Apache 2.4.49")
             max_results: Nombre maximum de résultats
+            product: Produit détecté (recherche dans la base locale)
+            version: Version détectée (recherche dans la base locale)
+            raise_errors: Lever l'erreur de recherche au lieu de retourner []
 
         Returns:
             Liste de CVEInfo
         """
-        logger.info(f"🔍 Recherche CVE par keyword: {keyword}")
-
-        headers = {}
-        if self.api_key:
-            headers["apiKey"] = self.api_key
-
-        params = {
-            "keywordSearch": keyword,
-            "resultsPerPage": max_results
-        }
-
-        try:
-            response = await self.client.get(
-                NVD_API_BASE,
-                params=params,
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            cves = []
-            for vuln in data.get("vulnerabilities", []):
-                cve_data = vuln.get("cve", {})
-                cve_info = self._parse_cve(cve_data)
-                if cve_info:
-                    cves.append(cve_info)
+        async def fetch() -> list[CVEInfo]:
+            local = await self._search_local(product=product, version=version, max_results=max_results)
+            if local is not None:
+                return local
 
+            logger.info(f"🔍 Recherche CVE par keyword: {keyword}")
+            cves = await self._query_nvd({"keywordSearch": keyword, "resultsPerPage": max_results})
             logger.info(f"✅ {len(cves)} CVE trouvées pour '{keyword}'")
             return cves
 
+        try:
+            return await cached_lookup("keyword", f"{keyword}|{product}|{version}|{max_results}", fetch)
         except Exception as e:
             logger.error(f"❌ Erreur recherche CVE: {e}")
+            if raise_errors:
+                raise
             return []
 
+    async def _search_local(
+        self,
+        cpe: Optional[str] = None,
+        product: Optional[str] = None,
+        version: Optional[str] = None,
+        max_results: int = 20
+    ) -> Optional[list[CVEInfo]]:
+        """
+        Recherche dans la base CVE locale.
+
+        Sans CPE, le produit détecté (nom CPE normalisé, tout éditeur) et sa
+        version sont recherchés ; sans produit ou sans version, aucune CVE.
+
+        Returns:
+            Liste de CVEInfo (éventuellement vide) si la base locale est
+            chargée ou si le mode hors-ligne est imposé, None sinon (l'appelant
+            interroge alors l'API NVD)
+        """
+        from .nvd_store import nvd_store
+
+        def lookup() -> Optional[list[CVEInfo]]:
+            if not nvd_store.is_loaded():
+                return [] if CVE_OFFLINE_ONLY else None
+            if cpe:
+                return nvd_store.search_by_cpe(cpe, max_results=max_results)
+            if not (product and version):
+                return []
+            return nvd_store.search(None, cpe_product_name(product), version, max_results=max_results)
+
+        try:
+            # Requête SQL synchrone: hors de la boucle d'événements
+            return await asyncio.to_thread(lookup)
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur base CVE locale: {e}")
+            return [] if CVE_OFFLINE_ONLY else None
+
     async def get_cve_details(self, cve_id: str) -> Optional[CVEInfo]:
         """
         Récupère les détails d'une CVE spécifique.
@@ -237,8 +318,9 @@ class CVEEnrichment:
             logger.error(f"❌ Erreur récupération CVE: {e}")
             return None
 
-    def _parse_cve(self, cve_data: dict) -> Optional[CVEInfo]:
-        """Parse les données CVE de l'API NVD."""
+    @staticmethod
+    def _parse_cve(cve_data: dict) -> Optional[CVEInfo]:
+        """Parse les données CVE de l'API NVD (même format que les flux JSON 2.0)."""
         try:
             cve_id = cve_data.get("id")
             if not cve_id:
@@ -368,21 +450,22 @@ class CVEEnrichment:
         # Chercher dans le mapping
         for key, cpe_base in self.PRODUCT_CPE_MAP.items():
             if key in product:
-                if service_version:
-                    # Nettoyer la version
-                    version = re.sub(r'[^0-9.]', '', service_version.split()[0])
+                version = extract_version(service_version, service_product)
+                if version:
                     return f"{cpe_base}:{version}:*:*:*:*:*:*:*"
                 return f"{cpe_base}:*:*:*:*:*:*:*:*"
 
         return None
 
 
-async def enrich_with_vulns(service: dict) -> list[dict]:
+async def enrich_with_vulns(service: dict, raise_errors: bool = False) -> list[dict]:
     """
     Enrichit un service avec ses vulnérabilités CVE.
 
     Args:
         service: Dictionnaire avec les infos du service
+        raise_errors: Lever l'erreur de recherche (NVD injoignable, rate
+            limit) au lieu de retourner une liste vide
 
     Returns:
         Liste de vulnérabilités détectées
@@ -400,7 +483,7 @@ async def enrich_with_vulns(service: dict) -> list[dict]:
 
         if cpe:
             # Rechercher les CVE
-            cves = await enricher.search_by_cpe(cpe, max_results=10)
+            cves = await enricher.search_by_cpe(cpe, max_results=10, raise_errors=raise_errors)
 
             for cve in cves:
                 vulnerabilities.append({
@@ -422,7 +505,13 @@ async def enrich_with_vulns(service: dict) -> list[dict]:
         # Recherche par keyword si pas de CPE
         elif service.get("service_version"):
             keyword = f"{service.get('service_name')} {service.get('service_version')}"
-            cves = await enricher.search_by_keyword(keyword, max_results=5)
+            cves = await enricher.search_by_keyword(
+                keyword,
+                max_results=5,
+                product=service.get("service_product"),
+                version=extract_version(service.get("service_version"), service.get("service_product")),
+                raise_errors=raise_errors
+            )
 
             for cve in cves:
                 vulnerabilities.append({
@@ -443,7 +532,7 @@ async def enrich_with_vulns(service: dict) -> list[dict]:
 
     except Exception as e:
         logger.error(f"Erreur enrichissement CVE: {e}")
-    finally:
-        await enricher.close()
+        if raise_errors:
+            raise
 
     return vulnerabilities
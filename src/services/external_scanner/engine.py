@@ -7,19 +7,57 @@ Coordonne les différentes étapes du scan:
 2. Audit TLS (si ports HTTPS détectés)
 3. Enrichissement CVE
 4. Calcul du score d'exposition
+
+Les étapes 2 et 3 sont indépendantes une fois les services connus : elles
+s'exécutent en parallèle (un audit TLS par port, une recherche CVE par
+service), bornées par des sémaphores et un pool de threads dédié au scan.
+La durée de chaque étape est reportée dans ``ScanResult.summary["stage_timings"]``.
+
+Avec le backend nmap en flux (``ScanConfig.nmap_streaming``, voir
+nmap_stream.py), nmap tourne en sous-processus asyncio et les recherches CVE
+d'un service démarrent dès qu'il est lu dans la sortie XML ; la durée "cve"
+ne couvre alors que la partie restante après le scan nmap.
+
+Mode différentiel (``ScanConfig.incremental`` et scan précédent fourni) :
+l'audit TLS et les recherches CVE inchangés sont repris du scan précédent
+(voir incremental.py) tant que leur dernière collecte réelle date de moins
+de ``ScanConfig.incremental_max_age_days`` (dates conservées dans
+``scan_data["tls_audited_at"]`` et ``scan_data["cve_checked_at"]``). Dès
+qu'un scan précédent est fourni, les constats
+sont comparés (nouveaux / corrigés / inchangés) dans ``summary["diff"]``
+et ``scan_data["diff"]``.
+
+Les clients du pipeline et le pool de threads peuvent être construits une
+fois et partagés entre scans (``ScanComponents``) : c'est le cas dans les
+workers Celery de scan (voir src/tasks/worker_runtime.py).
 """
 
 import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Optional
 from dataclasses import dataclass, field
 from uuid import UUID
 
-from .nmap_client import NmapClient, scan_services
+from .nmap_client import NmapClient, ServiceInfo, scan_services
+from .nmap_stream import AsyncNmapClient
 from .tls_audit import TLSAuditor, scan_tls_vulnerabilities
 from .cve_enrichment import CVEEnrichment, enrich_with_vulns
 from .scoring import ExposureScoring, calculate_exposure_score
+from .incremental import (
+    PreviousScan,
+    diff_findings,
+    previous_cve_findings,
+    previous_findings,
+    reusable_tls_details,
+    service_fingerprint,
+    service_key,
+    service_key_id,
+    tls_audit_due,
+    tls_ports
+)
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +74,10 @@ class ScanConfig:
     ports: Optional[str] = None  # None = ports courants
     scan_all_ports: bool = False
 
+    # Backend nmap: sous-processus asyncio avec sortie XML en flux
+    # (False = python-nmap dans le pool de threads du scan)
+    nmap_streaming: bool = True
+
     # Features
     enable_tls_audit: bool = True
     enable_cve_enrichment: bool = True
@@ -43,6 +85,17 @@ class ScanConfig:
 
     # Limites
     max_cve_per_service: int = 10
+    max_tls_ports: int = 3
+
+    # Concurrence des étapes TLS / CVE
+    tls_concurrency: int = 3  # Audits TLS simultanés (sslyze, threads)
+    cve_concurrency: int = 4  # Recherches CVE simultanées (NVD)
+    executor_workers: int = 4  # Pool de threads dédié (nmap, sslyze)
+
+    # Rescan différentiel (réutilise TLS / CVE inchangés du scan précédent)
+    incremental: bool = False
+    # Âge maximal d'un audit TLS / d'une recherche CVE repris (au-delà: collecte réelle)
+    incremental_max_age_days: int = 30
 
 
 @dataclass
@@ -145,6 +198,47 @@ class ScanResult:
     scan_duration_seconds: float = 0.0
 
 
+@dataclass
+class ScanComponents:
+    """Clients du pipeline de scan, réutilisables d'un scan à l'autre."""
+    nmap_client: NmapClient
+    nmap_stream_client: AsyncNmapClient
+    tls_auditor: TLSAuditor
+    cve_enricher: CVEEnrichment
+    scorer: ExposureScoring
+    executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def build(cls, config: ScanConfig, shared_executor: bool = True) -> "ScanComponents":
+        """
+        Construit les composants depuis une configuration.
+
+        Args:
+            config: Configuration (timeouts, taille du pool de threads)
+            shared_executor: Créer un pool de threads partagé entre les scans
+        """
+        executor = None
+        if shared_executor:
+            executor = ThreadPoolExecutor(
+                max_workers=config.executor_workers,
+                thread_name_prefix="scan-stage"
+            )
+        return cls(
+            nmap_client=NmapClient(timeout=config.nmap_timeout),
+            nmap_stream_client=AsyncNmapClient(timeout=config.nmap_timeout),
+            tls_auditor=TLSAuditor(timeout=config.tls_timeout),
+            cve_enricher=CVEEnrichment(),
+            scorer=ExposureScoring(),
+            executor=executor
+        )
+
+    def shutdown(self) -> None:
+        """Arrête le pool de threads partagé."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
 class ScanEngine:
     """
     Moteur principal du scan externe.
@@ -159,25 +253,34 @@ class ScanEngine:
         print(f"Vulnérabilités: {len(result.vulnerabilities)}")
     """
 
-    def __init__(self, config: Optional[ScanConfig] = None):
+    def __init__(self, config: Optional[ScanConfig] = None, components: Optional[ScanComponents] = None):
         """
         Initialise le moteur de scan.
 
         Args:
             config: Configuration du scan
+            components: Clients et pool de threads partagés (construits
+                depuis la configuration si absents)
         """
         self.config = config or ScanConfig()
-        self.nmap_client = NmapClient(timeout=self.config.nmap_timeout)
-        self.tls_auditor = TLSAuditor(timeout=self.config.tls_timeout)
-        self.cve_enricher = CVEEnrichment()
-        self.scorer = ExposureScoring()
+        shared = components is not None
+        components = components or ScanComponents.build(self.config, shared_executor=False)
+        self.nmap_client = components.nmap_client
+        self.nmap_stream_client = components.nmap_stream_client
+        self.tls_auditor = components.tls_auditor
+        self.cve_enricher = components.cve_enricher
+        self.scorer = components.scorer
+        # Pool partagé: ni créé ni arrêté par run_scan
+        self._shared_executor = components.executor if shared else None
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     async def run_scan(
         self,
         target_type: str,
         target_value: str,
         target_id: Optional[UUID] = None,
-        scan_id: Optional[UUID] = None
+        scan_id: Optional[UUID] = None,
+        previous: Optional[PreviousScan] = None
     ) -> ScanResult:
         """
         Exécute un scan complet sur une cible.
@@ -187,6 +290,8 @@ class ScanEngine:
             target_value: Valeur de la cible
             target_id: ID de la cible (optionnel)
             scan_id: ID du scan (optionnel)
+            previous: Dernier scan réussi de la cible (rescan différentiel
+                si config.incremental, diff des constats dans tous les cas)
 
         Returns:
             ScanResult avec tous les résultats
@@ -202,10 +307,49 @@ class ScanEngine:
 
         logger.info(f"🚀 Démarrage scan: {target_type} -> {target_value}")
 
+        stage_timings: dict = {}
+        reuse = previous if self.config.incremental else None
+        incremental_stats = {
+            "tls_reused": False,
+            "cve_services_reused": 0,
+            "cve_services_queried": 0,
+        }
+        self._executor = self._shared_executor or ThreadPoolExecutor(
+            max_workers=self.config.executor_workers,
+            thread_name_prefix="scan-stage"
+        )
+
+        # Recherches CVE lancées dès qu'un service est lu dans la sortie nmap
+        # (backend en flux), par (port, protocole)
+        cve_semaphore = asyncio.Semaphore(self.config.cve_concurrency)
+        cve_prefetch: dict[tuple, asyncio.Task] = {}
+        known_cves = (
+            previous_cve_findings(reuse, self.config.incremental_max_age_days)
+            if reuse is not None else {}
+        )
+        # Date de la dernière recherche NVD réelle par couple (service, version)
+        cve_checked_at: dict[str, str] = {}
+
+        def on_service(svc: ServiceInfo) -> None:
+            service = self._service_dict(svc)
+            if svc.state != "open" or not (service["service_version"] or service["cpe"]):
+                return
+            if service_key(service) in known_cves:
+                return
+            key = (svc.port, svc.protocol)
+            if key not in cve_prefetch:
+                cve_prefetch[key] = asyncio.create_task(self._lookup_cve(service, cve_semaphore))
+
         try:
             # Étape 1: Scan nmap (ports, services, OS)
             logger.info("📡 Étape 1/4: Scan des ports, services et OS...")
-            nmap_result = await self._scan_ports_and_os(target_type, target_value)
+            nmap_result = await self._timed_stage(
+                "nmap", stage_timings,
+                self._scan_ports_and_os(
+                    target_type, target_value,
+                    on_service if self.config.enable_cve_enrichment else None
+                )
+            )
             result.services = nmap_result["services"]
             result.infra_info = nmap_result["infra_info"]
             result.raw_command = nmap_result.get("raw_command")
@@ -213,21 +357,31 @@ class ScanEngine:
             if result.infra_info and result.infra_info.os_name:
                 logger.info(f"   ✅ OS détecté: {result.infra_info.os_name} ({result.infra_info.os_accuracy}% confiance)")
 
-            # Étape 2: Audit TLS
-            tls_vulnerabilities = []
+            # Étapes 2 et 3 en parallèle: Audit TLS + Enrichissement CVE
+            logger.info("🔐🔍 Étapes 2-3/4: Audit TLS et enrichissement CVE en parallèle...")
+            tls_result, cve_vulnerabilities = await asyncio.gather(
+                self._timed_stage(
+                    "tls", stage_timings,
+                    self._audit_tls(target_value, result.services, reuse, incremental_stats)
+                )
+                if self.config.enable_tls_audit else self._skip_stage({}),
+                self._timed_stage(
+                    "cve", stage_timings,
+                    self._enrich_cve(
+                        result.services, reuse, incremental_stats,
+                        prefetched=cve_prefetch, semaphore=cve_semaphore,
+                        checked_at=cve_checked_at
+                    )
+                )
+                if self.config.enable_cve_enrichment else self._skip_stage([])
+            )
+
+            tls_vulnerabilities = tls_result.get("vulnerabilities", [])
             if self.config.enable_tls_audit:
-                logger.info("🔐 Étape 2/4: Audit TLS...")
-                tls_result = await self._audit_tls(target_value, result.services)
-                tls_vulnerabilities = tls_result.get("vulnerabilities", [])
                 result.tls_grade = tls_result.get("grade")
                 result.tls_details = tls_result.get("tls_details")
                 logger.info(f"   ✅ Grade TLS: {result.tls_grade}, {len(tls_vulnerabilities)} issues")
-
-            # Étape 3: Enrichissement CVE
-            cve_vulnerabilities = []
             if self.config.enable_cve_enrichment:
-                logger.info("🔍 Étape 3/4: Enrichissement CVE...")
-                cve_vulnerabilities = await self._enrich_cve(result.services)
                 logger.info(f"   ✅ {len(cve_vulnerabilities)} CVE détectées")
 
             # Combiner les vulnérabilités
@@ -247,12 +401,14 @@ class ScanEngine:
 
             # Étape 4: Calcul du score
             logger.info("📊 Étape 4/4: Calcul du score d'exposition...")
+            scoring_start = time.perf_counter()
             score_result = self.scorer.calculate(
                 vulnerabilities=all_vulnerabilities,
                 services=result.services,
                 tls_grade=result.tls_grade
             )
             result.exposure_score = score_result.score
+            stage_timings["scoring"] = round(time.perf_counter() - scoring_start, 3)
 
             # Générer le résumé
             result.summary = self._generate_summary(
@@ -262,6 +418,7 @@ class ScanEngine:
                 tls_grade=result.tls_grade,
                 infra_info=result.infra_info
             )
+            result.summary["stage_timings"] = stage_timings
 
             # Construire scan_data avec toutes les données brutes
             result.scan_data = self._build_scan_data(
@@ -270,6 +427,31 @@ class ScanEngine:
                 infra_info=result.infra_info,
                 raw_command=result.raw_command
             )
+            if self.config.enable_tls_audit and tls_result.get("audited_at"):
+                result.scan_data["tls_audited_at"] = tls_result["audited_at"]
+            if self.config.enable_cve_enrichment:
+                result.scan_data["cve_checked_at"] = cve_checked_at
+
+            # Comparaison avec le scan précédent
+            if previous is not None:
+                diff = diff_findings(previous.vulnerabilities, all_vulnerabilities)
+                result.scan_data["diff"] = {"previous_scan_id": previous.scan_id, **diff}
+                result.summary["diff"] = {
+                    "previous_scan_id": previous.scan_id,
+                    "services_changed": (
+                        service_fingerprint(result.services)
+                        != service_fingerprint(previous.scan_data.get("services", []))
+                    ),
+                    "nb_new": len(diff["new"]),
+                    "nb_fixed": len(diff["fixed"]),
+                    "nb_unchanged": len(diff["unchanged"]),
+                }
+                logger.info(
+                    f"   🔁 Diff: {len(diff['new'])} nouveaux, {len(diff['fixed'])} corrigés, "
+                    f"{len(diff['unchanged'])} inchangés"
+                )
+            if reuse is not None:
+                result.summary["incremental"] = incremental_stats
 
             # Finaliser
             result.status = "SUCCESS"
@@ -293,31 +475,89 @@ class ScanEngine:
                 result.scan_duration_seconds = (
                     result.finished_at - result.started_at
                 ).total_seconds()
+            result.summary["stage_timings"] = stage_timings
+
+        finally:
+            for task in cve_prefetch.values():
+                task.cancel()
+            if self._executor is not self._shared_executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
 
         return result
 
+    @staticmethod
+    async def _timed_stage(name: str, timings: dict, coro):
+        """Exécute une étape et enregistre sa durée (secondes) dans timings."""
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timings[name] = round(time.perf_counter() - start, 3)
+
+    @staticmethod
+    async def _skip_stage(value):
+        """Étape désactivée: valeur par défaut immédiate."""
+        return value
+
+    async def _run_blocking(self, func):
+        """Exécute un appel synchrone (nmap, sslyze) dans le pool dédié du scan."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func)
+
+    @staticmethod
+    def _service_dict(svc: ServiceInfo) -> dict:
+        """Service nmap au format du pipeline (scan_data, CVE, scoring)."""
+        return {
+            "port": svc.port,
+            "protocol": svc.protocol,
+            "service_name": svc.service_name,
+            "service_version": f"{svc.service_product or ''} {svc.service_version or ''}".strip() or None,
+            "service_product": svc.service_product,
+            "service_banner": svc.service_banner,
+            "cpe": svc.cpe
+        }
+
     async def _scan_ports_and_os(
         self,
         target_type: str,
-        target_value: str
+        target_value: str,
+        on_service: Optional[Callable[[ServiceInfo], None]] = None
     ) -> dict:
         """
         Scan les ports avec nmap et détecte l'OS.
 
+        Args:
+            target_type: Type de cible
+            target_value: Valeur de la cible
+            on_service: Callback appelé pour chaque service lu (backend en flux)
+
         Returns:
             Dict avec 'services' et 'infra_info'
         """
-        # Exécuter en thread car nmap est synchrone
-        loop = asyncio.get_event_loop()
-
-        if self.config.scan_all_ports:
-            nmap_result = await loop.run_in_executor(
-                None,
+        if self.config.nmap_streaming:
+            # Sous-processus asyncio: aucun thread bloqué pendant le scan
+            if self.config.scan_all_ports:
+                nmap_result = await self.nmap_stream_client.full_scan(
+                    target_value, detect_os=True, on_service=on_service
+                )
+            elif self.config.ports:
+                nmap_result = await self.nmap_stream_client.scan_target(
+                    target_value,
+                    ports=self.config.ports,
+                    arguments="-sV -T4 -O --osscan-guess",
+                    on_service=on_service
+                )
+            else:
+                nmap_result = await self.nmap_stream_client.quick_scan(
+                    target_value, detect_os=True, on_service=on_service
+                )
+        # Exécuter en thread car python-nmap est synchrone
+        elif self.config.scan_all_ports:
+            nmap_result = await self._run_blocking(
                 lambda: self.nmap_client.full_scan(target_value, detect_os=True)
             )
         elif self.config.ports:
-            nmap_result = await loop.run_in_executor(
-                None,
+            nmap_result = await self._run_blocking(
                 lambda: self.nmap_client.scan_target(
                     target_value,
                     ports=self.config.ports,
@@ -325,8 +565,7 @@ class ScanEngine:
                 )
             )
         else:
-            nmap_result = await loop.run_in_executor(
-                None,
+            nmap_result = await self._run_blocking(
                 lambda: self.nmap_client.quick_scan(target_value, detect_os=True)
             )
 
@@ -337,16 +576,7 @@ class ScanEngine:
 
         for svc in nmap_result.services:
             if svc.state == "open":
-                service_info = {
-                    "port": svc.port,
-                    "protocol": svc.protocol,
-                    "service_name": svc.service_name,
-                    "service_version": f"{svc.service_product or ''} {svc.service_version or ''}".strip() or None,
-                    "service_product": svc.service_product,
-                    "service_banner": svc.service_banner,
-                    "cpe": svc.cpe
-                }
-                services.append(service_info)
+                services.append(self._service_dict(svc))
 
                 # Détecter le serveur web
                 if svc.port in [80, 443, 8080, 8443] and svc.service_product:
@@ -384,117 +614,222 @@ class ScanEngine:
     async def _audit_tls(
         self,
         target_value: str,
-        services: list[dict]
+        services: list[dict],
+        previous: Optional[PreviousScan] = None,
+        stats: Optional[dict] = None
     ) -> dict:
-        """Audit TLS sur les ports HTTPS."""
-        # Trouver les ports HTTPS
-        tls_ports = []
-        for svc in services:
-            port = svc.get("port")
-            service_name = svc.get("service_name", "").lower()
-            if port in [443, 8443, 9443] or "https" in service_name or "ssl" in service_name:
-                tls_ports.append(port)
+        """
+        Audit TLS sur les ports HTTPS.
+
+        En mode différentiel, l'audit complet est remplacé par une empreinte
+        légère par port ; si elle est inchangée et l'audit précédent récent,
+        les résultats du scan précédent sont repris.
+
+        Le résultat porte la date de l'audit complet (``audited_at``, ISO 8601),
+        reprise du scan précédent en cas de réutilisation.
+        """
+        all_ports = tls_ports(services)
+        ports = all_ports[:self.config.max_tls_ports]
+        max_age_days = self.config.incremental_max_age_days
+
+        # Un audit par port, en parallèle (borné par tls_concurrency)
+        semaphore = asyncio.Semaphore(self.config.tls_concurrency)
+
+        if previous is not None and not tls_audit_due(previous, max_age_days):
+            async def fingerprint_port(port: int):
+                async with semaphore:
+                    return await self._run_blocking(
+                        lambda: self.tls_auditor.fingerprint(target_value, port)
+                    )
+
+            fingerprints = await asyncio.gather(*(fingerprint_port(port) for port in ports))
+            reused = reusable_tls_details(previous, all_ports, fingerprints, max_age_days)
+            if reused is not None:
+                if stats is not None:
+                    stats["tls_reused"] = True
+                logger.info("   ♻️ Empreinte TLS inchangée: audit précédent réutilisé")
+                return {
+                    "grade": reused.get("grade"),
+                    "vulnerabilities": previous_findings(previous, "TLS_WEAK"),
+                    "tls_details": TLSDetails(
+                        protocols=reused.get("protocols") or TLSDetails().protocols,
+                        certificate=reused.get("certificate") or {},
+                        ciphers=reused.get("ciphers") or {"strong": [], "weak": []},
+                        grade=reused.get("grade")
+                    ),
+                    "audited_at": previous.scan_data["tls_audited_at"]
+                }
+
+        audited_at = datetime.now(timezone.utc).isoformat()
 
-        if not tls_ports:
-            # Essayer le port 443 par défaut
-            tls_ports = [443]
+        async def audit_port(port: int):
+            async with semaphore:
+                try:
+                    # Exécuter en thread car sslyze est synchrone
+                    return await self._run_blocking(
+                        lambda: self.tls_auditor.audit(target_value, port)
+                    )
+                except Exception as e:
+                    logger.warning(f"Erreur TLS port {port}: {e}")
+                    return e
+
+        port_results = await asyncio.gather(*(audit_port(port) for port in ports))
 
         vulnerabilities = []
         grade = None
         tls_details = TLSDetails()
 
-        for port in tls_ports[:3]:  # Limiter à 3 ports
-            try:
-                # Exécuter en thread car sslyze est synchrone
-                loop = asyncio.get_event_loop()
-                tls_result = await loop.run_in_executor(
-                    None,
-                    lambda p=port: self.tls_auditor.audit(target_value, p)
-                )
+        # Fusion dans l'ordre des ports (même résultat que l'audit séquentiel)
+        for port, tls_result in zip(ports, port_results):
+            if isinstance(tls_result, Exception):
+                tls_details.error = str(tls_result)
+                continue
 
-                if not tls_result.error:
-                    grade = tls_result.grade
-                    tls_details.grade = grade
-
-                    # Stocker les protocoles supportés
-                    tls_details.protocols = {
-                        "ssl2": tls_result.supports_ssl2,
-                        "ssl3": tls_result.supports_ssl3,
-                        "tls10": tls_result.supports_tls10,
-                        "tls11": tls_result.supports_tls11,
-                        "tls12": tls_result.supports_tls12,
-                        "tls13": tls_result.supports_tls13
-                    }
+            if not tls_result.error:
+                grade = tls_result.grade
+                tls_details.grade = grade
+
+                # Stocker les protocoles supportés
+                tls_details.protocols = {
+                    "ssl2": tls_result.supports_ssl2,
+                    "ssl3": tls_result.supports_ssl3,
+                    "tls10": tls_result.supports_tls10,
+                    "tls11": tls_result.supports_tls11,
+                    "tls12": tls_result.supports_tls12,
+                    "tls13": tls_result.supports_tls13
+                }
 
-                    # Stocker les ciphers
-                    tls_details.ciphers = {
-                        "strong": tls_result.strong_ciphers,
-                        "weak": tls_result.weak_ciphers
+                # Stocker les ciphers
+                tls_details.ciphers = {
+                    "strong": tls_result.strong_ciphers,
+                    "weak": tls_result.weak_ciphers
+                }
+
+                # Stocker les infos du certificat
+                if tls_result.certificate:
+                    cert = tls_result.certificate
+                    tls_details.certificate = {
+                        "subject": cert.subject,
+                        "issuer": cert.issuer,
+                        "serial_number": cert.serial_number,
+                        "not_before": cert.not_before.isoformat() if cert.not_before else None,
+                        "not_after": cert.not_after.isoformat() if cert.not_after else None,
+                        "is_expired": cert.is_expired,
+                        "days_until_expiry": cert.days_until_expiry,
+                        "is_self_signed": cert.is_self_signed,
+                        "signature_algorithm": cert.signature_algorithm,
+                        "public_key_algorithm": cert.public_key_algorithm,
+                        "public_key_size": cert.public_key_size,
+                        "san_domains": cert.san_domains
                     }
 
-                    # Stocker les infos du certificat
-                    if tls_result.certificate:
-                        cert = tls_result.certificate
-                        tls_details.certificate = {
-                            "subject": cert.subject,
-                            "issuer": cert.issuer,
-                            "serial_number": cert.serial_number,
-                            "not_before": cert.not_before.isoformat() if cert.not_before else None,
-                            "not_after": cert.not_after.isoformat() if cert.not_after else None,
-                            "is_expired": cert.is_expired,
-                            "days_until_expiry": cert.days_until_expiry,
-                            "is_self_signed": cert.is_self_signed,
-                            "signature_algorithm": cert.signature_algorithm,
-                            "public_key_algorithm": cert.public_key_algorithm,
-                            "public_key_size": cert.public_key_size,
-                            "san_domains": cert.san_domains
-                        }
-
-                    for vuln in tls_result.vulnerabilities:
-                        vulnerabilities.append({
-                            "port": port,
-                            "protocol": "tcp",
-                            "service_name": "https",
-                            "vulnerability_type": "TLS_WEAK",
-                            "severity": vuln.severity,
-                            "title": vuln.name,
-                            "description": vuln.description,
-                            "recommendation": vuln.recommendation,
-                            "cve_ids": vuln.cve_ids,
-                            "cvss_score": vuln.cvss_score
-                        })
-                else:
-                    tls_details.error = tls_result.error
-
-            except Exception as e:
-                logger.warning(f"Erreur TLS port {port}: {e}")
-                tls_details.error = str(e)
+                for vuln in tls_result.vulnerabilities:
+                    vulnerabilities.append({
+                        "port": port,
+                        "protocol": "tcp",
+                        "service_name": "https",
+                        "vulnerability_type": "TLS_WEAK",
+                        "severity": vuln.severity,
+                        "title": vuln.name,
+                        "description": vuln.description,
+                        "recommendation": vuln.recommendation,
+                        "cve_ids": vuln.cve_ids,
+                        "cvss_score": vuln.cvss_score
+                    })
+            else:
+                tls_details.error = tls_result.error
 
         return {
             "grade": grade,
             "vulnerabilities": vulnerabilities,
-            "tls_details": tls_details
+            "tls_details": tls_details,
+            "audited_at": audited_at
         }
 
-    async def _enrich_cve(self, services: list[dict]) -> list[dict]:
-        """Enrichit les services avec les CVE."""
+    async def _enrich_cve(
+        self,
+        services: list[dict],
+        previous: Optional[PreviousScan] = None,
+        stats: Optional[dict] = None,
+        prefetched: Optional[dict] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        checked_at: Optional[dict] = None
+    ) -> list[dict]:
+        """
+        Enrichit les services avec les CVE (une recherche par service, en parallèle).
+
+        En mode différentiel, les couples (service, version) enrichis depuis
+        moins de incremental_max_age_days reprennent les CVE du scan
+        précédent sans recherche NVD. Les recherches déjà lancées pendant le
+        scan nmap (prefetched) sont reprises.
+
+        checked_at reçoit, par couple (service, version), la date de la
+        dernière recherche réussie (reprise du scan précédent si réutilisée).
+        Une recherche en échec n'est pas datée : elle sera refaite.
+        """
+        semaphore = semaphore or asyncio.Semaphore(self.config.cve_concurrency)
+        prefetched = prefetched if prefetched is not None else {}
+        checked_at = checked_at if checked_at is not None else {}
+        now = datetime.now(timezone.utc).isoformat()
+
+        async def enrich_service(svc: dict) -> list[dict]:
+            task = prefetched.pop((svc.get("port"), svc.get("protocol")), None)
+            vulns = await task if task is not None else await self._lookup_cve(svc, semaphore)
+            if vulns is None:
+                return []
+            checked_at[service_key_id(service_key(svc))] = now
+            return vulns
+
+        # Seulement si on a une version
+        candidates = [
+            svc for svc in services
+            if svc.get("service_version") or svc.get("cpe")
+        ]
+
         all_vulnerabilities = []
+        if previous is not None:
+            known = previous_cve_findings(previous, self.config.incremental_max_age_days)
+            previous_checked_at = previous.scan_data.get("cve_checked_at") or {}
+            to_query = []
+            for svc in candidates:
+                key = service_key(svc)
+                if key not in known:
+                    to_query.append(svc)
+                    continue
+                # CVE reprises, rattachées au port courant du service
+                all_vulnerabilities.extend(
+                    {**vuln, "port": svc.get("port"), "protocol": svc.get("protocol", "tcp")}
+                    for vuln in known[key][:self.config.max_cve_per_service]
+                )
+                checked_at[service_key_id(key)] = previous_checked_at[service_key_id(key)]
+            if stats is not None:
+                stats["cve_services_reused"] = len(candidates) - len(to_query)
+                stats["cve_services_queried"] = len(to_query)
+            candidates = to_query
 
-        for svc in services:
-            # Seulement si on a une version
-            if not svc.get("service_version") and not svc.get("cpe"):
-                continue
+        results = await asyncio.gather(*(enrich_service(svc) for svc in candidates))
 
+        for vulns in results:
+            all_vulnerabilities.extend(vulns)
+        return all_vulnerabilities
+
+    async def _lookup_cve(self, svc: dict, semaphore: asyncio.Semaphore) -> Optional[list[dict]]:
+        """
+        Recherche CVE d'un service (bornée par semaphore et cve_timeout).
+
+        Returns:
+            CVE du service, ou None si la recherche a échoué
+        """
+        async with semaphore:
             try:
-                vulns = await enrich_with_vulns(svc)
-                # Limiter le nombre de CVE par service
-                all_vulnerabilities.extend(
-                    vulns[:self.config.max_cve_per_service]
+                vulns = await asyncio.wait_for(
+                    enrich_with_vulns(svc, raise_errors=True), timeout=self.config.cve_timeout
                 )
+                # Limiter le nombre de CVE par service
+                return vulns[:self.config.max_cve_per_service]
             except Exception as e:
                 logger.warning(f"Erreur enrichissement CVE pour {svc}: {e}")
-
-        return all_vulnerabilities
+                return None
 
     def _check_exposed_ports(self, services: list[dict]) -> list[dict]:
         """Vérifie les ports sensibles exposés."""
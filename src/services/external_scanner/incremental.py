@@ -0,0 +1,229 @@
+# backend/src/services/external_scanner/incremental.py
+"""
+Rescan différentiel : réutilisation des résultats du scan précédent.
+
+Le scan nmap est toujours exécuté (il fournit l'empreinte des services) ;
+les étapes coûteuses sont réutilisées quand rien n'a changé :
+- audit TLS : sauté si le numéro de série du certificat et l'ensemble des
+  versions TLS acceptées (empreinte légère, quelques handshakes) sont
+  identiques à ceux du dernier audit complet, sur les mêmes ports
+- enrichissement CVE : pas de recherche NVD pour un couple (service,
+  version) déjà enrichi au scan précédent ; ses CVE sont reprises
+- score : toujours recalculé
+
+Chaque donnée reprise garde la date de sa dernière collecte réelle
+(``scan_data["tls_audited_at"]`` et ``scan_data["cve_checked_at"]`` par
+couple (service, version)) : au-delà de ``max_age_days``, l'audit TLS ou la
+recherche CVE est refait même si rien n'a changé, afin que les CVE publiées
+depuis soient remontées.
+
+Le résultat est comparé aux constats du scan précédent (nouveaux, corrigés,
+inchangés).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Ports audités en TLS par défaut
+TLS_PORTS = (443, 8443, 9443)
+
+# Taille des colonnes service_name / service_version des constats persistés
+SERVICE_FIELD_MAX_LENGTH = 100
+
+
+@dataclass
+class PreviousScan:
+    """Dernier scan réussi d'une cible (scan_data et constats persistés)."""
+    scan_id: str
+    finished_at: Optional[datetime] = None
+    scan_data: dict = field(default_factory=dict)
+    vulnerabilities: list[dict] = field(default_factory=list)
+
+
+def tls_ports(services: list[dict]) -> list[int]:
+    """Ports à auditer en TLS (443 par défaut si aucun service TLS détecté)."""
+    ports = []
+    for svc in services:
+        port = svc.get("port")
+        service_name = (svc.get("service_name") or "").lower()
+        if port in TLS_PORTS or "https" in service_name or "ssl" in service_name:
+            ports.append(port)
+    return ports or [443]
+
+
+def service_key(service: dict) -> tuple:
+    """
+    Couple (service, version) servant de clé d'enrichissement CVE.
+
+    Tronqué comme les colonnes des constats persistés : la clé d'un service
+    du scan et celle de ses constats relus en base sont identiques.
+    """
+    return (
+        (service.get("service_name") or "")[:SERVICE_FIELD_MAX_LENGTH],
+        (service.get("service_version") or "")[:SERVICE_FIELD_MAX_LENGTH],
+    )
+
+
+def service_key_id(key: tuple) -> str:
+    """Clé (service, version) sérialisable (entrées de scan_data["cve_checked_at"])."""
+    return "|".join(key)
+
+
+def is_fresh(collected_at: Optional[str], max_age_days: int, now: Optional[datetime] = None) -> bool:
+    """Vrai si la date de collecte (ISO 8601) date de moins de max_age_days."""
+    if not collected_at:
+        return False
+    try:
+        collected = datetime.fromisoformat(collected_at)
+    except (TypeError, ValueError):
+        return False
+    if collected.tzinfo is None:
+        collected = collected.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return now - collected < timedelta(days=max_age_days)
+
+
+def service_fingerprint(services: list[dict]) -> list[tuple]:
+    """Empreinte des services ouverts (port, protocole, service, version, CPE)."""
+    return sorted(
+        (
+            svc.get("port") or 0,
+            svc.get("protocol") or "tcp",
+            svc.get("service_name") or "",
+            svc.get("service_version") or "",
+            svc.get("cpe") or "",
+        )
+        for svc in services
+    )
+
+
+def finding_signature(vuln: dict) -> tuple:
+    """Identité d'un constat d'un scan à l'autre (type, port, titre)."""
+    return (
+        vuln.get("vulnerability_type") or "",
+        vuln.get("port") or 0,
+        vuln.get("title") or "",
+    )
+
+
+def _compact(vuln: dict) -> dict:
+    return {
+        "vulnerability_type": vuln.get("vulnerability_type"),
+        "port": vuln.get("port"),
+        "title": vuln.get("title"),
+        "severity": vuln.get("severity"),
+        "cve_ids": vuln.get("cve_ids") or [],
+    }
+
+
+def diff_findings(previous: list[dict], current: list[dict]) -> dict:
+    """
+    Compare les constats de deux scans.
+
+    Returns:
+        {"new": [...], "fixed": [...], "unchanged": [...]} (constats résumés)
+    """
+    previous_by_sig = {finding_signature(v): v for v in previous}
+    current_by_sig = {finding_signature(v): v for v in current}
+
+    return {
+        "new": [_compact(v) for sig, v in current_by_sig.items() if sig not in previous_by_sig],
+        "fixed": [_compact(v) for sig, v in previous_by_sig.items() if sig not in current_by_sig],
+        "unchanged": [_compact(v) for sig, v in current_by_sig.items() if sig in previous_by_sig],
+    }
+
+
+def tls_audit_due(previous: PreviousScan, max_age_days: int) -> bool:
+    """Vrai si le dernier audit TLS complet est trop ancien (ou de date inconnue)."""
+    return not is_fresh(previous.scan_data.get("tls_audited_at"), max_age_days)
+
+
+def reusable_tls_details(
+    previous: PreviousScan,
+    ports: list[int],
+    fingerprints: list[Optional[dict]],
+    max_age_days: int = 30
+) -> Optional[dict]:
+    """
+    Détails TLS du scan précédent si l'empreinte courante est inchangée.
+
+    Conditions : audit complet de moins de max_age_days, sans erreur et sur
+    les mêmes ports, même numéro de série de certificat et mêmes versions
+    TLS 1.0-1.3 sur chaque port audité, statut d'expiration du certificat
+    inchangé.
+
+    Args:
+        previous: Scan précédent
+        ports: Ports TLS détectés par le scan courant
+        fingerprints: Empreintes des ports audités (None si injoignable)
+        max_age_days: Âge maximal de l'audit complet repris
+
+    Returns:
+        Détails TLS (expiration recalculée) ou None s'il faut réauditer
+    """
+    if tls_audit_due(previous, max_age_days):
+        return None
+    tls_details = previous.scan_data.get("tls_details")
+    if not tls_details or tls_details.get("error") or not tls_details.get("grade"):
+        return None
+    if tls_ports(previous.scan_data.get("services", [])) != ports:
+        return None
+
+    certificate = dict(tls_details.get("certificate") or {})
+    protocols = tls_details.get("protocols") or {}
+    for fingerprint in fingerprints:
+        if not fingerprint:
+            return None
+        if fingerprint["serial_number"] != certificate.get("serial_number"):
+            return None
+        if any(bool(protocols.get(name)) != supported for name, supported in fingerprint["protocols"].items()):
+            return None
+
+    if certificate.get("not_after"):
+        not_after = datetime.fromisoformat(certificate["not_after"])
+        if not_after.tzinfo is None:
+            not_after = not_after.replace(tzinfo=timezone.utc)
+        now = datetime.now(timezone.utc)
+        is_expired = now > not_after
+        if is_expired != bool(certificate.get("is_expired")):
+            # Le certificat vient d'expirer: constats et grade à recalculer
+            return None
+        certificate["days_until_expiry"] = (not_after - now).days
+
+    return {**tls_details, "certificate": certificate}
+
+
+def previous_findings(previous: PreviousScan, vulnerability_type: str) -> list[dict]:
+    """Constats du scan précédent d'un type donné."""
+    return [v for v in previous.vulnerabilities if v.get("vulnerability_type") == vulnerability_type]
+
+
+def previous_cve_findings(previous: PreviousScan, max_age_days: int = 30) -> dict[tuple, list[dict]]:
+    """
+    CVE du scan précédent par couple (service, version) enrichi depuis
+    moins de max_age_days (date de la dernière recherche NVD réelle).
+
+    Un couple enrichi sans CVE est présent avec une liste vide.
+    """
+    checked_at = previous.scan_data.get("cve_checked_at") or {}
+    findings: dict[tuple, list[dict]] = {}
+    for svc in previous.scan_data.get("services", []):
+        if not (svc.get("service_version") or svc.get("cpe")):
+            continue
+        key = service_key(svc)
+        if is_fresh(checked_at.get(service_key_id(key)), max_age_days):
+            findings[key] = []
+
+    seen = set()
+    for vuln in previous_findings(previous, "SERVICE_VULN"):
+        key = service_key(vuln)
+        if key not in findings:
+            continue
+        # Un même couple peut être exposé sur plusieurs ports: CVE uniques
+        cve_key = (key, vuln.get("title"))
+        if cve_key in seen:
+            continue
+        seen.add(cve_key)
+        findings[key].append(vuln)
+    return findings
@@ -28,6 +28,7 @@ class ServiceInfo:
     service_product: Optional[str] = None
     service_banner: Optional[str] = None
     cpe: Optional[str] = None  # Common Platform Enumeration
+    host: Optional[str] = None  # Adresse de l'hôte (scan d'une plage IP)
 
 
 @dataclass
@@ -0,0 +1,355 @@
+# backend/src/services/external_scanner/nmap_stream.py
+"""
+Backend nmap asyncio : sous-processus avec sortie XML en flux.
+
+Alternative à NmapClient (python-nmap) :
+- nmap est lancé en sous-processus asyncio (``-oX -``), aucun thread n'est
+  bloqué pendant le scan
+- la sortie XML est analysée au fil de l'eau (XMLPullParser) : chaque
+  service est transmis à un callback dès que nmap écrit son hôte, sans
+  attendre la fin du processus ; les éléments analysés sont libérés
+- nombre de processus nmap simultanés borné par boucle d'événements
+  (NMAP_MAX_CONCURRENCY), timeout global du processus
+- annulation propre : le processus est terminé (SIGTERM puis SIGKILL)
+
+Nmap écrit un hôte quand son scan est terminé : pour une plage IP les
+services arrivent hôte par hôte, pour une cible unique en une fois.
+"""
+
+import asyncio
+import logging
+import os
+import shlex
+import weakref
+import xml.etree.ElementTree as ET
+from typing import Callable, Optional
+
+from .nmap_client import NmapClient, NmapScanResult, OSInfo, ServiceInfo
+
+logger = logging.getLogger(__name__)
+
+NMAP_BINARY = os.getenv("NMAP_BINARY", "nmap")
+NMAP_MAX_CONCURRENCY = int(os.getenv("NMAP_MAX_CONCURRENCY", "4"))
+
+# Délai laissé à nmap pour s'arrêter après SIGTERM
+NMAP_TERMINATE_GRACE_SECONDS = 5
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Un sémaphore par boucle d'événements (un sémaphore asyncio est lié à sa boucle)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _nmap_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(NMAP_MAX_CONCURRENCY)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+class NmapXMLStreamParser:
+    """
+    Analyse incrémentale de la sortie XML de nmap.
+
+    Exemple d'utilisation:
+        parser = NmapXMLStreamParser(target="example.com")
+        for chunk in chunks:
+            for service in parser.feed(chunk):
+                print(service.port, service.service_name)
+        result = parser.close()
+    """
+
+    def __init__(self, target: str):
+        self.result = NmapScanResult(target=target)
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        """Vrai si l'élément racine <nmaprun> a été lu."""
+        return self._started
+
+    def feed(self, data: bytes) -> list[ServiceInfo]:
+        """
+        Analyse un fragment de sortie.
+
+        Returns:
+            Services des hôtes terminés dans ce fragment
+        """
+        self._parser.feed(data)
+        return self._consume()
+
+    def close(self) -> NmapScanResult:
+        """Termine l'analyse et retourne le résultat complet."""
+        try:
+            self._parser.close()
+            self._consume()
+        except ET.ParseError as e:
+            # Sortie tronquée (timeout, processus arrêté): on garde les hôtes lus
+            logger.debug(f"Sortie XML nmap incomplète: {e}")
+        return self.result
+
+    def _consume(self) -> list[ServiceInfo]:
+        services = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if elem.tag == "nmaprun":
+                    self._root = elem
+                    self._started = True
+                    self.result.command_line = elem.get("args")
+                continue
+
+            if elem.tag == "host":
+                services.extend(self._parse_host(elem))
+                # Libérer l'hôte analysé (sortie potentiellement volumineuse)
+                if self._root is not None:
+                    self._root.remove(elem)
+            elif elem.tag == "finished":
+                self.result.scan_time = float(elem.get("elapsed") or 0)
+        return services
+
+    def _parse_host(self, host: ET.Element) -> list[ServiceInfo]:
+        result = self.result
+        status = host.find("status")
+        state = status.get("state", "unknown") if status is not None else "unknown"
+
+        address = None
+        for addr in host.findall("address"):
+            if addr.get("addrtype") in ("ipv4", "ipv6"):
+                address = addr.get("addr")
+                break
+
+        # Premier hôte actif: informations principales du résultat
+        if result.state != "up":
+            result.state = state
+            result.target_ip = address
+            hostname = host.find("hostnames/hostname")
+            if hostname is not None:
+                result.hostname = hostname.get("name")
+            self._parse_os(host)
+
+        services = []
+        for port in host.findall("ports/port"):
+            service = self._parse_port(port, address)
+            result.services.append(service)
+            services.append(service)
+        return services
+
+    @staticmethod
+    def _parse_port(port: ET.Element, address: Optional[str]) -> ServiceInfo:
+        state = port.find("state")
+        service = port.find("service")
+        attrs = service.attrib if service is not None else {}
+        cpe = service.find("cpe") if service is not None else None
+
+        return ServiceInfo(
+            port=int(port.get("portid")),
+            protocol=port.get("protocol", "tcp"),
+            state=state.get("state", "unknown") if state is not None else "unknown",
+            service_name=attrs.get("name", "unknown"),
+            service_version=attrs.get("version") or None,
+            service_product=attrs.get("product") or None,
+            service_banner=attrs.get("extrainfo") or None,
+            cpe=cpe.text if cpe is not None and cpe.text else None,
+            host=address
+        )
+
+    def _parse_os(self, host: ET.Element) -> None:
+        result = self.result
+        result.os_matches = []
+        for os_match in host.findall("os/osmatch"):
+            os_class = os_match.find("osclass")
+            os_class_attrs = os_class.attrib if os_class is not None else {}
+            os_cpe = os_class.find("cpe") if os_class is not None else None
+
+            result.os_matches.append(OSInfo(
+                name=os_match.get("name"),
+                accuracy=int(os_match.get("accuracy") or 0),
+                family=os_class_attrs.get("osfamily"),
+                vendor=os_class_attrs.get("vendor"),
+                os_gen=os_class_attrs.get("osgen"),
+                os_type=os_class_attrs.get("type"),
+                cpe=os_cpe.text if os_cpe is not None else None
+            ))
+
+        if result.os_matches:
+            result.os_match = result.os_matches[0].name
+            result.os_info = result.os_matches[0]
+
+
+class AsyncNmapClient:
+    """
+    Client nmap asyncio (sous-processus, sortie XML en flux).
+
+    Mêmes profils de scan que NmapClient (quick_scan, full_scan,
+    scan_target) ; un callback optionnel reçoit chaque service analysé.
+
+    Exemple d'utilisation:
+        client = AsyncNmapClient(timeout=300)
+        result = await client.quick_scan("example.com", on_service=print)
+    """
+
+    def __init__(self, timeout: int = 300, binary: str = NMAP_BINARY):
+        """
+        Initialise le client.
+
+        Args:
+            timeout: Timeout en secondes (par hôte et pour le processus)
+            binary: Chemin de l'exécutable nmap
+        """
+        self.timeout = timeout
+        self.binary = binary
+
+    async def scan_target(
+        self,
+        target: str,
+        ports: Optional[str] = None,
+        arguments: str = "-sV",
+        on_service: Optional[Callable[[ServiceInfo], None]] = None
+    ) -> NmapScanResult:
+        """
+        Scan une cible avec nmap.
+
+        Args:
+            target: Cible (domaine, IP, ou range CIDR)
+            ports: Ports à scanner (ex: "22,80,443" ou "1-1000")
+            arguments: Arguments nmap
+            on_service: Callback appelé pour chaque service analysé
+
+        Returns:
+            NmapScanResult avec les services détectés
+        """
+        argv = [self.binary, *shlex.split(arguments), "--host-timeout", f"{self.timeout}s", "-oX", "-"]
+        if ports:
+            argv += ["-p", ports]
+        argv.append(target)
+
+        parser = NmapXMLStreamParser(target)
+        logger.info(f"🔍 Scan nmap (flux): {' '.join(argv[1:])}")
+
+        async with _nmap_semaphore():
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *argv,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except OSError as e:
+                logger.error(f"❌ Erreur nmap: {e}")
+                parser.result.error = str(e)
+                return parser.result
+
+            stderr = ""
+            stderr_task = asyncio.create_task(process.stderr.read())
+            try:
+                await asyncio.wait_for(
+                    self._read_output(process, parser, on_service),
+                    timeout=self.timeout
+                )
+                stderr = (await stderr_task).decode(errors="replace").strip()
+                await process.wait()
+            except asyncio.TimeoutError:
+                logger.error(f"❌ Timeout nmap après {self.timeout}s: {target}")
+                parser.result.error = f"Timeout nmap après {self.timeout}s"
+            finally:
+                # Annulation ou timeout: ne pas laisser de processus nmap orphelin
+                if process.returncode is None:
+                    await self._terminate(process)
+                if not stderr_task.done():
+                    stderr_task.cancel()
+
+        result = parser.close()
+
+        if not result.error and (process.returncode != 0 or not parser.started):
+            result.error = stderr or f"nmap terminé avec le code {process.returncode}"
+            logger.error(f"❌ Erreur nmap: {result.error}")
+        elif not result.error:
+            logger.info(
+                f"✅ Scan terminé: {len(result.services)} services détectés "
+                f"en {result.scan_time:.1f}s"
+            )
+
+        return result
+
+    async def quick_scan(
+        self,
+        target: str,
+        detect_os: bool = True,
+        on_service: Optional[Callable[[ServiceInfo], None]] = None
+    ) -> NmapScanResult:
+        """Scan rapide des ports les plus courants (voir NmapClient.quick_scan)."""
+        return await self._scan_with_os_fallback(target, NmapClient.COMMON_PORTS, "-sV -T4", detect_os, on_service)
+
+    async def full_scan(
+        self,
+        target: str,
+        detect_os: bool = True,
+        on_service: Optional[Callable[[ServiceInfo], None]] = None
+    ) -> NmapScanResult:
+        """Scan complet top 1000 ports (voir NmapClient.full_scan)."""
+        return await self._scan_with_os_fallback(target, None, "-sV -sC -T4", detect_os, on_service)
+
+    async def _scan_with_os_fallback(
+        self,
+        target: str,
+        ports: Optional[str],
+        arguments: str,
+        detect_os: bool,
+        on_service: Optional[Callable[[ServiceInfo], None]]
+    ) -> NmapScanResult:
+        result = await self.scan_target(
+            target,
+            ports=ports,
+            arguments=f"{arguments} -O --osscan-guess" if detect_os else arguments,
+            on_service=on_service
+        )
+
+        # Si erreur liée aux privilèges root pour OS detection, retry sans -O
+        if detect_os and result.error and "root privileges" in result.error.lower():
+            logger.warning("⚠️ OS detection requires root privileges, retrying without -O")
+            result = await self.scan_target(target, ports=ports, arguments=arguments, on_service=on_service)
+            if not result.error:
+                result.os_match = "OS detection disabled (requires root)"
+
+        return result
+
+    @staticmethod
+    async def _read_output(
+        process: asyncio.subprocess.Process,
+        parser: NmapXMLStreamParser,
+        on_service: Optional[Callable[[ServiceInfo], None]]
+    ) -> None:
+        while True:
+            chunk = await process.stdout.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            for service in parser.feed(chunk):
+                if on_service is not None:
+                    try:
+                        on_service(service)
+                    except Exception as e:
+                        logger.warning(f"Erreur callback service {service.port}: {e}")
+
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process) -> None:
+        """Arrête nmap (SIGTERM, puis SIGKILL après le délai de grâce)."""
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), timeout=NMAP_TERMINATE_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+                await process.wait()
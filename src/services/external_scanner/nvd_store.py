@@ -0,0 +1,511 @@
+# backend/src/services/external_scanner/nvd_store.py
+"""
+Base CVE locale alimentée par les flux JSON NVD (API 2.0).
+
+Les fichiers ``nvdcve-2.0-<année|modified|recent>.json[.gz]`` déposés dans
+``NVD_FEEDS_DIR`` (téléchargés par Celery beat, ou copiés manuellement
+lorsque les workers de scan n'ont pas accès à Internet) sont importés dans
+PostgreSQL :
+- nvd_cve: une ligne par CVE (score CVSS, sévérité, description, références)
+- nvd_cpe_match: critères CPE vulnérables (vendor, product, version exacte
+  ou plage versionStart*/versionEnd*), indexés par (vendor, product)
+- nvd_feed_state: empreinte SHA-256 de chaque fichier importé (import
+  incrémental: un flux inchangé n'est pas relu, un flux delta ``modified``
+  remplace uniquement les CVE qu'il contient)
+
+La correspondance CPE -> CVE est déterministe et ne nécessite aucun accès
+réseau: une requête indexée par (vendor, product) sur les seuls critères de
+version, un filtre de version, puis la lecture des CVE retenues (au plus
+max_results, par score décroissant).
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+
+from src.database import SessionLocal
+from .cve_enrichment import CVEEnrichment, CVEInfo
+
+logger = logging.getLogger(__name__)
+
+NVD_FEEDS_DIR = os.getenv("NVD_FEEDS_DIR", "./data/nvd")
+NVD_FEEDS_URL = os.getenv("NVD_FEEDS_URL", "https://nvd.nist.gov/feeds/json/cve/2.0")
+
+# Taille des lots d'écriture lors de l'import
+IMPORT_BATCH_SIZE = 1000
+
+# Vérification "base chargée" mise en cache (secondes)
+LOADED_CHECK_TTL = 60
+# Sans flux annuel importé, nombre de CVE à partir duquel la base est
+# considérée comme chargée (les flux delta seuls n'en contiennent que
+# quelques milliers)
+NVD_MIN_CVE_COUNT = int(os.getenv("NVD_MIN_CVE_COUNT", "100000"))
+
+
+def parse_cpe(cpe: str) -> Optional[tuple[str, str, Optional[str]]]:
+    """
+    Décompose un CPE 2.3 en (vendor, product, version).
+
+    La version vaut None si elle est générique ('*' ou '-').
+    """
+    parts = cpe.split(":")
+    if len(parts) < 6 or parts[0] != "cpe" or parts[1] != "2.3":
+        return None
+    version = parts[5]
+    return parts[3].lower(), parts[4].lower(), None if version in ("*", "-", "") else version
+
+
+def version_key(version: str) -> tuple:
+    """
+    Clé de comparaison de versions ('1.18.0', '8.2p1', '2.4.49').
+
+    Les segments numériques sont comparés numériquement, les segments
+    alphabétiques lexicalement.
+    """
+    return tuple(
+        (1, int(token)) if token.isdigit() else (0, token)
+        for token in re.findall(r"\d+|[a-z]+", version.lower())
+    )
+
+
+def version_matches(version: str, match: dict) -> bool:
+    """Teste une version contre un critère CPE (version exacte ou plage)."""
+    key = version_key(version)
+
+    if match.get("version"):
+        return key == version_key(match["version"])
+
+    bounds = (
+        match.get("version_start_including"),
+        match.get("version_start_excluding"),
+        match.get("version_end_including"),
+        match.get("version_end_excluding"),
+    )
+    if not any(bounds):
+        # Critère sans version ni plage: toutes versions
+        return True
+
+    start_incl, start_excl, end_incl, end_excl = bounds
+    if start_incl and key < version_key(start_incl):
+        return False
+    if start_excl and key <= version_key(start_excl):
+        return False
+    if end_incl and key > version_key(end_incl):
+        return False
+    if end_excl and key >= version_key(end_excl):
+        return False
+    return True
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Date NVD en UTC explicite.
+
+    Les flux donnent des dates sans décalage ("2024-11-20T23:28:43.667") alors
+    que les colonnes sont ``timestamptz`` : une date naïve est interprétée en UTC.
+    """
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def _iter_cpe_matches(cve_data: dict) -> Iterable[dict]:
+    """Critères CPE vulnérables d'une CVE (configurations -> nodes -> cpeMatch)."""
+    for config in cve_data.get("configurations", []):
+        for node in config.get("nodes", []):
+            for match in node.get("cpeMatch", []):
+                if not match.get("vulnerable"):
+                    continue
+                parsed = parse_cpe(match.get("criteria", ""))
+                if not parsed:
+                    continue
+                vendor, product, version = parsed
+                yield {
+                    "vendor": vendor,
+                    "product": product,
+                    "version": version,
+                    "version_start_including": match.get("versionStartIncluding"),
+                    "version_start_excluding": match.get("versionStartExcluding"),
+                    "version_end_including": match.get("versionEndIncluding"),
+                    "version_end_excluding": match.get("versionEndExcluding"),
+                }
+
+
+def _load_feed(path: Path) -> dict:
+    """Charge un fichier de flux NVD (.json ou .json.gz)."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class NVDStore:
+    """
+    Accès à la base CVE locale (import des flux et recherche par CPE).
+
+    Exemple:
+        store = NVDStore()
+        store.import_feeds()
+        cves = store.search("nginx", "nginx", "1.18.0")
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._loaded: Optional[bool] = None
+        self._loaded_checked_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def is_loaded(self) -> bool:
+        """
+        True si la base contient l'historique NVD (résultat mis en cache).
+
+        Il faut au moins un flux annuel (``nvdcve-2.0-YYYY``) importé, ou
+        NVD_MIN_CVE_COUNT CVE : les flux delta (modified, recent) importés
+        par la tâche planifiée ne suffisent pas, la recherche passe alors
+        par l'API NVD.
+        """
+        now = time.monotonic()
+        if self._loaded is not None and now - self._loaded_checked_at < LOADED_CHECK_TTL:
+            return self._loaded
+
+        db = self.session_factory()
+        try:
+            self._loaded = self._check_loaded(db)
+        except Exception as e:
+            logger.warning(f"⚠️ Base CVE locale indisponible: {e}")
+            self._loaded = False
+        finally:
+            db.close()
+
+        self._loaded_checked_at = now
+        return self._loaded
+
+    def _check_loaded(self, db) -> bool:
+        """Flux annuel importé, ou nombre minimal de CVE atteint."""
+        if not db.execute(text("SELECT to_regclass('nvd_feed_state') IS NOT NULL")).scalar():
+            return False
+
+        feeds = db.execute(text("SELECT feed_name FROM nvd_feed_state")).scalars().all()
+        if not feeds:
+            return False
+        if any(re.fullmatch(r"nvdcve-2\.0-\d{4}", name) for name in feeds):
+            return True
+
+        cve_count = db.execute(text("SELECT COUNT(*) FROM nvd_cve")).scalar() or 0
+        if cve_count >= NVD_MIN_CVE_COUNT:
+            return True
+
+        logger.warning(
+            f"⚠️ Base CVE locale incomplète: flux delta seuls ({', '.join(sorted(feeds))}, "
+            f"{cve_count} CVE) — importer les flux annuels nvdcve-2.0-YYYY ; "
+            f"recherche via l'API NVD en attendant"
+        )
+        return False
+
+    def search(
+        self,
+        vendor: Optional[str],
+        product: str,
+        version: Optional[str],
+        max_results: int = 20
+    ) -> list[CVEInfo]:
+        """
+        CVE affectant (vendor, product, version), triées par score CVSS décroissant.
+
+        Args:
+            vendor: Éditeur CPE (None = tout éditeur pour ce produit)
+            product: Produit CPE (ex: "http_server", "nginx")
+            version: Version détectée (None = inconnue: aucune correspondance,
+                pour ne pas remonter toutes les CVE historiques du produit)
+            max_results: Nombre maximum de CVE
+
+        Returns:
+            Liste de CVEInfo
+        """
+        if not version:
+            return []
+
+        vendor_filter = "AND m.vendor = :vendor" if vendor else ""
+        db = self.session_factory()
+        try:
+            # Critères du produit seuls (lignes étroites) : les détails des CVE
+            # ne sont lus que pour les critères correspondant à la version
+            criteria = db.execute(text(f"""
+                SELECT
+                    m.cve_id, m.version,
+                    m.version_start_including, m.version_start_excluding,
+                    m.version_end_including, m.version_end_excluding
+                FROM nvd_cpe_match m
+                WHERE m.product = :product
+                  {vendor_filter}
+            """), {"vendor": (vendor or "").lower(), "product": product.lower()}).mappings().all()
+
+            cve_ids = sorted({row["cve_id"] for row in criteria if version_matches(version, row)})
+            if not cve_ids:
+                return []
+
+            rows = db.execute(text("""
+                SELECT
+                    c.cve_id, c.description, c.cvss_score, c.cvss_vector, c.cvss_version,
+                    c.severity, c.published_date, c.last_modified,
+                    c."references", c.cwe_ids
+                FROM nvd_cve c
+                WHERE c.cve_id = ANY(:cve_ids)
+                ORDER BY COALESCE(c.cvss_score, 0) DESC, c.cve_id
+                LIMIT :limit
+            """), {"cve_ids": cve_ids, "limit": max_results}).mappings().all()
+        finally:
+            db.close()
+
+        return [
+            CVEInfo(
+                cve_id=row["cve_id"],
+                description=row["description"] or "",
+                cvss_score=float(row["cvss_score"]) if row["cvss_score"] is not None else None,
+                cvss_vector=row["cvss_vector"],
+                cvss_version=row["cvss_version"] or "3.1",
+                severity=row["severity"] or "UNKNOWN",
+                published_date=row["published_date"],
+                last_modified=row["last_modified"],
+                references=list(row["references"] or []),
+                cwe_ids=list(row["cwe_ids"] or []),
+            )
+            for row in rows
+        ]
+
+    def search_by_cpe(self, cpe: str, max_results: int = 20) -> list[CVEInfo]:
+        """CVE affectant un CPE 2.3 (ex: construit par build_cpe_from_service)."""
+        parsed = parse_cpe(cpe)
+        if not parsed:
+            return []
+        vendor, product, version = parsed
+        return self.search(vendor, product, version, max_results=max_results)
+
+    # ------------------------------------------------------------------
+    # Import des flux
+    # ------------------------------------------------------------------
+
+    def import_feeds(self, directory: Optional[str] = None) -> dict:
+        """
+        Importe les flux présents dans le répertoire (incrémental).
+
+        Les flux annuels sont importés avant les flux delta (modified,
+        recent), afin que les modifications récentes l'emportent.
+
+        Returns:
+            Dict {fichier: nombre de CVE importées | "unchanged"}
+        """
+        feeds_dir = Path(directory or NVD_FEEDS_DIR)
+        files = sorted(
+            list(feeds_dir.glob("nvdcve-2.0-*.json")) + list(feeds_dir.glob("nvdcve-2.0-*.json.gz")),
+            key=lambda p: (not p.name.split("-")[2][:4].isdigit(), p.name)
+        )
+
+        results = {}
+        for path in files:
+            results[path.name] = self.import_feed_file(path)
+
+        self._loaded = None
+        return results
+
+    def import_feed_file(self, path: Path) -> int | str:
+        """
+        Importe un fichier de flux si son contenu a changé depuis le dernier import.
+
+        Returns:
+            Nombre de CVE importées, ou "unchanged"
+        """
+        feed_name = path.name.split(".json")[0]
+        sha256 = _file_sha256(path)
+
+        db = self.session_factory()
+        try:
+            previous = db.execute(
+                text("SELECT sha256 FROM nvd_feed_state WHERE feed_name = :name"),
+                {"name": feed_name}
+            ).scalar()
+            if previous == sha256:
+                return "unchanged"
+
+            start = time.perf_counter()
+            vulnerabilities = _load_feed(path).get("vulnerabilities", [])
+
+            imported = 0
+            for i in range(0, len(vulnerabilities), IMPORT_BATCH_SIZE):
+                batch = [v.get("cve", {}) for v in vulnerabilities[i:i + IMPORT_BATCH_SIZE]]
+                imported += self._upsert_batch(db, batch)
+                db.commit()
+
+            db.execute(text("""
+                INSERT INTO nvd_feed_state (feed_name, sha256, cve_count, imported_at)
+                VALUES (:name, :sha256, :count, NOW())
+                ON CONFLICT (feed_name) DO UPDATE
+                SET sha256 = EXCLUDED.sha256,
+                    cve_count = EXCLUDED.cve_count,
+                    imported_at = NOW()
+            """), {"name": feed_name, "sha256": sha256, "count": imported})
+            db.commit()
+
+            logger.info(
+                f"✅ Flux NVD importé: {path.name} ({imported} CVE en {time.perf_counter() - start:.1f}s)"
+            )
+            return imported
+
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _upsert_batch(self, db, batch: list[dict]) -> int:
+        """
+        Remplace les CVE du lot (et leurs critères CPE) si la version du flux
+        est au moins aussi récente que celle déjà en base. Les CVE rejetées
+        sont supprimées.
+        """
+        cve_rows, match_rows, rejected = [], [], []
+
+        for cve_data in batch:
+            cve_id = cve_data.get("id")
+            if not cve_id:
+                continue
+            if cve_data.get("vulnStatus") == "Rejected":
+                rejected.append(cve_id)
+                continue
+
+            cve = CVEEnrichment._parse_cve(cve_data)
+            if not cve:
+                continue
+
+            cve_rows.append({
+                "cve_id": cve.cve_id,
+                "description": cve.description,
+                "cvss_score": cve.cvss_score,
+                "cvss_vector": cve.cvss_vector,
+                "cvss_version": cve.cvss_version,
+                "severity": cve.severity,
+                "published_date": _as_utc(cve.published_date),
+                "last_modified": _as_utc(cve.last_modified),
+                "references": json.dumps(cve.references),
+                "cwe_ids": json.dumps(cve.cwe_ids),
+            })
+            match_rows.extend({"cve_id": cve.cve_id, **m} for m in _iter_cpe_matches(cve_data))
+
+        if rejected:
+            db.execute(
+                text("DELETE FROM nvd_cve WHERE cve_id = ANY(:ids)"),
+                {"ids": rejected}
+            )
+
+        if not cve_rows:
+            return 0
+
+        # Ne garder que les CVE au moins aussi récentes que la version stockée
+        # (un flux annuel réimporté ne doit pas écraser un flux delta plus récent)
+        stored = {
+            cve_id: _as_utc(last_modified)
+            for cve_id, last_modified in db.execute(
+                text("SELECT cve_id, last_modified FROM nvd_cve WHERE cve_id = ANY(:ids)"),
+                {"ids": [row["cve_id"] for row in cve_rows]}
+            ).fetchall()
+        }
+        cve_rows = [
+            row for row in cve_rows
+            if stored.get(row["cve_id"]) is None
+            or row["last_modified"] is None
+            or row["last_modified"] >= stored[row["cve_id"]]
+        ]
+        if not cve_rows:
+            return 0
+        cve_ids = {row["cve_id"] for row in cve_rows}
+        match_rows = [m for m in match_rows if m["cve_id"] in cve_ids]
+
+        db.execute(text("""
+            INSERT INTO nvd_cve (
+                cve_id, description, cvss_score, cvss_vector, cvss_version,
+                severity, published_date, last_modified, "references", cwe_ids
+            )
+            VALUES (
+                :cve_id, :description, :cvss_score, :cvss_vector, :cvss_version,
+                :severity, :published_date, :last_modified,
+                CAST(:references AS jsonb), CAST(:cwe_ids AS jsonb)
+            )
+            ON CONFLICT (cve_id) DO UPDATE SET
+                description = EXCLUDED.description,
+                cvss_score = EXCLUDED.cvss_score,
+                cvss_vector = EXCLUDED.cvss_vector,
+                cvss_version = EXCLUDED.cvss_version,
+                severity = EXCLUDED.severity,
+                published_date = EXCLUDED.published_date,
+                last_modified = EXCLUDED.last_modified,
+                "references" = EXCLUDED."references",
+                cwe_ids = EXCLUDED.cwe_ids
+        """), cve_rows)
+
+        db.execute(text("DELETE FROM nvd_cpe_match WHERE cve_id = ANY(:ids)"), {"ids": list(cve_ids)})
+        if match_rows:
+            db.execute(text("""
+                INSERT INTO nvd_cpe_match (
+                    cve_id, vendor, product, version,
+                    version_start_including, version_start_excluding,
+                    version_end_including, version_end_excluding
+                )
+                VALUES (
+                    :cve_id, :vendor, :product, :version,
+                    :version_start_including, :version_start_excluding,
+                    :version_end_including, :version_end_excluding
+                )
+            """), match_rows)
+
+        return len(cve_rows)
+
+
+def download_feeds(names: Iterable[str] = ("modified", "recent"), directory: Optional[str] = None) -> list[Path]:
+    """
+    Télécharge des flux NVD (ex: "modified", "recent", "2024") dans le répertoire.
+
+    À n'utiliser que depuis une zone ayant accès à nvd.nist.gov ; les workers
+    en zone restreinte se contentent d'importer les fichiers déposés.
+    """
+    import httpx
+
+    feeds_dir = Path(directory or NVD_FEEDS_DIR)
+    feeds_dir.mkdir(parents=True, exist_ok=True)
+
+    downloaded = []
+    with httpx.Client(timeout=120.0, follow_redirects=True) as client:
+        for name in names:
+            filename = f"nvdcve-2.0-{name}.json.gz"
+            response = client.get(f"{NVD_FEEDS_URL}/{filename}")
+            response.raise_for_status()
+            target = feeds_dir / filename
+            tmp = target.with_suffix(".tmp")
+            tmp.write_bytes(response.content)
+            tmp.replace(target)
+            downloaded.append(target)
+            logger.info(f"📥 Flux NVD téléchargé: {filename}")
+
+    return downloaded
+
+
+# Instance globale (une par process)
+nvd_store = NVDStore()
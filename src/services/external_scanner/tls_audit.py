@@ -214,6 +214,66 @@ class TLSAuditor:
 
         return result
 
+    def fingerprint(self, target: str, port: int = 443) -> Optional[dict]:
+        """
+        Empreinte TLS légère (sans sslyze) : numéro de série du certificat et
+        versions TLS 1.0 à 1.3 acceptées, obtenues par quelques handshakes.
+
+        Sert au rescan différentiel : un audit complet n'est relancé que si
+        l'empreinte a changé depuis le dernier audit.
+
+        Args:
+            target: Domaine ou IP
+            port: Port TLS
+
+        Returns:
+            {"serial_number": str, "protocols": {"tls10": bool, ...}} ou None
+            si le serveur est injoignable en TLS
+        """
+        import socket
+        import ssl
+        from cryptography import x509
+
+        timeout = min(10, self.timeout)
+
+        def handshake(version=None) -> bytes:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            try:
+                # Autoriser les anciennes versions/ciphers pour les détecter
+                context.set_ciphers("ALL:@SECLEVEL=0")
+            except ssl.SSLError:
+                pass
+            if version is not None:
+                context.minimum_version = version
+                context.maximum_version = version
+            with socket.create_connection((target, port), timeout=timeout) as sock:
+                with context.wrap_socket(sock, server_hostname=target) as tls:
+                    return tls.getpeercert(binary_form=True)
+
+        try:
+            der = handshake()
+            serial_number = str(x509.load_der_x509_certificate(der).serial_number)
+        except Exception as e:
+            logger.info(f"Empreinte TLS impossible {target}:{port}: {e}")
+            return None
+
+        protocols = {}
+        for name, version in (
+            ("tls10", ssl.TLSVersion.TLSv1),
+            ("tls11", ssl.TLSVersion.TLSv1_1),
+            ("tls12", ssl.TLSVersion.TLSv1_2),
+            ("tls13", ssl.TLSVersion.TLSv1_3),
+        ):
+            try:
+                handshake(version)
+                protocols[name] = True
+            except (OSError, ValueError):
+                protocols[name] = False
+
+        return {"serial_number": serial_number, "protocols": protocols}
+
     def _parse_cipher_results(self, scan_result, result: TLSAuditResult):
         """Parse les résultats des cipher suites (sslyze 6.x API)."""
         try:
@@ -0,0 +1,209 @@
+"""
+Registre des modèles d'embedding (un chargement par process)
+
+Les services d'embedding (exigences, points de contrôle, réponses, mapping
+cross-référentiel) partagent le même tokenizer et les mêmes poids : le
+registre charge chaque modèle une seule fois par process, à la première
+utilisation, ou au démarrage si ``EMBEDDING_WARMUP_ON_STARTUP`` est activé.
+
+Variante optionnelle quantifiée dynamiquement en int8 (CPU uniquement) via
+``EMBEDDING_QUANTIZE_INT8`` : moins de RAM et une inférence plus rapide sur CPU.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadedModel:
+    """Modèle chargé et ses métriques de chargement"""
+    model_path: str
+    tokenizer: Any
+    model: Any
+    device: Any
+    quantized: bool
+    load_time_seconds: float
+    memory_bytes: int
+    loaded_at: float = field(default_factory=time.time)
+    warmed_up: bool = False
+
+
+def _model_memory_bytes(model) -> int:
+    """Taille des paramètres et buffers du modèle (octets)"""
+    size = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        size += tensor.numel() * tensor.element_size()
+    # Les couches quantifiées stockent leurs poids packés hors parameters()
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if packed is not None and hasattr(packed, "_weight_bias"):
+            try:
+                weight, bias = packed._weight_bias()
+                size += weight.numel() * weight.element_size()
+                if bias is not None:
+                    size += bias.numel() * bias.element_size()
+            except Exception:
+                pass
+    return size
+
+
+class ModelRegistry:
+    """
+    Registre process-wide des modèles Hugging Face.
+
+    Thread-safe : deux requêtes concurrentes qui demandent le même modèle
+    déclenchent un seul chargement.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, bool], LoadedModel] = {}
+        self._lock = threading.Lock()
+        self._loading_locks: Dict[Tuple[str, bool], threading.Lock] = {}
+
+    def get(self, model_path: Optional[str] = None, quantized: Optional[bool] = None) -> LoadedModel:
+        """
+        Retourne le modèle demandé, en le chargeant au premier appel.
+
+        Args:
+            model_path: Nom/chemin HF du modèle (défaut: settings.embedding_model)
+            quantized: Variante int8 (défaut: settings.embedding_quantize_int8)
+        """
+        model_path = model_path or settings.embedding_model
+        if quantized is None:
+            quantized = settings.embedding_quantize_int8
+        key = (model_path, bool(quantized))
+
+        loaded = self._models.get(key)
+        if loaded is not None:
+            return loaded
+
+        with self._lock:
+            loading_lock = self._loading_locks.setdefault(key, threading.Lock())
+
+        with loading_lock:
+            loaded = self._models.get(key)
+            if loaded is None:
+                loaded = self._load(model_path, bool(quantized))
+                self._models[key] = loaded
+            return loaded
+
+    def _load(self, model_path: str, quantized: bool) -> LoadedModel:
+        """Charge le tokenizer et les poids depuis le cache Hugging Face local"""
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+
+        # Configurer HF_HOME pour utiliser le cache local
+        os.environ["HF_HOME"] = settings.hf_home
+
+        # Threads intra-op torch (0 = valeur par défaut de torch)
+        if settings.embedding_num_threads > 0:
+            torch.set_num_threads(settings.embedding_num_threads)
+
+        start = time.perf_counter()
+        logger.info(f"🔄 Chargement du modèle depuis le cache HF : {model_path}")
+
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(
+                model_path,
+                cache_dir=settings.models_cache_dir,
+                local_files_only=False  # Permet d'utiliser le cache local s'il existe
+            )
+            model = AutoModel.from_pretrained(
+                model_path,
+                cache_dir=settings.models_cache_dir,
+                local_files_only=False
+            )
+        except Exception as e:
+            logger.error(f"❌ Erreur chargement modèle : {e}")
+            raise RuntimeError(f"Échec chargement modèle ({model_path}): {e}")
+
+        # Force CPU si pas de GPU
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        model.eval()
+
+        if quantized:
+            if device.type != "cpu":
+                logger.warning("⚠️ Quantification int8 ignorée : disponible uniquement sur CPU")
+                quantized = False
+            else:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        model.to(device)
+
+        loaded = LoadedModel(
+            model_path=model_path,
+            tokenizer=tokenizer,
+            model=model,
+            device=device,
+            quantized=quantized,
+            load_time_seconds=round(time.perf_counter() - start, 2),
+            memory_bytes=_model_memory_bytes(model),
+        )
+
+        logger.info(
+            f"✅ Modèle chargé sur {device} : {model_path} "
+            f"({'int8, ' if quantized else ''}{loaded.memory_bytes / 1024 / 1024:.0f} Mo, "
+            f"{loaded.load_time_seconds}s, threads={torch.get_num_threads()})"
+        )
+        return loaded
+
+    def warmup(self, model_paths: Optional[Iterable[str]] = None) -> None:
+        """
+        Charge les modèles et exécute une passe à vide (allocations, kernels).
+
+        Args:
+            model_paths: Modèles à préchauffer (défaut: settings.embedding_model)
+        """
+        import torch
+
+        for model_path in model_paths or [settings.embedding_model]:
+            loaded = self.get(model_path)
+            if loaded.warmed_up:
+                continue
+
+            start = time.perf_counter()
+            inputs = loaded.tokenizer(["warmup"], return_tensors="pt", padding=True)
+            inputs = {k: v.to(loaded.device) for k, v in inputs.items()}
+            with torch.no_grad():
+                loaded.model(**inputs)
+            loaded.warmed_up = True
+
+            logger.info(f"🔥 Modèle préchauffé : {model_path} ({time.perf_counter() - start:.2f}s)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Modèles chargés, empreinte mémoire et temps de chargement"""
+        models = [
+            {
+                "model_path": m.model_path,
+                "quantized": m.quantized,
+                "device": str(m.device),
+                "memory_mb": round(m.memory_bytes / 1024 / 1024, 1),
+                "load_time_seconds": m.load_time_seconds,
+                "loaded_at": m.loaded_at,
+                "warmed_up": m.warmed_up,
+            }
+            for m in self._models.values()
+        ]
+        return {
+            "loaded_models": len(models),
+            "total_memory_mb": round(sum(m["memory_mb"] for m in models), 1),
+            "models": models,
+        }
+
+    def clear(self) -> None:
+        """Décharge tous les modèles (tests)"""
+        with self._lock:
+            self._models.clear()
+            self._loading_locks.clear()
+
+
+# Instance globale (une par process)
+model_registry = ModelRegistry()
@@ -0,0 +1,392 @@
+"""
+Service de rendu CPU des rapports dans un pool de process.
+
+La génération des graphiques (matplotlib, backend Agg) et la conversion
+HTML -> PDF (xhtml2pdf) sont liées au CPU et gardent le GIL : exécutées dans
+le thread de la requête ou du worker, elles bloquent les autres handlers et
+ne profitent pas des autres cœurs. Elles sont envoyées à un pool borné de
+process :
+- matplotlib et xhtml2pdf sont importés une fois par process du pool
+- limite de temps par tâche : alarme dans le process de rendu
+  (RENDER_TASK_TIMEOUT_SECONDS), puis arrêt forcé du pool si le process ne
+  rend pas la main (boucle dans du code C). Le délai court à partir du
+  démarrage effectif de la tâche, signalé par le process de rendu : une
+  tâche en attente derrière un rendu long n'est pas comptée en retard
+- limite mémoire par process (RENDER_MAX_MEMORY_MB, espace d'adressage :
+  Linux n'applique pas RLIMIT_RSS) ; process recyclés après
+  RENDER_MAX_TASKS_PER_CHILD tâches
+- RENDER_POOL_WORKERS=0 : rendu dans le process appelant (développement,
+  Windows) ; idem si le process appelant ne peut pas créer de process
+  (process worker Celery daemon, ex: generate_report_job_task). Depuis le
+  thread principal, le rendu dans le process appelant garde la limite de
+  temps (alarme) et une limite mémoire temporaire : RLIMIT_AS abaissé à
+  l'espace d'adressage courant + RENDER_MAX_MEMORY_MB, puis restauré. Depuis
+  un autre thread (alarme impossible, limite partagée par tout le process),
+  aucune limite n'est appliquée : seule la time_limit de la tâche appelante
+  s'applique
+
+Les graphiques déjà en cache (voir chart_cache.py) ne passent pas par le pool.
+
+Exemple d'utilisation:
+    pdf_bytes = render_pdf(html_content)
+    png_bytes = render_chart("generate_radar_chart", color_scheme, labels=labels, datasets=datasets)
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+RENDER_POOL_WORKERS = int(os.getenv("RENDER_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+RENDER_TASK_TIMEOUT_SECONDS = int(os.getenv("RENDER_TASK_TIMEOUT_SECONDS", "120"))
+RENDER_MAX_MEMORY_MB = int(os.getenv("RENDER_MAX_MEMORY_MB", "1536"))
+RENDER_MAX_TASKS_PER_CHILD = int(os.getenv("RENDER_MAX_TASKS_PER_CHILD", "50"))
+
+# Délai laissé au process de rendu après l'alarme avant l'arrêt forcé du pool
+RENDER_KILL_GRACE_SECONDS = 10
+
+# Intervalle de vérification du démarrage effectif d'une tâche
+_POLL_SECONDS = 0.5
+
+
+class RenderError(Exception):
+    """Échec du rendu (délai dépassé, limite mémoire, process arrêté)."""
+
+
+class RenderTimeout(RenderError):
+    """Délai de rendu dépassé."""
+
+
+# ==============================================================================
+# PROCESS DE RENDU
+# ==============================================================================
+
+def _init_worker(max_memory_mb: int) -> None:
+    """Initialise un process de rendu (limite mémoire, imports)."""
+    # Un seul thread BLAS par process: le parallélisme vient du pool
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+    if resource is not None and max_memory_mb > 0:
+        limit = max_memory_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError) as e:
+            logger.warning(f"⚠️ Limite mémoire du rendu non appliquée: {e}")
+
+    # Import unique par process (plusieurs centaines de ms chacun)
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot  # noqa: F401
+    except ImportError:
+        pass
+    try:
+        from xhtml2pdf import pisa  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _raise_timeout(signum, frame):
+    raise RenderTimeout("Délai de rendu dépassé")
+
+
+def _run_with_time_limit(timeout: int, func: Callable, *args) -> Any:
+    """Exécute func dans le process de rendu, interrompue après timeout secondes."""
+    if not hasattr(signal, "setitimer"):
+        return func(*args)
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _address_space_bytes() -> Optional[int]:
+    """Espace d'adressage courant du process (Linux), None si inconnu."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@contextmanager
+def _scoped_memory_limit(max_memory_mb: int):
+    """Limite l'espace d'adressage à l'usage courant + max_memory_mb, puis la restaure."""
+    current = _address_space_bytes() if resource is not None and max_memory_mb > 0 else None
+    if current is None:
+        yield
+        return
+
+    previous = resource.getrlimit(resource.RLIMIT_AS)
+    limit = current + max_memory_mb * 1024 * 1024
+    if previous[1] != resource.RLIM_INFINITY:
+        limit = min(limit, previous[1])
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, previous[1]))
+    except (ValueError, OSError) as e:
+        logger.warning(f"⚠️ Limite mémoire du rendu non appliquée: {e}")
+        yield
+        return
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, previous)
+
+
+def _run_inline(timeout: int, func: Callable, *args) -> Any:
+    """Rendu dans le process appelant (limites de temps et de mémoire depuis le thread principal)."""
+    if threading.current_thread() is not threading.main_thread():
+        return func(*args)
+    with _scoped_memory_limit(RENDER_MAX_MEMORY_MB):
+        return _run_with_time_limit(timeout, func, *args)
+
+
+def _run_task(task_id: str, starts, timeout: int, func: Callable, *args) -> Any:
+    """Point d'entrée d'une tâche dans le process de rendu (signale son démarrage)."""
+    try:
+        starts[task_id] = time.time()
+    except Exception:
+        pass
+    return _run_with_time_limit(timeout, func, *args)
+
+
+def _html_to_pdf(html: str) -> bytes:
+    """Conversion HTML -> PDF (xhtml2pdf)."""
+    from io import BytesIO
+    from xhtml2pdf import pisa
+
+    buffer = BytesIO()
+    status = pisa.CreatePDF(html, dest=buffer, encoding="utf-8")
+    if status.err:
+        raise RenderError(f"xhtml2pdf a rencontré {status.err} erreur(s)")
+    return buffer.getvalue()
+
+
+def _generate_chart(method_name: str, color_scheme: Optional[Dict[str, str]], kwargs: Dict[str, Any]) -> bytes:
+    """Génération d'un graphique (méthode ChartGenerator, hors cache)."""
+    from .chart_generator import ChartGenerator
+
+    generator = ChartGenerator(color_scheme)
+    method = getattr(ChartGenerator, method_name)
+    return getattr(method, "__wrapped__", method)(generator, **kwargs)
+
+
+# ==============================================================================
+# POOL
+# ==============================================================================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pool_unavailable = False
+
+# Démarrage effectif des tâches {task_id: time.time()}, renseigné par les
+# process de rendu (dictionnaire partagé d'un process Manager)
+_manager = None
+_task_starts = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool de rendu (créé au premier appel), None si le process ne peut pas en créer."""
+    global _pool, _manager, _task_starts, _pool_unavailable
+    with _pool_lock:
+        if _pool is None and not _pool_unavailable:
+            if multiprocessing.current_process().daemon:
+                # Process daemon (worker Celery prefork): pas de process enfants
+                logger.warning("⚠️ Process daemon: pool de rendu indisponible, rendu dans le process courant")
+                _pool_unavailable = True
+                return None
+            try:
+                if _manager is None:
+                    _manager = multiprocessing.get_context("spawn").Manager()
+                    _task_starts = _manager.dict()
+                _pool = ProcessPoolExecutor(
+                    max_workers=RENDER_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(RENDER_MAX_MEMORY_MB,),
+                    max_tasks_per_child=RENDER_MAX_TASKS_PER_CHILD or None
+                )
+            except (AssertionError, OSError) as e:
+                logger.warning(f"⚠️ Pool de rendu indisponible, rendu dans le process courant: {e}")
+                _pool_unavailable = True
+                return None
+            logger.info(f"🖨️ Pool de rendu démarré ({RENDER_POOL_WORKERS} process)")
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Arrête un pool (process tués) ; le prochain rendu en crée un nouveau."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        try:
+            process.kill()
+        except Exception:
+            pass
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(pool: ProcessPoolExecutor, task_id: str, timeout: int, func: Callable, *args):
+    global _pool_unavailable
+    try:
+        return pool.submit(_run_task, task_id, _task_starts, timeout, func, *args)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        pool = _get_pool()
+        return pool.submit(_run_task, task_id, _task_starts, timeout, func, *args) if pool else None
+    except AssertionError as e:
+        # Process daemon (worker Celery prefork): pas de process enfants
+        logger.warning(f"⚠️ Pool de rendu indisponible, rendu dans le process courant: {e}")
+        _pool_unavailable = True
+        _discard_pool(pool)
+        return None
+
+
+def run_render_task(func: Callable, *args, timeout: Optional[int] = None) -> Any:
+    """
+    Exécute une fonction de rendu dans le pool.
+
+    Args:
+        func: Fonction de niveau module (sérialisable) exécutée dans le pool
+        timeout: Limite de temps en secondes (RENDER_TASK_TIMEOUT_SECONDS)
+
+    Returns:
+        Résultat de func
+
+    Raises:
+        RenderTimeout: Délai dépassé
+        RenderError: Limite mémoire atteinte ou process de rendu arrêté
+    """
+    timeout = timeout or RENDER_TASK_TIMEOUT_SECONDS
+
+    pool = _get_pool() if RENDER_POOL_WORKERS > 0 else None
+    task_id = uuid.uuid4().hex
+    future = _submit(pool, task_id, timeout, func, *args) if pool is not None else None
+    if future is None:
+        try:
+            return _run_inline(timeout, func, *args)
+        except MemoryError as e:
+            raise RenderError("Limite mémoire du rendu atteinte") from e
+
+    # Le délai court à partir du démarrage signalé par le process de rendu
+    # (attente en file exclue) ; l'alarme du process interrompt normalement
+    # la tâche avant : l'arrêt du pool n'est qu'un dernier recours
+    deadline = None
+    try:
+        while True:
+            try:
+                wait = _POLL_SECONDS if deadline is None else max(deadline - time.time(), 0)
+                return future.result(timeout=wait)
+            except FutureTimeoutError:
+                if deadline is None:
+                    started = _task_started_at(task_id)
+                    if started is not None:
+                        deadline = started + timeout + RENDER_KILL_GRACE_SECONDS
+                    continue
+                logger.error(f"❌ Rendu bloqué après {timeout}s: arrêt du pool de rendu")
+                _discard_pool(pool)
+                raise RenderTimeout(f"Rendu interrompu après {timeout}s")
+            except BrokenProcessPool as e:
+                _discard_pool(pool)
+                raise RenderError("Process de rendu arrêté (limite mémoire ou plantage)") from e
+            except MemoryError as e:
+                raise RenderError("Limite mémoire du rendu atteinte") from e
+    finally:
+        _forget_task(task_id)
+
+
+def _task_started_at(task_id: str) -> Optional[float]:
+    """Démarrage effectif d'une tâche (None si pas encore démarrée)."""
+    try:
+        return _task_starts.get(task_id)
+    except Exception:
+        return None
+
+
+def _forget_task(task_id: str) -> None:
+    try:
+        _task_starts.pop(task_id, None)
+    except Exception:
+        pass
+
+
+def render_pdf(html: str, timeout: Optional[int] = None) -> bytes:
+    """
+    Convertit un document HTML en PDF (xhtml2pdf) dans le pool de rendu.
+
+    Raises:
+        ImportError: xhtml2pdf non installé
+        RenderError: Erreur xhtml2pdf, délai ou limite mémoire dépassés
+    """
+    return run_render_task(_html_to_pdf, html, timeout=timeout)
+
+
+def render_chart(
+    method_name: str,
+    color_scheme: Optional[Dict[str, str]] = None,
+    timeout: Optional[int] = None,
+    **kwargs
+) -> bytes:
+    """
+    Génère un graphique (méthode ChartGenerator.generate_*) dans le pool de
+    rendu, ou le lit dans le cache des graphiques.
+
+    Args:
+        method_name: Méthode de ChartGenerator (ex: "generate_radar_chart")
+        color_scheme: Palette du template
+        timeout: Limite de temps en secondes
+        **kwargs: Paramètres de la méthode
+
+    Returns:
+        Bytes de l'image PNG
+    """
+    from .chart_cache import chart_params, get_or_generate
+    from .chart_generator import ChartGenerator
+
+    method = getattr(ChartGenerator, method_name)
+    color_scheme = color_scheme or ChartGenerator.DEFAULT_COLOR_SCHEME
+
+    return get_or_generate(
+        method.chart_type,
+        chart_params(method.__wrapped__, **kwargs),
+        color_scheme,
+        lambda: run_render_task(_generate_chart, method_name, color_scheme, kwargs, timeout=timeout)
+    )
+
+
+@atexit.register
+def shutdown_render_pool() -> None:
+    """Arrête le pool de rendu (fin du process)."""
+    global _pool, _manager, _task_starts
+    with _pool_lock:
+        pool, _pool = _pool, None
+        manager, _manager, _task_starts = _manager, None, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    if manager is not None:
+        try:
+            manager.shutdown()
+        except Exception:
+            pass
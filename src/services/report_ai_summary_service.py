@@ -3,6 +3,13 @@ Service de génération de résumés IA pour les rapports d'audit.
 
 Génère des résumés exécutifs en utilisant DeepSeek/Ollama avec différents
 tons adaptés aux publics cibles (Direction, RSSI, Auditeurs).
+
+Appels au modèle :
+- client HTTP async mutualisé (keep-alive), un par boucle d'événements ;
+  les appels synchrones passent par une boucle longue durée du thread
+  (``run_sync``), le client de ce thread survit ainsi d'un rapport à l'autre
+- résumés mis en cache par (ton, empreinte des prompts) : une campagne
+  inchangée (figée) réutilise les résumés déjà générés
 """
 
 from typing import Dict, Any, List, Optional
@@ -10,12 +17,68 @@ from uuid import UUID
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+import asyncio
+import hashlib
 import httpx
 import os
 import logging
+import threading
+import weakref
+
+from .report_snapshot_service import get_snapshot
+from ..utils.event_loop import run_sync
+from ..utils.redis_manager import redis_manager
 
 logger = logging.getLogger(__name__)
 
+AI_SUMMARY_CACHE_ENABLED = os.getenv("AI_SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+AI_SUMMARY_CACHE_TTL = int(os.getenv("AI_SUMMARY_CACHE_TTL", "2592000"))  # 30 jours
+# Appels simultanés au modèle (widgets IA d'un même rapport)
+AI_SUMMARY_CONCURRENCY = int(os.getenv("AI_SUMMARY_CONCURRENCY", "3"))
+
+CACHE_KEY_PREFIX = "ai:report_summary:"
+
+# Un client par boucle d'événements (un AsyncClient est lié à sa boucle) :
+# run_sync crée une boucle par thread (jobs traités dans le pool de threads de l'API)
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_http_clients_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Client HTTP Ollama mutualisé (keep-alive) de la boucle d'événements courante."""
+    loop = asyncio.get_running_loop()
+    with _http_clients_lock:
+        client = _http_clients.get(loop)
+        if client is None or client.is_closed:
+            # Timeout élevé pour laisser le modèle travailler
+            client = httpx.AsyncClient(
+                timeout=180,
+                limits=httpx.Limits(
+                    max_connections=max(AI_SUMMARY_CONCURRENCY, 1) * 2,
+                    max_keepalive_connections=max(AI_SUMMARY_CONCURRENCY, 1)
+                )
+            )
+            _http_clients[loop] = client
+        return client
+
+
+async def close_http_client() -> None:
+    """Ferme le client HTTP Ollama de la boucle courante (arrêt du process worker)."""
+    with _http_clients_lock:
+        client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def summary_cache_key(model: str, tone: str, system_prompt: str, user_prompt: str) -> str:
+    """Clé de cache d'un résumé (ton, empreinte du modèle et des prompts)."""
+    digest = hashlib.sha256(
+        "\0".join((model, system_prompt, user_prompt)).encode("utf-8")
+    ).hexdigest()
+    return f"{CACHE_KEY_PREFIX}{tone}:{digest}"
+
 
 class ReportAISummaryService:
     """Génère des résumés IA pour les rapports d'audit."""
@@ -258,8 +321,8 @@ Actions par trimestre avec responsable suggéré et livrables.
         system_prompt = self.SYSTEM_PROMPT + self.CONSOLIDATED_PROMPTS.get(tone, self.CONSOLIDATED_PROMPTS["executive"])
         user_prompt = self._build_consolidated_prompt(campaign_data)
 
-        # 3. Appeler DeepSeek
-        summary_text = await self._call_deepseek(system_prompt, user_prompt)
+        # 3. Appeler DeepSeek (ou réutiliser un résumé identique en cache)
+        summary_text = await self._summarize(system_prompt, user_prompt, tone)
 
         # 4. Structurer la réponse
         return {
@@ -301,8 +364,8 @@ Actions par trimestre avec responsable suggéré et livrables.
         system_prompt = self.SYSTEM_PROMPT + self.INDIVIDUAL_PROMPTS.get(tone, self.INDIVIDUAL_PROMPTS["executive"])
         user_prompt = self._build_individual_prompt(entity_data)
 
-        # 3. Appeler DeepSeek
-        summary_text = await self._call_deepseek(system_prompt, user_prompt)
+        # 3. Appeler DeepSeek (ou réutiliser un résumé identique en cache)
+        summary_text = await self._summarize(system_prompt, user_prompt, tone)
 
         # 4. Structurer la réponse
         return {
@@ -329,27 +392,7 @@ Actions par trimestre avec responsable suggéré et livrables.
         Version synchrone de generate_campaign_summary.
         À utiliser depuis un contexte non-async (ex: job processor).
         """
-        logger.info(f"🤖 [SYNC] Génération résumé campagne {campaign_id} - Ton: {tone}")
-
-        # 1. Collecter les données
-        campaign_data = self._collect_campaign_data(campaign_id, tenant_id)
-
-        # 2. Construire le prompt
-        system_prompt = self.SYSTEM_PROMPT + self.CONSOLIDATED_PROMPTS.get(tone, self.CONSOLIDATED_PROMPTS["executive"])
-        user_prompt = self._build_consolidated_prompt(campaign_data)
-
-        # 3. Appeler DeepSeek (version sync)
-        summary_text = self._call_deepseek_sync(system_prompt, user_prompt)
-
-        # 4. Structurer la réponse
-        return {
-            "executive_summary": summary_text,
-            "key_findings": campaign_data.get("key_findings", []),
-            "top_recommendations": campaign_data.get("top_actions", []),
-            "statistics": campaign_data.get("stats", {}),
-            "tone": tone,
-            "generated_at": datetime.utcnow().isoformat()
-        }
+        return run_sync(self.generate_campaign_summary(campaign_id, tenant_id, tone, language))
 
     def generate_entity_summary_sync(
         self,
@@ -363,27 +406,7 @@ Actions par trimestre avec responsable suggéré et livrables.
         Version synchrone de generate_entity_summary.
         À utiliser depuis un contexte non-async (ex: job processor).
         """
-        logger.info(f"🤖 [SYNC] Génération résumé entité {entity_id} - Ton: {tone}")
-
-        # 1. Collecter les données de l'entité
-        entity_data = self._collect_entity_data(campaign_id, entity_id, tenant_id)
-
-        # 2. Construire le prompt
-        system_prompt = self.SYSTEM_PROMPT + self.INDIVIDUAL_PROMPTS.get(tone, self.INDIVIDUAL_PROMPTS["executive"])
-        user_prompt = self._build_individual_prompt(entity_data)
-
-        # 3. Appeler DeepSeek (version sync)
-        summary_text = self._call_deepseek_sync(system_prompt, user_prompt)
-
-        # 4. Structurer la réponse
-        return {
-            "executive_summary": summary_text,
-            "entity_name": entity_data.get("entity", {}).get("name", "N/A"),
-            "benchmarking": entity_data.get("benchmarking", {}),
-            "recommendations": entity_data.get("recommendations", []),
-            "tone": tone,
-            "generated_at": datetime.utcnow().isoformat()
-        }
+        return run_sync(self.generate_entity_summary(campaign_id, entity_id, tenant_id, tone, language))
 
     # ========================================================================
     # COLLECTE DE DONNÉES
@@ -392,150 +415,10 @@ Actions par trimestre avec responsable suggéré et livrables.
     def _collect_campaign_data(self, campaign_id: UUID, tenant_id: UUID) -> Dict[str, Any]:
         """Collecte les données consolidées de la campagne."""
         try:
-            # Informations campagne
-            # Note: la table campaign utilise launch_date/due_date (pas start_date/end_date)
-            campaign_query = text("""
-                SELECT c.title, c.launch_date, c.due_date, f.name as framework_name
-                FROM campaign c
-                LEFT JOIN questionnaire q ON c.questionnaire_id = q.id
-                LEFT JOIN framework f ON q.framework_id = f.id
-                WHERE c.id = CAST(:campaign_id AS uuid)
-            """)
-            campaign_result = self.db.execute(campaign_query, {"campaign_id": str(campaign_id)}).fetchone()
-
-            # Statistiques globales
-            # NOTE: compliance_status utilise les valeurs anglaises: 'compliant', 'non_compliant', 'partial'
-            stats_query = text("""
-                SELECT
-                    COUNT(DISTINCT qr.id) as total_questions,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status IN ('non_compliant', 'partial') THEN qr.id END) as nc_count
-                FROM question_answer qr
-                JOIN audit a ON qr.audit_id = a.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-            """)
-            stats_result = self.db.execute(stats_query, {"campaign_id": str(campaign_id)}).fetchone()
-
-            total_questions = stats_result.total_questions or 0
-            conformes = stats_result.conformes or 0
-            conformity_rate = round((conformes / total_questions * 100), 1) if total_questions > 0 else 0
-
-            # Entités
-            entities_query = text("""
-                SELECT
-                    ee.id, ee.name, ee.stakeholder_type,
-                    COUNT(DISTINCT qr.id) as questions,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes
-                FROM ecosystem_entity ee
-                JOIN audit a ON a.entity_id = ee.id
-                JOIN question_answer qr ON qr.audit_id = a.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                GROUP BY ee.id, ee.name, ee.stakeholder_type
-            """)
-            entities_results = self.db.execute(entities_query, {"campaign_id": str(campaign_id)}).fetchall()
-
-            entities_summary = []
-            for e in entities_results:
-                score = round((e.conformes / e.questions * 100), 1) if e.questions > 0 else 0
-                entities_summary.append({
-                    "name": e.name,
-                    "type": e.stakeholder_type or "N/A",
-                    "score": score,
-                    "level": self._get_maturity_level(score)
-                })
-
-            # Domaines
-            domains_query = text("""
-                SELECT
-                    COALESCE(d.code_officiel, d.code) as name,
-                    COUNT(DISTINCT qr.id) as questions,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes
-                FROM domain d
-                JOIN requirement r ON r.domain_id = d.id
-                JOIN question q ON q.requirement_id = r.id
-                JOIN question_answer qr ON qr.question_id = q.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                GROUP BY d.id, COALESCE(d.code_officiel, d.code)
-                ORDER BY d.code
-            """)
-            domains_results = self.db.execute(domains_query, {"campaign_id": str(campaign_id)}).fetchall()
-
-            domain_analysis = []
-            for d in domains_results:
-                rate = round((d.conformes / d.questions * 100), 1) if d.questions > 0 else 0
-                domain_analysis.append({
-                    "name": d.name,
-                    "conformity_rate": rate
-                })
-
-            # NC critiques
-            nc_query = text("""
-                SELECT
-                    ee.name as entity_name,
-                    COALESCE(d.code_officiel, d.code) as domain_name,
-                    q.question_text
-                FROM question_answer qr
-                JOIN audit a ON qr.audit_id = a.id
-                JOIN ecosystem_entity ee ON a.entity_id = ee.id
-                JOIN question q ON qr.question_id = q.id
-                JOIN requirement r ON q.requirement_id = r.id
-                JOIN domain d ON r.domain_id = d.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                  AND qr.compliance_status = 'non_compliant'
-                LIMIT 10
-            """)
-            nc_results = self.db.execute(nc_query, {"campaign_id": str(campaign_id)}).fetchall()
-
-            critical_nc = [
-                {"entity_name": nc.entity_name, "domain": nc.domain_name, "control_point": nc.question_text[:80]}
-                for nc in nc_results
-            ]
-
-            # Statistiques des preuves (attachments)
-            attachments_query = text("""
-                SELECT
-                    COUNT(DISTINCT att.id) as total_attachments,
-                    COUNT(DISTINCT CASE WHEN att.virus_scan_status = 'clean' THEN att.id END) as clean_files,
-                    COUNT(DISTINCT att.answer_id) as answers_with_evidence,
-                    COALESCE(SUM(att.file_size), 0) as total_size_bytes,
-                    array_agg(DISTINCT att.attachment_type) FILTER (WHERE att.attachment_type IS NOT NULL) as attachment_types
-                FROM answer_attachment att
-                JOIN question_answer qr ON att.answer_id = qr.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                  AND att.is_active = true
-                  AND att.deleted_at IS NULL
-            """)
-            attachments_result = self.db.execute(attachments_query, {"campaign_id": str(campaign_id)}).fetchone()
-
-            evidence_stats = {
-                "total_attachments": attachments_result.total_attachments or 0,
-                "clean_files": attachments_result.clean_files or 0,
-                "answers_with_evidence": attachments_result.answers_with_evidence or 0,
-                "total_size_mb": round((attachments_result.total_size_bytes or 0) / (1024 * 1024), 2),
-                "attachment_types": attachments_result.attachment_types or [],
-                "evidence_coverage_rate": round((attachments_result.answers_with_evidence or 0) / total_questions * 100, 1) if total_questions > 0 else 0
-            }
-
-            return {
-                "campaign": {
-                    "title": campaign_result.title if campaign_result else "N/A",
-                    "framework_name": campaign_result.framework_name if campaign_result else "N/A"
-                },
-                "stats": {
-                    "total_questions": total_questions,
-                    "conformity_rate": conformity_rate,
-                    "entities_count": len(entities_summary),
-                    "nc_critical": len([e for e in entities_summary if e["score"] < 50]),
-                    "nc_major": len([e for e in entities_summary if 50 <= e["score"] < 70])
-                },
-                "entities_summary": entities_summary,
-                "domain_analysis": domain_analysis,
-                "critical_nc": critical_nc,
-                "evidence_stats": evidence_stats,
-                "key_findings": self._extract_key_findings(domain_analysis),
-                "top_actions": self._get_top_actions(critical_nc)
-            }
-
+            return get_snapshot(
+                self.db, "ai_campaign", campaign_id, None,
+                lambda: self._query_campaign_data(campaign_id)
+            )
         except Exception as e:
             logger.error(f"❌ Erreur collecte données campagne: {e}")
             # Rollback pour éviter que l'erreur ne bloque les transactions suivantes
@@ -551,280 +434,159 @@ Actions par trimestre avec responsable suggéré et livrables.
                 "critical_nc": []
             }
 
+    def _query_campaign_data(self, campaign_id: UUID) -> Dict[str, Any]:
+        """Requêtes de collecte des données consolidées (lève une exception en cas d'échec)."""
+        # Informations campagne
+        # Note: la table campaign utilise launch_date/due_date (pas start_date/end_date)
+        campaign_query = text("""
+            SELECT c.title, c.launch_date, c.due_date, f.name as framework_name
+            FROM campaign c
+            LEFT JOIN questionnaire q ON c.questionnaire_id = q.id
+            LEFT JOIN framework f ON q.framework_id = f.id
+            WHERE c.id = CAST(:campaign_id AS uuid)
+        """)
+        campaign_result = self.db.execute(campaign_query, {"campaign_id": str(campaign_id)}).fetchone()
+
+        # Statistiques globales
+        # NOTE: compliance_status utilise les valeurs anglaises: 'compliant', 'non_compliant', 'partial'
+        stats_query = text("""
+            SELECT
+                COUNT(DISTINCT qr.id) as total_questions,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status IN ('non_compliant', 'partial') THEN qr.id END) as nc_count
+            FROM question_answer qr
+            JOIN audit a ON qr.audit_id = a.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+        """)
+        stats_result = self.db.execute(stats_query, {"campaign_id": str(campaign_id)}).fetchone()
+
+        total_questions = stats_result.total_questions or 0
+        conformes = stats_result.conformes or 0
+        conformity_rate = round((conformes / total_questions * 100), 1) if total_questions > 0 else 0
+
+        # Entités
+        entities_query = text("""
+            SELECT
+                ee.id, ee.name, ee.stakeholder_type,
+                COUNT(DISTINCT qr.id) as questions,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes
+            FROM ecosystem_entity ee
+            JOIN audit a ON a.entity_id = ee.id
+            JOIN question_answer qr ON qr.audit_id = a.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+            GROUP BY ee.id, ee.name, ee.stakeholder_type
+        """)
+        entities_results = self.db.execute(entities_query, {"campaign_id": str(campaign_id)}).fetchall()
+
+        entities_summary = []
+        for e in entities_results:
+            score = round((e.conformes / e.questions * 100), 1) if e.questions > 0 else 0
+            entities_summary.append({
+                "name": e.name,
+                "type": e.stakeholder_type or "N/A",
+                "score": score,
+                "level": self._get_maturity_level(score)
+            })
+
+        # Domaines
+        domains_query = text("""
+            SELECT
+                COALESCE(d.code_officiel, d.code) as name,
+                COUNT(DISTINCT qr.id) as questions,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes
+            FROM domain d
+            JOIN requirement r ON r.domain_id = d.id
+            JOIN question q ON q.requirement_id = r.id
+            JOIN question_answer qr ON qr.question_id = q.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+            GROUP BY d.id, COALESCE(d.code_officiel, d.code)
+            ORDER BY d.code
+        """)
+        domains_results = self.db.execute(domains_query, {"campaign_id": str(campaign_id)}).fetchall()
+
+        domain_analysis = []
+        for d in domains_results:
+            rate = round((d.conformes / d.questions * 100), 1) if d.questions > 0 else 0
+            domain_analysis.append({
+                "name": d.name,
+                "conformity_rate": rate
+            })
+
+        # NC critiques
+        nc_query = text("""
+            SELECT
+                ee.name as entity_name,
+                COALESCE(d.code_officiel, d.code) as domain_name,
+                q.question_text
+            FROM question_answer qr
+            JOIN audit a ON qr.audit_id = a.id
+            JOIN ecosystem_entity ee ON a.entity_id = ee.id
+            JOIN question q ON qr.question_id = q.id
+            JOIN requirement r ON q.requirement_id = r.id
+            JOIN domain d ON r.domain_id = d.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+              AND qr.compliance_status = 'non_compliant'
+            LIMIT 10
+        """)
+        nc_results = self.db.execute(nc_query, {"campaign_id": str(campaign_id)}).fetchall()
+
+        critical_nc = [
+            {"entity_name": nc.entity_name, "domain": nc.domain_name, "control_point": nc.question_text[:80]}
+            for nc in nc_results
+        ]
+
+        # Statistiques des preuves (attachments)
+        attachments_query = text("""
+            SELECT
+                COUNT(DISTINCT att.id) as total_attachments,
+                COUNT(DISTINCT CASE WHEN att.virus_scan_status = 'clean' THEN att.id END) as clean_files,
+                COUNT(DISTINCT att.answer_id) as answers_with_evidence,
+                COALESCE(SUM(att.file_size), 0) as total_size_bytes,
+                array_agg(DISTINCT att.attachment_type) FILTER (WHERE att.attachment_type IS NOT NULL) as attachment_types
+            FROM answer_attachment att
+            JOIN question_answer qr ON att.answer_id = qr.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+              AND att.is_active = true
+              AND att.deleted_at IS NULL
+        """)
+        attachments_result = self.db.execute(attachments_query, {"campaign_id": str(campaign_id)}).fetchone()
+
+        evidence_stats = {
+            "total_attachments": attachments_result.total_attachments or 0,
+            "clean_files": attachments_result.clean_files or 0,
+            "answers_with_evidence": attachments_result.answers_with_evidence or 0,
+            "total_size_mb": round((attachments_result.total_size_bytes or 0) / (1024 * 1024), 2),
+            "attachment_types": attachments_result.attachment_types or [],
+            "evidence_coverage_rate": round((attachments_result.answers_with_evidence or 0) / total_questions * 100, 1) if total_questions > 0 else 0
+        }
+
+        return {
+            "campaign": {
+                "title": campaign_result.title if campaign_result else "N/A",
+                "framework_name": campaign_result.framework_name if campaign_result else "N/A"
+            },
+            "stats": {
+                "total_questions": total_questions,
+                "conformity_rate": conformity_rate,
+                "entities_count": len(entities_summary),
+                "nc_critical": len([e for e in entities_summary if e["score"] < 50]),
+                "nc_major": len([e for e in entities_summary if 50 <= e["score"] < 70])
+            },
+            "entities_summary": entities_summary,
+            "domain_analysis": domain_analysis,
+            "critical_nc": critical_nc,
+            "evidence_stats": evidence_stats,
+            "key_findings": self._extract_key_findings(domain_analysis),
+            "top_actions": self._get_top_actions(critical_nc)
+        }
+
     def _collect_entity_data(self, campaign_id: UUID, entity_id: UUID, tenant_id: UUID) -> Dict[str, Any]:
         """Collecte les données d'une entité spécifique pour rapport INDIVIDUEL."""
         try:
-            logger.info(f"🔍 DEBUG _collect_entity_data - campaign_id={campaign_id}, entity_id={entity_id}, tenant_id={tenant_id}")
-
-            # ================================================================
-            # 1. INFORMATIONS DE LA CAMPAGNE (contexte essentiel)
-            # ================================================================
-            campaign_query = text("""
-                SELECT
-                    c.title as campaign_title,
-                    c.description as campaign_description,
-                    c.launch_date as start_date,
-                    c.due_date as end_date,
-                    f.name as framework_name,
-                    f.code as framework_code,
-                    f.version as framework_version,
-                    f.description as framework_description,
-                    q.name as questionnaire_name
-                FROM campaign c
-                LEFT JOIN questionnaire q ON c.questionnaire_id = q.id
-                LEFT JOIN framework f ON q.framework_id = f.id
-                WHERE c.id = CAST(:campaign_id AS uuid)
-            """)
-            campaign_result = self.db.execute(campaign_query, {"campaign_id": str(campaign_id)}).fetchone()
-            logger.info(f"🔍 DEBUG campaign_result: {campaign_result}")
-
-            # ================================================================
-            # 2. INFORMATIONS ENRICHIES DE L'ENTITÉ
-            # ================================================================
-            entity_query = text("""
-                SELECT
-                    ee.name,
-                    ee.stakeholder_type,
-                    ee.city,
-                    ee.country_code,
-                    ee.description as entity_description,
-                    ee.entity_category as sector,
-                    ee.legal_name as employee_count,
-                    ee.annual_revenue,
-                    cat.name as category_name,
-                    cat.entity_category
-                FROM ecosystem_entity ee
-                LEFT JOIN categories cat ON ee.category_id = cat.id
-                WHERE ee.id = CAST(:entity_id AS uuid)
-            """)
-            entity_result = self.db.execute(entity_query, {"entity_id": str(entity_id)}).fetchone()
-            logger.info(f"🔍 DEBUG entity_result: {entity_result}")
-            logger.info(f"🔍 DEBUG entity_name: {entity_result.name if entity_result else 'NONE'}")
-
-            # Score de l'entité
-            # NOTE: compliance_status utilise les valeurs anglaises: 'compliant', 'non_compliant', 'partial'
-            score_query = text("""
-                SELECT
-                    COUNT(DISTINCT qr.id) as total_questions,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status IN ('non_compliant', 'partial') THEN qr.id END) as nc_count
-                FROM question_answer qr
-                JOIN audit a ON qr.audit_id = a.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                  AND a.entity_id = CAST(:entity_id AS uuid)
-            """)
-            score_result = self.db.execute(score_query, {
-                "campaign_id": str(campaign_id),
-                "entity_id": str(entity_id)
-            }).fetchone()
-
-            total = score_result.total_questions or 0
-            conformes = score_result.conformes or 0
-            global_score = round((conformes / total * 100), 1) if total > 0 else 0
-            logger.info(f"🔍 DEBUG score: total={total}, conformes={conformes}, global_score={global_score}%")
-
-            # Benchmarking vs autres entités
-            benchmark_query = text("""
-                SELECT
-                    a.entity_id,
-                    COUNT(DISTINCT qr.id) as questions,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes
-                FROM question_answer qr
-                JOIN audit a ON qr.audit_id = a.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                GROUP BY a.entity_id
-            """)
-            benchmark_results = self.db.execute(benchmark_query, {"campaign_id": str(campaign_id)}).fetchall()
-
-            all_scores = []
-            for b in benchmark_results:
-                score = round((b.conformes / b.questions * 100), 1) if b.questions > 0 else 0
-                all_scores.append({"entity_id": str(b.entity_id), "score": score})
-
-            all_scores.sort(key=lambda x: x["score"], reverse=True)
-            position = next((i + 1 for i, s in enumerate(all_scores) if s["entity_id"] == str(entity_id)), 0)
-            avg_score = round(sum(s["score"] for s in all_scores) / len(all_scores), 1) if all_scores else 0
-
-            # Domaines de l'entité
-            domains_query = text("""
-                SELECT
-                    COALESCE(d.code_officiel, d.code) as name,
-                    COUNT(DISTINCT qr.id) as questions,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes,
-                    COUNT(DISTINCT CASE WHEN qr.compliance_status IN ('non_compliant', 'partial') THEN qr.id END) as nc_count
-                FROM domain d
-                JOIN requirement r ON r.domain_id = d.id
-                JOIN question q ON q.requirement_id = r.id
-                JOIN question_answer qr ON qr.question_id = q.id
-                JOIN audit a ON qr.audit_id = a.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                  AND a.entity_id = CAST(:entity_id AS uuid)
-                GROUP BY d.id, COALESCE(d.code_officiel, d.code)
-                ORDER BY d.code
-            """)
-            domains_results = self.db.execute(domains_query, {
-                "campaign_id": str(campaign_id),
-                "entity_id": str(entity_id)
-            }).fetchall()
-
-            domain_analysis = []
-            strengths = []
-            for d in domains_results:
-                rate = round((d.conformes / d.questions * 100), 1) if d.questions > 0 else 0
-                domain_analysis.append({
-                    "name": d.name,
-                    "conformity_rate": rate,
-                    "nc": d.nc_count
-                })
-                if rate >= 80:
-                    strengths.append({"title": d.name, "score": rate})
-
-            # ================================================================
-            # NON-CONFORMITÉS DÉTAILLÉES (avec commentaires et recommandations)
-            # ================================================================
-            # Colonnes vérifiées: domain(title, code, code_officiel), requirement(official_code, title),
-            # question(question_text), control_point(implementation_guidance)
-            nc_query = text("""
-                SELECT
-                    COALESCE(d.code_officiel, d.code) as domain_name,
-                    d.title as domain_full_name,
-                    r.official_code as requirement_code,
-                    r.title as requirement_title,
-                    q.question_text,
-                    qr.comment as auditor_comment,
-                    qr.compliance_status,
-                    cp.implementation_guidance as control_recommendation
-                FROM question_answer qr
-                JOIN audit a ON qr.audit_id = a.id
-                JOIN question q ON qr.question_id = q.id
-                LEFT JOIN requirement r ON q.requirement_id = r.id
-                LEFT JOIN domain d ON r.domain_id = d.id
-                LEFT JOIN control_point cp ON q.control_point_id = cp.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                  AND a.entity_id = CAST(:entity_id AS uuid)
-                  AND qr.compliance_status IN ('non_compliant', 'partial')
-                ORDER BY d.code, r.official_code
-            """)
-            nc_results = self.db.execute(nc_query, {
-                "campaign_id": str(campaign_id),
-                "entity_id": str(entity_id)
-            }).fetchall()
-
-            # Séparer NC totales et partielles
-            nc_total = [nc for nc in nc_results if nc.compliance_status == 'non_compliant']
-            nc_partiel = [nc for nc in nc_results if nc.compliance_status == 'partial']
-
-            non_conformities = {
-                "critical": [
-                    {
-                        "domain": nc.domain_name,
-                        "domain_full": nc.domain_full_name,
-                        "requirement": nc.requirement_code,
-                        "control_point": nc.question_text,
-                        "auditor_comment": nc.auditor_comment or "Aucun commentaire",
-                        "recommendation": nc.control_recommendation or "À définir"
-                    }
-                    for nc in nc_total[:10]  # Top 10 NC totales
-                ],
-                "major": [
-                    {
-                        "domain": nc.domain_name,
-                        "control_point": nc.question_text[:100],
-                        "status": "Partiel",
-                        "auditor_comment": nc.auditor_comment or ""
-                    }
-                    for nc in nc_partiel[:10]  # Top 10 NC partielles
-                ],
-                "total_nc": len(nc_total),
-                "total_partial": len(nc_partiel)
-            }
-
-            # Statistiques des preuves (attachments) pour cette entité
-            entity_attachments_query = text("""
-                SELECT
-                    COUNT(DISTINCT att.id) as total_attachments,
-                    COUNT(DISTINCT CASE WHEN att.virus_scan_status = 'clean' THEN att.id END) as clean_files,
-                    COUNT(DISTINCT att.answer_id) as answers_with_evidence,
-                    COALESCE(SUM(att.file_size), 0) as total_size_bytes,
-                    array_agg(DISTINCT att.attachment_type) FILTER (WHERE att.attachment_type IS NOT NULL) as attachment_types,
-                    array_agg(DISTINCT att.original_filename) FILTER (WHERE att.original_filename IS NOT NULL) as filenames
-                FROM answer_attachment att
-                JOIN question_answer qr ON att.answer_id = qr.id
-                JOIN audit a ON qr.audit_id = a.id
-                WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
-                  AND a.entity_id = CAST(:entity_id AS uuid)
-                  AND att.is_active = true
-                  AND att.deleted_at IS NULL
-            """)
-            entity_attachments_result = self.db.execute(entity_attachments_query, {
-                "campaign_id": str(campaign_id),
-                "entity_id": str(entity_id)
-            }).fetchone()
-
-            evidence_stats = {
-                "total_attachments": entity_attachments_result.total_attachments or 0,
-                "clean_files": entity_attachments_result.clean_files or 0,
-                "answers_with_evidence": entity_attachments_result.answers_with_evidence or 0,
-                "total_size_mb": round((entity_attachments_result.total_size_bytes or 0) / (1024 * 1024), 2),
-                "attachment_types": entity_attachments_result.attachment_types or [],
-                "sample_filenames": (entity_attachments_result.filenames or [])[:10],  # Limiter à 10 exemples
-                "evidence_coverage_rate": round((entity_attachments_result.answers_with_evidence or 0) / total * 100, 1) if total > 0 else 0
-            }
-
-            # Fallback: utiliser le nom du questionnaire si pas de framework
-            framework_name = "N/A"
-            if campaign_result:
-                if campaign_result.framework_name:
-                    framework_name = campaign_result.framework_name
-                elif campaign_result.questionnaire_name:
-                    framework_name = campaign_result.questionnaire_name
-
-            return {
-                # ✅ NOUVEAU: Contexte de la campagne
-                "campaign": {
-                    "title": campaign_result.campaign_title if campaign_result else "N/A",
-                    "description": campaign_result.campaign_description if campaign_result else "",
-                    "framework_name": framework_name,
-                    "framework_code": campaign_result.framework_code if campaign_result and campaign_result.framework_code else "",
-                    "framework_version": campaign_result.framework_version if campaign_result and campaign_result.framework_version else "",
-                    "framework_description": campaign_result.framework_description if campaign_result and campaign_result.framework_description else "",
-                    "questionnaire_name": campaign_result.questionnaire_name if campaign_result and campaign_result.questionnaire_name else "",
-                    "start_date": str(campaign_result.start_date) if campaign_result and campaign_result.start_date else "N/A",
-                    "end_date": str(campaign_result.end_date) if campaign_result and campaign_result.end_date else "N/A"
-                },
-                # ✅ ENRICHI: Informations détaillées de l'entité
-                "entity": {
-                    "name": entity_result.name if entity_result else "N/A",
-                    "type": entity_result.stakeholder_type if entity_result else "N/A",
-                    "city": entity_result.city if entity_result else "N/A",
-                    "country": entity_result.country_code if entity_result else "N/A",
-                    "description": getattr(entity_result, 'entity_description', None) or "",
-                    "sector": getattr(entity_result, 'sector', None) or "Non spécifié",
-                    "employee_count": getattr(entity_result, 'employee_count', None) or "Non spécifié",
-                    "category": getattr(entity_result, 'category_name', None) or "Non catégorisé",
-                    "entity_category": getattr(entity_result, 'entity_category', None) or ""
-                },
-                "score": {
-                    "global_score": global_score,
-                    "maturity_level": self._get_maturity_level(global_score),
-                    "total_questions": total,
-                    "conformes": conformes,
-                    "nc_count": score_result.nc_count or 0
-                },
-                "benchmarking": {
-                    "entity_score": global_score,
-                    "average_score": avg_score,
-                    "position": position,
-                    "total_entities": len(all_scores),
-                    "performance_vs_average": round(global_score - avg_score, 1)
-                },
-                "domain_analysis": domain_analysis,
-                "non_conformities": non_conformities,
-                "evidence_stats": evidence_stats,
-                "strengths": strengths,
-                "recommendations": self._generate_recommendations(domain_analysis, non_conformities)
-            }
-
+            return get_snapshot(
+                self.db, "ai_entity", campaign_id, entity_id,
+                lambda: self._query_entity_data(campaign_id, entity_id, tenant_id)
+            )
         except Exception as e:
             logger.error(f"❌ Erreur collecte données entité: {e}")
             # Rollback pour éviter que l'erreur ne bloque les transactions suivantes
@@ -840,12 +602,291 @@ Actions par trimestre avec responsable suggéré et livrables.
                 "non_conformities": {"critical": [], "major": []}
             }
 
+    def _query_entity_data(self, campaign_id: UUID, entity_id: UUID, tenant_id: UUID) -> Dict[str, Any]:
+        """Requêtes de collecte des données d'une entité (lève une exception en cas d'échec)."""
+        logger.info(f"🔍 DEBUG _collect_entity_data - campaign_id={campaign_id}, entity_id={entity_id}, tenant_id={tenant_id}")
+
+        # ================================================================
+        # 1. INFORMATIONS DE LA CAMPAGNE (contexte essentiel)
+        # ================================================================
+        campaign_query = text("""
+            SELECT
+                c.title as campaign_title,
+                c.description as campaign_description,
+                c.launch_date as start_date,
+                c.due_date as end_date,
+                f.name as framework_name,
+                f.code as framework_code,
+                f.version as framework_version,
+                f.description as framework_description,
+                q.name as questionnaire_name
+            FROM campaign c
+            LEFT JOIN questionnaire q ON c.questionnaire_id = q.id
+            LEFT JOIN framework f ON q.framework_id = f.id
+            WHERE c.id = CAST(:campaign_id AS uuid)
+        """)
+        campaign_result = self.db.execute(campaign_query, {"campaign_id": str(campaign_id)}).fetchone()
+        logger.info(f"🔍 DEBUG campaign_result: {campaign_result}")
+
+        # ================================================================
+        # 2. INFORMATIONS ENRICHIES DE L'ENTITÉ
+        # ================================================================
+        entity_query = text("""
+            SELECT
+                ee.name,
+                ee.stakeholder_type,
+                ee.city,
+                ee.country_code,
+                ee.description as entity_description,
+                ee.entity_category as sector,
+                ee.legal_name as employee_count,
+                ee.annual_revenue,
+                cat.name as category_name,
+                cat.entity_category
+            FROM ecosystem_entity ee
+            LEFT JOIN categories cat ON ee.category_id = cat.id
+            WHERE ee.id = CAST(:entity_id AS uuid)
+        """)
+        entity_result = self.db.execute(entity_query, {"entity_id": str(entity_id)}).fetchone()
+        logger.info(f"🔍 DEBUG entity_result: {entity_result}")
+        logger.info(f"🔍 DEBUG entity_name: {entity_result.name if entity_result else 'NONE'}")
+
+        # Score de l'entité
+        # NOTE: compliance_status utilise les valeurs anglaises: 'compliant', 'non_compliant', 'partial'
+        score_query = text("""
+            SELECT
+                COUNT(DISTINCT qr.id) as total_questions,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status IN ('non_compliant', 'partial') THEN qr.id END) as nc_count
+            FROM question_answer qr
+            JOIN audit a ON qr.audit_id = a.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+              AND a.entity_id = CAST(:entity_id AS uuid)
+        """)
+        score_result = self.db.execute(score_query, {
+            "campaign_id": str(campaign_id),
+            "entity_id": str(entity_id)
+        }).fetchone()
+
+        total = score_result.total_questions or 0
+        conformes = score_result.conformes or 0
+        global_score = round((conformes / total * 100), 1) if total > 0 else 0
+        logger.info(f"🔍 DEBUG score: total={total}, conformes={conformes}, global_score={global_score}%")
+
+        # Benchmarking vs autres entités
+        benchmark_query = text("""
+            SELECT
+                a.entity_id,
+                COUNT(DISTINCT qr.id) as questions,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes
+            FROM question_answer qr
+            JOIN audit a ON qr.audit_id = a.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+            GROUP BY a.entity_id
+        """)
+        benchmark_results = self.db.execute(benchmark_query, {"campaign_id": str(campaign_id)}).fetchall()
+
+        all_scores = []
+        for b in benchmark_results:
+            score = round((b.conformes / b.questions * 100), 1) if b.questions > 0 else 0
+            all_scores.append({"entity_id": str(b.entity_id), "score": score})
+
+        all_scores.sort(key=lambda x: x["score"], reverse=True)
+        position = next((i + 1 for i, s in enumerate(all_scores) if s["entity_id"] == str(entity_id)), 0)
+        avg_score = round(sum(s["score"] for s in all_scores) / len(all_scores), 1) if all_scores else 0
+
+        # Domaines de l'entité
+        domains_query = text("""
+            SELECT
+                COALESCE(d.code_officiel, d.code) as name,
+                COUNT(DISTINCT qr.id) as questions,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status = 'compliant' THEN qr.id END) as conformes,
+                COUNT(DISTINCT CASE WHEN qr.compliance_status IN ('non_compliant', 'partial') THEN qr.id END) as nc_count
+            FROM domain d
+            JOIN requirement r ON r.domain_id = d.id
+            JOIN question q ON q.requirement_id = r.id
+            JOIN question_answer qr ON qr.question_id = q.id
+            JOIN audit a ON qr.audit_id = a.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+              AND a.entity_id = CAST(:entity_id AS uuid)
+            GROUP BY d.id, COALESCE(d.code_officiel, d.code)
+            ORDER BY d.code
+        """)
+        domains_results = self.db.execute(domains_query, {
+            "campaign_id": str(campaign_id),
+            "entity_id": str(entity_id)
+        }).fetchall()
+
+        domain_analysis = []
+        strengths = []
+        for d in domains_results:
+            rate = round((d.conformes / d.questions * 100), 1) if d.questions > 0 else 0
+            domain_analysis.append({
+                "name": d.name,
+                "conformity_rate": rate,
+                "nc": d.nc_count
+            })
+            if rate >= 80:
+                strengths.append({"title": d.name, "score": rate})
+
+        # ================================================================
+        # NON-CONFORMITÉS DÉTAILLÉES (avec commentaires et recommandations)
+        # ================================================================
+        # Colonnes vérifiées: domain(title, code, code_officiel), requirement(official_code, title),
+        # question(question_text), control_point(implementation_guidance)
+        nc_query = text("""
+            SELECT
+                COALESCE(d.code_officiel, d.code) as domain_name,
+                d.title as domain_full_name,
+                r.official_code as requirement_code,
+                r.title as requirement_title,
+                q.question_text,
+                qr.comment as auditor_comment,
+                qr.compliance_status,
+                cp.implementation_guidance as control_recommendation
+            FROM question_answer qr
+            JOIN audit a ON qr.audit_id = a.id
+            JOIN question q ON qr.question_id = q.id
+            LEFT JOIN requirement r ON q.requirement_id = r.id
+            LEFT JOIN domain d ON r.domain_id = d.id
+            LEFT JOIN control_point cp ON q.control_point_id = cp.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+              AND a.entity_id = CAST(:entity_id AS uuid)
+              AND qr.compliance_status IN ('non_compliant', 'partial')
+            ORDER BY d.code, r.official_code
+        """)
+        nc_results = self.db.execute(nc_query, {
+            "campaign_id": str(campaign_id),
+            "entity_id": str(entity_id)
+        }).fetchall()
+
+        # Séparer NC totales et partielles
+        nc_total = [nc for nc in nc_results if nc.compliance_status == 'non_compliant']
+        nc_partiel = [nc for nc in nc_results if nc.compliance_status == 'partial']
+
+        non_conformities = {
+            "critical": [
+                {
+                    "domain": nc.domain_name,
+                    "domain_full": nc.domain_full_name,
+                    "requirement": nc.requirement_code,
+                    "control_point": nc.question_text,
+                    "auditor_comment": nc.auditor_comment or "Aucun commentaire",
+                    "recommendation": nc.control_recommendation or "À définir"
+                }
+                for nc in nc_total[:10]  # Top 10 NC totales
+            ],
+            "major": [
+                {
+                    "domain": nc.domain_name,
+                    "control_point": nc.question_text[:100],
+                    "status": "Partiel",
+                    "auditor_comment": nc.auditor_comment or ""
+                }
+                for nc in nc_partiel[:10]  # Top 10 NC partielles
+            ],
+            "total_nc": len(nc_total),
+            "total_partial": len(nc_partiel)
+        }
+
+        # Statistiques des preuves (attachments) pour cette entité
+        entity_attachments_query = text("""
+            SELECT
+                COUNT(DISTINCT att.id) as total_attachments,
+                COUNT(DISTINCT CASE WHEN att.virus_scan_status = 'clean' THEN att.id END) as clean_files,
+                COUNT(DISTINCT att.answer_id) as answers_with_evidence,
+                COALESCE(SUM(att.file_size), 0) as total_size_bytes,
+                array_agg(DISTINCT att.attachment_type) FILTER (WHERE att.attachment_type IS NOT NULL) as attachment_types,
+                array_agg(DISTINCT att.original_filename) FILTER (WHERE att.original_filename IS NOT NULL) as filenames
+            FROM answer_attachment att
+            JOIN question_answer qr ON att.answer_id = qr.id
+            JOIN audit a ON qr.audit_id = a.id
+            WHERE qr.campaign_id = CAST(:campaign_id AS uuid)
+              AND a.entity_id = CAST(:entity_id AS uuid)
+              AND att.is_active = true
+              AND att.deleted_at IS NULL
+        """)
+        entity_attachments_result = self.db.execute(entity_attachments_query, {
+            "campaign_id": str(campaign_id),
+            "entity_id": str(entity_id)
+        }).fetchone()
+
+        evidence_stats = {
+            "total_attachments": entity_attachments_result.total_attachments or 0,
+            "clean_files": entity_attachments_result.clean_files or 0,
+            "answers_with_evidence": entity_attachments_result.answers_with_evidence or 0,
+            "total_size_mb": round((entity_attachments_result.total_size_bytes or 0) / (1024 * 1024), 2),
+            "attachment_types": entity_attachments_result.attachment_types or [],
+            "sample_filenames": (entity_attachments_result.filenames or [])[:10],  # Limiter à 10 exemples
+            "evidence_coverage_rate": round((entity_attachments_result.answers_with_evidence or 0) / total * 100, 1) if total > 0 else 0
+        }
+
+        # Fallback: utiliser le nom du questionnaire si pas de framework
+        framework_name = "N/A"
+        if campaign_result:
+            if campaign_result.framework_name:
+                framework_name = campaign_result.framework_name
+            elif campaign_result.questionnaire_name:
+                framework_name = campaign_result.questionnaire_name
+
+        return {
+            # ✅ NOUVEAU: Contexte de la campagne
+            "campaign": {
+                "title": campaign_result.campaign_title if campaign_result else "N/A",
+                "description": campaign_result.campaign_description if campaign_result else "",
+                "framework_name": framework_name,
+                "framework_code": campaign_result.framework_code if campaign_result and campaign_result.framework_code else "",
+                "framework_version": campaign_result.framework_version if campaign_result and campaign_result.framework_version else "",
+                "framework_description": campaign_result.framework_description if campaign_result and campaign_result.framework_description else "",
+                "questionnaire_name": campaign_result.questionnaire_name if campaign_result and campaign_result.questionnaire_name else "",
+                "start_date": str(campaign_result.start_date) if campaign_result and campaign_result.start_date else "N/A",
+                "end_date": str(campaign_result.end_date) if campaign_result and campaign_result.end_date else "N/A"
+            },
+            # ✅ ENRICHI: Informations détaillées de l'entité
+            "entity": {
+                "name": entity_result.name if entity_result else "N/A",
+                "type": entity_result.stakeholder_type if entity_result else "N/A",
+                "city": entity_result.city if entity_result else "N/A",
+                "country": entity_result.country_code if entity_result else "N/A",
+                "description": getattr(entity_result, 'entity_description', None) or "",
+                "sector": getattr(entity_result, 'sector', None) or "Non spécifié",
+                "employee_count": getattr(entity_result, 'employee_count', None) or "Non spécifié",
+                "category": getattr(entity_result, 'category_name', None) or "Non catégorisé",
+                "entity_category": getattr(entity_result, 'entity_category', None) or ""
+            },
+            "score": {
+                "global_score": global_score,
+                "maturity_level": self._get_maturity_level(global_score),
+                "total_questions": total,
+                "conformes": conformes,
+                "nc_count": score_result.nc_count or 0
+            },
+            "benchmarking": {
+                "entity_score": global_score,
+                "average_score": avg_score,
+                "position": position,
+                "total_entities": len(all_scores),
+                "performance_vs_average": round(global_score - avg_score, 1)
+            },
+            "domain_analysis": domain_analysis,
+            "non_conformities": non_conformities,
+            "evidence_stats": evidence_stats,
+            "strengths": strengths,
+            "recommendations": self._generate_recommendations(domain_analysis, non_conformities)
+        }
+
     # ========================================================================
     # CONSTRUCTION DES PROMPTS
     # ========================================================================
 
     def _build_consolidated_prompt(self, data: Dict[str, Any]) -> str:
-        """Construit le prompt utilisateur pour rapport consolidé."""
+        """
+        Construit le prompt utilisateur pour rapport consolidé.
+
+        Le prompt ne dépend que des données de la campagne (pas de la date du
+        jour) : il sert de clé de cache, une campagne figée réutilise ainsi
+        ses résumés.
+        """
         entities_text = "\n".join([
             f"{i+1}. {e['name']} ({e['type']})\n   - Score : {e['score']}%\n   - Niveau : {e['level']}"
             for i, e in enumerate(data.get("entities_summary", []))
@@ -870,7 +911,6 @@ DONNÉES DE L'AUDIT CONSOLIDÉ :
 
 📊 CAMPAGNE
 - Titre : {data['campaign']['title']}
-- Date : {datetime.now().strftime('%d/%m/%Y')}
 - Référentiel : {data['campaign']['framework_name']}
 
 📈 STATISTIQUES GLOBALES
@@ -905,9 +945,9 @@ GÉNÈRE LE RÉSUMÉ EXÉCUTIF EN RESPECTANT STRICTEMENT :
 - Mentionner la qualité et couverture des preuves documentaires
 
 ⚠️ RÉPONDS UNIQUEMENT AVEC UN JSON VALIDE AU FORMAT:
-{
+{{
   "summary": "TON RÉSUMÉ COMPLET ICI (avec sections VUE D'ENSEMBLE, POINTS FORTS, RISQUES, etc.)"
-}
+}}
 """
 
     def _build_individual_prompt(self, data: Dict[str, Any]) -> str:
@@ -1141,125 +1181,73 @@ GÉNÈRE UN RÉSUMÉ EXÉCUTIF PERSONNALISÉ pour {entity.get('name', 'N/A')} en
 
         return content
 
-    async def _call_deepseek(self, system_prompt: str, user_prompt: str) -> str:
-        """
-        Appel à DeepSeek via Ollama (version async).
-
-        Utilise format: "json" pour forcer GLM-4.6 à mettre la réponse dans content.
-        """
-        try:
-            # Timeout élevé pour laisser le modèle travailler
-            async with httpx.AsyncClient(timeout=180) as client:
-                logger.info(f"🚀 Appel Ollama {self.model} avec format=json...")
-
-                response = await client.post(
-                    f"{self.ollama_url}/api/chat",
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "format": "json",  # ⚠️ CRUCIAL: Force le contenu dans "content"
-                        "stream": False,
-                        "keep_alive": "5m",
-                        "options": {
-                            "temperature": 0.3,
-                            "num_predict": 4000,  # Augmenté pour résumés longs
-                            "top_p": 0.9,
-                            "repeat_penalty": 1.1
-                        }
-                    }
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    logger.info(f"🔍 Réponse Ollama (clés): {list(result.keys())}")
-
-                    # Avec format=json, le contenu est TOUJOURS dans message.content
-                    content = self._extract_content_from_response(result)
-
-                    # Parser le JSON pour extraire le résumé
-                    summary = self._parse_json_summary(content)
+    async def _summarize(self, system_prompt: str, user_prompt: str, tone: str) -> str:
+        """Résumé en cache pour ces prompts, ou généré par le modèle puis mis en cache."""
+        cache_key = None
+        if AI_SUMMARY_CACHE_ENABLED and redis_manager.is_connected:
+            cache_key = summary_cache_key(self.model, tone, system_prompt, user_prompt)
+            cached = redis_manager.get(cache_key)
+            if isinstance(cached, dict) and cached.get("text"):
+                logger.info(f"♻️ Résumé IA servi depuis le cache (ton: {tone})")
+                return cached["text"]
 
-                    if summary:
-                        logger.info(f"✅ Résumé IA généré ({len(summary)} chars)")
-                    else:
-                        logger.warning(f"⚠️ Résumé vide après parsing JSON")
+        return await self._call_deepseek(system_prompt, user_prompt, cache_key=cache_key)
 
-                    return summary
-                else:
-                    logger.error(f"❌ Erreur Ollama: {response.status_code} - {response.text[:500]}")
-                    return self._generate_fallback_summary(user_prompt)
-
-        except Exception as e:
-            logger.error(f"❌ Erreur appel DeepSeek: {e}")
-            return self._generate_fallback_summary(user_prompt)
-
-    def _call_deepseek_sync(self, system_prompt: str, user_prompt: str) -> str:
+    async def _call_deepseek(self, system_prompt: str, user_prompt: str, cache_key: Optional[str] = None) -> str:
         """
-        Appel à DeepSeek via Ollama (version synchrone pour contexte non-async).
+        Appel à DeepSeek via Ollama (client HTTP mutualisé).
 
         Utilise format: "json" pour forcer GLM-4.6 à mettre la réponse dans content.
+        Seul un résumé obtenu du modèle est mis en cache (pas le résumé de repli).
         """
         try:
-            # Timeout élevé pour laisser le modèle travailler
-            with httpx.Client(timeout=180) as client:
-                logger.info(f"🚀 [SYNC] Appel Ollama {self.model} avec format=json...")
-
-                response = client.post(
-                    f"{self.ollama_url}/api/chat",
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "format": "json",  # ⚠️ CRUCIAL: Force le contenu dans "content"
-                        "stream": False,
-                        "keep_alive": "5m",
-                        "options": {
-                            "temperature": 0.3,
-                            "num_predict": 4000,  # Augmenté pour résumés longs
-                            "top_p": 0.9,
-                            "repeat_penalty": 1.1
-                        }
+            client = get_http_client()
+            logger.info(f"🚀 Appel Ollama {self.model} avec format=json...")
+
+            response = await client.post(
+                f"{self.ollama_url}/api/chat",
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    "format": "json",  # ⚠️ CRUCIAL: Force le contenu dans "content"
+                    "stream": False,
+                    "keep_alive": "5m",
+                    "options": {
+                        "temperature": 0.3,
+                        "num_predict": 4000,  # Augmenté pour résumés longs
+                        "top_p": 0.9,
+                        "repeat_penalty": 1.1
                     }
-                )
+                }
+            )
 
-                if response.status_code == 200:
-                    result = response.json()
-                    logger.info(f"🔍 Réponse Ollama sync (clés): {list(result.keys())}")
+            if response.status_code == 200:
+                result = response.json()
+                logger.info(f"🔍 Réponse Ollama (clés): {list(result.keys())}")
 
-                    # Log détaillé de la structure message
-                    message = result.get("message", {})
-                    logger.info(f"🔍 Message keys: {list(message.keys()) if isinstance(message, dict) else 'N/A'}")
-                    content_len = len(message.get('content', '')) if isinstance(message, dict) else 0
-                    logger.info(f"🔍 content length: {content_len}")
+                # Avec format=json, le contenu est TOUJOURS dans message.content
+                content = self._extract_content_from_response(result)
 
-                    # Afficher les 500 premiers caractères de content
-                    if message.get("content"):
-                        logger.info(f"📝 CONTENT (500 chars): {message.get('content', '')[:500]}")
+                # Parser le JSON pour extraire le résumé
+                summary = self._parse_json_summary(content)
 
-                    # Avec format=json, le contenu est TOUJOURS dans message.content
-                    content = self._extract_content_from_response(result)
-
-                    # Parser le JSON pour extraire le résumé
-                    summary = self._parse_json_summary(content)
-
-                    if summary:
-                        logger.info(f"✅ Résumé IA généré (sync) ({len(summary)} chars)")
-                        logger.info(f"📄 RÉSUMÉ FINAL (500 chars): {summary[:500]}")
-                    else:
-                        logger.warning(f"⚠️ Résumé vide après parsing JSON (sync)")
-
-                    return summary
+                if summary:
+                    logger.info(f"✅ Résumé IA généré ({len(summary)} chars)")
+                    if cache_key:
+                        redis_manager.set(cache_key, {"text": summary}, ttl=AI_SUMMARY_CACHE_TTL)
                 else:
-                    logger.error(f"❌ Erreur Ollama: {response.status_code} - {response.text[:500]}")
-                    return self._generate_fallback_summary(user_prompt)
+                    logger.warning(f"⚠️ Résumé vide après parsing JSON")
+
+                return summary
+            else:
+                logger.error(f"❌ Erreur Ollama: {response.status_code} - {response.text[:500]}")
+                return self._generate_fallback_summary(user_prompt)
 
         except Exception as e:
-            logger.error(f"❌ Erreur appel DeepSeek (sync): {e}")
+            logger.error(f"❌ Erreur appel DeepSeek: {e}")
             return self._generate_fallback_summary(user_prompt)
 
     def _parse_json_summary(self, content: str) -> str:
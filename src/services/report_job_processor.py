@@ -1,16 +1,20 @@
 """
 Service de traitement des jobs de génération de rapports.
 
-Ce module traite les jobs de génération de rapports en mode synchrone
-(peut être adapté pour Celery plus tard).
+Ce module traite un job de génération de rapport de bout en bout. Il est
+exécuté par les workers Celery de la queue ``report_generation``
+(voir src/tasks/report_tasks.py) et publie sa progression via Redis pub/sub.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, text
 from datetime import datetime, timezone
+import asyncio
+import json
 import logging
+import time
 from pathlib import Path
 
 from ..models.report import (
@@ -21,8 +25,12 @@ from ..models.report import (
 from ..schemas.report import JobStatus, ReportStatus, ReportScope, GenerationMode
 from .report_service import ReportService
 from .file_storage_service import FileStorageService
-from .widget_renderer import WidgetRenderer
-from .report_ai_summary_service import ReportAISummaryService
+from .render_pool import render_pdf
+from .report_snapshot_service import get_snapshot
+from .widget_renderer import WidgetRenderer, get_render_plan
+from .report_ai_summary_service import AI_SUMMARY_CONCURRENCY, ReportAISummaryService
+from ..utils.event_loop import run_sync
+from .report_progress import publish_job_progress
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +92,7 @@ class ReportJobProcessor:
             job.current_step_number = 1
             job.progress_percent = 5
             self.db.commit()
+            publish_job_progress(job)
 
             # 3. Récupérer le rapport associé
             report = self.db.execute(
@@ -105,7 +114,10 @@ class ReportJobProcessor:
             self._update_job_progress(job, "Collecte des données", 2, 15)
 
             if report.report_scope == ReportScope.CONSOLIDATED.value:
-                data = self.report_service.collect_consolidated_data(report.campaign_id)
+                data = get_snapshot(
+                    self.db, "consolidated", report.campaign_id, None,
+                    lambda: self.report_service.collect_consolidated_data(report.campaign_id)
+                )
 
                 # IMPORTANT: Normaliser les données consolidées pour compatibilité avec les widgets
                 # Les widgets attendent 'stats' et 'scores', pas 'global_stats'
@@ -154,9 +166,9 @@ class ReportJobProcessor:
                 logger.info(f"✅ Données consolidées normalisées: stats={list(data['stats'].keys())}, scores={list(data['scores'].keys())}")
 
             elif report.report_scope == ReportScope.ENTITY.value:
-                data = self.report_service.collect_entity_data(
-                    report.campaign_id,
-                    report.entity_id
+                data = get_snapshot(
+                    self.db, "entity", report.campaign_id, report.entity_id,
+                    lambda: self.report_service.collect_entity_data(report.campaign_id, report.entity_id)
                 )
 
                 # Normaliser nc_count pour les widgets
@@ -220,9 +232,9 @@ class ReportJobProcessor:
                 logger.info(f"✅ Données scan_ecosystem normalisées: ecosystem keys={list(data['ecosystem'].keys())}, ecosystem_comparison count={len(data.get('ecosystem_comparison', []))}")
             else:
                 # Fallback: entity data
-                data = self.report_service.collect_entity_data(
-                    report.campaign_id,
-                    report.entity_id
+                data = get_snapshot(
+                    self.db, "entity", report.campaign_id, report.entity_id,
+                    lambda: self.report_service.collect_entity_data(report.campaign_id, report.entity_id)
                 )
 
             # 5b. Appliquer le logo personnalisé du template si configuré
@@ -278,7 +290,8 @@ class ReportJobProcessor:
                     data=data,
                     report=report,
                     template=template,
-                    ai_widget_configs=ai_widget_configs
+                    ai_widget_configs=ai_widget_configs,
+                    job=job
                 )
 
             # 7. Générer le HTML
@@ -319,6 +332,7 @@ class ReportJobProcessor:
             job.current_step = "Terminé"
 
             self.db.commit()
+            publish_job_progress(job)
 
             logger.info(f"✅ Job {job_id} terminé avec succès - PDF: {report.file_name}")
             return True
@@ -342,6 +356,7 @@ class ReportJobProcessor:
                         report.error_message = str(e)
 
                 self.db.commit()
+                publish_job_progress(job, error=str(e))
 
             return False
 
@@ -357,6 +372,7 @@ class ReportJobProcessor:
         job.current_step_number = step_number
         job.progress_percent = progress
         self.db.commit()
+        publish_job_progress(job)
         logger.info(f"📊 Job {job.id}: {step_name} ({progress}%)")
 
     def _generate_ai_contents(
@@ -364,17 +380,23 @@ class ReportJobProcessor:
         data: Dict[str, Any],
         report: GeneratedReport,
         template: ReportTemplate,
-        ai_widget_configs: list
+        ai_widget_configs: list,
+        job: Optional[ReportGenerationJob] = None
     ) -> Dict[str, Any]:
         """
         Génère les contenus IA pour les widgets ai_summary du template.
 
+        Les widgets IA sont générés simultanément (AI_SUMMARY_CONCURRENCY appels
+        au modèle au plus) ; les widgets de même ton partagent un seul appel.
+        La latence de chaque widget est enregistrée dans le job (stage_metrics).
+
         Args:
             data: Données collectées du rapport
             report: Rapport en cours de génération
             template: Template utilisé
             ai_widget_configs: Configurations des widgets IA (depuis le frontend)
                 [{"widget_id": "...", "use_ai": true/false, "manual_content": "...", "tone": "..."}]
+            job: Job en cours (enregistrement des latences)
 
         Returns:
             data enrichi avec les contenus IA générés
@@ -383,7 +405,6 @@ class ReportJobProcessor:
             # Récupérer la structure du template
             structure = template.structure or []
             if isinstance(structure, str):
-                import json
                 structure = json.loads(structure)
 
             # Trouver les widgets de type ai_summary ou summary
@@ -398,13 +419,13 @@ class ReportJobProcessor:
             # Créer un dictionnaire des configs par widget_id pour accès rapide
             configs_by_id = {c.get('widget_id'): c for c in ai_widget_configs}
 
-            # Initialiser le service IA
-            ai_service = ReportAISummaryService(self.db)
-
             # Initialiser la structure pour stocker les contenus IA
             if 'ai_contents' not in data:
                 data['ai_contents'] = {}
 
+            # Widgets à générer par l'IA: (widget_id, tone)
+            pending: List[Tuple[str, str]] = []
+
             for widget in ai_widgets:
                 # Utiliser widget_key OU id comme identifiant unique
                 widget_id = widget.get('id') or widget.get('widget_key') or ''
@@ -430,53 +451,9 @@ class ReportJobProcessor:
                         'tone': tone
                     }
                 elif use_ai:
-                    # Générer via l'IA
-                    try:
-                        logger.info(f"  → Génération IA en cours (tone={tone})...")
-                        logger.info(f"  🔍 DEBUG: report.campaign_id={report.campaign_id}, report.entity_id={report.entity_id}, report.tenant_id={report.tenant_id}")
-
-                        # Utiliser les versions synchrones des méthodes
-                        if report.report_scope == ReportScope.CONSOLIDATED.value:
-                            ai_result = ai_service.generate_campaign_summary_sync(
-                                campaign_id=report.campaign_id,
-                                tenant_id=report.tenant_id,
-                                tone=tone
-                            )
-                        else:
-                            ai_result = ai_service.generate_entity_summary_sync(
-                                campaign_id=report.campaign_id,
-                                entity_id=report.entity_id,
-                                tenant_id=report.tenant_id,
-                                tone=tone
-                            )
-
-                        # Le résultat contient executive_summary
-                        generated_text = ai_result.get('executive_summary', '')
-                        if generated_text:
-                            logger.info(f"  ✅ Contenu IA généré ({len(generated_text)} chars)")
-                            data['ai_contents'][widget_id] = {
-                                'text': generated_text,
-                                'source': 'ai',
-                                'tone': tone,
-                                'model': 'deepseek'
-                            }
-                        else:
-                            # Fallback si pas de contenu généré
-                            logger.warning(f"  ⚠️ Contenu IA vide")
-                            data['ai_contents'][widget_id] = {
-                                'text': "[Résumé IA non disponible - contenu vide]",
-                                'source': 'fallback',
-                                'tone': tone
-                            }
-
-                    except Exception as e:
-                        logger.error(f"  ❌ Erreur génération IA: {str(e)}")
-                        data['ai_contents'][widget_id] = {
-                            'text': f"[Erreur lors de la génération IA: {str(e)}]",
-                            'source': 'error',
-                            'tone': tone,
-                            'error': str(e)
-                        }
+                    # Généré ci-dessous (place réservée pour conserver l'ordre des widgets)
+                    data['ai_contents'][widget_id] = None
+                    pending.append((widget_id, tone))
                 else:
                     # Ni IA ni contenu manuel - placeholder
                     logger.info(f"  → Aucun contenu (IA désactivée, pas de contenu manuel)")
@@ -486,6 +463,28 @@ class ReportJobProcessor:
                         'tone': tone
                     }
 
+            if pending:
+                started = time.perf_counter()
+                results = run_sync(self._generate_ai_widgets(ReportAISummaryService(self.db), report, pending))
+                stage_ms = round((time.perf_counter() - started) * 1000)
+                logger.info(f"🤖 {len(pending)} widget(s) IA générés en {stage_ms} ms")
+
+                widget_metrics = []
+                for widget_id, tone in pending:
+                    content, latency_ms = results[widget_id]
+                    data['ai_contents'][widget_id] = content
+                    widget_metrics.append({
+                        'widget_id': widget_id,
+                        'tone': tone,
+                        'source': content['source'],
+                        'latency_ms': latency_ms
+                    })
+
+                if job is not None:
+                    self._record_stage_metrics(job, {
+                        'ai_contents': {'total_ms': stage_ms, 'widgets': widget_metrics}
+                    })
+
             # Stocker aussi un résumé global (pour compatibilité avec l'ancien format)
             # Utiliser le premier contenu IA généré
             for widget_id, content in data['ai_contents'].items():
@@ -503,8 +502,110 @@ class ReportJobProcessor:
         except Exception as e:
             logger.error(f"❌ Erreur génération contenus IA: {str(e)}", exc_info=True)
             # Ne pas faire échouer tout le rapport si l'IA échoue
+            data['ai_contents'] = {
+                widget_id: content
+                for widget_id, content in data.get('ai_contents', {}).items()
+                if content is not None
+            }
             return data
 
+    async def _generate_ai_widgets(
+        self,
+        ai_service: ReportAISummaryService,
+        report: GeneratedReport,
+        pending: List[Tuple[str, str]]
+    ) -> Dict[str, Tuple[Dict[str, Any], int]]:
+        """
+        Génère simultanément les contenus des widgets IA.
+
+        Returns:
+            {widget_id: (contenu du widget, latence en ms)}
+        """
+        semaphore = asyncio.Semaphore(max(AI_SUMMARY_CONCURRENCY, 1))
+        # Un appel par ton: les widgets de même ton ont le même prompt
+        by_tone: Dict[str, asyncio.Task] = {}
+
+        async def generate(tone: str) -> Tuple[Dict[str, Any], int]:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    logger.info(f"  → Génération IA en cours (tone={tone})...")
+                    if report.report_scope == ReportScope.CONSOLIDATED.value:
+                        ai_result = await ai_service.generate_campaign_summary(
+                            campaign_id=report.campaign_id,
+                            tenant_id=report.tenant_id,
+                            tone=tone
+                        )
+                    else:
+                        ai_result = await ai_service.generate_entity_summary(
+                            campaign_id=report.campaign_id,
+                            entity_id=report.entity_id,
+                            tenant_id=report.tenant_id,
+                            tone=tone
+                        )
+
+                    # Le résultat contient executive_summary
+                    generated_text = ai_result.get('executive_summary', '')
+                    if generated_text:
+                        logger.info(f"  ✅ Contenu IA généré ({len(generated_text)} chars, tone={tone})")
+                        content = {
+                            'text': generated_text,
+                            'source': 'ai',
+                            'tone': tone,
+                            'model': 'deepseek'
+                        }
+                    else:
+                        # Fallback si pas de contenu généré
+                        logger.warning(f"  ⚠️ Contenu IA vide (tone={tone})")
+                        content = {
+                            'text': "[Résumé IA non disponible - contenu vide]",
+                            'source': 'fallback',
+                            'tone': tone
+                        }
+
+                except Exception as e:
+                    logger.error(f"  ❌ Erreur génération IA: {str(e)}")
+                    content = {
+                        'text': f"[Erreur lors de la génération IA: {str(e)}]",
+                        'source': 'error',
+                        'tone': tone,
+                        'error': str(e)
+                    }
+
+                return content, round((time.perf_counter() - started) * 1000)
+
+        for _, tone in pending:
+            if tone not in by_tone:
+                by_tone[tone] = asyncio.ensure_future(generate(tone))
+
+        await asyncio.gather(*by_tone.values())
+
+        results = {}
+        for widget_id, tone in pending:
+            content, latency_ms = by_tone[tone].result()
+            results[widget_id] = (dict(content), latency_ms)
+        return results
+
+    def _record_stage_metrics(self, job: ReportGenerationJob, metrics: Dict[str, Any]) -> None:
+        """
+        Ajoute des mesures au job (colonne JSONB stage_metrics).
+
+        N'interrompt jamais la génération: la transaction du job est préservée
+        (savepoint) si l'écriture échoue.
+        """
+        try:
+            with self.db.begin_nested():
+                self.db.execute(
+                    text("""
+                        UPDATE report_generation_job
+                        SET stage_metrics = COALESCE(stage_metrics, '{}'::jsonb) || CAST(:metrics AS jsonb)
+                        WHERE id = CAST(:job_id AS uuid)
+                    """),
+                    {"job_id": str(job.id), "metrics": json.dumps(metrics)}
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ Mesures du job {job.id} non enregistrées: {e}")
+
     def _generate_simple_html(
         self,
         data: Dict[str, Any],
@@ -548,42 +649,17 @@ class ReportJobProcessor:
         # Créer le renderer
         renderer = WidgetRenderer(color_scheme, fonts)
 
-        # Récupérer la structure du template
-        structure = template.structure or []
-        if isinstance(structure, str):
-            import json
-            structure = json.loads(structure)
-
         # Log état des données IA avant rendu
         logger.info(f"🎨 _generate_simple_html: ai_contents keys={list(data.get('ai_contents', {}).keys())}")
         logger.info(f"🎨 _generate_simple_html: ai_summary présent={bool(data.get('ai_summary'))}, text len={len(data.get('ai_summary', {}).get('text', ''))}")
 
-        # Passer la structure du template dans data pour que render_toc puisse générer la TOC
-        data['_template_structure'] = structure
+        # Structure du template compilée une fois par version du template.
+        # Les templates utilisent 'widget_key' ou 'id' comme identifiant unique
+        # (nécessaire pour les widgets IA qui récupèrent leur contenu dans data['ai_contents'])
+        plan = get_render_plan(template.id, template.updated_at, template.structure, widget_key_as_id=True)
 
         # Générer le HTML de chaque widget
-        widgets_html = []
-        for widget in sorted(structure, key=lambda w: w.get('position', 0)):
-            widget_type = widget.get('widget_type', '')
-            config = widget.get('config', {}).copy()  # Copie pour ne pas modifier l'original
-
-            # Ajouter l'ID du widget au config pour que render_widget puisse l'utiliser
-            # (nécessaire pour les widgets IA qui doivent récupérer leur contenu dans data['ai_contents'])
-            # Note: les templates utilisent 'widget_key' ou 'id' comme identifiant unique
-            widget_id = widget.get('id') or widget.get('widget_key') or ''
-            if widget_id:
-                config['id'] = widget_id
-
-            # Log spécial pour widgets ai_summary
-            if widget_type in ['ai_summary', 'summary']:
-                logger.info(f"🤖 Rendu widget IA: type={widget_type}, id={widget_id[:20] if widget_id else 'VIDE'}")
-
-            try:
-                html = renderer.render_widget(widget_type, config, data)
-                widgets_html.append(html)
-            except Exception as e:
-                logger.warning(f"Erreur rendu widget {widget_type}: {e}")
-                widgets_html.append(f"<!-- Erreur widget {widget_type}: {e} -->")
+        widgets_html = plan.render_widgets(renderer, data)
 
         # Assembler le HTML final
         primary_color = color_scheme.get('primary', '#8B5CF6')
@@ -1204,26 +1280,13 @@ class ReportJobProcessor:
             f.write(html_content)
         logger.info(f"🔍 HTML debug sauvegardé: {debug_html_path} ({len(html_content)} chars)")
 
-        # Méthode principale: xhtml2pdf (même approche que EBIOS)
+        # Méthode principale: xhtml2pdf (même approche que EBIOS), exécuté
+        # dans le pool de rendu (temps et mémoire bornés)
         try:
-            from xhtml2pdf import pisa
-
             filename = f"rapport_{report.id}_{timestamp}.pdf"
             content_type = "application/pdf"
 
-            # Convertir HTML en PDF avec xhtml2pdf
-            pdf_buffer = BytesIO()
-            pisa_status = pisa.CreatePDF(
-                html_content,
-                dest=pdf_buffer,
-                encoding='utf-8'
-            )
-
-            if pisa_status.err:
-                logger.error(f"❌ Erreur xhtml2pdf: {pisa_status.err} erreur(s)")
-                raise Exception(f"xhtml2pdf a rencontré {pisa_status.err} erreur(s)")
-
-            pdf_bytes = pdf_buffer.getvalue()
+            pdf_bytes = render_pdf(html_content)
             logger.info(f"✅ PDF généré avec xhtml2pdf: {filename} ({len(pdf_bytes)} bytes)")
 
         except ImportError:
@@ -0,0 +1,126 @@
+"""
+Diffusion de la progression des jobs de génération de rapports.
+
+Les workers Celery (queue ``report_generation``) publient chaque étape d'un
+job sur un canal Redis pub/sub ``report_job:{job_id}``. L'endpoint SSE de
+l'API s'abonne aux canaux des jobs qu'il suit et relaie les événements au
+navigateur.
+
+Redis reste optionnel : sans Redis, la publication est ignorée et l'endpoint
+SSE retombe sur un polling de la table ``report_generation_job``.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.utils.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "report_job:"
+
+# Codes d'étape stables (le libellé affiché reste current_step)
+STEP_CODES = {
+    1: "initializing",
+    2: "collecting_data",
+    3: "generating_ai",
+    4: "rendering",
+    5: "finalizing",
+}
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def job_channel(job_id: Any) -> str:
+    """Nom du canal pub/sub d'un job"""
+    return f"{CHANNEL_PREFIX}{job_id}"
+
+
+def build_job_event(job, error: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Construit l'événement de progression d'un job.
+
+    Args:
+        job: ReportGenerationJob (ou objet équivalent)
+        error: Message d'erreur éventuel
+
+    Returns:
+        Dictionnaire sérialisable en JSON
+    """
+    step_number = getattr(job, "current_step_number", None) or 0
+    event = {
+        "job_id": str(job.id),
+        "report_id": str(job.report_id) if getattr(job, "report_id", None) else None,
+        "status": job.status,
+        "step": STEP_CODES.get(step_number, "processing"),
+        "step_number": step_number,
+        "step_label": getattr(job, "current_step", None),
+        "progress": getattr(job, "progress_percent", None) or 0,
+    }
+    if error or getattr(job, "error_message", None):
+        event["error"] = error or job.error_message
+    return event
+
+
+def publish_job_progress(job, error: Optional[str] = None) -> bool:
+    """
+    Publie la progression d'un job sur son canal Redis.
+
+    Returns:
+        True si l'événement a été publié
+    """
+    client = redis_manager.client
+    if client is None:
+        return False
+
+    try:
+        client.publish(job_channel(job.id), json.dumps(build_job_event(job, error), ensure_ascii=False))
+        return True
+    except RedisError as e:
+        logger.debug(f"Publication progression job {job.id} impossible: {e}")
+        return False
+
+
+async def subscribe_job_events(
+    job_ids: Iterable[Any],
+    poll_timeout: float = 1.0
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    S'abonne aux canaux de progression des jobs.
+
+    Produit les événements reçus, ou ``None`` à chaque ``poll_timeout`` sans
+    message (permet à l'appelant de vérifier l'état en base / d'envoyer un
+    keep-alive). Lève ``RedisError`` si Redis est indisponible.
+    """
+    import redis.asyncio as aioredis
+
+    client = aioredis.Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        decode_responses=True,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+    )
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(*[job_channel(job_id) for job_id in job_ids])
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=poll_timeout)
+            if message is None:
+                yield None
+                continue
+            try:
+                yield json.loads(message["data"])
+            except (TypeError, ValueError):
+                logger.debug(f"Message de progression illisible: {message!r}")
+    finally:
+        try:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await client.aclose()
+        except Exception:
+            pass
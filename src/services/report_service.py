@@ -29,6 +29,8 @@ from ..models.report import (
     ReportChartCache
 )
 from ..schemas.report import GenerationMode, ReportStatus, ReportScope
+from .report_snapshot_service import record_collection_error
+from .scan_ecosystem_service import get_ecosystem_aggregates
 
 logger = logging.getLogger(__name__)
 
@@ -220,6 +222,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération logos: {str(e)}")
+            record_collection_error("_get_logos_data")
             return {
                 'tenant_logo_url': None,
                 'organization_logo_url': None,
@@ -253,6 +256,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération logo entité: {str(e)}")
+            record_collection_error("_get_entity_logo")
             return {'entity_name': None, 'entity_logo_url': None}
 
     def _get_framework_data(self, questionnaire_id: UUID) -> Dict[str, Any]:
@@ -286,6 +290,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération framework: {str(e)}")
+            record_collection_error("_get_framework_data")
             return {'name': 'N/A', 'code': 'N/A', 'version': 'N/A'}
 
     def _calculate_statistics(self, campaign_id: UUID) -> Dict[str, Any]:
@@ -346,6 +351,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur calcul statistiques: {str(e)}")
+            record_collection_error("_calculate_statistics")
             return {}
 
     def _calculate_domain_scores(self, campaign_id: UUID) -> List[Dict[str, Any]]:
@@ -423,6 +429,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur calcul scores domaines: {str(e)}")
+            record_collection_error("_calculate_domain_scores")
             return []
 
     def _get_non_conformities(self, campaign_id: UUID) -> tuple[List[Dict], List[Dict]]:
@@ -497,6 +504,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération NC: {str(e)}")
+            record_collection_error("_get_non_conformities")
             return [], []
 
     def _get_actions(self, campaign_id: UUID) -> List[Dict[str, Any]]:
@@ -542,6 +550,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération actions: {str(e)}")
+            record_collection_error("_get_actions")
             return []
 
     # ========================================================================
@@ -762,12 +771,21 @@ class ReportService:
 
             entity_ids = campaign_scope.entity_ids
 
-            # 3. Récupérer les informations de chaque entité
+            # 3. Récupérer les informations de toutes les entités
+            # Stats et scores par domaine calculés en requêtes groupées par audit.entity_id
+            # (et non une requête par entité)
+            entities_by_id = {
+                str(entity.id): entity
+                for entity in self.db.execute(
+                    select(EcosystemEntity).where(EcosystemEntity.id.in_(entity_ids))
+                ).scalars().all()
+            }
+            entity_stats = self._calculate_entities_statistics(campaign_id, entity_ids)
+            entity_domain_scores = self._calculate_entities_domain_scores(campaign_id, list(entities_by_id.keys()))
+
             entities_data = []
             for entity_id in entity_ids:
-                entity = self.db.execute(
-                    select(EcosystemEntity).where(EcosystemEntity.id == entity_id)
-                ).scalar_one_or_none()
+                entity = entities_by_id.get(str(entity_id))
 
                 if entity:
                     entity_data = {
@@ -775,8 +793,8 @@ class ReportService:
                         'name': entity.name,
                         'code': entity.short_code,
                         'entity_type': entity.stakeholder_type,
-                        'stats': self._calculate_entity_statistics(campaign_id, entity.id),
-                        'domain_scores': self._calculate_entity_domain_scores(campaign_id, entity.id),
+                        'stats': entity_stats.get(str(entity.id), {}),
+                        'domain_scores': entity_domain_scores.get(str(entity.id), []),
                         'risk_level': 'low'  # Calculé plus bas
                     }
 
@@ -794,7 +812,7 @@ class ReportService:
             data['entities'] = entities_data
 
             # 4. Statistiques globales écosystème
-            data['global_stats'] = self._calculate_global_statistics(campaign_id, entity_ids)
+            data['global_stats'] = self._calculate_global_statistics(campaign_id, entity_ids, entity_stats)
 
             # 5. Comparaison par domaine (radar multi-entités)
             data['domain_comparison'] = self._calculate_domain_comparison(campaign_id, entity_ids)
@@ -870,26 +888,116 @@ class ReportService:
                 "entity_id": str(entity_id)
             }).fetchone()
 
-            total = result.total_questions or 0
-            answered = result.answered_questions or 0
-            compliant = result.compliant or 0
+            return self._format_entity_statistics(result)
 
-            # Calcul du taux de conformité
-            applicable = total - (result.not_applicable or 0)
-            compliance_rate = round((compliant / applicable * 100) if applicable > 0 else 0, 1)
+        except Exception as e:
+            logger.error(f"❌ Erreur calcul stats entité {entity_id}: {str(e)}")
+            record_collection_error("_calculate_entity_statistics")
+            return {}
 
-            return {
-                'total_questions': total,
-                'answered_questions': answered,
-                'compliance_rate': compliance_rate,
-                'nc_major_count': result.nc_major or 0,
-                'nc_minor_count': result.nc_minor or 0,
-                'compliant_count': compliant,
-                'not_applicable_count': result.not_applicable or 0
+    @staticmethod
+    def _format_entity_statistics(result) -> Dict[str, Any]:
+        """Formate une ligne d'agrégat (total/answered/compliant/nc/na) en stats d'entité."""
+        total = result.total_questions or 0
+        answered = result.answered_questions or 0
+        compliant = result.compliant or 0
+
+        # Calcul du taux de conformité
+        applicable = total - (result.not_applicable or 0)
+        compliance_rate = round((compliant / applicable * 100) if applicable > 0 else 0, 1)
+
+        return {
+            'total_questions': total,
+            'answered_questions': answered,
+            'compliance_rate': compliance_rate,
+            'nc_major_count': result.nc_major or 0,
+            'nc_minor_count': result.nc_minor or 0,
+            'compliant_count': compliant,
+            'not_applicable_count': result.not_applicable or 0
+        }
+
+    def _calculate_entities_statistics(self, campaign_id: UUID, entity_ids: List[UUID]) -> Dict[str, Dict[str, Any]]:
+        """
+        Calcule les statistiques de plusieurs entités en une seule requête.
+
+        Même sémantique que _calculate_entity_statistics (questions du questionnaire
+        LEFT JOIN réponses de l'entité), groupée par audit.entity_id.
+
+        Returns:
+            Dict {entity_id (str): stats}
+        """
+        if not entity_ids:
+            return {}
+
+        entity_ids_str = [str(eid) for eid in entity_ids]
+        try:
+            stats_query = text("""
+                WITH scope_entities AS (
+                    SELECT DISTINCT unnest(CAST(:entity_ids AS uuid[])) AS entity_id
+                ),
+                answers_with_status AS (
+                    SELECT
+                        a.entity_id,
+                        qa.question_id,
+                        qa.answer_value,
+                        COALESCE(
+                            qa.compliance_status,
+                            CASE LOWER(qa.answer_value->>'choice')
+                                WHEN 'oui' THEN 'compliant'
+                                WHEN 'non' THEN 'non_compliant_major'
+                                WHEN 'partiellement' THEN 'non_compliant_minor'
+                                WHEN 'partiel' THEN 'non_compliant_minor'
+                                WHEN 'na' THEN 'not_applicable'
+                                WHEN 'n/a' THEN 'not_applicable'
+                                WHEN 'non applicable' THEN 'not_applicable'
+                                ELSE NULL
+                            END
+                        ) as effective_status
+                    FROM question_answer qa
+                    JOIN audit a ON qa.audit_id = a.id
+                    WHERE qa.campaign_id = CAST(:campaign_id AS uuid)
+                      AND qa.is_current = true
+                      AND a.entity_id = ANY(CAST(:entity_ids AS uuid[]))
+                )
+                SELECT
+                    se.entity_id,
+                    COUNT(*) as total_questions,
+                    COUNT(CASE WHEN aws.answer_value IS NOT NULL THEN 1 END) as answered_questions,
+                    COUNT(CASE WHEN aws.effective_status = 'compliant' THEN 1 END) as compliant,
+                    COUNT(CASE WHEN aws.effective_status = 'non_compliant_major' THEN 1 END) as nc_major,
+                    COUNT(CASE WHEN aws.effective_status = 'non_compliant_minor' THEN 1 END) as nc_minor,
+                    COUNT(CASE WHEN aws.effective_status = 'not_applicable' THEN 1 END) as not_applicable
+                FROM scope_entities se
+                CROSS JOIN question q
+                LEFT JOIN answers_with_status aws
+                    ON aws.question_id = q.id
+                   AND aws.entity_id = se.entity_id
+                WHERE q.questionnaire_id = (
+                    SELECT questionnaire_id FROM campaign WHERE id = CAST(:campaign_id AS uuid)
+                )
+                GROUP BY se.entity_id
+            """)
+
+            results = self.db.execute(stats_query, {
+                "campaign_id": str(campaign_id),
+                "entity_ids": entity_ids_str
+            }).fetchall()
+
+            stats = {str(row.entity_id): self._format_entity_statistics(row) for row in results}
+
+            # Questionnaire sans question : mêmes stats vides que la version unitaire
+            empty = {
+                'total_questions': 0, 'answered_questions': 0, 'compliance_rate': 0,
+                'nc_major_count': 0, 'nc_minor_count': 0, 'compliant_count': 0,
+                'not_applicable_count': 0
             }
+            for eid in entity_ids_str:
+                stats.setdefault(eid, dict(empty))
+            return stats
 
         except Exception as e:
-            logger.error(f"❌ Erreur calcul stats entité {entity_id}: {str(e)}")
+            logger.error(f"❌ Erreur calcul stats entités: {str(e)}")
+            record_collection_error("_calculate_entities_statistics")
             return {}
 
     def _calculate_entity_domain_scores(self, campaign_id: UUID, entity_id: UUID) -> List[Dict[str, Any]]:
@@ -964,12 +1072,123 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur calcul domaines entité {entity_id}: {str(e)}")
+            record_collection_error("_calculate_entity_domain_scores")
             return []
 
-    def _calculate_global_statistics(self, campaign_id: UUID, entity_ids: List[UUID]) -> Dict[str, Any]:
-        """Calcule les statistiques globales pour toutes les entités."""
+    def _calculate_entities_domain_scores(
+        self,
+        campaign_id: UUID,
+        entity_ids: List[UUID]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Calcule les scores par domaine de plusieurs entités en une seule requête.
+
+        Même sémantique que _calculate_entity_domain_scores (tous les domaines
+        du questionnaire, 0 si aucune réponse), groupée par audit.entity_id.
+
+        Returns:
+            Dict {entity_id (str): [scores par domaine, triés par code]}
+        """
+        if not entity_ids:
+            return {}
+
+        entity_ids_str = [str(eid) for eid in entity_ids]
+        try:
+            domain_scores_query = text("""
+                WITH scope_entities AS (
+                    SELECT DISTINCT unnest(CAST(:entity_ids AS uuid[])) AS entity_id
+                ),
+                answers_with_status AS (
+                    SELECT
+                        a.entity_id,
+                        qa.id,
+                        qa.question_id,
+                        COALESCE(
+                            qa.compliance_status,
+                            CASE LOWER(qa.answer_value->>'choice')
+                                WHEN 'oui' THEN 'compliant'
+                                WHEN 'non' THEN 'non_compliant_major'
+                                WHEN 'partiellement' THEN 'non_compliant_minor'
+                                WHEN 'partiel' THEN 'non_compliant_minor'
+                                WHEN 'na' THEN 'not_applicable'
+                                WHEN 'n/a' THEN 'not_applicable'
+                                WHEN 'non applicable' THEN 'not_applicable'
+                                ELSE NULL
+                            END
+                        ) as effective_status
+                    FROM question_answer qa
+                    JOIN audit a ON qa.audit_id = a.id
+                    WHERE qa.campaign_id = CAST(:campaign_id AS uuid)
+                      AND qa.is_current = true
+                      AND a.entity_id = ANY(CAST(:entity_ids AS uuid[]))
+                )
+                SELECT
+                    se.entity_id,
+                    d.id,
+                    COALESCE(d.title, d.code_officiel, d.code) as name,
+                    d.code,
+                    CASE
+                        WHEN COUNT(aws.id) > 0 THEN
+                            ROUND(
+                                (COUNT(CASE WHEN aws.effective_status = 'compliant' THEN 1 END) * 100.0 +
+                                 COUNT(CASE WHEN aws.effective_status = 'non_compliant_minor' THEN 1 END) * 50.0) /
+                                COUNT(aws.id)
+                            , 1)
+                        ELSE 0
+                    END as score
+                FROM scope_entities se
+                CROSS JOIN domain d
+                JOIN requirement r ON r.domain_id = d.id
+                JOIN question q ON q.requirement_id = r.id
+                LEFT JOIN answers_with_status aws
+                    ON aws.question_id = q.id
+                   AND aws.entity_id = se.entity_id
+                   AND aws.effective_status IN ('compliant', 'non_compliant_minor', 'non_compliant_major')
+                WHERE q.questionnaire_id = (
+                    SELECT questionnaire_id FROM campaign WHERE id = CAST(:campaign_id AS uuid)
+                )
+                GROUP BY se.entity_id, d.id, d.title, d.code_officiel, d.code
+                ORDER BY se.entity_id, d.code
+            """)
+
+            results = self.db.execute(domain_scores_query, {
+                "campaign_id": str(campaign_id),
+                "entity_ids": entity_ids_str
+            }).fetchall()
+
+            scores: Dict[str, List[Dict[str, Any]]] = {eid: [] for eid in entity_ids_str}
+            for row in results:
+                scores.setdefault(str(row.entity_id), []).append({
+                    'id': str(row.id),
+                    'name': row.name,
+                    'code': row.code,
+                    'score': float(row.score)
+                })
+            return scores
+
+        except Exception as e:
+            logger.error(f"❌ Erreur calcul domaines entités: {str(e)}")
+            record_collection_error("_calculate_entities_domain_scores")
+            return {}
+
+    def _calculate_global_statistics(
+        self,
+        campaign_id: UUID,
+        entity_ids: List[UUID],
+        entity_stats: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Calcule les statistiques globales pour toutes les entités.
+
+        Args:
+            campaign_id: ID de la campagne
+            entity_ids: Entités du périmètre
+            entity_stats: Stats par entité déjà calculées (évite de les recalculer)
+        """
         try:
             entity_ids_str = [str(eid) for eid in entity_ids]
+            if entity_stats is None:
+                entity_stats = self._calculate_entities_statistics(campaign_id, entity_ids)
 
             # Note: question_answer n'a pas entity_id, on passe par audit.entity_id (FK vers ecosystem_entity)
             # Support données legacy: dériver compliance_status depuis answer_value->>'choice' si NULL
@@ -1024,16 +1243,24 @@ class ReportService:
                 'nc_critical': result.nc_major or 0,
                 'nc_minor': result.nc_minor or 0,
                 'avg_compliance_rate': round(result.avg_compliance_rate or 0, 1),
-                'entities_at_risk': sum(1 for eid in entity_ids if self._is_entity_at_risk(campaign_id, eid))
+                'entities_at_risk': sum(
+                    1 for eid in entity_ids_str
+                    if self._is_at_risk(entity_stats.get(eid, {}))
+                )
             }
 
         except Exception as e:
             logger.error(f"❌ Erreur calcul stats globales: {str(e)}")
+            record_collection_error("_calculate_global_statistics")
             return {}
 
     def _is_entity_at_risk(self, campaign_id: UUID, entity_id: UUID) -> bool:
         """Vérifie si une entité est à risque (score < 70%)."""
-        stats = self._calculate_entity_statistics(campaign_id, entity_id)
+        return self._is_at_risk(self._calculate_entity_statistics(campaign_id, entity_id))
+
+    @staticmethod
+    def _is_at_risk(stats: Dict[str, Any]) -> bool:
+        """Une entité est à risque si son taux de conformité est < 70%."""
         return stats.get('compliance_rate', 0) < 70
 
     def _calculate_domain_comparison(self, campaign_id: UUID, entity_ids: List[UUID]) -> List[Dict[str, Any]]:
@@ -1111,6 +1338,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur comparaison domaines: {str(e)}")
+            record_collection_error("_calculate_domain_comparison")
             return []
 
     def _get_top_critical_nc(self, campaign_id: UUID, entity_ids: List[UUID], limit: int = 10) -> List[Dict[str, Any]]:
@@ -1184,6 +1412,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération NC critiques: {str(e)}")
+            record_collection_error("_get_top_critical_nc")
             return []
 
     def _get_consolidated_actions(self, campaign_id: UUID, entity_ids: List[UUID]) -> List[Dict[str, Any]]:
@@ -1242,6 +1471,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération actions consolidées: {str(e)}")
+            record_collection_error("_get_consolidated_actions")
             return []
 
     # ========================================================================
@@ -1456,6 +1686,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération NC entité: {str(e)}")
+            record_collection_error("_get_entity_non_conformities")
             return []
 
     def _get_entity_actions(self, campaign_id: UUID, entity_id: UUID) -> List[Dict[str, Any]]:
@@ -1510,6 +1741,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur récupération actions entité: {str(e)}")
+            record_collection_error("_get_entity_actions")
             return []
 
     def _get_priority_label(self, priority: str) -> str:
@@ -1560,14 +1792,15 @@ class ReportService:
                     'percentile': 100
                 }
 
-            # Calculer les scores de toutes les entités
-            all_scores = []
-            for eid in campaign_scope.entity_ids:
-                stats = self._calculate_entity_statistics(campaign_id, eid)
-                all_scores.append({
+            # Calculer les scores de toutes les entités (une seule requête groupée)
+            all_stats = self._calculate_entities_statistics(campaign_id, campaign_scope.entity_ids)
+            all_scores = [
+                {
                     'entity_id': str(eid),
-                    'score': stats.get('compliance_rate', 0)
-                })
+                    'score': all_stats.get(str(eid), {}).get('compliance_rate', 0)
+                }
+                for eid in campaign_scope.entity_ids
+            ]
 
             # Trier par score
             all_scores.sort(key=lambda x: x['score'], reverse=True)
@@ -1595,6 +1828,7 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur calcul benchmarking: {str(e)}")
+            record_collection_error("_calculate_entity_benchmarking")
             return {}
 
     # ========================================================================
@@ -1818,86 +2052,61 @@ class ReportService:
             # Logos
             data['logos'] = self._get_logos_data(tenant_id)
 
-            # 1. Statistiques globales de l'écosystème
-            stats_query = text("""
-                WITH latest_scans AS (
-                    SELECT DISTINCT ON (es.entity_id)
-                        es.id,
-                        es.entity_id,
-                        es.summary,
-                        es.finished_at
-                    FROM external_scan es
-                    WHERE es.tenant_id = CAST(:tenant_id AS uuid)
-                      AND es.status = 'SUCCESS'
-                      AND es.entity_id IS NOT NULL
-                    ORDER BY es.entity_id, es.finished_at DESC
-                )
-                SELECT
-                    COUNT(DISTINCT ls.entity_id) as total_entities,
-                    AVG((ls.summary->>'exposure_score')::numeric) as avg_exposure,
-                    MIN((ls.summary->>'exposure_score')::numeric) as min_exposure,
-                    MAX((ls.summary->>'exposure_score')::numeric) as max_exposure,
-                    SUM((ls.summary->>'nb_vuln_critical')::int) as total_critical,
-                    SUM((ls.summary->>'nb_vuln_high')::int) as total_high,
-                    SUM((ls.summary->>'nb_vuln_medium')::int) as total_medium,
-                    SUM((ls.summary->>'nb_vuln_low')::int) as total_low,
-                    SUM((ls.summary->>'nb_services_exposed')::int) as total_services
-                FROM latest_scans ls
-            """)
-
-            stats = self.db.execute(stats_query, {"tenant_id": str(tenant_id)}).fetchone()
+            # 1. Statistiques globales de l'écosystème (agrégats en cache,
+            # rafraîchis en fin de campagne de scan)
+            aggregates = get_ecosystem_aggregates(self.db, tenant_id)
+            stats = aggregates['stats']
 
             data['ecosystem'] = {
-                'total_entities': stats.total_entities or 0,
-                'avg_exposure_score': round(float(stats.avg_exposure or 0), 1),
-                'min_exposure_score': round(float(stats.min_exposure or 0), 1),
-                'max_exposure_score': round(float(stats.max_exposure or 0), 1),
+                'total_entities': stats['total_entities'],
+                'avg_exposure_score': round(stats['avg_exposure'], 1),
+                'min_exposure_score': round(stats['min_exposure'], 1),
+                'max_exposure_score': round(stats['max_exposure'], 1),
                 'total_vulnerabilities': {
-                    'critical': stats.total_critical or 0,
-                    'high': stats.total_high or 0,
-                    'medium': stats.total_medium or 0,
-                    'low': stats.total_low or 0,
-                    'total': (stats.total_critical or 0) + (stats.total_high or 0) + (stats.total_medium or 0) + (stats.total_low or 0)
+                    'critical': stats['total_critical'],
+                    'high': stats['total_high'],
+                    'medium': stats['total_medium'],
+                    'low': stats['total_low'],
+                    'total': stats['total_critical'] + stats['total_high'] + stats['total_medium'] + stats['total_low']
                 },
-                'total_services_exposed': stats.total_services or 0,
-                'avg_risk_level': self._get_risk_level(float(stats.avg_exposure or 0)),
+                'total_services_exposed': stats['total_services'],
+                'avg_risk_level': self._get_risk_level(stats['avg_exposure']),
                 'scan_date': datetime.now(timezone.utc).strftime('%d/%m/%Y')
             }
 
-            # 2. Liste des entités avec leurs scores (dernier scan)
+            # 2. Liste des entités avec leurs scores (dernier scan, table
+            # external_scan_latest)
             entities_query = text("""
                 WITH latest_scans AS (
-                    SELECT DISTINCT ON (es.entity_id)
-                        es.id as scan_id,
-                        es.entity_id,
-                        es.summary,
-                        es.finished_at,
-                        ee.name as entity_name,
-                        ee.logo_url as entity_logo
-                    FROM external_scan es
-                    JOIN ecosystem_entity ee ON es.entity_id = ee.id
-                    WHERE es.tenant_id = CAST(:tenant_id AS uuid)
-                      AND es.status = 'SUCCESS'
-                      AND es.entity_id IS NOT NULL
-                    ORDER BY es.entity_id, es.finished_at DESC
+                    SELECT DISTINCT ON (l.entity_id) l.*
+                    FROM external_scan_latest l
+                    WHERE l.tenant_id = CAST(:tenant_id AS uuid)
+                      AND l.entity_id IS NOT NULL
+                    ORDER BY l.entity_id, l.finished_at DESC
                 )
                 SELECT
                     ls.scan_id,
                     ls.entity_id,
-                    ls.entity_name,
-                    ls.entity_logo,
-                    ls.summary,
-                    ls.finished_at
+                    ee.name as entity_name,
+                    ee.logo_url as entity_logo,
+                    ls.finished_at,
+                    ls.exposure_score,
+                    ls.tls_grade,
+                    ls.nb_vuln_critical,
+                    ls.nb_vuln_high,
+                    ls.nb_vuln_medium,
+                    ls.nb_vuln_low,
+                    ls.nb_services_exposed
                 FROM latest_scans ls
-                ORDER BY (ls.summary->>'exposure_score')::numeric DESC
+                JOIN ecosystem_entity ee ON ls.entity_id = ee.id
+                ORDER BY ls.exposure_score DESC
             """)
 
             entities = self.db.execute(entities_query, {"tenant_id": str(tenant_id)}).fetchall()
 
             data['entities'] = []
             for e in entities:
-                summary = e.summary or {}
-                exposure = summary.get('exposure_score', 0)
+                exposure = e.exposure_score if e.exposure_score is not None else 0
                 data['entities'].append({
                     'id': str(e.entity_id),
                     'name': e.entity_name,
@@ -1906,12 +2115,12 @@ class ReportService:
                     'last_scan_date': e.finished_at.strftime('%d/%m/%Y') if e.finished_at else None,
                     'exposure_score': exposure,
                     'risk_level': self._get_risk_level(exposure),
-                    'tls_grade': summary.get('tls_grade', 'N/A'),
-                    'vuln_critical': summary.get('nb_vuln_critical', 0),
-                    'vuln_high': summary.get('nb_vuln_high', 0),
-                    'vuln_medium': summary.get('nb_vuln_medium', 0),
-                    'vuln_low': summary.get('nb_vuln_low', 0),
-                    'services_exposed': summary.get('nb_services_exposed', 0)
+                    'tls_grade': e.tls_grade or 'N/A',
+                    'vuln_critical': e.nb_vuln_critical,
+                    'vuln_high': e.nb_vuln_high,
+                    'vuln_medium': e.nb_vuln_medium,
+                    'vuln_low': e.nb_vuln_low,
+                    'services_exposed': e.nb_services_exposed
                 })
 
             # 3. Top vulnérabilités
@@ -1954,28 +2163,8 @@ class ReportService:
             ]
 
             # 4. Distribution des grades TLS
-            grades_query = text("""
-                WITH latest_scans AS (
-                    SELECT DISTINCT ON (es.entity_id)
-                        es.summary->>'tls_grade' as grade
-                    FROM external_scan es
-                    WHERE es.tenant_id = CAST(:tenant_id AS uuid)
-                      AND es.status = 'SUCCESS'
-                      AND es.entity_id IS NOT NULL
-                    ORDER BY es.entity_id, es.finished_at DESC
-                )
-                SELECT
-                    COALESCE(grade, 'N/A') as grade,
-                    COUNT(*) as count
-                FROM latest_scans
-                GROUP BY grade
-                ORDER BY grade
-            """)
-
-            grades = self.db.execute(grades_query, {"tenant_id": str(tenant_id)}).fetchall()
-
             data['distribution'] = {
-                'tls_grades': {g.grade: g.count for g in grades}
+                'tls_grades': aggregates['tls_grades']
             }
 
             # 5. Graphique de positionnement (toutes les entités)
@@ -2038,75 +2227,46 @@ class ReportService:
             Dict avec les données du graphique
         """
         try:
-            # Requête pour récupérer les données de positionnement
+            # Requête pour récupérer les données de positionnement (dernier
+            # scan de chaque entité, table external_scan_latest)
             if entity_id:
                 # Une seule entité
                 query = text("""
-                    WITH latest_scan AS (
-                        SELECT
-                            es.id,
-                            es.entity_id,
-                            es.summary,
-                            ee.name as entity_name
-                        FROM external_scan es
-                        JOIN ecosystem_entity ee ON es.entity_id = ee.id
-                        WHERE es.entity_id = CAST(:entity_id AS uuid)
-                          AND es.status = 'SUCCESS'
-                        ORDER BY es.finished_at DESC
-                        LIMIT 1
-                    ),
-                    vuln_stats AS (
-                        SELECT
-                            ls.entity_id,
-                            COUNT(v.id) as total_cves,
-                            COALESCE(AVG(v.cvss_score), 0) as avg_cvss
-                        FROM latest_scan ls
-                        LEFT JOIN external_service_vulnerability v ON v.external_scan_id = ls.id
-                        GROUP BY ls.entity_id
-                    )
                     SELECT
-                        ls.entity_id,
-                        ls.entity_name,
-                        (ls.summary->>'exposure_score')::numeric as exposure_score,
-                        COALESCE(vs.total_cves, 0) as total_cves,
-                        COALESCE(vs.avg_cvss, 0) as avg_cvss
-                    FROM latest_scan ls
-                    LEFT JOIN vuln_stats vs ON ls.entity_id = vs.entity_id
+                        l.entity_id,
+                        ee.name as entity_name,
+                        l.exposure_score,
+                        l.nb_findings as total_cves,
+                        l.avg_cvss
+                    FROM external_scan_latest l
+                    JOIN ecosystem_entity ee ON l.entity_id = ee.id
+                    WHERE l.entity_id = CAST(:entity_id AS uuid)
+                    ORDER BY l.finished_at DESC
+                    LIMIT 1
                 """)
                 params = {"entity_id": str(entity_id)}
             else:
                 # Toutes les entités
                 query = text("""
                     WITH latest_scans AS (
-                        SELECT DISTINCT ON (es.entity_id)
-                            es.id,
-                            es.entity_id,
-                            es.summary,
-                            ee.name as entity_name
-                        FROM external_scan es
-                        JOIN ecosystem_entity ee ON es.entity_id = ee.id
-                        WHERE es.tenant_id = CAST(:tenant_id AS uuid)
-                          AND es.status = 'SUCCESS'
-                          AND es.entity_id IS NOT NULL
-                        ORDER BY es.entity_id, es.finished_at DESC
-                    ),
-                    vuln_stats AS (
-                        SELECT
-                            ls.entity_id,
-                            COUNT(v.id) as total_cves,
-                            COALESCE(AVG(v.cvss_score), 0) as avg_cvss
-                        FROM latest_scans ls
-                        LEFT JOIN external_service_vulnerability v ON v.external_scan_id = ls.id
-                        GROUP BY ls.entity_id
+                        SELECT DISTINCT ON (l.entity_id)
+                            l.entity_id,
+                            l.exposure_score,
+                            l.nb_findings,
+                            l.avg_cvss
+                        FROM external_scan_latest l
+                        WHERE l.tenant_id = CAST(:tenant_id AS uuid)
+                          AND l.entity_id IS NOT NULL
+                        ORDER BY l.entity_id, l.finished_at DESC
                     )
                     SELECT
                         ls.entity_id,
-                        ls.entity_name,
-                        (ls.summary->>'exposure_score')::numeric as exposure_score,
-                        COALESCE(vs.total_cves, 0) as total_cves,
-                        COALESCE(vs.avg_cvss, 0) as avg_cvss
+                        ee.name as entity_name,
+                        ls.exposure_score,
+                        ls.nb_findings as total_cves,
+                        ls.avg_cvss
                     FROM latest_scans ls
-                    LEFT JOIN vuln_stats vs ON ls.entity_id = vs.entity_id
+                    JOIN ecosystem_entity ee ON ls.entity_id = ee.id
                 """)
                 params = {"tenant_id": str(tenant_id)}
 
@@ -2133,4 +2293,5 @@ class ReportService:
 
         except Exception as e:
             logger.error(f"❌ Erreur génération positionnement: {str(e)}")
+            record_collection_error("_get_entity_positioning")
             return {'type': 'scatter', 'data': []}
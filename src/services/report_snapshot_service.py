@@ -0,0 +1,238 @@
+"""
+Snapshots versionnés des données de rapport d'une campagne.
+
+Un même rapport déclenche plusieurs collectes des mêmes données : aperçu HTML
+(consulté plusieurs fois), résumé IA puis génération PDF. Chaque collecte
+exécute une vingtaine de requêtes d'agrégation sur ``question_answer``.
+
+Le dictionnaire de données est calculé une fois par (type de collecte,
+campagne, entité, version des données) puis partagé via Redis :
+- version : campagne figée -> date de gel (les réponses ne bougent plus) ;
+  sinon dernière mise à jour et nombre de réponses ``question_answer``.
+  La dernière mise à jour du plan d'action (publié après le gel), les
+  logos et noms (tenant, organisation, entité) et le référentiel affichés
+  entrent dans les deux cas
+- une nouvelle version produit une nouvelle clé (pas d'invalidation) ;
+  les campagnes figées ne sont recalculées qu'à l'expiration du snapshot
+- stockage compact : JSON compressé (zlib) encodé en base64, le client
+  Redis partagé travaillant en chaînes (``decode_responses=True``)
+- chaque lecture renvoie une copie indépendante : les appelants peuvent
+  normaliser le dictionnaire sans altérer le snapshot
+- une collecte partielle (erreur avalée par un helper de ReportService,
+  signalée via record_collection_error) est renvoyée sans être mise en cache
+- sans Redis (mode dégradé), les données sont collectées à chaque appel
+
+Exemple d'utilisation:
+    data = get_snapshot(db, "entity", campaign_id, entity_id,
+                        lambda: report_service.collect_entity_data(campaign_id, entity_id))
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import zlib
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.utils.redis_manager import RedisJSONEncoder, redis_manager
+
+logger = logging.getLogger(__name__)
+
+REPORT_SNAPSHOT_ENABLED = os.getenv("REPORT_SNAPSHOT_ENABLED", "true").lower() == "true"
+# Campagne en cours : filet de sécurité pour les données hors version
+REPORT_SNAPSHOT_TTL = int(os.getenv("REPORT_SNAPSHOT_TTL", "3600"))
+REPORT_SNAPSHOT_FROZEN_TTL = int(os.getenv("REPORT_SNAPSHOT_FROZEN_TTL", "2592000"))  # 30 jours
+
+CACHE_KEY_PREFIX = "report:snapshot:"
+
+# Niveau de compression zlib (6 : bon compromis taille / CPU)
+_COMPRESSION_LEVEL = 6
+
+# Sources en erreur de la collecte en cours (None hors get_snapshot)
+_collection_errors: ContextVar[Optional[List[str]]] = ContextVar("report_collection_errors", default=None)
+
+_VERSION_QUERY = text("""
+    SELECT
+        c.status,
+        c.frozen_date,
+        CASE WHEN c.status = 'frozen' THEN NULL ELSE (
+            SELECT MAX(qa.updated_at) FROM question_answer qa WHERE qa.campaign_id = c.id
+        ) END AS answers_updated_at,
+        CASE WHEN c.status = 'frozen' THEN NULL ELSE (
+            SELECT COUNT(*) FROM question_answer qa WHERE qa.campaign_id = c.id
+        ) END AS answers_count,
+        (
+            SELECT MAX(GREATEST(ap.updated_at, api.updated_at))
+            FROM action_plan ap
+            LEFT JOIN action_plan_item api ON api.action_plan_id = ap.id
+            WHERE ap.campaign_id = c.id
+        ) AS actions_updated_at,
+        (
+            SELECT md5(CONCAT_WS('|', t.name, t.logo_url)) FROM tenant t WHERE t.id = c.tenant_id
+        ) AS tenant_context,
+        (
+            SELECT md5(CONCAT_WS('|', o.name, o.logo_url)) FROM organization o
+            WHERE o.tenant_id = c.tenant_id LIMIT 1
+        ) AS organization_context,
+        (
+            SELECT md5(CONCAT_WS('|', ee.name, ee.logo_url)) FROM ecosystem_entity ee
+            WHERE ee.id = CAST(:entity_id AS uuid)
+        ) AS entity_context,
+        (
+            SELECT md5(CONCAT_WS('|', f.name, f.code, f.version))
+            FROM questionnaire q
+            JOIN framework f ON f.id = q.framework_id
+            WHERE q.id = c.questionnaire_id
+        ) AS framework_context
+    FROM campaign c
+    WHERE c.id = CAST(:campaign_id AS uuid)
+""")
+
+
+def campaign_data_version(
+    db: Session,
+    campaign_id: UUID,
+    entity_id: Optional[UUID] = None
+) -> Optional[Tuple[str, bool]]:
+    """
+    Version des données de rapport d'une campagne (et de l'entité).
+
+    Returns:
+        (version, campagne figée) ou None si la campagne est introuvable
+        ou la version non calculable
+    """
+    try:
+        row = db.execute(_VERSION_QUERY, {
+            "campaign_id": str(campaign_id),
+            "entity_id": str(entity_id) if entity_id else None,
+        }).fetchone()
+    except Exception as e:
+        logger.warning(f"⚠️ Version des données de la campagne {campaign_id} non calculable: {e}")
+        # Rollback pour éviter que l'erreur ne bloque les transactions suivantes
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        return None
+
+    if row is None:
+        return None
+
+    frozen = row.status == "frozen"
+    if frozen:
+        version = f"frozen:{row.frozen_date}:{row.actions_updated_at}"
+    else:
+        version = f"live:{row.answers_updated_at}:{row.answers_count}:{row.actions_updated_at}"
+    # Logos (URL ou data URI, réduits à leur md5), noms et référentiel :
+    # un changement produit un nouveau snapshot
+    version += f":{row.tenant_context}:{row.organization_context}:{row.entity_context}:{row.framework_context}"
+    return version, frozen
+
+
+def record_collection_error(source: str) -> None:
+    """
+    Signale une erreur avalée pendant la collecte (données de repli).
+
+    Sans effet hors d'une collecte lancée par get_snapshot.
+    """
+    errors = _collection_errors.get()
+    if errors is not None:
+        errors.append(source)
+
+
+def _collect(build: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], List[str]]:
+    """Exécute build en relevant les erreurs signalées par les helpers."""
+    token = _collection_errors.set([])
+    try:
+        data = build()
+        return data, _collection_errors.get()
+    finally:
+        _collection_errors.reset(token)
+
+
+def snapshot_key(kind: str, campaign_id: UUID, entity_id: Optional[UUID], version: str) -> str:
+    """Clé Redis d'un snapshot."""
+    digest = hashlib.sha256(version.encode("utf-8")).hexdigest()[:16]
+    return f"{CACHE_KEY_PREFIX}{kind}:{campaign_id}:{entity_id or '-'}:{digest}"
+
+
+def encode_snapshot(data: Dict[str, Any]) -> str:
+    """Sérialise un dictionnaire de données (JSON compressé, base64)."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), cls=RedisJSONEncoder)
+    return base64.b64encode(zlib.compress(payload.encode("utf-8"), _COMPRESSION_LEVEL)).decode("ascii")
+
+
+def decode_snapshot(payload: str) -> Dict[str, Any]:
+    """Désérialise un snapshot (nouvelle copie à chaque appel)."""
+    return json.loads(zlib.decompress(base64.b64decode(payload)).decode("utf-8"))
+
+
+def get_snapshot(
+    db: Session,
+    kind: str,
+    campaign_id: UUID,
+    entity_id: Optional[UUID],
+    build: Callable[[], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Données de rapport depuis le snapshot de la version courante, ou
+    collectées par build puis mises en cache.
+
+    Args:
+        db: Session SQLAlchemy (calcul de la version)
+        kind: Type de collecte (ex: "consolidated", "entity", "ai_campaign")
+        campaign_id: ID de la campagne
+        entity_id: ID de l'entité (None pour les données de campagne)
+        build: Collecte des données (lève une exception en cas d'échec, ou
+            signale les données de repli via record_collection_error :
+            une collecte partielle n'est pas mise en cache)
+
+    Returns:
+        Dictionnaire de données, modifiable par l'appelant
+    """
+    if not REPORT_SNAPSHOT_ENABLED or not redis_manager.is_connected:
+        return build()
+
+    version = campaign_data_version(db, campaign_id, entity_id)
+    if version is None:
+        return build()
+    version, frozen = version
+
+    key = snapshot_key(kind, campaign_id, entity_id, version)
+    cached = redis_manager.get(key)
+    if isinstance(cached, dict) and "z" in cached:
+        try:
+            data = decode_snapshot(cached["z"])
+            logger.debug(f"Snapshot {kind} servi depuis le cache ({key})")
+            return data
+        except (ValueError, zlib.error) as e:
+            logger.warning(f"⚠️ Snapshot illisible {key}, nouvelle collecte: {e}")
+
+    data, errors = _collect(build)
+    if errors:
+        logger.warning(
+            f"⚠️ Collecte {kind} partielle pour la campagne {campaign_id} "
+            f"({', '.join(errors)}), snapshot non mis en cache"
+        )
+        return data
+
+    payload = encode_snapshot(data)
+    ttl = REPORT_SNAPSHOT_FROZEN_TTL if frozen else REPORT_SNAPSHOT_TTL
+    if redis_manager.set(key, {"z": payload}, ttl=ttl):
+        logger.info(f"📸 Snapshot {kind} de la campagne {campaign_id} mis en cache ({len(payload)} octets)")
+
+    # Même représentation qu'une lecture en cache (types JSON), copie indépendante
+    return decode_snapshot(payload)
+
+
+def clear_snapshots(campaign_id: Optional[UUID] = None) -> int:
+    """Supprime les snapshots (d'une campagne ou de toutes)."""
+    if campaign_id is None:
+        return redis_manager.delete_pattern(f"{CACHE_KEY_PREFIX}*")
+    return redis_manager.delete_pattern(f"{CACHE_KEY_PREFIX}*:{campaign_id}:*")
@@ -9,10 +9,22 @@ Données anonymisées:
 - Noms d'organismes remplacés par "ORGANISME_xxx"
 - Aucune URL ou chemin réseau spécifique
 
+Génération par lots:
+- les vulnérabilités identiques une fois anonymisées (même CVE sur plusieurs
+  hôtes) ne sont justifiées qu'une fois
+- les justifications déjà générées sont reprises du cache Redis
+- les lots restants sont envoyés en parallèle (SCAN_AI_CONCURRENCY appels
+  simultanés au maximum)
+- seules les justifications IA complètes et associées par ``vuln_index``
+  sont mises en cache, sous une clé incluant une empreinte du prompt système,
+  du gabarit de lot et du modèle (une modification invalide le cache)
+
 Version: 1.0
 Date: 2024-12-07
 """
 
+import asyncio
+import hashlib
 import logging
 import json
 import re
@@ -21,12 +33,22 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import httpx
 
+from src.utils.redis_manager import redis_manager
+
 logger = logging.getLogger(__name__)
 
 # Configuration via variables d'environnement
 OLLAMA_BASE_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "glm-4.6:cloud")
 
+# Appels IA simultanés lors de la génération par lots
+SCAN_AI_CONCURRENCY = int(os.getenv("SCAN_AI_CONCURRENCY", "3"))
+# Durée de vie des justifications en cache (30 jours)
+SCAN_AI_JUSTIFICATION_TTL = int(os.getenv("SCAN_AI_JUSTIFICATION_TTL", "2592000"))
+
+# Champs attendus dans chaque justification
+REQUIRED_FIELDS = ('why_action', 'why_severity', 'why_priority', 'why_role', 'why_due_days')
+
 
 class ScanAIJustificationService:
     """
@@ -56,17 +78,20 @@ RÈGLES IMPORTANTES:
 
 Tu réponds UNIQUEMENT en JSON valide, sans texte additionnel."""
 
-    def __init__(self, ollama_base_url: str = None, model: str = None):
+    def __init__(self, ollama_base_url: str = None, model: str = None, concurrency: int = None):
         """
         Initialise le service.
 
         Args:
             ollama_base_url: URL de base d'Ollama (défaut: OLLAMA_URL env var)
             model: Modèle à utiliser (défaut: OLLAMA_MODEL env var)
+            concurrency: Appels IA simultanés (défaut: SCAN_AI_CONCURRENCY env var)
         """
         self.ollama_base_url = (ollama_base_url or OLLAMA_BASE_URL).rstrip('/')
         self.model = model or OLLAMA_MODEL
+        self.concurrency = max(1, concurrency or SCAN_AI_CONCURRENCY)
         self.timeout = httpx.Timeout(connect=30.0, read=120.0, write=30.0, pool=30.0)
+        self.prompt_version = self._prompt_version()
         logger.info(f"🤖 ScanAIJustificationService initialisé - URL: {self.ollama_base_url}, Model: {self.model}")
 
     def _anonymize_vulnerability(self, vuln: Dict[str, Any]) -> Dict[str, Any]:
@@ -242,6 +267,10 @@ Tu réponds UNIQUEMENT en JSON valide, sans texte additionnel."""
         """
         Génère les justifications pour plusieurs vulnérabilités en batch.
 
+        Les vulnérabilités sont dédupliquées par signature anonymisée, les
+        justifications en cache sont réutilisées et les lots restants sont
+        traités en parallèle (self.concurrency appels simultanés).
+
         Args:
             vulnerabilities: Liste des vulnérabilités
             batch_size: Nombre de vulns à traiter par appel IA
@@ -249,35 +278,142 @@ Tu réponds UNIQUEMENT en JSON valide, sans texte additionnel."""
         Returns:
             Liste des justifications pour chaque vulnérabilité
         """
-        all_justifications = []
+        # Anonymiser puis dédupliquer (ordre de première apparition)
+        anon_vulns = [self._anonymize_vulnerability(v) for v in vulnerabilities]
+        signatures = [self._signature(v) for v in anon_vulns]
+        unique: Dict[str, Dict[str, Any]] = {}
+        for signature, anon_vuln in zip(signatures, anon_vulns):
+            unique.setdefault(signature, anon_vuln)
+
+        # Justifications déjà générées
+        justifications: Dict[str, Dict[str, str]] = {}
+        for signature in unique:
+            cached = redis_manager.get_cached_ai_result(self.model, self._cache_hash(signature))
+            if isinstance(cached, dict):
+                justifications[signature] = cached
+
+        pending = [(sig, v) for sig, v in unique.items() if sig not in justifications]
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+        logger.info(
+            f"🤖 Justifications: {len(vulnerabilities)} vulnérabilités, {len(unique)} uniques, "
+            f"{len(justifications)} en cache, {len(batches)} lots à générer "
+            f"(parallélisme {self.concurrency})"
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_batch(batch_number: int, batch: list) -> None:
+            async with semaphore:
+                results = await self._justify_batch(batch_number, [v for _, v in batch])
+            for (signature, _), result in zip(batch, results):
+                justifications[signature] = result
 
-        # Traiter par lots pour éviter les timeouts
-        for i in range(0, len(vulnerabilities), batch_size):
-            batch = vulnerabilities[i:i + batch_size]
+        await asyncio.gather(*(run_batch(n + 1, batch) for n, batch in enumerate(batches)))
 
-            # Anonymiser toutes les vulns du batch
-            anon_batch = [self._anonymize_vulnerability(v) for v in batch]
+        return [dict(justifications[signature]) for signature in signatures]
 
-            try:
-                # Construire le prompt batch
-                user_prompt = self._build_batch_prompt(anon_batch)
+    async def _justify_batch(self, batch_number: int, anon_batch: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Génère les justifications d'un lot (un appel IA) et met en cache
+        celles produites par l'IA (pas les justifications par défaut).
+        """
+        try:
+            # Construire le prompt batch
+            user_prompt = self._build_batch_prompt(anon_batch)
 
-                # Appeler l'IA
-                response = await self._call_ai(user_prompt)
+            # Appeler l'IA
+            response = await self._call_ai(user_prompt)
 
-                # Parser la réponse
-                batch_results = self._parse_batch_response(response, len(batch))
-                all_justifications.extend(batch_results)
+            # Parser la réponse
+            items = self._parse_batch_items(response)
+        except Exception as e:
+            logger.error(f"❌ Erreur batch {batch_number}: {e}")
+            # Générer des justifications par défaut pour ce batch
+            return [self._generate_default_justifications(vuln) for vuln in anon_batch]
+
+        by_index = self._map_batch_items(items, len(anon_batch))
+
+        results = []
+        for idx, vuln in enumerate(anon_batch):
+            item = by_index.get(idx)
+            if item is not None:
+                redis_manager.cache_ai_result(
+                    self.model, self._cache_hash(self._signature(vuln)), item, ttl=SCAN_AI_JUSTIFICATION_TTL
+                )
+                results.append(item)
+            else:
+                results.append(self._generate_default_justifications(vuln))
+
+        logger.info(
+            f"✅ Batch {batch_number}: {len(by_index)}/{len(results)} justifications IA "
+            f"(défaut pour les autres)"
+        )
+        return results
 
-                logger.info(f"✅ Batch {i//batch_size + 1}: {len(batch_results)} justifications générées")
+    @staticmethod
+    def _map_batch_items(items: list, expected_count: int) -> Dict[int, Dict[str, str]]:
+        """
+        Associe les éléments de la réponse batch aux vulnérabilités du lot.
 
-            except Exception as e:
-                logger.error(f"❌ Erreur batch {i//batch_size + 1}: {e}")
-                # Générer des justifications par défaut pour ce batch
-                for vuln in anon_batch:
-                    all_justifications.append(self._generate_default_justifications(vuln))
+        L'association se fait par ``vuln_index`` (1-based) ; sans aucun
+        ``vuln_index``, par position uniquement si le nombre d'éléments
+        correspond au lot. Les éléments incomplets (champ ``why_*`` manquant
+        ou vide), hors lot ou en double sont écartés : la vulnérabilité
+        reçoit alors une justification par défaut, non mise en cache.
 
-        return all_justifications
+        Returns:
+            {position dans le lot: justification (champs requis uniquement)}
+        """
+        dict_items = [item for item in items if isinstance(item, dict)]
+        indexed = any('vuln_index' in item for item in dict_items)
+        if not indexed and len(items) != expected_count:
+            logger.warning(
+                f"⚠️ Réponse batch sans vuln_index: {len(items)} éléments pour "
+                f"{expected_count} vulnérabilités, justifications par défaut"
+            )
+            return {}
+
+        mapped: Dict[int, Dict[str, str]] = {}
+        duplicates = set()
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            if indexed:
+                try:
+                    idx = int(item.get('vuln_index')) - 1
+                except (TypeError, ValueError):
+                    continue
+            else:
+                idx = position
+            if not 0 <= idx < expected_count:
+                continue
+            if not all(isinstance(item.get(field), str) and item[field].strip() for field in REQUIRED_FIELDS):
+                continue
+            if idx in mapped:
+                duplicates.add(idx)
+                continue
+            mapped[idx] = {field: item[field] for field in REQUIRED_FIELDS}
+
+        for idx in duplicates:
+            # Deux réponses pour une même vulnérabilité : aucune n'est fiable
+            mapped.pop(idx, None)
+        return mapped
+
+    @staticmethod
+    def _signature(anon_vuln: Dict[str, Any]) -> str:
+        """Signature d'une vulnérabilité anonymisée (identique => même justification)."""
+        payload = json.dumps(anon_vuln, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _prompt_version(self) -> str:
+        """Empreinte courte du prompt système, du gabarit de lot et du modèle."""
+        # Gabarit rendu avec une vulnérabilité vide : texte fixe du prompt de lot
+        payload = "\0".join((self.SYSTEM_PROMPT, self._build_batch_prompt([{}]), self.model))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+    def _cache_hash(self, signature: str) -> str:
+        return f"scan-justification:{self.prompt_version}:{signature}"
 
     def _build_justification_prompt(self, vuln: Dict[str, Any]) -> str:
         """
@@ -438,8 +574,7 @@ Retourne un JSON array avec un objet par vulnérabilité:
             result = json.loads(cleaned)
 
             # Valider les champs requis
-            required_fields = ['why_action', 'why_severity', 'why_priority', 'why_role', 'why_due_days']
-            for field in required_fields:
+            for field in REQUIRED_FIELDS:
                 if field not in result:
                     result[field] = "Justification non disponible."
 
@@ -450,45 +585,28 @@ Retourne un JSON array avec un objet par vulnérabilité:
             logger.debug(f"Réponse brute: {response[:500]}")
             return self._generate_default_justifications({})
 
-    def _parse_batch_response(self, response: str, expected_count: int) -> List[Dict[str, str]]:
+    def _parse_batch_items(self, response: str) -> list:
         """
-        Parse la réponse JSON batch de l'IA.
-        """
-        try:
-            cleaned = response.strip()
-            if cleaned.startswith("```"):
-                if cleaned.startswith("```json"):
-                    cleaned = cleaned[7:]
-                else:
-                    cleaned = cleaned[3:]
-                if "```" in cleaned:
-                    cleaned = cleaned.split("```")[0]
-            cleaned = cleaned.strip()
-
-            results = json.loads(cleaned)
-
-            if not isinstance(results, list):
-                results = [results]
+        Parse la réponse JSON batch de l'IA (éléments bruts, sans complément).
 
-            # Compléter si nécessaire
-            while len(results) < expected_count:
-                results.append(self._generate_default_justifications({}))
-
-            # Nettoyer chaque résultat
-            cleaned_results = []
-            for r in results[:expected_count]:
-                if isinstance(r, dict):
-                    # Retirer vuln_index s'il existe
-                    r.pop('vuln_index', None)
-                    cleaned_results.append(r)
-                else:
-                    cleaned_results.append(self._generate_default_justifications({}))
-
-            return cleaned_results
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Erreur parsing JSON batch: {e}")
-            return [self._generate_default_justifications({}) for _ in range(expected_count)]
+        Raises:
+            json.JSONDecodeError: Réponse non JSON
+        """
+        cleaned = response.strip()
+        if cleaned.startswith("```"):
+            if cleaned.startswith("```json"):
+                cleaned = cleaned[7:]
+            else:
+                cleaned = cleaned[3:]
+            if "```" in cleaned:
+                cleaned = cleaned.split("```")[0]
+        cleaned = cleaned.strip()
+
+        results = json.loads(cleaned)
+
+        if not isinstance(results, list):
+            results = [results]
+        return results
 
     def _generate_default_justifications(self, vuln: Dict[str, Any]) -> Dict[str, str]:
         """
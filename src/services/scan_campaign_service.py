@@ -0,0 +1,621 @@
+"""
+Campagnes de scan externe (rafraîchissement complet d'un écosystème).
+
+Une campagne scanne en parallèle les cibles actives d'un tenant :
+1. Planification : résolution DNS des cibles, déduplication des cibles qui
+   résolvent vers la même adresse IP (un seul scan, résultat propagé aux
+   doublons en fin de campagne), création des lignes external_scan
+2. Fan-out : un groupe Celery de tâches de scan terminé par un chord
+   (voir src.tasks.external_scan_tasks)
+3. Limitation : chaque tâche obtient des créneaux Redis avant de lancer nmap
+   (plafonds global et par tenant, politesse par IP et par ASN) ; sinon elle
+   est replanifiée. Les scans ponctuels (hors campagne) obtiennent les mêmes
+   créneaux
+4. Finalisation (callback du chord) : compteurs, propagation aux doublons,
+   rafraîchissement des agrégats écosystème
+
+L'ASN d'une adresse est obtenu par DNS (origin.asn.cymru.com) ; à défaut,
+le préfixe réseau (/24, /48) sert de regroupement de politesse.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import ipaddress
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.utils.redis_manager import redis_manager
+from .scan_ecosystem_service import propagate_latest_scan, refresh_ecosystem_aggregates
+
+logger = logging.getLogger(__name__)
+
+# Plafonds de scans simultanés
+SCAN_GLOBAL_CONCURRENCY = int(os.getenv("SCAN_GLOBAL_CONCURRENCY", "8"))
+SCAN_TENANT_CONCURRENCY = int(os.getenv("SCAN_TENANT_CONCURRENCY", "4"))
+# Politesse : scans simultanés vers une même IP / un même ASN
+SCAN_IP_CONCURRENCY = int(os.getenv("SCAN_IP_CONCURRENCY", "1"))
+SCAN_ASN_CONCURRENCY = int(os.getenv("SCAN_ASN_CONCURRENCY", "2"))
+SCAN_ASN_LOOKUP = os.getenv("SCAN_ASN_LOOKUP", "true").lower() == "true"
+
+# Durée d'un créneau (libéré en fin de scan, expiré si le worker meurt)
+SCAN_SLOT_LEASE_SECONDS = int(os.getenv("SCAN_SLOT_LEASE_SECONDS", "900"))
+# Délai avant nouvelle tentative quand un plafond est atteint
+SCAN_SLOT_RETRY_SECONDS = int(os.getenv("SCAN_SLOT_RETRY_SECONDS", "30"))
+# Attente maximale d'un créneau avant abandon du scan
+SCAN_CAMPAIGN_MAX_WAIT_SECONDS = int(os.getenv("SCAN_CAMPAIGN_MAX_WAIT_SECONDS", "86400"))
+
+RESOLVE_WORKERS = 16
+SLOT_KEY_PREFIX = "scan:slots:"
+
+# Types de cibles résolues par DNS
+HOSTNAME_TYPES = ("DOMAIN", "SUBDOMAIN")
+
+# Intervalle de rescan des cibles planifiées (external_target.scan_frequency)
+SCAN_FREQUENCY_INTERVALS = {
+    "DAILY": "1 day",
+    "WEEKLY": "7 days",
+    "MONTHLY": "1 month",
+}
+
+
+# ==============================================================================
+# RÉSOLUTION ET DÉDUPLICATION
+# ==============================================================================
+
+def resolve_addresses(target_type: str, value: str) -> List[str]:
+    """
+    Adresses IP d'une cible (triées, sans doublon).
+
+    Une plage IP est conservée telle quelle (notation CIDR) ; un nom non
+    résolu donne une liste vide.
+    """
+    value = value.strip()
+    try:
+        if target_type == "IP":
+            return [str(ipaddress.ip_address(value))]
+        if target_type == "IP_RANGE":
+            return [str(ipaddress.ip_network(value, strict=False))]
+    except ValueError:
+        return []
+
+    if target_type not in HOSTNAME_TYPES:
+        return []
+
+    try:
+        infos = socket.getaddrinfo(value, None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return []
+    return sorted({info[4][0] for info in infos}, key=_address_sort_key)
+
+
+def _address_sort_key(address: str) -> tuple:
+    """IPv4 avant IPv6, puis ordre numérique."""
+    ip = ipaddress.ip_network(address, strict=False)
+    return ip.version, int(ip.network_address), ip.prefixlen
+
+
+def network_key(address: str) -> str:
+    """Préfixe réseau d'une adresse (/24 en IPv4, /48 en IPv6)."""
+    network = ipaddress.ip_network(address, strict=False)
+    prefix = 24 if network.version == 4 else 48
+    if network.prefixlen <= prefix:
+        return str(network)
+    return str(network.supernet(new_prefix=prefix))
+
+
+@lru_cache(maxsize=4096)
+def lookup_asn(address: str) -> Optional[str]:
+    """
+    Numéro d'AS d'une adresse IP via le service DNS de Team Cymru.
+
+    Returns:
+        ASN (ex: "16276") ou None si indisponible (dnspython absent compris)
+    """
+    try:
+        import dns.resolver
+    except ImportError:
+        return None
+
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return None
+    if not ip.is_global:
+        return None
+
+    if ip.version == 4:
+        query = ".".join(reversed(str(ip).split("."))) + ".origin.asn.cymru.com"
+    else:
+        query = ".".join(reversed(ip.exploded.replace(":", ""))) + ".origin6.asn.cymru.com"
+
+    try:
+        answer = dns.resolver.resolve(query, "TXT", lifetime=3.0)
+    except Exception:
+        return None
+
+    for record in answer:
+        # "16276 | 51.68.0.0/16 | FR | ripencc | 2016-09-09"
+        asn = record.to_text().strip('"').split("|")[0].strip().split(" ")[0]
+        if asn.isdigit():
+            return asn
+    return None
+
+
+def politeness_group(address: str) -> str:
+    """Groupe de politesse d'une adresse : ASN si connu, sinon préfixe réseau."""
+    if SCAN_ASN_LOOKUP and "/" not in address:
+        asn = lookup_asn(address)
+        if asn:
+            return f"asn:{asn}"
+    return f"net:{network_key(address)}"
+
+
+def plan_targets(targets: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Déduplique les cibles qui résolvent vers la même adresse.
+
+    Les cibles sont regroupées par adresse principale (première adresse
+    résolue). Dans chaque groupe, un nom d'hôte est préféré à une IP (le
+    nom permet le SNI lors de l'audit TLS). Les cibles non résolues sont
+    conservées individuellement (le moteur de scan rapportera l'erreur).
+
+    Args:
+        targets: Cibles {id, type, value, addresses}
+
+    Returns:
+        (cibles à scanner, doublons {target_id, duplicate_of, address})
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    to_scan: List[Dict[str, Any]] = []
+
+    for target in targets:
+        if target["addresses"]:
+            groups.setdefault(target["addresses"][0], []).append(target)
+        else:
+            to_scan.append(target)
+
+    duplicates = []
+    for address, group in groups.items():
+        group.sort(key=lambda t: (t["type"] not in HOSTNAME_TYPES, t["value"], str(t["id"])))
+        primary, others = group[0], group[1:]
+        to_scan.append(primary)
+        duplicates.extend(
+            {"target_id": str(t["id"]), "duplicate_of": str(primary["id"]), "address": address}
+            for t in others
+        )
+
+    return to_scan, duplicates
+
+
+# ==============================================================================
+# CRÉNEAUX DE SCAN (REDIS)
+# ==============================================================================
+
+# Un ZSET par plafond : membres = scans en cours, score = expiration du créneau.
+# Les créneaux sont pris sur toutes les clés ou sur aucune.
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local expires_at = tonumber(ARGV[2])
+local member = ARGV[3]
+local ttl = tonumber(ARGV[4])
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+    if not redis.call('ZSCORE', key, member)
+        and redis.call('ZCARD', key) >= tonumber(ARGV[4 + i]) then
+        return 0
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, expires_at, member)
+    redis.call('EXPIRE', key, ttl)
+end
+return 1
+"""
+
+
+def scan_slot_limits(
+    tenant_id: str,
+    address: Optional[str],
+    group: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Clés de créneaux (et plafonds) à obtenir pour scanner une adresse.
+
+    Args:
+        tenant_id: Tenant de la cible
+        address: Adresse principale de la cible (None si non résolue)
+        group: Groupe de politesse (calculé à la planification)
+    """
+    limits = {
+        f"{SLOT_KEY_PREFIX}global": SCAN_GLOBAL_CONCURRENCY,
+        f"{SLOT_KEY_PREFIX}tenant:{tenant_id}": SCAN_TENANT_CONCURRENCY,
+    }
+    if address:
+        limits[f"{SLOT_KEY_PREFIX}ip:{address}"] = SCAN_IP_CONCURRENCY
+        limits[f"{SLOT_KEY_PREFIX}{group or politeness_group(address)}"] = SCAN_ASN_CONCURRENCY
+    return limits
+
+
+def target_slot_limits(tenant_id: str, target_type: str, value: str) -> Dict[str, int]:
+    """
+    Clés de créneaux d'une cible scannée hors campagne.
+
+    Résout la cible comme à la planification d'une campagne, pour que les
+    scans ponctuels partagent les mêmes plafonds que les campagnes.
+    """
+    addresses = resolve_addresses(target_type, value)
+    return scan_slot_limits(tenant_id, addresses[0] if addresses else None)
+
+
+def acquire_scan_slots(scan_id: str, limits: Dict[str, int]) -> bool:
+    """
+    Réserve un créneau sur chaque clé si aucun plafond n'est atteint.
+
+    Sans Redis, aucun plafond n'est appliqué (mode dégradé, signalé dans les
+    logs) : seule la concurrence des workers Celery limite alors les scans.
+    """
+    client = redis_manager.client
+    if client is None:
+        logger.warning(f"⚠️ Redis non connecté : scan {scan_id} lancé sans plafond de concurrence")
+        return True
+
+    now = time.time()
+    keys = list(limits)
+    try:
+        script = client.register_script(_ACQUIRE_SCRIPT)
+        return bool(script(
+            keys=keys,
+            args=[now, now + SCAN_SLOT_LEASE_SECONDS, scan_id, SCAN_SLOT_LEASE_SECONDS]
+                 + [limits[key] for key in keys]
+        ))
+    except RedisError as e:
+        logger.warning(f"⚠️ Créneaux de scan indisponibles (mode dégradé): {e}")
+        return True
+
+
+def release_scan_slots(scan_id: str, limits: Dict[str, int]) -> None:
+    """Libère les créneaux d'un scan terminé."""
+    client = redis_manager.client
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline()
+        for key in limits:
+            pipe.zrem(key, scan_id)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"⚠️ Libération des créneaux de scan impossible: {e}")
+
+
+# ==============================================================================
+# SERVICE
+# ==============================================================================
+
+class ScanCampaignService:
+    """
+    Création, planification et finalisation des campagnes de scan.
+
+    Ne commit pas : l'appelant reste maître de la transaction.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_campaign(
+        self,
+        tenant_id: str,
+        triggered_by: Optional[str] = None,
+        trigger_type: str = "manual",
+        name: Optional[str] = None,
+        target_ids: Optional[List[str]] = None,
+        entity_ids: Optional[List[str]] = None
+    ) -> str:
+        """
+        Crée une campagne PENDING.
+
+        Args:
+            tenant_id: Tenant propriétaire
+            triggered_by: Utilisateur à l'origine (None si planifiée)
+            trigger_type: manual, scheduled
+            name: Libellé de la campagne
+            target_ids: Limite aux cibles listées (None = toutes)
+            entity_ids: Limite aux cibles de ces entités (None = toutes)
+
+        Returns:
+            ID de la campagne
+        """
+        campaign_id = str(uuid.uuid4())
+        target_filter = {
+            key: [str(v) for v in values]
+            for key, values in (("target_ids", target_ids), ("entity_ids", entity_ids))
+            if values
+        }
+
+        self.db.execute(text("""
+            INSERT INTO external_scan_campaign (
+                id, tenant_id, name, status, trigger_type, triggered_by,
+                target_filter, created_at
+            ) VALUES (
+                CAST(:id AS uuid), CAST(:tenant_id AS uuid), :name, 'PENDING',
+                :trigger_type, CAST(:triggered_by AS uuid),
+                CAST(:target_filter AS jsonb), NOW()
+            )
+        """), {
+            "id": campaign_id,
+            "tenant_id": tenant_id,
+            "name": name,
+            "trigger_type": trigger_type,
+            "triggered_by": triggered_by,
+            "target_filter": json.dumps(target_filter) if target_filter else None,
+        })
+        return campaign_id
+
+    def plan_campaign(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """
+        Sélectionne, résout et déduplique les cibles, puis crée les scans.
+
+        Les cibles ayant déjà un scan PENDING/RUNNING sont ignorées.
+
+        Returns:
+            Scans à lancer {target_id, scan_id, tenant_id, address, group}
+        """
+        campaign = self.db.execute(text("""
+            SELECT id, tenant_id, trigger_type, triggered_by, target_filter
+            FROM external_scan_campaign
+            WHERE id = CAST(:id AS uuid)
+        """), {"id": campaign_id}).fetchone()
+        if not campaign:
+            raise ValueError(f"Campagne de scan introuvable: {campaign_id}")
+
+        tenant_id = str(campaign.tenant_id)
+        target_filter = campaign.target_filter or {}
+
+        rows = self.db.execute(text("""
+            SELECT
+                et.id, et.type, et.value, et.entity_id,
+                EXISTS (
+                    SELECT 1 FROM external_scan es
+                    WHERE es.external_target_id = et.id
+                      AND es.status IN ('PENDING', 'RUNNING')
+                ) AS is_running
+            FROM external_target et
+            WHERE et.tenant_id = CAST(:tenant_id AS uuid)
+              AND et.deleted_at IS NULL
+              AND et.is_active = true
+              AND et.type <> 'EMAIL_DOMAIN'
+              AND (CAST(:target_ids AS uuid[]) IS NULL OR et.id = ANY(CAST(:target_ids AS uuid[])))
+              AND (CAST(:entity_ids AS uuid[]) IS NULL OR et.entity_id = ANY(CAST(:entity_ids AS uuid[])))
+            ORDER BY et.created_at
+        """), {
+            "tenant_id": tenant_id,
+            "target_ids": target_filter.get("target_ids"),
+            "entity_ids": target_filter.get("entity_ids"),
+        }).fetchall()
+
+        skipped = [str(r.id) for r in rows if r.is_running]
+        candidates = [r for r in rows if not r.is_running]
+
+        # Résolution DNS en parallèle (appels bloquants)
+        with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as pool:
+            addresses = list(pool.map(lambda r: resolve_addresses(r.type, r.value), candidates))
+
+        targets = [
+            {"id": str(r.id), "type": r.type, "value": r.value, "entity_id": r.entity_id, "addresses": addrs}
+            for r, addrs in zip(candidates, addresses)
+        ]
+        to_scan, duplicates = plan_targets(targets)
+
+        # Groupes de politesse (ASN) des adresses à scanner
+        with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as pool:
+            groups = list(pool.map(
+                lambda t: politeness_group(t["addresses"][0]) if t["addresses"] else None,
+                to_scan
+            ))
+
+        jobs = []
+        scan_rows = []
+        for target, group in zip(to_scan, groups):
+            scan_id = str(uuid.uuid4())
+            scan_rows.append({
+                "scan_id": scan_id,
+                "target_id": target["id"],
+                "tenant_id": tenant_id,
+                "entity_id": str(target["entity_id"]) if target["entity_id"] else None,
+                "triggered_by": str(campaign.triggered_by) if campaign.triggered_by else None,
+                "trigger_type": campaign.trigger_type,
+                "campaign_id": campaign_id,
+            })
+            jobs.append({
+                "target_id": target["id"],
+                "scan_id": scan_id,
+                "tenant_id": tenant_id,
+                "address": target["addresses"][0] if target["addresses"] else None,
+                "group": group,
+            })
+
+        if scan_rows:
+            self.db.execute(text("""
+                INSERT INTO external_scan (
+                    id, external_target_id, tenant_id, entity_id,
+                    status, triggered_by, trigger_type, campaign_id, created_at
+                ) VALUES (
+                    CAST(:scan_id AS uuid),
+                    CAST(:target_id AS uuid),
+                    CAST(:tenant_id AS uuid),
+                    CAST(:entity_id AS uuid),
+                    'PENDING',
+                    CAST(:triggered_by AS uuid),
+                    :trigger_type,
+                    CAST(:campaign_id AS uuid),
+                    NOW()
+                )
+            """), scan_rows)
+
+        summary = {"duplicates": duplicates, "skipped_running": skipped}
+        self.db.execute(text("""
+            UPDATE external_scan_campaign
+            SET status = :status,
+                targets_count = :targets_count,
+                scans_count = :scans_count,
+                deduplicated_count = :deduplicated_count,
+                summary = CAST(:summary AS jsonb),
+                started_at = NOW(),
+                finished_at = CASE WHEN :scans_count = 0 THEN NOW() END
+            WHERE id = CAST(:id AS uuid)
+        """), {
+            "id": campaign_id,
+            "status": "RUNNING" if jobs else "SUCCESS",
+            "targets_count": len(rows),
+            "scans_count": len(jobs),
+            "deduplicated_count": len(duplicates),
+            "summary": json.dumps(summary),
+        })
+
+        logger.info(
+            f"🗺️ Campagne de scan planifiée: {campaign_id} — {len(jobs)} scans, "
+            f"{len(duplicates)} doublons IP, {len(skipped)} cibles déjà en cours"
+        )
+        return jobs
+
+    def finalize_campaign(self, campaign_id: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Clôture une campagne à partir des résultats des scans (callback du chord).
+
+        - compteurs SUCCESS / ERROR et statut (SUCCESS, PARTIAL, ERROR)
+        - propagation du dernier scan de chaque cible scannée à ses doublons
+        - rafraîchissement des agrégats écosystème du tenant
+        """
+        campaign = self.db.execute(text("""
+            SELECT tenant_id, summary FROM external_scan_campaign
+            WHERE id = CAST(:id AS uuid)
+        """), {"id": campaign_id}).fetchone()
+        if not campaign:
+            raise ValueError(f"Campagne de scan introuvable: {campaign_id}")
+
+        success_count = sum(1 for r in results if r and r.get("status") == "SUCCESS")
+        error_count = len(results) - success_count
+
+        summary = dict(campaign.summary or {})
+        duplicates = summary.get("duplicates", [])
+        if duplicates:
+            self.db.execute(text("""
+                UPDATE external_target t
+                SET last_scan_at = p.last_scan_at,
+                    last_scan_status = p.last_scan_status,
+                    last_exposure_score = p.last_exposure_score,
+                    updated_at = NOW()
+                FROM external_target p
+                WHERE t.id = CAST(:target_id AS uuid)
+                  AND p.id = CAST(:duplicate_of AS uuid)
+            """), duplicates)
+            propagate_latest_scan(self.db, duplicates)
+
+        aggregates = refresh_ecosystem_aggregates(self.db, campaign.tenant_id)
+        summary["ecosystem"] = aggregates["stats"]
+
+        if error_count == 0:
+            status = "SUCCESS"
+        elif success_count:
+            status = "PARTIAL"
+        else:
+            status = "ERROR"
+
+        self.db.execute(text("""
+            UPDATE external_scan_campaign
+            SET status = :status,
+                success_count = :success_count,
+                error_count = :error_count,
+                summary = CAST(:summary AS jsonb),
+                finished_at = NOW()
+            WHERE id = CAST(:id AS uuid)
+        """), {
+            "id": campaign_id,
+            "status": status,
+            "success_count": success_count,
+            "error_count": error_count,
+            "summary": json.dumps(summary),
+        })
+
+        return {"status": status, "success_count": success_count, "error_count": error_count}
+
+    def mark_campaign_error(self, campaign_id: str, error_message: str) -> None:
+        """Marque une campagne en erreur (échec de la planification)."""
+        self.db.execute(text("""
+            UPDATE external_scan_campaign
+            SET status = 'ERROR', error_message = :error, finished_at = NOW()
+            WHERE id = CAST(:id AS uuid)
+        """), {"id": campaign_id, "error": error_message})
+
+    def get_campaign(self, tenant_id: str, campaign_id: str):
+        """Campagne d'un tenant (None si introuvable)."""
+        return self.db.execute(text("""
+            SELECT * FROM external_scan_campaign
+            WHERE id = CAST(:id AS uuid)
+              AND tenant_id = CAST(:tenant_id AS uuid)
+        """), {"id": campaign_id, "tenant_id": tenant_id}).fetchone()
+
+    def list_campaigns(self, tenant_id: str, limit: int = 20, offset: int = 0) -> Tuple[list, int]:
+        """Campagnes d'un tenant (plus récentes d'abord) et nombre total."""
+        params = {"tenant_id": tenant_id, "limit": limit, "offset": offset}
+        rows = self.db.execute(text("""
+            SELECT * FROM external_scan_campaign
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+            ORDER BY created_at DESC
+            LIMIT :limit OFFSET :offset
+        """), params).fetchall()
+        total = self.db.execute(text("""
+            SELECT COUNT(*) FROM external_scan_campaign
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+        """), params).scalar()
+        return rows, total or 0
+
+    def due_targets_by_tenant(self) -> Dict[str, List[str]]:
+        """
+        Cibles dont le rescan périodique est dû (scan_frequency DAILY, WEEKLY,
+        MONTHLY), regroupées par tenant.
+
+        Les cibles ayant déjà un scan PENDING/RUNNING sont exclues
+        (last_scan_at n'est mis à jour qu'en fin de scan) : sans elles, aucune
+        campagne vide n'est créée à chaque passage du planificateur.
+        """
+        rows = self.db.execute(text("""
+            SELECT et.tenant_id, et.id
+            FROM external_target et
+            WHERE et.deleted_at IS NULL
+              AND et.is_active = true
+              AND et.type <> 'EMAIL_DOMAIN'
+              AND et.scan_frequency IN ('DAILY', 'WEEKLY', 'MONTHLY')
+              AND (
+                  et.last_scan_at IS NULL
+                  OR et.last_scan_at < NOW() - CAST(
+                      CASE et.scan_frequency
+                          WHEN 'DAILY' THEN :daily
+                          WHEN 'WEEKLY' THEN :weekly
+                          ELSE :monthly
+                      END AS interval)
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM external_scan es
+                  WHERE es.external_target_id = et.id
+                    AND es.status IN ('PENDING', 'RUNNING')
+              )
+            ORDER BY et.tenant_id
+        """), {
+            "daily": SCAN_FREQUENCY_INTERVALS["DAILY"],
+            "weekly": SCAN_FREQUENCY_INTERVALS["WEEKLY"],
+            "monthly": SCAN_FREQUENCY_INTERVALS["MONTHLY"],
+        }).fetchall()
+
+        due: Dict[str, List[str]] = {}
+        for row in rows:
+            due.setdefault(str(row.tenant_id), []).append(str(row.id))
+        return due
@@ -0,0 +1,273 @@
+"""
+Agrégats écosystème du scanner externe.
+
+Table external_scan_latest : dernier scan réussi de chaque cible, avec le
+résumé du scan en colonnes typées (score, grade TLS, vulnérabilités par
+sévérité) et les statistiques de ses constats. Elle est maintenue à chaque
+scan réussi (même transaction que la mise à jour du scan), à chaque
+remédiation et à la propagation des doublons d'une campagne ; rapports
+écosystème, dashboard et vue écosystème la lisent au lieu de rechercher le
+dernier scan dans tout l'historique external_scan.
+
+Statistiques globales (score d'exposition, vulnérabilités, services exposés)
+et distribution des grades TLS calculées sur le dernier scan réussi de chaque
+entité, utilisées par collect_scan_ecosystem_data (rapports écosystème).
+
+Les agrégats sont mis en cache par tenant dans Redis :
+- recalculés en fin de campagne de scan (callback de chord)
+- invalidés à chaque scan réussi
+- recalculés à la demande si absents
+"""
+
+from typing import Any, Dict, List
+from uuid import UUID
+import logging
+import os
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.utils.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+ECOSYSTEM_AGGREGATES_TTL = int(os.getenv("SCAN_ECOSYSTEM_AGGREGATES_TTL", "86400"))
+
+CACHE_KEY_PREFIX = "scan:ecosystem:"
+
+
+# Statistiques des constats d'un scan (LATERAL sur le scan ls)
+_FINDINGS_STATS = """
+    SELECT
+        COUNT(*) as nb_findings,
+        COALESCE(ROUND(AVG(esv.cvss_score)::numeric, 2), 0) as avg_cvss,
+        COUNT(*) FILTER (WHERE esv.severity = 'CRITICAL' AND esv.is_remediated IS NOT TRUE) as open_critical,
+        COUNT(*) FILTER (WHERE esv.severity = 'HIGH' AND esv.is_remediated IS NOT TRUE) as open_high,
+        COUNT(*) FILTER (WHERE esv.severity = 'MEDIUM' AND esv.is_remediated IS NOT TRUE) as open_medium,
+        COUNT(*) FILTER (WHERE esv.severity = 'LOW' AND esv.is_remediated IS NOT TRUE) as open_low,
+        COUNT(*) FILTER (WHERE esv.is_remediated IS NOT TRUE) as open_total
+    FROM external_service_vulnerability esv
+    WHERE esv.external_scan_id = ls.id
+"""
+
+
+def _cache_key(tenant_id) -> str:
+    return f"{CACHE_KEY_PREFIX}{tenant_id}"
+
+
+def upsert_latest_scan(db: Session, scan_id: str) -> None:
+    """
+    Enregistre un scan réussi comme dernier scan de sa cible (sans commit).
+
+    Un scan terminé avant le dernier scan enregistré ne le remplace pas.
+    """
+    db.execute(text(f"""
+        INSERT INTO external_scan_latest (
+            external_target_id, tenant_id, entity_id, scan_id, finished_at, scans_count,
+            exposure_score, tls_grade,
+            nb_vuln_critical, nb_vuln_high, nb_vuln_medium, nb_vuln_low, nb_services_exposed,
+            nb_findings, avg_cvss,
+            open_critical, open_high, open_medium, open_low, open_total,
+            updated_at
+        )
+        SELECT
+            ls.external_target_id, ls.tenant_id, ls.entity_id, ls.id, ls.finished_at, 1,
+            ROUND((ls.summary->>'exposure_score')::numeric)::int,
+            ls.summary->>'tls_grade',
+            COALESCE((ls.summary->>'nb_vuln_critical')::int, 0),
+            COALESCE((ls.summary->>'nb_vuln_high')::int, 0),
+            COALESCE((ls.summary->>'nb_vuln_medium')::int, 0),
+            COALESCE((ls.summary->>'nb_vuln_low')::int, 0),
+            COALESCE((ls.summary->>'nb_services_exposed')::int, 0),
+            v.nb_findings, v.avg_cvss,
+            v.open_critical, v.open_high, v.open_medium, v.open_low, v.open_total,
+            NOW()
+        FROM external_scan ls
+        CROSS JOIN LATERAL ({_FINDINGS_STATS}) v
+        WHERE ls.id = CAST(:scan_id AS uuid)
+          AND ls.status = 'SUCCESS'
+          AND ls.external_target_id IS NOT NULL
+        ON CONFLICT (external_target_id) DO UPDATE SET
+            tenant_id = EXCLUDED.tenant_id,
+            entity_id = EXCLUDED.entity_id,
+            scan_id = EXCLUDED.scan_id,
+            finished_at = EXCLUDED.finished_at,
+            scans_count = external_scan_latest.scans_count + 1,
+            exposure_score = EXCLUDED.exposure_score,
+            tls_grade = EXCLUDED.tls_grade,
+            nb_vuln_critical = EXCLUDED.nb_vuln_critical,
+            nb_vuln_high = EXCLUDED.nb_vuln_high,
+            nb_vuln_medium = EXCLUDED.nb_vuln_medium,
+            nb_vuln_low = EXCLUDED.nb_vuln_low,
+            nb_services_exposed = EXCLUDED.nb_services_exposed,
+            nb_findings = EXCLUDED.nb_findings,
+            avg_cvss = EXCLUDED.avg_cvss,
+            open_critical = EXCLUDED.open_critical,
+            open_high = EXCLUDED.open_high,
+            open_medium = EXCLUDED.open_medium,
+            open_low = EXCLUDED.open_low,
+            open_total = EXCLUDED.open_total,
+            updated_at = NOW()
+        WHERE external_scan_latest.finished_at IS NULL
+           OR EXCLUDED.finished_at >= external_scan_latest.finished_at
+    """), {"scan_id": str(scan_id)})
+
+
+def refresh_latest_scan_findings(db: Session, scan_id: str) -> None:
+    """Recalcule les compteurs de constats d'un dernier scan (remédiation, sans commit)."""
+    db.execute(text(f"""
+        UPDATE external_scan_latest l
+        SET nb_findings = v.nb_findings,
+            avg_cvss = v.avg_cvss,
+            open_critical = v.open_critical,
+            open_high = v.open_high,
+            open_medium = v.open_medium,
+            open_low = v.open_low,
+            open_total = v.open_total,
+            updated_at = NOW()
+        FROM external_scan ls
+        CROSS JOIN LATERAL ({_FINDINGS_STATS}) v
+        WHERE ls.id = CAST(:scan_id AS uuid)
+          AND l.scan_id = ls.id
+    """), {"scan_id": str(scan_id)})
+
+
+def propagate_latest_scan(db: Session, duplicates: List[Dict[str, Any]]) -> None:
+    """
+    Reporte le dernier scan d'une cible sur ses doublons (sans commit).
+
+    Args:
+        duplicates: [{"target_id": ..., "duplicate_of": ...}] (plan de campagne)
+    """
+    if not duplicates:
+        return
+    db.execute(text("""
+        INSERT INTO external_scan_latest (
+            external_target_id, tenant_id, entity_id, scan_id, finished_at, scans_count,
+            exposure_score, tls_grade,
+            nb_vuln_critical, nb_vuln_high, nb_vuln_medium, nb_vuln_low, nb_services_exposed,
+            nb_findings, avg_cvss,
+            open_critical, open_high, open_medium, open_low, open_total,
+            updated_at
+        )
+        SELECT
+            t.id, t.tenant_id, t.entity_id, p.scan_id, p.finished_at, 0,
+            p.exposure_score, p.tls_grade,
+            p.nb_vuln_critical, p.nb_vuln_high, p.nb_vuln_medium, p.nb_vuln_low, p.nb_services_exposed,
+            p.nb_findings, p.avg_cvss,
+            p.open_critical, p.open_high, p.open_medium, p.open_low, p.open_total,
+            NOW()
+        FROM external_scan_latest p
+        JOIN external_target t ON t.id = CAST(:target_id AS uuid)
+        WHERE p.external_target_id = CAST(:duplicate_of AS uuid)
+        ON CONFLICT (external_target_id) DO UPDATE SET
+            entity_id = EXCLUDED.entity_id,
+            scan_id = EXCLUDED.scan_id,
+            finished_at = EXCLUDED.finished_at,
+            exposure_score = EXCLUDED.exposure_score,
+            tls_grade = EXCLUDED.tls_grade,
+            nb_vuln_critical = EXCLUDED.nb_vuln_critical,
+            nb_vuln_high = EXCLUDED.nb_vuln_high,
+            nb_vuln_medium = EXCLUDED.nb_vuln_medium,
+            nb_vuln_low = EXCLUDED.nb_vuln_low,
+            nb_services_exposed = EXCLUDED.nb_services_exposed,
+            nb_findings = EXCLUDED.nb_findings,
+            avg_cvss = EXCLUDED.avg_cvss,
+            open_critical = EXCLUDED.open_critical,
+            open_high = EXCLUDED.open_high,
+            open_medium = EXCLUDED.open_medium,
+            open_low = EXCLUDED.open_low,
+            open_total = EXCLUDED.open_total,
+            updated_at = NOW()
+    """), [
+        {"target_id": d["target_id"], "duplicate_of": d["duplicate_of"]}
+        for d in duplicates
+    ])
+
+
+def compute_ecosystem_aggregates(db: Session, tenant_id: UUID) -> Dict[str, Any]:
+    """
+    Calcule les agrégats écosystème d'un tenant (dernier scan par entité).
+
+    Returns:
+        Dict avec les clés 'stats' (totaux et scores) et 'tls_grades'
+        ({grade: nombre d'entités})
+    """
+    params = {"tenant_id": str(tenant_id)}
+
+    stats = db.execute(text("""
+        WITH latest_scans AS (
+            SELECT DISTINCT ON (l.entity_id) l.*
+            FROM external_scan_latest l
+            WHERE l.tenant_id = CAST(:tenant_id AS uuid)
+              AND l.entity_id IS NOT NULL
+            ORDER BY l.entity_id, l.finished_at DESC
+        )
+        SELECT
+            COUNT(*) as total_entities,
+            AVG(ls.exposure_score) as avg_exposure,
+            MIN(ls.exposure_score) as min_exposure,
+            MAX(ls.exposure_score) as max_exposure,
+            SUM(ls.nb_vuln_critical) as total_critical,
+            SUM(ls.nb_vuln_high) as total_high,
+            SUM(ls.nb_vuln_medium) as total_medium,
+            SUM(ls.nb_vuln_low) as total_low,
+            SUM(ls.nb_services_exposed) as total_services
+        FROM latest_scans ls
+    """), params).fetchone()
+
+    grades = db.execute(text("""
+        WITH latest_scans AS (
+            SELECT DISTINCT ON (l.entity_id)
+                l.tls_grade as grade
+            FROM external_scan_latest l
+            WHERE l.tenant_id = CAST(:tenant_id AS uuid)
+              AND l.entity_id IS NOT NULL
+            ORDER BY l.entity_id, l.finished_at DESC
+        )
+        SELECT
+            COALESCE(grade, 'N/A') as grade,
+            COUNT(*) as count
+        FROM latest_scans
+        GROUP BY grade
+        ORDER BY grade
+    """), params).fetchall()
+
+    return {
+        "stats": {
+            "total_entities": stats.total_entities or 0,
+            "avg_exposure": float(stats.avg_exposure or 0),
+            "min_exposure": float(stats.min_exposure or 0),
+            "max_exposure": float(stats.max_exposure or 0),
+            "total_critical": stats.total_critical or 0,
+            "total_high": stats.total_high or 0,
+            "total_medium": stats.total_medium or 0,
+            "total_low": stats.total_low or 0,
+            "total_services": stats.total_services or 0,
+        },
+        "tls_grades": {g.grade: g.count for g in grades},
+    }
+
+
+def refresh_ecosystem_aggregates(db: Session, tenant_id: UUID) -> Dict[str, Any]:
+    """Recalcule les agrégats d'un tenant et met à jour le cache."""
+    aggregates = compute_ecosystem_aggregates(db, tenant_id)
+    redis_manager.set(_cache_key(tenant_id), aggregates, ttl=ECOSYSTEM_AGGREGATES_TTL)
+    logger.info(
+        f"📊 Agrégats écosystème rafraîchis: tenant={tenant_id}, "
+        f"{aggregates['stats']['total_entities']} entités"
+    )
+    return aggregates
+
+
+def get_ecosystem_aggregates(db: Session, tenant_id: UUID) -> Dict[str, Any]:
+    """Agrégats d'un tenant depuis le cache, recalculés s'ils sont absents."""
+    cached = redis_manager.get(_cache_key(tenant_id))
+    if cached:
+        return cached
+    return refresh_ecosystem_aggregates(db, tenant_id)
+
+
+def invalidate_ecosystem_aggregates(tenant_id) -> None:
+    """Invalide les agrégats d'un tenant (nouveau scan réussi)."""
+    redis_manager.delete(_cache_key(tenant_id))
@@ -0,0 +1,107 @@
+# backend/src/services/scan_metrics_service.py
+"""
+Métriques des workers de scan externe (format d'exposition Prometheus).
+
+Chaque scan exécuté par un worker alimente des histogrammes de durée par
+étape :
+- queue_wait : attente entre la mise en file de la tâche et le début du scan
+  (créneaux de campagne compris)
+- nmap, tls, cve, scoring : étapes du moteur (``summary["stage_timings"]``)
+- persist : écriture des résultats (constats, résumé, dernier scan)
+- total : durée complète de la tâche
+
+Les workers Celery étant des process distincts, les compteurs sont agrégés
+dans un hash Redis (``scan:metrics``), comme les compteurs du cache CVE.
+``render_prometheus()`` produit le texte exposé par ``GET /redis/scan-metrics``.
+"""
+
+import logging
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.utils.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "scan:metrics"
+
+STAGES = ("queue_wait", "nmap", "tls", "cve", "scoring", "persist", "total")
+
+# Bornes des histogrammes (secondes) : de la recherche CVE en cache au scan
+# complet d'une plage IP
+BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def record_scan_metrics(timings: dict, status: str) -> None:
+    """
+    Enregistre les durées d'un scan (une transaction Redis).
+
+    Args:
+        timings: Durée (secondes) par étape ; les étapes inconnues ou
+            absentes sont ignorées
+        status: Statut final de la tâche (SUCCESS, ERROR)
+    """
+    client = redis_manager.client
+    if client is None:
+        return
+
+    try:
+        pipe = client.pipeline(transaction=False)
+        for stage, seconds in timings.items():
+            if stage not in STAGES or seconds is None:
+                continue
+            seconds = max(float(seconds), 0.0)
+            for bound in BUCKETS:
+                if seconds <= bound:
+                    pipe.hincrby(METRICS_KEY, f"{stage}:le:{_format_bound(bound)}", 1)
+            pipe.hincrby(METRICS_KEY, f"{stage}:le:+Inf", 1)
+            pipe.hincrbyfloat(METRICS_KEY, f"{stage}:sum", seconds)
+            pipe.hincrby(METRICS_KEY, f"{stage}:count", 1)
+        pipe.hincrby(METRICS_KEY, f"tasks:{status}", 1)
+        pipe.execute()
+    except RedisError as e:
+        logger.debug(f"Métriques de scan non enregistrées: {e}")
+
+
+def render_prometheus(raw: Optional[dict] = None) -> str:
+    """
+    Métriques au format texte Prometheus.
+
+    Args:
+        raw: Contenu du hash de métriques (lu dans Redis si absent)
+    """
+    if raw is None:
+        client = redis_manager.client
+        raw = client.hgetall(METRICS_KEY) if client is not None else {}
+
+    lines = [
+        "# HELP scan_stage_duration_seconds Durée des étapes des scans externes",
+        "# TYPE scan_stage_duration_seconds histogram",
+    ]
+    for stage in STAGES:
+        count = int(raw.get(f"{stage}:count", 0))
+        if not count:
+            continue
+        for bound in (*BUCKETS, float("inf")):
+            le = _format_bound(bound)
+            value = int(raw.get(f"{stage}:le:{le}", 0))
+            lines.append(f'scan_stage_duration_seconds_bucket{{stage="{stage}",le="{le}"}} {value}')
+        total = float(raw.get(f"{stage}:sum", 0))
+        lines.append(f'scan_stage_duration_seconds_sum{{stage="{stage}"}} {total}')
+        lines.append(f'scan_stage_duration_seconds_count{{stage="{stage}"}} {count}')
+
+    lines += [
+        "# HELP scan_tasks_total Tâches de scan terminées par statut",
+        "# TYPE scan_tasks_total counter",
+    ]
+    for field, value in sorted(raw.items()):
+        if field.startswith("tasks:"):
+            lines.append(f'scan_tasks_total{{status="{field[len("tasks:"):]}"}} {int(value)}')
+
+    return "\n".join(lines) + "\n"
+
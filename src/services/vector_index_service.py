@@ -0,0 +1,138 @@
+"""
+Index ANN (pgvector HNSW) des tables d'embeddings
+
+Les recherches de similarité (points de contrôle, exigences, réponses)
+utilisent la distance cosinus ``<=>`` ; les index HNSW sont donc construits
+avec ``vector_cosine_ops`` pour que l'opérateur trié corresponde à l'index et
+à la similarité renvoyée (``1 - distance cosinus``).
+
+Le vecteur de requête est lié comme un tableau ``real[]`` natif du driver puis
+casté en ``vector`` côté PostgreSQL (pas de littéral texte construit en Python).
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# table -> (colonne vecteur, nom de l'index HNSW)
+VECTOR_INDEXES: Dict[str, tuple] = {
+    "control_point_embeddings": ("embedding_vector", "ix_control_point_embeddings_hnsw"),
+    "requirement_embeddings": ("embedding_vector", "ix_requirement_embeddings_hnsw"),
+    "response_embeddings": ("embedding", "ix_response_embeddings_hnsw"),
+}
+
+
+def vector_param(name: str) -> str:
+    """Fragment SQL d'un paramètre vecteur lié comme tableau real[]"""
+    return f"CAST(CAST(:{name} AS real[]) AS vector)"
+
+
+def to_vector_param(vector: Sequence[float]) -> List[float]:
+    """Valeur du paramètre vecteur (liste de float, adaptée en tableau par le driver)"""
+    return [float(v) for v in vector]
+
+
+def apply_ef_search(db: Session, ef_search: Optional[int] = None) -> None:
+    """
+    Règle hnsw.ef_search pour la transaction courante (rappel vs latence).
+
+    Args:
+        ef_search: Taille de la liste candidate (défaut: settings.vector_ef_search)
+    """
+    ef_search = int(ef_search or settings.vector_ef_search)
+    # SET n'accepte pas de paramètre lié : valeur entière validée
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {max(1, min(ef_search, 1000))}"))
+
+
+def _legacy_indexes(db: Session, table: str, keep: str) -> List[str]:
+    """Index vectoriels existants de la table autres que l'index HNSW géré"""
+    rows = db.execute(text("""
+        SELECT indexname
+        FROM pg_indexes
+        WHERE schemaname = current_schema()
+          AND tablename = :table
+          AND indexname <> :keep
+          AND (indexdef ILIKE '%USING ivfflat%' OR indexdef ILIKE '%USING hnsw%')
+    """), {"table": table, "keep": keep}).fetchall()
+    return [r.indexname for r in rows]
+
+
+def ensure_vector_indexes(
+    db: Session,
+    rebuild: bool = False,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Crée (ou reconstruit) les index HNSW cosinus des tables d'embeddings.
+
+    Les anciens index ivfflat sont remplacés. Commit à la fin.
+
+    Args:
+        rebuild: Reconstruire les index existants (REINDEX)
+        m: Paramètre HNSW m (défaut: settings.vector_hnsw_m)
+        ef_construction: Paramètre HNSW ef_construction (défaut: settings)
+
+    Returns:
+        Dict {table: action effectuée}
+    """
+    m = int(m or settings.vector_hnsw_m)
+    ef_construction = int(ef_construction or settings.vector_hnsw_ef_construction)
+    actions: Dict[str, str] = {}
+
+    for table, (column, index_name) in VECTOR_INDEXES.items():
+        exists_table = db.execute(
+            text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table}
+        ).scalar()
+        if not exists_table:
+            actions[table] = "absent"
+            continue
+
+        for legacy in _legacy_indexes(db, table, index_name):
+            db.execute(text(f'DROP INDEX IF EXISTS "{legacy}"'))
+            logger.info(f"🗑️ Index vectoriel remplacé: {legacy}")
+
+        exists_index = db.execute(
+            text("SELECT to_regclass(:index) IS NOT NULL"), {"index": index_name}
+        ).scalar()
+
+        if exists_index and rebuild:
+            db.execute(text(f'REINDEX INDEX "{index_name}"'))
+            actions[table] = "rebuilt"
+        elif exists_index:
+            actions[table] = "ok"
+        else:
+            db.execute(text(f"""
+                CREATE INDEX "{index_name}" ON {table}
+                USING hnsw ({column} vector_cosine_ops)
+                WITH (m = {m}, ef_construction = {ef_construction})
+            """))
+            actions[table] = "created"
+
+        logger.info(f"📐 Index HNSW {index_name}: {actions[table]}")
+
+    db.commit()
+    return actions
+
+
+def get_vector_index_status(db: Session) -> List[Dict[str, Any]]:
+    """Index vectoriels des tables d'embeddings (type, taille, définition)"""
+    rows = db.execute(text("""
+        SELECT
+            i.tablename,
+            i.indexname,
+            i.indexdef,
+            pg_size_pretty(pg_relation_size(quote_ident(i.indexname)::regclass)) AS size
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema()
+          AND i.tablename = ANY(:tables)
+          AND (i.indexdef ILIKE '%USING ivfflat%' OR i.indexdef ILIKE '%USING hnsw%')
+        ORDER BY i.tablename
+    """), {"tables": list(VECTOR_INDEXES.keys())}).mappings().all()
+    return [dict(r) for r in rows]
@@ -3,16 +3,51 @@ Service de rendu des widgets en HTML.
 
 Transforme la configuration JSON des widgets en HTML formaté
 prêt pour la conversion PDF via WeasyPrint.
+
+La structure d'un template est compilée une fois en plan de rendu
+(``RenderPlan`` : widgets triés, configurations prêtes), mis en cache par
+template et version (``get_render_plan``). Les variables %xxx.yyy% des
+textes sont découpées une fois en segments (``_compile_variables``).
 """
 
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from jinja2 import Environment, Template
 from datetime import datetime
+import io
+import json
 import logging
+import os
 import re
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Plans de rendu compilés conservés en mémoire (par process)
+RENDER_PLAN_CACHE_SIZE = int(os.getenv("RENDER_PLAN_CACHE_SIZE", "128"))
+
+# Pattern: %key.subkey%
+_VARIABLE_PATTERN = re.compile(r'%([^%]+)%')
+
+
+@lru_cache(maxsize=4096)
+def _compile_variables(text: str) -> Tuple:
+    """
+    Découpe un texte en segments : littéraux (str) et variables
+    (texte brut, chemin des clés).
+    """
+    segments = []
+    last = 0
+    for match in _VARIABLE_PATTERN.finditer(text):
+        if match.start() > last:
+            segments.append(text[last:match.start()])
+        segments.append((match.group(0), tuple(match.group(1).split('.'))))
+        last = match.end()
+    if last < len(text):
+        segments.append(text[last:])
+    return tuple(segments)
+
 
 class WidgetRenderer:
     """Renderer pour transformer widgets en HTML."""
@@ -28,6 +63,7 @@ class WidgetRenderer:
         self.color_scheme = color_scheme
         self.fonts = fonts
         self.env = Environment()
+        self._renderers = self._build_renderer_map()
 
     # ========================================================================
     # WIDGETS DE STRUCTURE
@@ -632,7 +668,7 @@ class WidgetRenderer:
             config: Configuration du widget (title, max_domains, etc.)
             data: Données contenant 'domains' ou 'domain_scores'
         """
-        from .chart_generator import ChartGenerator
+        from .render_pool import render_chart
         import base64
 
         title = config.get("title", "Scores par Domaine")
@@ -663,11 +699,12 @@ class WidgetRenderer:
             return self._render_chart_placeholder("Radar Domaines", "📊 Aucun domaine")
 
         try:
-            # Générer le graphique
-            chart_gen = ChartGenerator(self.color_scheme)
+            # Générer le graphique (cache des graphiques, puis pool de rendu)
             datasets = {"Score": scores}
 
-            img_bytes = chart_gen.generate_radar_chart(
+            img_bytes = render_chart(
+                "generate_radar_chart",
+                self.color_scheme,
                 labels=labels,
                 datasets=datasets,
                 title="",  # Titre géré en HTML
@@ -749,46 +786,48 @@ class WidgetRenderer:
             "suggested_role": "Rôle"
         }
 
+        parts = [html]
         for col in columns:
-            html += f'<th style="padding: 12px; text-align: left;">{column_labels.get(col, col)}</th>\n'
+            parts.append(f'<th style="padding: 12px; text-align: left;">{column_labels.get(col, col)}</th>\n')
 
-        html += """
+        parts.append("""
                     </tr>
                 </thead>
                 <tbody>
-        """
+        """)
+
+        severity_colors = {
+            "critical": self.color_scheme["danger"],
+            "major": self.color_scheme["warning"],
+            "minor": self.color_scheme["success"]
+        }
 
         # Lignes
         for i, action in enumerate(actions):
             bg_color = "#F9FAFB" if i % 2 == 0 else "white"
-            html += f'<tr style="background-color: {bg_color};">\n'
+            parts.append(f'<tr style="background-color: {bg_color};">\n')
 
             for col in columns:
                 value = action.get(col, "-")
 
                 # Formatage spécial pour sévérité et priorité
                 if col == "severity":
-                    severity_colors = {
-                        "critical": self.color_scheme["danger"],
-                        "major": self.color_scheme["warning"],
-                        "minor": self.color_scheme["success"]
-                    }
                     color = severity_colors.get(value, "#6B7280")
                     value = f'<span style="color: {color}; font-weight: bold;">●</span> {value.upper()}'
                 elif col == "priority":
                     value = f'<strong>{value}</strong>'
 
-                html += f'<td style="padding: 10px;">{value}</td>\n'
+                parts.append(f'<td style="padding: 10px;">{value}</td>\n')
 
-            html += '</tr>\n'
+            parts.append('</tr>\n')
 
-        html += """
+        parts.append("""
                 </tbody>
             </table>
         </div>
-        """
+        """)
 
-        return html
+        return "".join(parts)
 
     def render_nc_table(self, config: Dict[str, Any], data: Dict[str, Any]) -> str:
         """Rendu du tableau des non-conformités."""
@@ -857,6 +896,8 @@ class WidgetRenderer:
                 <tbody>
         """
 
+        parts = [html]
+        danger_color = self.color_scheme['danger']
         for i, nc in enumerate(ncs):
             bg_color = "#FEF2F2" if i % 2 == 0 else "white"
 
@@ -873,22 +914,22 @@ class WidgetRenderer:
             comment = nc.get('comment') or '-'
             comment = comment[:80] + '...' if len(comment) > 80 else comment
 
-            html += f"""
+            parts.append(f"""
                 <tr style="background-color: {bg_color};">
                     <td style="padding: 10px;">{domain_name}</td>
                     <td style="padding: 10px;">{question_text}</td>
-                    <td style="padding: 10px;"><span style="color: {self.color_scheme['danger']}; font-weight: bold;">●</span> {risk}</td>
+                    <td style="padding: 10px;"><span style="color: {danger_color}; font-weight: bold;">●</span> {risk}</td>
                     <td style="padding: 10px;">{comment}</td>
                 </tr>
-            """
+            """)
 
-        html += """
+        parts.append("""
                 </tbody>
             </table>
         </div>
-        """
+        """)
 
-        return html
+        return "".join(parts)
 
     def render_questions_table(self, config: Dict[str, Any], data: Dict[str, Any]) -> str:
         """Rendu du tableau des questions."""
@@ -1306,6 +1347,7 @@ class WidgetRenderer:
             "low": {"bg": "#ECFDF5", "border": "#22C55E", "label": "Basse"},
         }
 
+        parts = [html]
         for i, action in enumerate(actions):
             priority = action.get("priority", "medium")
             pstyle = priority_colors.get(priority, priority_colors["medium"])
@@ -1320,7 +1362,7 @@ class WidgetRenderer:
                 meta_items.append(f'<span>💰 {action.get("budget", "N/A")}</span>')
             meta_html = " &nbsp;&nbsp; ".join(meta_items) if meta_items else ""
 
-            html += f"""
+            parts.append(f"""
                 <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin-bottom: 10px;">
                     <tr>
                         <td width="4" style="background-color: {pstyle['border']}; padding: 0;"></td>
@@ -1340,12 +1382,12 @@ class WidgetRenderer:
                         </td>
                     </tr>
                 </table>
-            """
+            """)
 
-        html += """
+        parts.append("""
         </div>
-        """
-        return html
+        """)
+        return "".join(parts)
 
     # ========================================================================
     # WIDGETS SCANNER (Rapports de scan de vulnérabilités)
@@ -1682,6 +1724,7 @@ class WidgetRenderer:
                 <tbody>
         """
 
+        parts = [html]
         for i, vuln in enumerate(vulnerabilities):
             bg_color = "#ECFEFF" if i % 2 == 0 else "white"
 
@@ -1710,7 +1753,7 @@ class WidgetRenderer:
                 sev_color = "#22C55E"
                 sev_label = "BASSE"
 
-            html += f"""
+            parts.append(f"""
                 <tr style="background: {bg_color};">
                     <td style="padding: 10px; font-family: monospace; font-size: 11px;">{cve_id}</td>
                     <td style="padding: 10px; text-align: center;">
@@ -1727,14 +1770,14 @@ class WidgetRenderer:
                     <td style="padding: 10px; font-size: 11px;">{description}</td>
                     <td style="padding: 10px; font-size: 11px;">{service}</td>
                 </tr>
-            """
+            """)
 
-        html += """
+        parts.append("""
                 </tbody>
             </table>
         </div>
-        """
-        return html
+        """)
+        return "".join(parts)
 
     def render_scan_services_table(self, config: Dict[str, Any], data: Dict[str, Any]) -> str:
         """
@@ -2503,24 +2546,27 @@ class WidgetRenderer:
         Returns:
             Texte avec variables remplacées
         """
-        import re
+        text = str(text)
+        if '%' not in text:
+            return text
 
-        # Pattern: %key.subkey%
-        pattern = r'%([^%]+)%'
+        parts = []
+        for segment in _compile_variables(text):
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
 
-        def replacer(match):
-            path = match.group(1).split('.')
+            raw, path = segment
             value = data
-
             for key in path:
                 if isinstance(value, dict):
-                    value = value.get(key, match.group(0))
+                    value = value.get(key, raw)
                 else:
-                    return match.group(0)
-
-            return str(value) if value is not None else match.group(0)
+                    value = raw
+                    break
+            parts.append(str(value) if value is not None else raw)
 
-        return re.sub(pattern, replacer, str(text))
+        return "".join(parts)
 
     def _render_chart_placeholder(self, title: str, icon: str) -> str:
         """Rendu d'un placeholder pour graphiques."""
@@ -3165,19 +3211,9 @@ class WidgetRenderer:
     # WIDGET DISPATCHER
     # ========================================================================
 
-    def render_widget(self, widget_type: str, config: Dict[str, Any], data: Dict[str, Any]) -> str:
-        """
-        Dispatcher principal pour le rendu des widgets.
-
-        Args:
-            widget_type: Type du widget
-            config: Configuration du widget
-            data: Données du rapport
-
-        Returns:
-            HTML du widget rendu
-        """
-        renderer_map = {
+    def _build_renderer_map(self) -> Dict[str, Any]:
+        """Table type de widget -> méthode de rendu (construite une fois)."""
+        return {
             # Structure
             "cover": self.render_cover,
             "header": self.render_header,
@@ -3238,7 +3274,19 @@ class WidgetRenderer:
             "feared_event_card": self.render_feared_event_card,
         }
 
-        renderer = renderer_map.get(widget_type)
+    def render_widget(self, widget_type: str, config: Dict[str, Any], data: Dict[str, Any]) -> str:
+        """
+        Dispatcher principal pour le rendu des widgets.
+
+        Args:
+            widget_type: Type du widget
+            config: Configuration du widget
+            data: Données du rapport
+
+        Returns:
+            HTML du widget rendu
+        """
+        renderer = self._renderers.get(widget_type)
 
         if renderer:
             try:
@@ -3251,6 +3299,116 @@ class WidgetRenderer:
             return f'<p style="color: orange;">Widget non supporté: {widget_type}</p>'
 
 
+class RenderPlan:
+    """
+    Structure d'un template compilée pour le rendu.
+
+    Les widgets sont triés par position et leur configuration (avec l'ID du
+    widget) préparée une fois ; le rendu écrit le HTML de chaque widget dans
+    un tampon.
+
+    Exemple d'utilisation:
+        plan = get_render_plan(template.id, template.updated_at, template.structure)
+        html = "\n".join(plan.render_widgets(renderer, data))
+    """
+
+    def __init__(self, structure: Any, widget_key_as_id: bool = False):
+        """
+        Compile la structure d'un template.
+
+        Args:
+            structure: Liste des widgets (ou JSON sérialisé)
+            widget_key_as_id: Utiliser widget_key si le widget n'a pas d'id
+        """
+        if isinstance(structure, str):
+            structure = json.loads(structure)
+        # Triée une fois par position (ordre de rendu, table des matières)
+        self.structure: List[Dict[str, Any]] = sorted(structure or [], key=lambda w: w.get("position", 0))
+
+        widgets = []
+        for widget in self.structure:
+            config = dict(widget.get("config") or {})
+
+            # IMPORTANT: Inclure l'ID du widget dans la config pour le rendu
+            # Cela permet aux widgets IA de récupérer leur contenu depuis ai_contents
+            widget_id = widget.get("id")
+            if not widget_id and widget_key_as_id:
+                widget_id = widget.get("widget_key")
+            if widget_id:
+                config["id"] = widget_id
+
+            widgets.append((widget.get("widget_type") or "", config))
+        self.widgets: Tuple[Tuple[str, Dict[str, Any]], ...] = tuple(widgets)
+
+    def render_widgets(self, renderer: WidgetRenderer, data: Dict[str, Any]) -> List[str]:
+        """
+        HTML de chaque widget, dans l'ordre du template.
+
+        La structure est passée dans data (``_template_structure``) pour que
+        render_toc puisse générer la table des matières.
+        """
+        data['_template_structure'] = self.structure
+
+        parts = []
+        for widget_type, config in self.widgets:
+            try:
+                # Copie: les renderers ne doivent pas modifier le plan partagé
+                parts.append(renderer.render_widget(widget_type, config.copy(), data))
+            except Exception as e:
+                logger.warning(f"Erreur rendu widget {widget_type}: {e}")
+                parts.append(f"<!-- Erreur widget {widget_type}: {e} -->")
+        return parts
+
+
+_plan_cache: "OrderedDict[tuple, RenderPlan]" = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def get_render_plan(
+    template_id: Any,
+    version: Any,
+    structure: Any,
+    widget_key_as_id: bool = False
+) -> RenderPlan:
+    """
+    Plan de rendu d'un template, compilé une fois par (template, version).
+
+    Args:
+        template_id: ID du template
+        version: Version du template (updated_at, mis à jour à chaque
+            modification de la structure). Sans ID ou sans version, le plan
+            est compilé sans mise en cache
+        structure: Structure du template (compilée si absente du cache)
+        widget_key_as_id: Utiliser widget_key si le widget n'a pas d'id
+
+    Returns:
+        RenderPlan partagé (ne pas modifier)
+    """
+    if template_id is None or version is None:
+        return RenderPlan(structure, widget_key_as_id)
+
+    key = (str(template_id), str(version), widget_key_as_id)
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+            return plan
+
+    plan = RenderPlan(structure, widget_key_as_id)
+
+    with _plan_cache_lock:
+        _plan_cache[key] = plan
+        while len(_plan_cache) > RENDER_PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+def clear_render_plans() -> None:
+    """Vide le cache des plans de rendu."""
+    with _plan_cache_lock:
+        _plan_cache.clear()
+
+
 def render_template_to_html(
     template: Dict[str, Any],
     data: Dict[str, Any]
@@ -3269,9 +3427,12 @@ def render_template_to_html(
     fonts = template.get("fonts", {})
 
     renderer = WidgetRenderer(color_scheme, fonts)
+    plan = get_render_plan(template.get("id"), template.get("updated_at"), template.get("structure", []))
+
+    out = io.StringIO()
 
     # En-tête HTML
-    html = f"""
+    out.write(f"""
     <!DOCTYPE html>
     <html lang="fr">
     <head>
@@ -3295,30 +3456,17 @@ def render_template_to_html(
         </style>
     </head>
     <body>
-    """
+    """)
 
     # Rendu de chaque widget
-    structure = template.get("structure", [])
-
-    # Passer la structure du template dans data pour que render_toc puisse générer la TOC
-    data['_template_structure'] = structure
-
-    for widget in sorted(structure, key=lambda w: w.get("position", 0)):
-        widget_type = widget.get("widget_type")
-        config = widget.get("config", {}).copy()  # Copier pour ne pas modifier l'original
-
-        # IMPORTANT: Inclure l'ID du widget dans la config pour le rendu
-        # Cela permet aux widgets IA de récupérer leur contenu depuis ai_contents
-        if widget.get("id"):
-            config["id"] = widget.get("id")
-
-        widget_html = renderer.render_widget(widget_type, config, data)
-        html += widget_html + "\n"
+    for widget_html in plan.render_widgets(renderer, data):
+        out.write(widget_html)
+        out.write("\n")
 
     # Fermeture HTML
-    html += """
+    out.write("""
     </body>
     </html>
-    """
+    """)
 
-    return html
+    return out.getvalue()
@@ -5,6 +5,8 @@ Module des tâches asynchrones Celery.
 Ce module contient:
 - celery_app: Configuration de l'application Celery
 - external_scan_tasks: Tâches pour le scan externe
+- report_tasks: Tâches de génération des rapports de campagne
+- compliance_tasks: Rafraîchissement des agrégats de conformité
 """
 
 from .celery_app import celery_app
@@ -3,8 +3,10 @@
 Configuration de l'application Celery.
 
 Celery est utilisé pour les tâches asynchrones:
-- Scans externes (nmap, TLS, CVE)
+- Scans externes (nmap, TLS, CVE), campagnes de rescan et mise à jour de la
+  base CVE locale
 - Génération de rapports
+- Agrégats de conformité (rafraîchissement planifié)
 - Notifications
 """
 
@@ -22,6 +24,8 @@ celery_app = Celery(
     backend=CELERY_RESULT_BACKEND,
     include=[
         "src.tasks.external_scan_tasks",
+        "src.tasks.report_tasks",
+        "src.tasks.compliance_tasks",
     ]
 )
 
@@ -51,6 +55,10 @@ celery_app.conf.update(
             "exchange": "report_generation",
             "routing_key": "report.generate",
         },
+        "nvd_feeds": {
+            "exchange": "nvd_feeds",
+            "routing_key": "nvd.feeds",
+        },
     },
 
     # Routes
@@ -58,9 +66,34 @@ celery_app.conf.update(
         "src.tasks.external_scan_tasks.scan_external_target_task": {
             "queue": "external_scan"
         },
+        "src.tasks.external_scan_tasks.launch_scan_campaign_task": {
+            "queue": "external_scan"
+        },
+        "src.tasks.external_scan_tasks.campaign_scan_target_task": {
+            "queue": "external_scan"
+        },
+        "src.tasks.external_scan_tasks.finalize_scan_campaign_task": {
+            "queue": "external_scan"
+        },
+        "src.tasks.external_scan_tasks.schedule_scan_campaigns_task": {
+            "queue": "external_scan"
+        },
+        # Téléchargement des flux NVD: worker dédié avec accès Internet sortant
+        # (nvd.nist.gov), les workers de scan pouvant être en zone restreinte.
+        # Voir update_nvd_feeds_task (import hors ligne: Scripts/import_nvd_feeds.py)
+        "src.tasks.external_scan_tasks.update_nvd_feeds_task": {
+            "queue": "nvd_feeds"
+        },
         "src.tasks.external_scan_tasks.generate_scan_report_task": {
             "queue": "report_generation"
         },
+        "src.tasks.report_tasks.generate_report_job_task": {
+            "queue": "report_generation"
+        },
+        # Maintenance (beat): worker dédié à la queue default, voir compliance_tasks.py
+        "src.tasks.compliance_tasks.refresh_compliance_scores_task": {
+            "queue": "default"
+        },
     },
 
     # Timeouts et retries
@@ -75,11 +108,28 @@ celery_app.conf.update(
 
     # Worker
     worker_prefetch_multiplier=1,  # Un job à la fois pour les scans
-    worker_concurrency=2,  # 2 workers par défaut
+    worker_concurrency=int(os.getenv("CELERY_WORKER_CONCURRENCY", "2")),  # surchargeable par --concurrency
 
     # Monitoring
     worker_send_task_events=True,
     task_send_sent_event=True,
+
+    # Tâches planifiées (celery beat, une seule instance) ; chaque tâche est
+    # exécutée par les workers de sa queue (default: voir compliance_tasks.py)
+    beat_schedule={
+        "refresh-compliance-scores": {
+            "task": "src.tasks.compliance_tasks.refresh_compliance_scores_task",
+            "schedule": float(os.getenv("COMPLIANCE_SCORE_REFRESH_SECONDS", "300")),
+        },
+        "schedule-scan-campaigns": {
+            "task": "src.tasks.external_scan_tasks.schedule_scan_campaigns_task",
+            "schedule": float(os.getenv("SCAN_CAMPAIGN_SCHEDULE_SECONDS", "3600")),
+        },
+        "update-nvd-feeds": {
+            "task": "src.tasks.external_scan_tasks.update_nvd_feeds_task",
+            "schedule": float(os.getenv("NVD_FEEDS_REFRESH_SECONDS", "7200")),
+        },
+    },
 )
 
 
@@ -0,0 +1,63 @@
+# backend/src/tasks/compliance_tasks.py
+"""
+Tâches Celery de maintenance des agrégats de conformité.
+
+Tâches:
+- refresh_compliance_scores_task: Recalcule les agrégats des couples
+  (campagne, entité) dont des réponses ont changé (planifiée par Celery beat)
+
+La tâche est routée vers la queue ``default``, consommée ni par les workers
+de scan (``external_scan``) ni par ceux des rapports (``report_generation``).
+Elle nécessite un planificateur (une seule instance) et un worker dédié:
+
+    celery -A src.tasks.celery_app beat --loglevel=INFO
+    celery -A src.tasks.celery_app worker --queues=default --concurrency=1 --hostname=maintenance@%h
+
+Sans ces deux processus, les agrégats restent maintenus à l'écriture
+(save_answer, submit) mais les écritures hors de ces chemins ne sont plus
+reportées dans les dashboards.
+"""
+
+import logging
+
+from celery import shared_task
+
+from src.database import SessionLocal
+from src.services.compliance_score_service import ComplianceScoreService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    bind=True,
+    name="src.tasks.compliance_tasks.refresh_compliance_scores_task",
+    soft_time_limit=240,
+    time_limit=300
+)
+def refresh_compliance_scores_task(self, limit: int = 200) -> dict:
+    """
+    Rafraîchit les agrégats de conformité périmés.
+
+    Args:
+        limit: Nombre maximal de couples (campagne, entité) par exécution
+
+    Returns:
+        Dictionnaire avec le nombre de couples recalculés
+    """
+    db = SessionLocal()
+
+    try:
+        refreshed = ComplianceScoreService(db).refresh_stale_scores(limit=limit)
+        db.commit()
+
+        if refreshed:
+            logger.info(f"📊 Agrégats de conformité rafraîchis: {refreshed} couple(s) campagne/entité")
+
+        return {"refreshed": refreshed}
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
@@ -4,11 +4,18 @@ Tâches Celery pour le scan externe.
 
 Tâches:
 - scan_external_target_task: Exécute un scan complet sur une cible
+- launch_scan_campaign_task: Planifie une campagne et lance ses scans (chord)
+- campaign_scan_target_task: Scan d'une cible d'une campagne (créneaux Redis)
+- finalize_scan_campaign_task: Callback du chord d'une campagne
+- schedule_scan_campaigns_task: Lance les rescans périodiques dus
 - generate_scan_report_task: Génère un rapport IA pour un scan
+- update_nvd_feeds_task: Met à jour la base CVE locale depuis les flux NVD
 """
 
-import asyncio
 import logging
+import os
+import random
+import time
 from datetime import datetime, timezone
 from uuid import UUID
 from typing import Optional
@@ -19,6 +26,20 @@ from sqlalchemy.orm import Session
 
 from src.database import SessionLocal
 from src.services.external_scanner.engine import ScanEngine, ScanConfig, ScanResult
+from src.services.external_scanner.incremental import PreviousScan
+from src.services.scan_metrics_service import record_scan_metrics
+from src.services.scan_campaign_service import (
+    SCAN_CAMPAIGN_MAX_WAIT_SECONDS,
+    SCAN_SLOT_RETRY_SECONDS,
+    ScanCampaignService,
+    acquire_scan_slots,
+    release_scan_slots,
+    scan_slot_limits,
+    target_slot_limits
+)
+from src.services.scan_ecosystem_service import invalidate_ecosystem_aggregates, upsert_latest_scan
+from src.tasks.worker_runtime import get_scan_components
+from src.utils.event_loop import run_sync
 from src.models.external_scan import (
     ExternalTarget,
     ExternalScan,
@@ -31,6 +52,20 @@ from src.models.external_scan import (
 
 logger = logging.getLogger(__name__)
 
+# Valeurs autorisées (calculées une fois, pas à chaque vulnérabilité)
+_VULNERABILITY_TYPES = frozenset(e.value for e in VulnerabilityType)
+_SEVERITY_LEVELS = frozenset(e.value for e in SeverityLevel)
+
+# Lignes par INSERT multi-lignes (borne la taille du paramètre JSON)
+VULN_INSERT_CHUNK_SIZE = 2000
+
+# Rescan différentiel : TLS / CVE inchangés repris du dernier scan réussi.
+# Un audit TLS ou une recherche CVE n'est repris que si sa collecte réelle
+# (et non le scan qui l'a reprise) date de moins de SCAN_INCREMENTAL_MAX_AGE_DAYS,
+# pour prendre en compte les nouvelles CVE publiées
+SCAN_INCREMENTAL_MODE = os.getenv("SCAN_INCREMENTAL_MODE", "true").lower() == "true"
+SCAN_INCREMENTAL_MAX_AGE_DAYS = int(os.getenv("SCAN_INCREMENTAL_MAX_AGE_DAYS", "30"))
+
 
 def get_db_session() -> Session:
     """Crée une session de base de données."""
@@ -49,147 +84,62 @@ def scan_external_target_task(
     self,
     target_id: str,
     scan_id: str,
-    triggered_by: Optional[str] = None
+    triggered_by: Optional[str] = None,
+    queued_at: Optional[float] = None
 ) -> dict:
     """
     Tâche Celery pour scanner une cible externe.
 
+    Comme les scans de campagne, le scan n'est lancé qu'après obtention des
+    créneaux Redis (plafonds global et par tenant, politesse par IP et par
+    ASN) ; sinon la tâche est replanifiée.
+
     Args:
         target_id: UUID de la cible (ExternalTarget.id)
         scan_id: UUID du scan (ExternalScan.id)
         triggered_by: UUID de l'utilisateur qui a déclenché le scan
+        queued_at: Horodatage de mise en file (métrique d'attente)
 
     Returns:
         Dictionnaire avec le résumé du scan
     """
-    logger.info(f"🚀 Démarrage tâche scan: target={target_id}, scan={scan_id}")
-
     db = get_db_session()
-
     try:
-        # Récupérer la cible
-        target_query = text("""
-            SELECT id, tenant_id, type, value, label
-            FROM external_target
-            WHERE id = CAST(:target_id AS uuid)
-            AND deleted_at IS NULL
-        """)
-        target_result = db.execute(
-            target_query,
-            {"target_id": target_id}
-        ).fetchone()
-
-        if not target_result:
-            logger.error(f"❌ Cible non trouvée: {target_id}")
-            _update_scan_status(db, scan_id, ScanExecutionStatus.ERROR, "Cible non trouvée")
-            return {"error": "Cible non trouvée"}
-
-        target_type = target_result.type
-        target_value = target_result.value
-        tenant_id = str(target_result.tenant_id)
-
-        # Mettre à jour le statut du scan à RUNNING
-        _update_scan_status(db, scan_id, ScanExecutionStatus.RUNNING)
-
-        # Exécuter le scan de manière asynchrone
-        logger.info(f"📡 Scan en cours: {target_type} -> {target_value}")
-
-        # Créer une boucle d'événements pour exécuter le scan async
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            config = ScanConfig(
-                nmap_timeout=300,
-                tls_timeout=60,
-                enable_tls_audit=True,
-                enable_cve_enrichment=True
-            )
-            engine = ScanEngine(config)
-
-            scan_result: ScanResult = loop.run_until_complete(
-                engine.run_scan(
-                    target_type=target_type,
-                    target_value=target_value,
-                    target_id=UUID(target_id),
-                    scan_id=UUID(scan_id)
-                )
-            )
-        finally:
-            loop.close()
-
-        # Persister les résultats
-        if scan_result.status == "SUCCESS":
-            # Sauvegarder les vulnérabilités
-            _save_vulnerabilities(
-                db,
-                scan_id=scan_id,
-                tenant_id=tenant_id,
-                vulnerabilities=scan_result.vulnerabilities
-            )
-
-            # Mettre à jour le résumé du scan
-            summary = scan_result.summary
-            summary["scan_duration_seconds"] = scan_result.scan_duration_seconds
-
-            _update_scan_success(
-                db,
-                scan_id=scan_id,
-                summary=summary,
-                started_at=scan_result.started_at,
-                finished_at=scan_result.finished_at,
-                scan_data=scan_result.scan_data
-            )
+        limits = _load_target_slot_limits(db, target_id)
+    finally:
+        db.close()
 
-            # Mettre à jour la cible
-            _update_target_after_scan(
-                db,
-                target_id=target_id,
-                exposure_score=scan_result.exposure_score,
-                scan_status=ScanStatus.SUCCESS
+    if not acquire_scan_slots(scan_id, limits):
+        waited = time.time() - (queued_at or time.time())
+        if waited < SCAN_CAMPAIGN_MAX_WAIT_SECONDS:
+            raise self.retry(
+                countdown=SCAN_SLOT_RETRY_SECONDS * (1 + random.random()),
+                max_retries=None
             )
 
-            logger.info(
-                f"✅ Scan terminé avec succès: score={scan_result.exposure_score}, "
-                f"vulns={len(scan_result.vulnerabilities)}"
-            )
+        error = f"Aucun créneau de scan disponible après {int(waited)}s"
+        db = get_db_session()
+        try:
+            _update_scan_status(db, scan_id, ScanExecutionStatus.ERROR, error)
+            _update_target_after_scan(db, target_id, None, ScanStatus.ERROR)
+        finally:
+            db.close()
+        return {"status": "ERROR", "error": error}
 
-            return {
-                "status": "SUCCESS",
-                "exposure_score": scan_result.exposure_score,
-                "nb_vulnerabilities": len(scan_result.vulnerabilities),
-                "nb_services": len(scan_result.services),
-                "tls_grade": scan_result.tls_grade,
-                "duration_seconds": scan_result.scan_duration_seconds
-            }
-
-        else:
-            # Scan en erreur
-            _update_scan_status(
-                db,
-                scan_id,
-                ScanExecutionStatus.ERROR,
-                scan_result.error_message
-            )
-            _update_target_after_scan(
-                db,
-                target_id=target_id,
-                exposure_score=None,
-                scan_status=ScanStatus.ERROR
-            )
+    logger.info(f"🚀 Démarrage tâche scan: target={target_id}, scan={scan_id}")
 
-            logger.error(f"❌ Scan échoué: {scan_result.error_message}")
+    db = get_db_session()
 
-            return {
-                "status": "ERROR",
-                "error": scan_result.error_message
-            }
+    try:
+        return _run_target_scan(db, target_id, scan_id, queued_at)
 
     except Exception as e:
         logger.exception(f"❌ Erreur inattendue dans la tâche scan: {e}")
 
-        # Mettre à jour le statut en erreur
+        # Mettre à jour le statut en erreur (en annulant d'abord les
+        # vulnérabilités non validées)
         try:
+            db.rollback()
             _update_scan_status(db, scan_id, ScanExecutionStatus.ERROR, str(e))
             _update_target_after_scan(db, target_id, None, ScanStatus.ERROR)
         except Exception:
@@ -201,9 +151,233 @@ def scan_external_target_task(
 
         return {"status": "ERROR", "error": str(e)}
 
+    finally:
+        release_scan_slots(scan_id, limits)
+        db.close()
+
+
+@shared_task(
+    bind=True,
+    name="src.tasks.external_scan_tasks.launch_scan_campaign_task",
+    soft_time_limit=300,
+    time_limit=360
+)
+def launch_scan_campaign_task(self, campaign_id: str) -> dict:
+    """
+    Planifie une campagne de scan et lance ses scans en parallèle.
+
+    Les scans forment un groupe Celery dont le chord appelle
+    finalize_scan_campaign_task une fois tous les scans terminés.
+
+    Args:
+        campaign_id: UUID de la campagne (external_scan_campaign.id)
+
+    Returns:
+        Dictionnaire avec le nombre de scans lancés
+    """
+    from celery import chord
+
+    db = get_db_session()
+    service = ScanCampaignService(db)
+
+    try:
+        jobs = service.plan_campaign(campaign_id)
+        db.commit()
+    except Exception as e:
+        logger.exception(f"❌ Planification de la campagne {campaign_id} impossible: {e}")
+        db.rollback()
+        service.mark_campaign_error(campaign_id, str(e))
+        db.commit()
+        return {"status": "ERROR", "error": str(e)}
+    finally:
+        db.close()
+
+    if not jobs:
+        return {"status": "SUCCESS", "nb_scans": 0}
+
+    queued_at = time.time()
+    header = [
+        campaign_scan_target_task.s(
+            campaign_id=campaign_id,
+            target_id=job["target_id"],
+            scan_id=job["scan_id"],
+            tenant_id=job["tenant_id"],
+            address=job["address"],
+            group=job["group"],
+            queued_at=queued_at
+        )
+        for job in jobs
+    ]
+    result = chord(header)(finalize_scan_campaign_task.s(campaign_id=campaign_id))
+
+    logger.info(f"🚀 Campagne de scan lancée: {campaign_id} ({len(jobs)} scans, chord={result.id})")
+
+    return {"status": "RUNNING", "nb_scans": len(jobs), "chord_id": result.id}
+
+
+@shared_task(
+    bind=True,
+    name="src.tasks.external_scan_tasks.campaign_scan_target_task",
+    max_retries=None,
+    soft_time_limit=600,
+    time_limit=900
+)
+def campaign_scan_target_task(
+    self,
+    campaign_id: str,
+    target_id: str,
+    scan_id: str,
+    tenant_id: str,
+    address: Optional[str] = None,
+    group: Optional[str] = None,
+    queued_at: Optional[float] = None
+) -> dict:
+    """
+    Scan d'une cible au sein d'une campagne.
+
+    Le scan ne démarre qu'après obtention des créneaux Redis (plafonds global
+    et par tenant, politesse par IP et par ASN) ; sinon la tâche est
+    replanifiée avec un délai aléatoire. Les erreurs sont retournées et non
+    levées, pour que le chord de la campagne se termine toujours.
+
+    Args:
+        campaign_id: UUID de la campagne
+        target_id: UUID de la cible
+        scan_id: UUID du scan (créé à la planification)
+        tenant_id: UUID du tenant
+        address: Adresse principale de la cible (None si non résolue)
+        group: Groupe de politesse (asn:<n> ou net:<préfixe>)
+        queued_at: Horodatage de lancement de la campagne
+
+    Returns:
+        Dictionnaire avec le résumé du scan
+    """
+    limits = scan_slot_limits(tenant_id, address, group)
+
+    if not acquire_scan_slots(scan_id, limits):
+        waited = time.time() - (queued_at or time.time())
+        if waited < SCAN_CAMPAIGN_MAX_WAIT_SECONDS:
+            raise self.retry(countdown=SCAN_SLOT_RETRY_SECONDS * (1 + random.random()))
+
+        error = f"Aucun créneau de scan disponible après {int(waited)}s"
+        db = get_db_session()
+        try:
+            _update_scan_status(db, scan_id, ScanExecutionStatus.ERROR, error)
+        finally:
+            db.close()
+        return {"status": "ERROR", "scan_id": scan_id, "target_id": target_id, "error": error}
+
+    logger.info(f"🚀 Scan de campagne: campaign={campaign_id}, target={target_id}, scan={scan_id}")
+
+    db = get_db_session()
+
+    try:
+        result = _run_target_scan(db, target_id, scan_id, queued_at)
+
+    except Exception as e:
+        logger.exception(f"❌ Erreur inattendue dans le scan de campagne: {e}")
+
+        try:
+            db.rollback()
+            _update_scan_status(db, scan_id, ScanExecutionStatus.ERROR, str(e))
+            _update_target_after_scan(db, target_id, None, ScanStatus.ERROR)
+        except Exception:
+            pass
+
+        result = {"status": "ERROR", "error": str(e)}
+
+    finally:
+        release_scan_slots(scan_id, limits)
+        db.close()
+
+    return {"scan_id": scan_id, "target_id": target_id, **result}
+
+
+@shared_task(
+    bind=True,
+    name="src.tasks.external_scan_tasks.finalize_scan_campaign_task",
+    soft_time_limit=120,
+    time_limit=180
+)
+def finalize_scan_campaign_task(self, results: list, campaign_id: str) -> dict:
+    """
+    Callback du chord d'une campagne : clôture la campagne, propage les
+    résultats aux cibles dédupliquées et rafraîchit les agrégats écosystème.
+
+    Args:
+        results: Résultats des scans de la campagne
+        campaign_id: UUID de la campagne
+
+    Returns:
+        Dictionnaire avec le statut et les compteurs de la campagne
+    """
+    db = get_db_session()
+
+    try:
+        outcome = ScanCampaignService(db).finalize_campaign(campaign_id, results or [])
+        db.commit()
+
+        logger.info(
+            f"🏁 Campagne de scan terminée: {campaign_id} — {outcome['status']} "
+            f"({outcome['success_count']} succès, {outcome['error_count']} erreurs)"
+        )
+        return outcome
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+@shared_task(
+    bind=True,
+    name="src.tasks.external_scan_tasks.schedule_scan_campaigns_task",
+    soft_time_limit=120,
+    time_limit=180
+)
+def schedule_scan_campaigns_task(self) -> dict:
+    """
+    Lance une campagne par tenant pour les cibles dont le rescan périodique
+    (scan_frequency) est dû (planifiée par Celery beat).
+
+    Returns:
+        Dictionnaire avec le nombre de campagnes et de cibles
+    """
+    db = get_db_session()
+
+    try:
+        service = ScanCampaignService(db)
+        due = service.due_targets_by_tenant()
+        campaign_ids = [
+            service.create_campaign(
+                tenant_id,
+                trigger_type="scheduled",
+                name="Rescan planifié",
+                target_ids=target_ids
+            )
+            for tenant_id, target_ids in due.items()
+            if target_ids
+        ]
+        db.commit()
+
+    except Exception:
+        db.rollback()
+        raise
+
     finally:
         db.close()
 
+    for campaign_id in campaign_ids:
+        launch_scan_campaign_task.delay(campaign_id=campaign_id)
+
+    nb_targets = sum(len(ids) for ids in due.values())
+    if campaign_ids:
+        logger.info(f"📅 {len(campaign_ids)} campagne(s) de rescan planifiée(s), {nb_targets} cibles")
+
+    return {"campaigns": len(campaign_ids), "targets": nb_targets}
+
 
 @shared_task(
     bind=True,
@@ -238,6 +412,225 @@ def generate_scan_report_task(
     }
 
 
+@shared_task(
+    bind=True,
+    name="src.tasks.external_scan_tasks.update_nvd_feeds_task",
+    soft_time_limit=1800,
+    time_limit=2100
+)
+def update_nvd_feeds_task(self, download: Optional[bool] = None) -> dict:
+    """
+    Met à jour la base CVE locale (planifiée par Celery beat).
+
+    Télécharge les flux delta NVD (modified, recent) si NVD_FEEDS_DOWNLOAD
+    est activé, puis importe les fichiers nouveaux ou modifiés de NVD_FEEDS_DIR.
+
+    Routée vers la queue ``nvd_feeds``, consommée par un worker dédié dont
+    l'hôte a un accès sortant à nvd.nist.gov (les workers de scan peuvent
+    être en zone réseau restreinte):
+
+        celery -A src.tasks.celery_app worker --queues=nvd_feeds --concurrency=1 --hostname=nvd@%h
+
+    Sans accès Internet, laisser NVD_FEEDS_DOWNLOAD désactivé et alimenter
+    NVD_FEEDS_DIR depuis une autre machine (Scripts/import_nvd_feeds.py).
+
+    Args:
+        download: Forcer/désactiver le téléchargement (défaut: NVD_FEEDS_DOWNLOAD)
+
+    Returns:
+        Dictionnaire {fichier: nombre de CVE importées | "unchanged"}
+    """
+    from src.services.external_scanner.nvd_store import download_feeds, nvd_store
+
+    if download is None:
+        download = os.getenv("NVD_FEEDS_DOWNLOAD", "false").lower() == "true"
+
+    if download:
+        try:
+            download_feeds()
+        except Exception as e:
+            # Import des fichiers déjà présents malgré l'échec du téléchargement
+            logger.warning(f"⚠️ Téléchargement des flux NVD impossible: {e}")
+
+    results = nvd_store.import_feeds()
+    imported = {name: count for name, count in results.items() if count != "unchanged"}
+    if imported:
+        # Les résultats en cache peuvent être périmés
+        from src.services.external_scanner.cve_cache import clear_cache
+        clear_cache()
+        logger.info(f"🛡️ Base CVE locale mise à jour: {imported}")
+
+    return results
+
+
+def _load_target_slot_limits(db: Session, target_id: str) -> dict:
+    """Créneaux de scan d'une cible (aucun si elle est introuvable : le scan échouera)."""
+    target = db.execute(text("""
+        SELECT tenant_id, type, value
+        FROM external_target
+        WHERE id = CAST(:target_id AS uuid)
+    """), {"target_id": target_id}).fetchone()
+    if not target:
+        return {}
+    return target_slot_limits(str(target.tenant_id), target.type, target.value)
+
+
+def _run_target_scan(db: Session, target_id: str, scan_id: str, queued_at: Optional[float] = None) -> dict:
+    """
+    Exécute le scan d'une cible et persiste ses résultats.
+
+    Les durées (attente en file, étapes du moteur, persistance, total)
+    alimentent les métriques des workers de scan.
+
+    Lève les erreurs inattendues (gérées par la tâche appelante).
+
+    Returns:
+        Dictionnaire avec le résumé du scan
+    """
+    timings: dict = {}
+    if queued_at is not None:
+        timings["queue_wait"] = max(time.time() - queued_at, 0.0)
+    start = time.perf_counter()
+    status = "ERROR"
+
+    try:
+        result = _execute_target_scan(db, target_id, scan_id, timings)
+        status = result.get("status", "ERROR")
+        return result
+    finally:
+        timings["total"] = time.perf_counter() - start
+        record_scan_metrics(timings, status)
+
+
+def _execute_target_scan(db: Session, target_id: str, scan_id: str, timings: dict) -> dict:
+    """Scan et persistance d'une cible ; renseigne timings (étapes, persistance)."""
+    # Récupérer la cible
+    target_query = text("""
+        SELECT id, tenant_id, type, value, label
+        FROM external_target
+        WHERE id = CAST(:target_id AS uuid)
+        AND deleted_at IS NULL
+    """)
+    target_result = db.execute(
+        target_query,
+        {"target_id": target_id}
+    ).fetchone()
+
+    if not target_result:
+        logger.error(f"❌ Cible non trouvée: {target_id}")
+        _update_scan_status(db, scan_id, ScanExecutionStatus.ERROR, "Cible non trouvée")
+        return {"error": "Cible non trouvée"}
+
+    target_type = target_result.type
+    target_value = target_result.value
+    tenant_id = str(target_result.tenant_id)
+
+    # Mettre à jour le statut du scan à RUNNING
+    _update_scan_status(db, scan_id, ScanExecutionStatus.RUNNING)
+
+    # Exécuter le scan de manière asynchrone
+    logger.info(f"📡 Scan en cours: {target_type} -> {target_value}")
+
+    # Dernier scan réussi (diff des constats, rescan différentiel)
+    previous = _load_previous_scan(db, target_id, scan_id)
+    incremental = SCAN_INCREMENTAL_MODE and _is_recent(previous)
+
+    config = ScanConfig(
+        nmap_timeout=300,
+        tls_timeout=60,
+        enable_tls_audit=True,
+        enable_cve_enrichment=True,
+        incremental=incremental,
+        incremental_max_age_days=SCAN_INCREMENTAL_MAX_AGE_DAYS
+    )
+    # Boucle d'événements et composants du moteur réutilisés par le worker
+    engine = ScanEngine(config, components=get_scan_components(config))
+
+    scan_result: ScanResult = run_sync(
+        engine.run_scan(
+            target_type=target_type,
+            target_value=target_value,
+            target_id=UUID(target_id),
+            scan_id=UUID(scan_id),
+            previous=previous
+        )
+    )
+    timings.update(scan_result.summary.get("stage_timings", {}))
+
+    # Persister les résultats
+    persist_start = time.perf_counter()
+    if scan_result.status == "SUCCESS":
+        # Sauvegarder les vulnérabilités (validées par le commit de
+        # _update_scan_success, dans la même transaction)
+        _save_vulnerabilities(
+            db,
+            scan_id=scan_id,
+            tenant_id=tenant_id,
+            vulnerabilities=scan_result.vulnerabilities
+        )
+
+        # Mettre à jour le résumé du scan
+        summary = scan_result.summary
+        summary["scan_duration_seconds"] = scan_result.scan_duration_seconds
+
+        _update_scan_success(
+            db,
+            scan_id=scan_id,
+            summary=summary,
+            started_at=scan_result.started_at,
+            finished_at=scan_result.finished_at,
+            scan_data=scan_result.scan_data
+        )
+
+        # Mettre à jour la cible
+        _update_target_after_scan(
+            db,
+            target_id=target_id,
+            exposure_score=scan_result.exposure_score,
+            scan_status=ScanStatus.SUCCESS
+        )
+
+        # Les agrégats écosystème du tenant sont périmés
+        invalidate_ecosystem_aggregates(tenant_id)
+        timings["persist"] = time.perf_counter() - persist_start
+
+        logger.info(
+            f"✅ Scan terminé avec succès: score={scan_result.exposure_score}, "
+            f"vulns={len(scan_result.vulnerabilities)}"
+        )
+
+        return {
+            "status": "SUCCESS",
+            "exposure_score": scan_result.exposure_score,
+            "nb_vulnerabilities": len(scan_result.vulnerabilities),
+            "nb_services": len(scan_result.services),
+            "tls_grade": scan_result.tls_grade,
+            "duration_seconds": scan_result.scan_duration_seconds
+        }
+
+    else:
+        # Scan en erreur
+        _update_scan_status(
+            db,
+            scan_id,
+            ScanExecutionStatus.ERROR,
+            scan_result.error_message
+        )
+        _update_target_after_scan(
+            db,
+            target_id=target_id,
+            exposure_score=None,
+            scan_status=ScanStatus.ERROR
+        )
+
+        logger.error(f"❌ Scan échoué: {scan_result.error_message}")
+
+        return {
+            "status": "ERROR",
+            "error": scan_result.error_message
+        }
+
+
 # ==============================================================================
 # FONCTIONS HELPER
 # ==============================================================================
@@ -301,6 +694,50 @@ def _make_json_serializable(obj):
             return None
 
 
+def _load_previous_scan(db: Session, target_id: str, scan_id: str) -> Optional[PreviousScan]:
+    """Dernier scan réussi d'une cible, avec ses constats (None si aucun)."""
+    row = db.execute(text("""
+        SELECT id, finished_at, scan_data
+        FROM external_scan
+        WHERE external_target_id = CAST(:target_id AS uuid)
+          AND id <> CAST(:scan_id AS uuid)
+          AND status = 'SUCCESS'
+          AND scan_data IS NOT NULL
+        ORDER BY finished_at DESC
+        LIMIT 1
+    """), {"target_id": target_id, "scan_id": scan_id}).fetchone()
+
+    if not row:
+        return None
+
+    vulns = db.execute(text("""
+        SELECT
+            port, protocol, service_name, service_version, service_banner,
+            vulnerability_type, severity, cve_ids, cvss_score, cvss_vector,
+            title, description, recommendation, "references"
+        FROM external_service_vulnerability
+        WHERE external_scan_id = CAST(:scan_id AS uuid)
+    """), {"scan_id": str(row.id)}).fetchall()
+
+    return PreviousScan(
+        scan_id=str(row.id),
+        finished_at=row.finished_at,
+        scan_data=row.scan_data or {},
+        vulnerabilities=[dict(v._mapping) for v in vulns]
+    )
+
+
+def _is_recent(previous: Optional[PreviousScan]) -> bool:
+    """Vrai si le scan précédent est assez récent pour un rescan différentiel."""
+    if previous is None or previous.finished_at is None:
+        return False
+    finished_at = previous.finished_at
+    if finished_at.tzinfo is None:
+        finished_at = finished_at.replace(tzinfo=timezone.utc)
+    age = datetime.now(timezone.utc) - finished_at
+    return age.days < SCAN_INCREMENTAL_MAX_AGE_DAYS
+
+
 def _update_scan_success(
     db: Session,
     scan_id: str,
@@ -333,6 +770,9 @@ def _update_scan_success(
         "started_at": started_at,
         "finished_at": finished_at
     })
+
+    # Dernier scan de la cible (rapports écosystème, dashboard)
+    upsert_latest_scan(db, scan_id)
     db.commit()
 
 
@@ -360,70 +800,127 @@ def _update_target_after_scan(
     db.commit()
 
 
+def _truncate(value, max_length: int) -> Optional[str]:
+    """Convertit en str et tronque à la taille de la colonne VARCHAR."""
+    if value is None:
+        return None
+    value = str(value)
+    return value[:max_length] if len(value) > max_length else value
+
+
+def _normalize_vulnerabilities(vulnerabilities: list[dict]) -> list[dict]:
+    """
+    Valide et normalise un lot de vulnérabilités avant insertion.
+
+    - type / sévérité hors énumération -> MISCONFIGURATION / INFO
+    - chaînes tronquées aux tailles des colonnes (une valeur trop longue
+      ferait échouer tout l'INSERT multi-lignes)
+    - port / score CVSS non numériques -> NULL
+    """
+    import uuid
+
+    rows = []
+    for vuln in vulnerabilities:
+        vuln_type = vuln.get("vulnerability_type") or "MISCONFIGURATION"
+        if vuln_type not in _VULNERABILITY_TYPES:
+            vuln_type = "MISCONFIGURATION"
+
+        severity = str(vuln.get("severity") or "INFO").upper()
+        if severity not in _SEVERITY_LEVELS:
+            severity = "INFO"
+
+        try:
+            port = int(vuln["port"]) if vuln.get("port") is not None else None
+        except (TypeError, ValueError):
+            port = None
+
+        try:
+            cvss_score = float(vuln["cvss_score"]) if vuln.get("cvss_score") is not None else None
+        except (TypeError, ValueError):
+            cvss_score = None
+
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "port": port,
+            "protocol": _truncate(vuln.get("protocol") or "tcp", 20),
+            "service_name": _truncate(vuln.get("service_name"), 100),
+            "service_version": _truncate(vuln.get("service_version"), 100),
+            "service_banner": vuln.get("service_banner"),
+            "vulnerability_type": vuln_type,
+            "severity": severity,
+            "cve_ids": list(vuln.get("cve_ids") or []),
+            "cvss_score": cvss_score,
+            "cvss_vector": _truncate(vuln.get("cvss_vector"), 100),
+            "title": _truncate(vuln.get("title") or "Vulnérabilité détectée", 255),
+            "description": vuln.get("description"),
+            "recommendation": vuln.get("recommendation"),
+            "references": list(vuln.get("references") or []),
+        })
+
+    return rows
+
+
 def _save_vulnerabilities(
     db: Session,
     scan_id: str,
     tenant_id: str,
     vulnerabilities: list[dict]
-):
-    """Sauvegarde les vulnérabilités détectées."""
-    import json
-    import uuid
+) -> int:
+    """
+    Sauvegarde les vulnérabilités détectées (insertion en masse).
 
-    for vuln in vulnerabilities:
-        vuln_id = str(uuid.uuid4())
+    Le lot est normalisé une fois puis écrit par un INSERT multi-lignes
+    (jsonb_populate_recordset, un seul paramètre sérialisé par lot de
+    VULN_INSERT_CHUNK_SIZE lignes). Les lignes sont lues avec le type de
+    ligne de la table : chaque valeur prend le type réel de sa colonne
+    (énumérations vulnerabilitytype / severitylevel du schéma SQL ou
+    VARCHAR du schéma Alembic), sans cast text -> enum.
 
-        # Mapper le type de vulnérabilité
-        vuln_type = vuln.get("vulnerability_type", "MISCONFIGURATION")
-        if vuln_type not in [e.value for e in VulnerabilityType]:
-            vuln_type = "MISCONFIGURATION"
+    Pas de commit ici: les vulnérabilités sont validées dans la même
+    transaction que _update_scan_success (un scan SUCCESS a toujours ses
+    vulnérabilités, un échec n'en laisse aucune à moitié écrite).
 
-        # Mapper la sévérité
-        severity = vuln.get("severity", "INFO").upper()
-        if severity not in [e.value for e in SeverityLevel]:
-            severity = "INFO"
+    Returns:
+        Nombre de vulnérabilités insérées
+    """
+    import json
 
-        query = text("""
-            INSERT INTO external_service_vulnerability (
-                id, external_scan_id, tenant_id,
-                port, protocol, service_name, service_version, service_banner,
-                vulnerability_type, severity,
-                cve_ids, cvss_score, cvss_vector,
-                title, description, recommendation,
-                "references",
-                created_at
-            ) VALUES (
-                CAST(:id AS uuid),
-                CAST(:scan_id AS uuid),
-                CAST(:tenant_id AS uuid),
-                :port, :protocol, :service_name, :service_version, :service_banner,
-                :vuln_type, :severity,
-                CAST(:cve_ids AS jsonb), :cvss_score, :cvss_vector,
-                :title, :description, :recommendation,
-                CAST(:refs AS jsonb),
-                NOW()
-            )
-        """)
+    rows = _normalize_vulnerabilities(vulnerabilities)
+    if not rows:
+        return 0
 
+    query = text("""
+        INSERT INTO external_service_vulnerability (
+            id, external_scan_id, tenant_id,
+            port, protocol, service_name, service_version, service_banner,
+            vulnerability_type, severity,
+            cve_ids, cvss_score, cvss_vector,
+            title, description, recommendation,
+            "references",
+            created_at
+        )
+        SELECT
+            r.id,
+            CAST(:scan_id AS uuid),
+            CAST(:tenant_id AS uuid),
+            r.port, r.protocol, r.service_name, r.service_version, r.service_banner,
+            r.vulnerability_type, r.severity,
+            r.cve_ids, r.cvss_score, r.cvss_vector,
+            r.title, r.description, r.recommendation,
+            r."references",
+            NOW()
+        FROM jsonb_populate_recordset(
+            CAST(NULL AS external_service_vulnerability),
+            CAST(:rows AS jsonb)
+        ) AS r
+    """)
+
+    for i in range(0, len(rows), VULN_INSERT_CHUNK_SIZE):
         db.execute(query, {
-            "id": vuln_id,
             "scan_id": scan_id,
             "tenant_id": tenant_id,
-            "port": vuln.get("port"),
-            "protocol": vuln.get("protocol", "tcp"),
-            "service_name": vuln.get("service_name"),
-            "service_version": vuln.get("service_version"),
-            "service_banner": vuln.get("service_banner"),
-            "vuln_type": vuln_type,
-            "severity": severity,
-            "cve_ids": json.dumps(vuln.get("cve_ids", [])),
-            "cvss_score": vuln.get("cvss_score"),
-            "cvss_vector": vuln.get("cvss_vector"),
-            "title": vuln.get("title", "Vulnérabilité détectée"),
-            "description": vuln.get("description"),
-            "recommendation": vuln.get("recommendation"),
-            "refs": json.dumps(vuln.get("references", []))
+            "rows": json.dumps(rows[i:i + VULN_INSERT_CHUNK_SIZE], default=str)
         })
 
-    db.commit()
-    logger.info(f"💾 {len(vulnerabilities)} vulnérabilités sauvegardées")
+    logger.info(f"💾 {len(rows)} vulnérabilités sauvegardées")
+    return len(rows)
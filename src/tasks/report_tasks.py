@@ -0,0 +1,114 @@
+# backend/src/tasks/report_tasks.py
+"""
+Tâches Celery pour la génération des rapports de campagne.
+
+Tâches:
+- generate_report_job_task: Traite un ReportGenerationJob (collecte, IA, HTML, PDF)
+
+Les tâches sont routées vers la queue ``report_generation``. Démarrage d'un worker:
+
+    celery -A src.tasks.celery_app worker --queues=report_generation --concurrency=4
+
+La progression est publiée sur Redis pub/sub (voir report_progress) et relayée
+par l'endpoint SSE ``/campaigns/{campaign_id}/generate-bulk/stream``.
+"""
+
+import logging
+from typing import Iterable
+from uuid import UUID
+
+from celery import group, shared_task
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.database import SessionLocal
+from src.models.report import ReportGenerationJob
+from src.schemas.report import JobStatus
+from src.tasks import worker_runtime  # noqa: F401  (init / arrêt des process workers)
+
+logger = logging.getLogger(__name__)
+
+
+def get_db_session() -> Session:
+    """Crée une session de base de données."""
+    return SessionLocal()
+
+
+@shared_task(
+    bind=True,
+    name="src.tasks.report_tasks.generate_report_job_task",
+    max_retries=1,
+    default_retry_delay=30,
+    soft_time_limit=1200,
+    time_limit=1500
+)
+def generate_report_job_task(self, job_id: str) -> dict:
+    """
+    Tâche Celery pour générer le rapport associé à un job.
+
+    Les erreurs de génération sont enregistrées sur le job par
+    ReportJobProcessor (statut FAILED) ; seule une base de données
+    injoignable (OperationalError) provoque une nouvelle tentative.
+
+    Args:
+        job_id: UUID du job (ReportGenerationJob.id)
+
+    Returns:
+        Dictionnaire avec le statut final du job
+    """
+    from src.services.report_job_processor import ReportJobProcessor
+
+    logger.info(f"🚀 Démarrage tâche rapport: job={job_id}")
+
+    db = get_db_session()
+
+    try:
+        job = db.execute(
+            select(ReportGenerationJob).where(ReportGenerationJob.id == UUID(job_id))
+        ).scalar_one_or_none()
+
+        if not job:
+            logger.error(f"❌ Job {job_id} non trouvé")
+            return {"job_id": job_id, "status": "not_found"}
+
+        # Idempotence (acks_late : un message peut être relivré après un crash worker)
+        if job.status in (JobStatus.COMPLETED.value, JobStatus.CANCELLED.value):
+            logger.info(f"⏭️ Job {job_id} déjà traité ({job.status})")
+            return {"job_id": job_id, "status": job.status}
+
+        success = ReportJobProcessor(db).process_job(job.id)
+
+        return {
+            "job_id": job_id,
+            "report_id": str(job.report_id),
+            "status": JobStatus.COMPLETED.value if success else JobStatus.FAILED.value
+        }
+
+    except OperationalError as e:
+        # Base injoignable (redémarrage, bascule) : erreur transitoire
+        logger.warning(f"⚠️ Base de données indisponible pour le job {job_id}: {e}")
+        raise self.retry(exc=e)
+
+    finally:
+        db.close()
+
+
+def enqueue_report_jobs(job_ids: Iterable[UUID | str]) -> list[str]:
+    """
+    Envoie un ou plusieurs jobs sur la queue ``report_generation``.
+
+    Les jobs sont envoyés en groupe pour être répartis entre les process
+    workers disponibles.
+
+    Returns:
+        Liste des task_id Celery
+    """
+    signatures = [generate_report_job_task.s(str(job_id)) for job_id in job_ids]
+    if not signatures:
+        return []
+
+    result = group(signatures).apply_async()
+    task_ids = [child.id for child in result.children or []]
+    logger.info(f"📤 {len(signatures)} job(s) de rapport envoyé(s) sur la queue report_generation")
+    return task_ids
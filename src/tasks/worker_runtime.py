@@ -0,0 +1,80 @@
+# backend/src/tasks/worker_runtime.py
+"""
+Environnement d'exécution des process workers Celery (scan externe, rapports).
+
+Un process worker Celery (prefork) exécute une tâche à la fois. Ce module lui
+fournit des ressources créées une fois par process au lieu d'une fois par
+tâche :
+- une boucle d'événements longue durée (src.utils.event_loop.run_sync) : les
+  ressources liées à la boucle (clients HTTP NVD et Ollama keep-alive,
+  sémaphore des processus nmap) survivent d'une tâche à l'autre
+- les composants du moteur de scan (clients nmap, auditeur TLS, scoring,
+  pool de threads), par jeu de timeouts
+- un pool de connexions base de données propre au process : les connexions
+  héritées du process parent sont abandonnées après le fork (taille du pool
+  via DB_POOL_SIZE / DB_MAX_OVERFLOW)
+- une connexion Redis propre au process (cache CVE, créneaux des campagnes,
+  invalidation des agrégats écosystème, métriques des étapes, progression
+  des rapports)
+
+C'est le seul module qui enregistre les hooks worker_process_init /
+worker_process_shutdown ; les modules de tâches l'importent.
+
+Exemple d'utilisation:
+    engine = ScanEngine(config, components=get_scan_components(config))
+    result = run_sync(engine.run_scan(target_type="DOMAIN", target_value="example.com"))
+"""
+
+import logging
+import threading
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from src.services.external_scanner.engine import ScanComponents, ScanConfig
+from src.utils.event_loop import close_event_loop, reset_event_loop
+
+logger = logging.getLogger(__name__)
+
+# Composants partagés par (timeout nmap, timeout TLS, taille du pool de threads)
+_components: dict[tuple, ScanComponents] = {}
+_components_lock = threading.Lock()
+
+
+def get_scan_components(config: ScanConfig) -> ScanComponents:
+    """Composants du moteur de scan partagés pour cette configuration."""
+    key = (config.nmap_timeout, config.tls_timeout, config.executor_workers)
+    with _components_lock:
+        components = _components.get(key)
+        if components is None:
+            components = ScanComponents.build(config)
+            _components[key] = components
+        return components
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    """Réinitialise les ressources héritées du process parent après le fork."""
+    from src.database import engine
+    from src.utils.redis_manager import redis_manager
+
+    # Les connexions du parent ne doivent pas être partagées entre process
+    engine.dispose(close=False)
+    redis_manager.connect()
+
+    # Boucle et threads du parent inutilisables dans le process enfant
+    reset_event_loop()
+    _components.clear()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    """Ferme les clients HTTP, la boucle et les composants à l'arrêt du process."""
+    from src.services.external_scanner.cve_cache import close_http_client as close_nvd_client
+    from src.services.report_ai_summary_service import close_http_client as close_ai_client
+
+    close_event_loop(close_nvd_client, close_ai_client)
+
+    with _components_lock:
+        for components in _components.values():
+            components.shutdown()
+        _components.clear()
@@ -0,0 +1,79 @@
+"""
+Boucle d'événements longue durée par thread, pour appeler du code async
+depuis un contexte synchrone (tâches Celery, pool de threads de l'API).
+
+Les ressources liées à une boucle (clients HTTP keep-alive, sémaphores)
+survivent ainsi d'un appel à l'autre dans le même thread.
+
+Exemple d'utilisation:
+    result = run_sync(engine.run_scan(target_type="DOMAIN", target_value="example.com"))
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_local = threading.local()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Boucle d'événements du thread courant (créée au premier appel)."""
+    loop: Optional[asyncio.AbstractEventLoop] = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _local.loop = loop
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Exécute une coroutine sur la boucle longue durée du thread.
+
+    Si l'attente est interrompue (SoftTimeLimitExceeded, KeyboardInterrupt),
+    la tâche est annulée et son annulation menée à terme avant de propager
+    l'exception : elle ne reste pas en suspens sur la boucle réutilisée par
+    les appels suivants.
+    """
+    loop = get_event_loop()
+    task = asyncio.ensure_future(coro, loop=loop)
+    try:
+        return loop.run_until_complete(task)
+    except BaseException:
+        if not task.done():
+            task.cancel()
+            try:
+                loop.run_until_complete(task)
+            except (asyncio.CancelledError, Exception):
+                pass
+        raise
+
+
+def reset_event_loop() -> None:
+    """Oublie la boucle du thread sans la fermer (héritée du process parent après un fork)."""
+    _local.loop = None
+
+
+def close_event_loop(*cleanups: Callable[[], Awaitable[None]]) -> None:
+    """
+    Ferme la boucle du thread après avoir exécuté les nettoyages donnés
+    (fermeture des clients HTTP liés à la boucle).
+    """
+    loop: Optional[asyncio.AbstractEventLoop] = getattr(_local, "loop", None)
+    _local.loop = None
+    if loop is None or loop.is_closed():
+        return
+    try:
+        for cleanup in cleanups:
+            try:
+                loop.run_until_complete(cleanup())
+            except Exception as e:
+                logger.warning(f"⚠️ Nettoyage de la boucle d'événements: {e}")
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        loop.close()
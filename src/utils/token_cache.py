@@ -0,0 +1,222 @@
+"""
+Cache des tokens Keycloak vérifiés (fast path d'authentification)
+
+Deux niveaux :
+1. LRU en mémoire (par process uvicorn) → aucun aller-retour réseau
+2. Redis (partagé entre workers) → évite la vérification JWKS/signature
+
+Les entrées sont indexées par le hash SHA-256 du token (jamais le token brut)
+et expirent au plus tard à l'``exp`` du token.
+
+Le module suit aussi la dernière synchronisation des rôles par utilisateur, afin
+que ``get_current_user_keycloak`` n'écrive en base que lorsque le jeu de rôles
+du token change (ou une fois par fenêtre de session).
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.utils.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+TOKEN_KEY_PREFIX = "auth:token:"
+ROLE_SYNC_KEY_PREFIX = "auth:role_sync:"
+
+
+def hash_token(token: str) -> str:
+    """Hash SHA-256 du token (clé de cache)"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def roles_digest(roles: list[str]) -> str:
+    """Empreinte stable d'un jeu de rôles (indépendante de l'ordre)"""
+    return hashlib.sha256("|".join(sorted(set(roles or []))).encode("utf-8")).hexdigest()[:32]
+
+
+class TokenClaimsCache:
+    """
+    Cache LRU + Redis des payloads de tokens déjà vérifiés.
+
+    Le TTL de chaque entrée est borné par l'``exp`` du token et par
+    ``max_ttl`` : un token expiré n'est jamais servi depuis le cache.
+    """
+
+    def __init__(self, max_entries: int = 2048, max_ttl: int = 300):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._role_syncs: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Claims vérifiés
+    # ------------------------------------------------------------------
+
+    def _ttl_for(self, payload: dict, now: float) -> int:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return 0
+        return int(min(self.max_ttl, exp - now))
+
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Retourne le payload vérifié du token s'il est en cache et non expiré.
+
+        Args:
+            token: JWT brut
+
+        Returns:
+            Payload décodé ou None
+        """
+        key = hash_token(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+
+        client = redis_manager.client
+        if client is not None:
+            try:
+                raw = client.get(f"{TOKEN_KEY_PREFIX}{key}")
+            except RedisError as e:
+                logger.debug(f"Cache token Redis indisponible: {e}")
+                raw = None
+            if raw:
+                try:
+                    payload = json.loads(raw)
+                except (TypeError, ValueError):
+                    payload = None
+                if payload is not None:
+                    ttl = self._ttl_for(payload, now)
+                    if ttl > 0:
+                        self._store_local(key, payload, now + ttl)
+                        self.hits += 1
+                        return payload
+
+        self.misses += 1
+        return None
+
+    def set(self, token: str, payload: dict) -> None:
+        """
+        Met en cache le payload d'un token vérifié (ignoré si ``exp`` absent ou passé).
+
+        Args:
+            token: JWT brut
+            payload: Payload vérifié par KeycloakService.verify_token
+        """
+        now = time.time()
+        ttl = self._ttl_for(payload, now)
+        if ttl <= 0:
+            return
+
+        key = hash_token(token)
+        self._store_local(key, payload, now + ttl)
+
+        client = redis_manager.client
+        if client is not None:
+            try:
+                client.setex(f"{TOKEN_KEY_PREFIX}{key}", ttl, json.dumps(payload, ensure_ascii=False))
+            except (RedisError, TypeError, ValueError) as e:
+                logger.debug(f"Écriture cache token Redis impossible: {e}")
+
+    def _store_local(self, key: str, payload: dict, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Synchronisation des rôles / last_login
+    # ------------------------------------------------------------------
+
+    def needs_role_sync(self, user_id: str, roles: list[str], window: int) -> bool:
+        """
+        Indique si les rôles/last_login de l'utilisateur doivent être réécrits en base.
+
+        Vrai si le jeu de rôles du token diffère de la dernière synchronisation
+        connue, ou si la dernière synchronisation date de plus de ``window`` secondes.
+        """
+        digest = roles_digest(roles)
+        now = time.time()
+
+        with self._lock:
+            entry = self._role_syncs.get(user_id)
+        if entry is None:
+            client = redis_manager.client
+            if client is not None:
+                try:
+                    raw = client.get(f"{ROLE_SYNC_KEY_PREFIX}{user_id}")
+                    if raw:
+                        synced_at, synced_digest = raw.split(":", 1)
+                        entry = (float(synced_at), synced_digest)
+                except (RedisError, ValueError) as e:
+                    logger.debug(f"Lecture role_sync Redis impossible: {e}")
+
+        if entry is None:
+            return True
+        synced_at, synced_digest = entry
+        return synced_digest != digest or (now - synced_at) >= window
+
+    def mark_role_synced(self, user_id: str, roles: list[str], window: int) -> None:
+        """Enregistre une synchronisation des rôles pour l'utilisateur"""
+        digest = roles_digest(roles)
+        now = time.time()
+
+        with self._lock:
+            self._role_syncs[user_id] = (now, digest)
+            self._role_syncs.move_to_end(user_id)
+            while len(self._role_syncs) > self.max_entries:
+                self._role_syncs.popitem(last=False)
+
+        client = redis_manager.client
+        if client is not None:
+            try:
+                client.setex(f"{ROLE_SYNC_KEY_PREFIX}{user_id}", window, f"{now}:{digest}")
+            except RedisError as e:
+                logger.debug(f"Écriture role_sync Redis impossible: {e}")
+
+    def clear(self) -> None:
+        """Vide le cache local (tests / logout global)"""
+        with self._lock:
+            self._entries.clear()
+            self._role_syncs.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> dict:
+        """Statistiques du cache local"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "tracked_users": len(self._role_syncs),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Instance globale (une par process)
+token_cache = TokenClaimsCache(
+    max_entries=settings.auth_token_cache_size,
+    max_ttl=settings.auth_token_cache_max_ttl,
+)
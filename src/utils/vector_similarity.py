@@ -0,0 +1,88 @@
+"""
+Similarité cosinus matricielle (top-k par blocs)
+
+Utilisé par le mapping cross-référentiel : les embeddings stockés des exigences
+source et cible sont chargés en matrices NumPy, normalisés, puis comparés par
+blocs (produit matriciel) en conservant les k meilleurs scores par ligne.
+La mémoire reste bornée à ``block_rows x block_cols`` scores.
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+
+
+def parse_pgvector(value: str) -> np.ndarray:
+    """Convertit la représentation texte pgvector '[v1,v2,...]' en vecteur float32"""
+    return np.fromstring(value.strip()[1:-1], dtype=np.float32, sep=",")
+
+
+def to_matrix(vectors: Iterable[str], dim: int) -> np.ndarray:
+    """Matrice (n, dim) float32 à partir de vecteurs pgvector au format texte"""
+    rows = [parse_pgvector(v) for v in vectors]
+    if not rows:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.vstack(rows)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Normalise chaque ligne (norme L2) ; les lignes nulles restent nulles"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def blockwise_top_k(
+    source: np.ndarray,
+    target: np.ndarray,
+    k: int,
+    block_rows: int = 1024,
+    block_cols: int = 16384
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k cosinus de chaque ligne de ``source`` parmi les lignes de ``target``.
+
+    Les deux matrices doivent être normalisées (cf. normalize_rows).
+
+    Args:
+        source: Matrice (n, d)
+        target: Matrice (m, d)
+        k: Nombre de voisins par ligne source
+        block_rows: Lignes source par bloc
+        block_cols: Lignes cible par bloc
+
+    Returns:
+        (indices, scores) de forme (n, min(k, m)), triés par score décroissant
+    """
+    n, m = source.shape[0], target.shape[0]
+    k = min(k, m)
+    indices = np.zeros((n, k), dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if n == 0 or k == 0:
+        return indices, scores
+
+    for r0 in range(0, n, block_rows):
+        block = source[r0:r0 + block_rows]
+        best_idx = np.empty((block.shape[0], 0), dtype=np.int64)
+        best_scores = np.empty((block.shape[0], 0), dtype=np.float32)
+
+        for c0 in range(0, m, block_cols):
+            sims = block @ target[c0:c0 + block_cols].T
+            kk = min(k, sims.shape[1])
+            part = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+
+            cand_idx = np.concatenate([best_idx, part + c0], axis=1)
+            cand_scores = np.concatenate(
+                [best_scores, np.take_along_axis(sims, part, axis=1)], axis=1
+            )
+            if cand_scores.shape[1] > k:
+                keep = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+                cand_idx = np.take_along_axis(cand_idx, keep, axis=1)
+                cand_scores = np.take_along_axis(cand_scores, keep, axis=1)
+            best_idx, best_scores = cand_idx, cand_scores
+
+        order = np.argsort(-best_scores, axis=1)
+        indices[r0:r0 + block.shape[0]] = np.take_along_axis(best_idx, order, axis=1)
+        scores[r0:r0 + block.shape[0]] = np.take_along_axis(best_scores, order, axis=1)
+
+    return indices, scores
@@ -0,0 +1,61 @@
+"""
+Tests unitaires pour le cache des images de graphiques des rapports.
+"""
+
+import pytest
+
+from src.services import chart_cache as module
+from src.services.chart_cache import cached_chart
+
+
+class FakeGenerator:
+    """Générateur simulé (compte les rendus)."""
+
+    def __init__(self, color_scheme):
+        self.color_scheme = color_scheme
+        self.renders = 0
+
+    @cached_chart("radar")
+    def generate_radar_chart(self, labels, datasets, title="Radar Chart", width=800):
+        self.renders += 1
+        return f"{labels}{datasets}{title}{width}".encode()
+
+
+class TestCachedChart:
+    """Tests pour le décorateur cached_chart."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        """Redis simulé par un dictionnaire."""
+        store = {}
+        monkeypatch.setattr(type(module.redis_manager), "is_connected", property(lambda self: True))
+        monkeypatch.setattr(module.redis_manager, "get", lambda key: store.get(key))
+        monkeypatch.setattr(
+            module.redis_manager, "set",
+            lambda key, value, ttl=None: store.__setitem__(key, value)
+        )
+        return store
+
+    def test_identical_chart_rendered_once(self):
+        """Appels positionnel et nommé équivalents: une seule génération."""
+        first = FakeGenerator({"primary": "#000"})
+        second = FakeGenerator({"primary": "#000"})
+
+        img = first.generate_radar_chart(["A", "B"], {"Score": [50, 60]})
+        cached = second.generate_radar_chart(labels=["A", "B"], datasets={"Score": [50, 60]}, width=800)
+
+        assert cached == img
+        assert first.renders == 1
+        assert second.renders == 0
+
+    def test_data_or_palette_change_regenerates(self):
+        """Des données ou une palette différentes produisent une nouvelle image."""
+        generator = FakeGenerator({"primary": "#000"})
+        generator.generate_radar_chart(["A"], {"Score": [50]})
+        generator.generate_radar_chart(["A"], {"Score": [51]})
+
+        other_palette = FakeGenerator({"primary": "#fff"})
+        other_palette.generate_radar_chart(["A"], {"Score": [50]})
+
+        assert generator.renders == 2
+        assert other_palette.renders == 1
@@ -0,0 +1,138 @@
+"""
+Tests unitaires pour les agrégats de conformité.
+
+Le score calculé sur compliance_score_aggregate doit être identique à
+l'ancienne moyenne AVG(CASE compliant=100 / minor=50 / major=0) sur les réponses.
+Le rafraîchissement périodique ne relit que les réponses modifiées depuis
+son dernier passage complet.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.services import compliance_score_service as module
+from src.services.compliance_score_service import ComplianceScoreService, score_sql
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class TestScoreSql:
+    """Tests de score_sql (exécuté sur SQLite en mémoire)."""
+
+    @pytest.fixture
+    def conn(self):
+        """Table d'agrégat minimale."""
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            conn.execute(text("""
+                CREATE TABLE compliance_score_aggregate (
+                    kind TEXT, compliant_count INT, minor_count INT,
+                    major_count INT, not_applicable_count INT
+                )
+            """))
+            yield conn
+
+    def _insert(self, conn, kind, compliant, minor, major, na=0):
+        conn.execute(
+            text("INSERT INTO compliance_score_aggregate VALUES (:k, :c, :mi, :ma, :na)"),
+            {"k": kind, "c": compliant, "mi": minor, "ma": major, "na": na}
+        )
+
+    def test_weighted_average_across_rows(self, conn):
+        """Le score agrégé équivaut à la moyenne pondérée des réponses."""
+        # 3 compliant + 1 minor + 1 major (+ N/A ignorés) sur deux lignes
+        self._insert(conn, "internal", 2, 1, 0, na=4)
+        self._insert(conn, "external", 1, 0, 1)
+
+        score = conn.execute(text(f"SELECT {score_sql()} FROM compliance_score_aggregate s")).scalar()
+
+        assert float(score) == pytest.approx((3 * 100 + 50 + 0) / 5)
+
+    def test_filter_and_empty(self, conn):
+        """Le filtre s'applique à chaque SUM ; aucun compteur => 0."""
+        self._insert(conn, "internal", 1, 1, 0)
+        self._insert(conn, "external", 0, 0, 0, na=2)
+
+        internal, external = conn.execute(text(f"""
+            SELECT {score_sql(where="s.kind = 'internal'")}, {score_sql(where="s.kind = 'external'")}
+            FROM compliance_score_aggregate s
+        """)).one()
+
+        assert float(internal) == pytest.approx(75.0)
+        assert float(external) == 0
+
+
+class FakeResult:
+    def __init__(self, rows=None, scalar=None):
+        self.rows = rows or []
+        self._scalar = scalar
+
+    def scalar(self):
+        return self._scalar
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session simulée: renvoie les couples périmés, mémorise le repère demandé."""
+
+    def __init__(self, stale):
+        self.stale = stale
+        self.since = None
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "SELECT NOW()" in sql:
+            return FakeResult(scalar=NOW)
+        if "FROM question_answer qa" in sql and "GROUP BY qa.campaign_id" in sql:
+            self.since = params["since"]
+            return FakeResult(self.stale[:params["limit"]])
+        return FakeResult()
+
+
+class TestRefreshStaleScores:
+    """Tests de refresh_stale_scores (repère du dernier passage en Redis)."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        """Redis simulé par un dictionnaire."""
+        store = {}
+        monkeypatch.setattr(module.redis_manager, "get", lambda key: store.get(key))
+        monkeypatch.setattr(
+            module.redis_manager, "set",
+            lambda key, value, ttl=None: store.__setitem__(key, value) or True
+        )
+        return store
+
+    def _service(self, monkeypatch, stale):
+        db = FakeSession(stale)
+        service = ComplianceScoreService(db)
+        refreshed = []
+        monkeypatch.setattr(service, "refresh_scores", lambda campaign_id, entity_id: refreshed.append(campaign_id))
+        return db, service, refreshed
+
+    def test_default_window_then_watermark(self, monkeypatch, cache):
+        """Premier passage sur la fenêtre par défaut, le suivant à partir du repère."""
+        db, service, refreshed = self._service(monkeypatch, [SimpleNamespace(campaign_id="c1", entity_id="e1")])
+
+        assert service.refresh_stale_scores() == 1
+        assert db.since == NOW - timedelta(seconds=module.COMPLIANCE_SCORE_LOOKBACK_SECONDS)
+        assert refreshed == ["c1"]
+
+        service.refresh_stale_scores()
+        assert db.since == NOW - timedelta(seconds=module.COMPLIANCE_SCORE_REFRESH_MARGIN_SECONDS)
+
+    def test_watermark_kept_when_truncated(self, monkeypatch, cache):
+        """Plus de couples que la limite: le repère n'avance pas."""
+        stale = [SimpleNamespace(campaign_id=f"c{i}", entity_id="e") for i in range(3)]
+        cache[module.WATERMARK_KEY] = (NOW - timedelta(hours=2)).isoformat()
+        db, service, refreshed = self._service(monkeypatch, stale)
+
+        assert service.refresh_stale_scores(limit=2) == 2
+
+        assert db.since == NOW - timedelta(hours=2)
+        assert cache[module.WATERMARK_KEY] == (NOW - timedelta(hours=2)).isoformat()
@@ -0,0 +1,181 @@
+"""
+Tests unitaires pour le cache Redis partagé des recherches CVE
+(TTL négatif, erreurs non mises en cache, single-flight).
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from src.services.external_scanner import cve_cache as module
+from src.services.external_scanner.cve_cache import cached_lookup, lookup_key
+from src.services.external_scanner.cve_enrichment import CVEInfo
+from src.utils.redis_manager import RedisJSONEncoder
+
+
+class FakeRedis:
+    """Client Redis simulé (chaînes, TTL mémorisés, hash de compteurs)."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.stats = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        self.ttls[key] = ex
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def hincrby(self, key, field, amount):
+        self.stats[field] = self.stats.get(field, 0) + amount
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """redis_manager branché sur FakeRedis (valeurs sérialisées en JSON)."""
+    fake = FakeRedis()
+    manager = module.redis_manager
+
+    def set_value(key, value, ttl=None):
+        return fake.set(key, json.loads(json.dumps(value, cls=RedisJSONEncoder)), ex=ttl)
+
+    monkeypatch.setattr(type(manager), "client", property(lambda self: fake))
+    monkeypatch.setattr(manager, "get", fake.get)
+    monkeypatch.setattr(manager, "set", set_value)
+    monkeypatch.setattr(manager, "exists", lambda key: key in fake.store)
+    monkeypatch.setattr(module, "WAIT_POLL_SECONDS", 0.01)
+    return fake
+
+
+def _lock_key(query):
+    return f"{module.LOCK_KEY_PREFIX}{lookup_key('cpe', query)[len(module.CACHE_KEY_PREFIX):]}"
+
+
+class CountingFetch:
+    """Recherche NVD simulée (compte les appels)."""
+
+    def __init__(self, result=None, delay=0.0, error=None):
+        self.calls = 0
+        self.result = result or []
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return list(self.result)
+
+
+CVE = CVEInfo(
+    cve_id="CVE-2021-23017",
+    description="nginx resolver off-by-one",
+    cvss_score=7.7,
+    severity="HIGH",
+    published_date=datetime(2021, 6, 1, 14, 15, tzinfo=timezone.utc),
+)
+QUERY = "cpe:2.3:a:f5:nginx:1.18.0:*:*:*:*:*:*:*"
+
+
+class TestCachedLookup:
+    """Tests pour cached_lookup."""
+
+    def test_result_cached_with_positive_ttl(self, redis):
+        """Résultat non vide: TTL positif, relu à l'identique sans nouvelle recherche."""
+        fetch = CountingFetch([CVE])
+
+        first = asyncio.run(cached_lookup("cpe", QUERY, fetch))
+        second = asyncio.run(cached_lookup("cpe", QUERY.upper(), fetch))
+
+        assert first == second == [CVE]
+        assert fetch.calls == 1
+        assert redis.ttls[lookup_key("cpe", QUERY)] == module.CVE_CACHE_TTL
+        assert redis.stats == {"misses": 1, "hits": 1}
+
+    def test_empty_result_uses_negative_ttl(self, redis):
+        """Recherche sans CVE: TTL négatif, comptée comme hit négatif ensuite."""
+        fetch = CountingFetch([])
+
+        asyncio.run(cached_lookup("cpe", QUERY, fetch))
+        cached = asyncio.run(cached_lookup("cpe", QUERY, fetch))
+
+        assert cached == []
+        assert fetch.calls == 1
+        assert redis.ttls[lookup_key("cpe", QUERY)] == module.CVE_CACHE_NEGATIVE_TTL
+        assert redis.stats == {"misses": 1, "negative_hits": 1}
+
+    def test_error_not_cached_and_lock_released(self, redis):
+        """Erreur NVD (rate limit): rien en cache, verrou libéré."""
+        fetch = CountingFetch(error=RuntimeError("NVD 429"))
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(cached_lookup("cpe", QUERY, fetch))
+
+        assert lookup_key("cpe", QUERY) not in redis.store
+        assert _lock_key(QUERY) not in redis.store
+
+    def test_concurrent_lookups_coalesced(self, redis):
+        """Deux scans concurrents sur la même clé: une seule recherche NVD."""
+        fetch = CountingFetch([CVE], delay=0.05)
+
+        async def two_scans():
+            return await asyncio.gather(
+                cached_lookup("cpe", QUERY, fetch),
+                cached_lookup("cpe", QUERY, fetch),
+            )
+
+        first, second = asyncio.run(two_scans())
+
+        assert first == second == [CVE]
+        assert fetch.calls == 1
+        assert redis.stats == {"misses": 1, "coalesced": 1}
+        assert _lock_key(QUERY) not in redis.store
+
+    def test_lock_lost_without_result(self, redis, monkeypatch):
+        """Verrou d'un autre scan disparu sans résultat: recherche locale, verrou d'autrui conservé."""
+        redis.store[_lock_key(QUERY)] = "other-scan"
+        monkeypatch.setattr(module.redis_manager, "exists", lambda key: False)
+        fetch = CountingFetch([CVE])
+
+        result = asyncio.run(cached_lookup("cpe", QUERY, fetch))
+
+        assert result == [CVE]
+        assert fetch.calls == 1
+        assert redis.store[_lock_key(QUERY)] == "other-scan"
+
+
+class TestHttpClient:
+    """Tests pour get_http_client (un client par boucle d'événements)."""
+
+    def test_one_client_per_loop(self):
+        """Même boucle: client réutilisé; autre boucle: client distinct, l'ancien reste ouvert."""
+        async def current_client():
+            return module.get_http_client()
+
+        first_loop, second_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            first = first_loop.run_until_complete(current_client())
+            again = first_loop.run_until_complete(current_client())
+            other = second_loop.run_until_complete(current_client())
+
+            assert first is again
+            assert other is not first
+            assert not first.is_closed
+
+            first_loop.run_until_complete(module.close_http_client())
+            second_loop.run_until_complete(module.close_http_client())
+            assert first.is_closed and other.is_closed
+        finally:
+            first_loop.close()
+            second_loop.close()
@@ -0,0 +1,68 @@
+"""
+Tests unitaires pour la boucle d'événements longue durée par thread.
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.event_loop import close_event_loop, get_event_loop, run_sync
+
+
+class TestRunSync:
+    """Tests pour run_sync (boucle longue durée du thread)."""
+
+    def test_returns_result_on_shared_loop(self):
+        """Les coroutines successives s'exécutent sur la même boucle."""
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert run_sync(current_loop()) is run_sync(current_loop()) is get_event_loop()
+
+    def test_interrupted_task_is_cancelled(self):
+        """Une interruption annule la tâche avant d'être propagée; la boucle reste utilisable."""
+        state = {}
+
+        def interrupt():
+            raise KeyboardInterrupt()
+
+        async def slow_request():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.01, interrupt)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        with pytest.raises(KeyboardInterrupt):
+            run_sync(slow_request())
+
+        assert state["cancelled"] is True
+        assert not asyncio.all_tasks(get_event_loop())
+
+        async def answer():
+            return 42
+
+        assert run_sync(answer()) == 42
+
+
+class TestCloseEventLoop:
+    """Tests pour close_event_loop (arrêt du process worker)."""
+
+    def test_cleanups_run_before_close(self):
+        """Les nettoyages s'exécutent sur la boucle, qui est ensuite fermée et remplacée."""
+        loop = get_event_loop()
+        seen = []
+
+        async def cleanup():
+            seen.append(asyncio.get_running_loop())
+
+        async def failing_cleanup():
+            raise RuntimeError("client déjà fermé")
+
+        close_event_loop(failing_cleanup, cleanup)
+
+        assert seen == [loop]
+        assert loop.is_closed()
+        assert get_event_loop() is not loop
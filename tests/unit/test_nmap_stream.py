@@ -0,0 +1,127 @@
+"""
+Tests unitaires pour l'analyse en flux de la sortie XML de nmap.
+"""
+
+import asyncio
+import stat
+
+from src.services.external_scanner.nmap_stream import AsyncNmapClient, NmapXMLStreamParser
+
+NMAP_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap" args="nmap -sV -oX - 192.0.2.0/30" start="1700000000">
+<host><status state="up"/><address addr="192.0.2.1" addrtype="ipv4"/>
+<hostnames><hostname name="www.example.org" type="PTR"/></hostnames>
+<ports>
+<port protocol="tcp" portid="22"><state state="open"/><service name="ssh" product="OpenSSH" version="8.2p1"><cpe>cpe:/a:openbsd:openssh:8.2p1</cpe></service></port>
+<port protocol="tcp" portid="443"><state state="open"/><service name="https" product="nginx" version="1.18.0"/></port>
+</ports>
+<os><osmatch name="Linux 5.4" accuracy="96"><osclass osfamily="Linux" vendor="Linux" type="general purpose"><cpe>cpe:/o:linux:linux_kernel:5.4</cpe></osclass></osmatch></os>
+</host>
+<host><status state="up"/><address addr="192.0.2.2" addrtype="ipv4"/>
+<ports>
+<port protocol="tcp" portid="80"><state state="open"/><service name="http" product="Apache httpd" version="2.4.41"/></port>
+</ports>
+</host>
+<runstats><finished time="1700000042" elapsed="42.50"/></runstats>
+</nmaprun>
+"""
+
+# Coupure à l'intérieur de la balise fermante du premier hôte
+SPLIT = NMAP_XML.index(b"</host>") + 3
+
+
+def services_of(parser, chunks):
+    """Services transmis fragment par fragment."""
+    return [[(s.host, s.port) for s in parser.feed(chunk)] for chunk in chunks]
+
+
+class TestNmapXMLStreamParser:
+    """Tests pour NmapXMLStreamParser."""
+
+    def test_host_split_across_chunks(self):
+        """Un hôte coupé entre deux fragments n'est transmis qu'une fois complet."""
+        parser = NmapXMLStreamParser(target="192.0.2.0/30")
+
+        emitted = services_of(parser, [NMAP_XML[:SPLIT], NMAP_XML[SPLIT:]])
+        result = parser.close()
+
+        assert emitted == [[], [("192.0.2.1", 22), ("192.0.2.1", 443), ("192.0.2.2", 80)]]
+        assert parser.started
+        assert result.error is None
+        assert result.command_line == "nmap -sV -oX - 192.0.2.0/30"
+        assert result.state == "up"
+        assert result.target_ip == "192.0.2.1"
+        assert result.hostname == "www.example.org"
+        assert result.os_match == "Linux 5.4"
+        assert result.scan_time == 42.5
+        assert [s.port for s in result.services] == [22, 443, 80]
+
+        ssh = result.services[0]
+        assert (ssh.service_name, ssh.service_product, ssh.service_version) == ("ssh", "OpenSSH", "8.2p1")
+        assert ssh.cpe == "cpe:/a:openbsd:openssh:8.2p1"
+
+    def test_small_chunks(self):
+        """Fragments de quelques octets: chaque hôte est transmis dès sa fin."""
+        parser = NmapXMLStreamParser(target="192.0.2.0/30")
+        first_host_end = NMAP_XML.index(b"</host>") + len(b"</host>")
+
+        ports_by_offset = []
+        for offset in range(0, len(NMAP_XML), 7):
+            for service in parser.feed(NMAP_XML[offset:offset + 7]):
+                ports_by_offset.append((offset + 7 >= first_host_end, service.port))
+        parser.close()
+
+        assert [port for _, port in ports_by_offset] == [22, 443, 80]
+        assert all(after_end for after_end, _ in ports_by_offset)
+
+    def test_truncated_output_keeps_finished_hosts(self):
+        """Sortie tronquée (timeout): les hôtes terminés sont conservés, sans exception."""
+        parser = NmapXMLStreamParser(target="192.0.2.0/30")
+        second_host = NMAP_XML.index(b"<host>", SPLIT)
+
+        emitted = services_of(parser, [NMAP_XML[:second_host + 60]])
+        result = parser.close()
+
+        assert emitted == [[("192.0.2.1", 22), ("192.0.2.1", 443)]]
+        assert [s.port for s in result.services] == [22, 443]
+        assert result.scan_time == 0
+
+    def test_empty_output(self):
+        """Aucune sortie (nmap absent ou arrêté): analyse non démarrée."""
+        parser = NmapXMLStreamParser(target="192.0.2.1")
+
+        result = parser.close()
+
+        assert not parser.started
+        assert result.services == []
+
+
+class TestAsyncNmapClient:
+    """Tests pour AsyncNmapClient.scan_target (sous-processus simulé)."""
+
+    def _fake_nmap(self, tmp_path, body):
+        script = tmp_path / "nmap"
+        script.write_text(f"#!/bin/sh\n{body}\n")
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        return str(script)
+
+    def test_services_streamed_to_callback(self, tmp_path):
+        """Chaque service est transmis au callback et retrouvé dans le résultat."""
+        (tmp_path / "out.xml").write_bytes(NMAP_XML)
+        client = AsyncNmapClient(timeout=10, binary=self._fake_nmap(tmp_path, f"cat {tmp_path / 'out.xml'}"))
+        seen = []
+
+        result = asyncio.run(client.scan_target("192.0.2.0/30", on_service=lambda s: seen.append(s.port)))
+
+        assert seen == [22, 443, 80]
+        assert result.error is None
+        assert [s.port for s in result.services] == [22, 443, 80]
+
+    def test_nmap_error_reported(self, tmp_path):
+        """Code retour non nul: l'erreur de nmap est remontée."""
+        client = AsyncNmapClient(timeout=10, binary=self._fake_nmap(tmp_path, "echo 'Failed to resolve' >&2; exit 1"))
+
+        result = asyncio.run(client.scan_target("invalid.example"))
+
+        assert result.error == "Failed to resolve"
+        assert result.services == []
@@ -0,0 +1,233 @@
+"""
+Tests unitaires pour la base CVE locale (flux NVD) et sa recherche.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from src.services.external_scanner import nvd_store as module
+from src.services.external_scanner.cve_enrichment import CVEEnrichment, extract_version
+from src.services.external_scanner.nvd_store import NVDStore, parse_cpe, version_matches
+
+
+def nvd_cve(cve_id="CVE-2021-23017", last_modified="2024-11-20T23:28:43.667"):
+    """CVE au format des flux NVD 2.0 (dates sans décalage)."""
+    return {
+        "id": cve_id,
+        "published": "2021-06-01T14:15:09.187",
+        "lastModified": last_modified,
+        "descriptions": [{"lang": "en", "value": "nginx resolver off-by-one"}],
+        "metrics": {"cvssMetricV31": [{"cvssData": {
+            "baseScore": 7.7, "vectorString": "CVSS:3.1/AV:N", "baseSeverity": "HIGH"
+        }}]},
+        "configurations": [{"nodes": [{"cpeMatch": [{
+            "vulnerable": True,
+            "criteria": "cpe:2.3:a:f5:nginx:*:*:*:*:*:*:*:*",
+            "versionStartIncluding": "0.6.18",
+            "versionEndExcluding": "1.20.1",
+        }]}]}],
+    }
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session simulée: nvd_cve en mémoire, last_modified relu en timestamptz."""
+
+    def __init__(self, rows=None):
+        self.last_modified = {}
+        self.rows = rows or []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "SELECT cve_id, last_modified FROM nvd_cve" in sql:
+            return FakeResult([(i, self.last_modified[i]) for i in params["ids"] if i in self.last_modified])
+        if "INSERT INTO nvd_cve" in sql:
+            for row in params:
+                self.last_modified[row["cve_id"]] = row["last_modified"]
+        if "FROM nvd_cpe_match m" in sql:
+            assert "description" not in sql
+            return FakeResult([r for r in self.rows if r["product"] == params["product"]])
+        if "FROM nvd_cve c" in sql:
+            self.detail_ids = list(params["cve_ids"])
+            return FakeResult([r for r in self.rows if r["cve_id"] in params["cve_ids"]][:params["limit"]])
+        return FakeResult([])
+
+    def close(self):
+        pass
+
+
+class TestParsing:
+    """Tests pour parse_cpe, version_matches et extract_version."""
+
+    def test_parse_cpe(self):
+        """Vendor, produit et version; version générique -> None."""
+        assert parse_cpe("cpe:2.3:a:F5:NGINX:1.18.0:*:*:*:*:*:*:*") == ("f5", "nginx", "1.18.0")
+        assert parse_cpe("cpe:2.3:a:f5:nginx:*:*:*:*:*:*:*:*") == ("f5", "nginx", None)
+        assert parse_cpe("cpe:/a:f5:nginx:1.18.0") is None
+
+    def test_version_matches_ranges(self):
+        """Version exacte, bornes incluses/exclues, comparaison numérique."""
+        match = {"version_start_including": "0.6.18", "version_end_excluding": "1.20.1"}
+
+        assert version_matches("1.18.0", match)
+        assert version_matches("0.6.18", match)
+        assert not version_matches("1.20.1", match)
+        assert version_matches("1.9.0", {"version_end_including": "1.10"})
+        assert version_matches("8.2", {"version": "8.2"})
+        assert not version_matches("8.2", {"version": "8.3"})
+        assert version_matches("1.0", {})
+
+    def test_extract_version(self):
+        """La version est extraite de la chaîne "produit version" du scan."""
+        assert extract_version("nginx 1.18.0", "nginx") == "1.18.0"
+        assert extract_version("OpenSSH 8.2p1 Ubuntu 4ubuntu0.5", "OpenSSH") == "8.2"
+        assert extract_version("nginx", "nginx") is None
+        assert extract_version(None) is None
+
+
+class TestImport:
+    """Tests pour NVDStore._upsert_batch."""
+
+    def test_reimporting_same_cve(self):
+        """Une CVE déjà en base est réimportée (flux delta) sans erreur de fuseau."""
+        store = NVDStore(session_factory=FakeSession)
+        db = FakeSession()
+
+        assert store._upsert_batch(db, [nvd_cve()]) == 1
+        stored = db.last_modified["CVE-2021-23017"]
+        assert stored.tzinfo is not None
+
+        # Relu comme timestamptz (aware), comparé à la date naïve du flux
+        db.last_modified["CVE-2021-23017"] = stored.astimezone(timezone.utc)
+        assert store._upsert_batch(db, [nvd_cve()]) == 1
+        assert store._upsert_batch(db, [nvd_cve(last_modified="2024-01-01T00:00:00.000")]) == 0
+        assert db.last_modified["CVE-2021-23017"] == datetime(2024, 11, 20, 23, 28, 43, 667000, tzinfo=timezone.utc)
+
+
+class FeedStateSession:
+    """Session simulée: flux importés (nvd_feed_state) et nombre de CVE."""
+
+    def __init__(self, feeds, cve_count=0):
+        self.feeds = feeds
+        self.cve_count = cve_count
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "to_regclass" in sql:
+            return FakeScalar(True)
+        if "FROM nvd_feed_state" in sql:
+            return FakeScalar(self.feeds)
+        if "COUNT(*) FROM nvd_cve" in sql:
+            return FakeScalar(self.cve_count)
+        raise AssertionError(sql)
+
+    def close(self):
+        pass
+
+
+class FakeScalar:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.value
+
+
+class TestIsLoaded:
+    """Tests pour NVDStore.is_loaded (historique NVD importé)."""
+
+    def test_yearly_feed_required(self):
+        """Flux delta seuls: base non chargée (repli sur l'API NVD)."""
+        deltas = NVDStore(session_factory=lambda: FeedStateSession(["nvdcve-2.0-modified", "nvdcve-2.0-recent"], 4000))
+        yearly = NVDStore(session_factory=lambda: FeedStateSession(["nvdcve-2.0-2021", "nvdcve-2.0-modified"]))
+        empty = NVDStore(session_factory=lambda: FeedStateSession([]))
+
+        assert not deltas.is_loaded()
+        assert yearly.is_loaded()
+        assert not empty.is_loaded()
+
+    def test_min_cve_count(self):
+        """Sans flux annuel, un nombre suffisant de CVE vaut base chargée."""
+        store = NVDStore(session_factory=lambda: FeedStateSession(["nvdcve-2.0-modified"], module.NVD_MIN_CVE_COUNT))
+
+        assert store.is_loaded()
+
+
+class TestLocalSearch:
+    """Tests pour CVEEnrichment._search_local sur la base locale."""
+
+    @pytest.fixture
+    def store(self, monkeypatch):
+        rows = [{
+            "cve_id": "CVE-2021-23017", "product": "nginx", "version": None,
+            "version_start_including": "0.6.18", "version_start_excluding": None,
+            "version_end_including": None, "version_end_excluding": "1.20.1",
+            "description": "nginx resolver off-by-one", "cvss_score": 7.7,
+            "cvss_vector": None, "cvss_version": "3.1", "severity": "HIGH",
+            "published_date": None, "last_modified": None, "references": [], "cwe_ids": [],
+        }]
+        store = NVDStore(session_factory=lambda: FakeSession(rows))
+        monkeypatch.setattr(store, "is_loaded", lambda: True)
+        monkeypatch.setattr(module, "nvd_store", store)
+        return store
+
+    def test_cpe_built_from_scan_service(self, store):
+        """Le service du scan ("nginx 1.18.0") produit un CPE versionné trouvé localement."""
+        enricher = CVEEnrichment()
+        cpe = enricher.build_cpe_from_service("http", "nginx 1.18.0", "nginx")
+
+        cves = asyncio.run(enricher._search_local(cpe=cpe))
+
+        assert cpe.startswith("cpe:2.3:a:nginx:nginx:1.18.0:")
+        assert [cve.cve_id for cve in cves] == ["CVE-2021-23017"]
+
+    def test_product_and_version_lookup(self, store):
+        """Hors mapping CPE: recherche par produit détecté et version."""
+        enricher = CVEEnrichment()
+
+        found = asyncio.run(enricher._search_local(product="nginx", version="1.18.0"))
+        fixed = asyncio.run(enricher._search_local(product="nginx", version="1.21.0"))
+        unknown = asyncio.run(enricher._search_local(product=None, version="1.18.0"))
+
+        assert [cve.cve_id for cve in found] == ["CVE-2021-23017"]
+        assert fixed == [] and unknown == []
+
+    def test_details_read_for_matched_cves_only(self, store):
+        """Les détails ne sont lus que pour les CVE dont le critère correspond."""
+        sessions = []
+        store_row = store.session_factory().rows[0]
+
+        def session_factory():
+            sessions.append(FakeSession([
+                {**store_row, "cve_id": "CVE-A", "version": "1.18.0"},
+                {**store_row, "cve_id": "CVE-B", "version": "1.20.0"},
+            ]))
+            return sessions[-1]
+
+        store.session_factory = session_factory
+        store.search("nginx", "nginx", "1.18.0")
+        store.search("nginx", "nginx", "2.0")
+
+        assert sessions[0].detail_ids == ["CVE-A"]
+        assert not hasattr(sessions[1], "detail_ids")
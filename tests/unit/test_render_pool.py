@@ -0,0 +1,93 @@
+"""
+Tests unitaires pour le service de rendu en pool de process.
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from src.services import render_pool as module
+from src.services.render_pool import RenderError, RenderTimeout, run_render_task
+
+
+class TestRenderPool:
+    """Tests pour run_render_task (rendu dans le process courant)."""
+
+    @pytest.fixture(autouse=True)
+    def inline(self, monkeypatch):
+        monkeypatch.setattr(module, "RENDER_POOL_WORKERS", 0)
+
+    def test_inline_render(self):
+        """Sans pool, la tâche s'exécute dans le process appelant."""
+        assert run_render_task(sum, [1, 2, 3]) == 6
+
+    def test_memory_error_reported(self):
+        """Une erreur mémoire devient une RenderError."""
+        def explode():
+            raise MemoryError()
+
+        with pytest.raises(RenderError):
+            run_render_task(explode)
+
+    def test_time_limit_interrupts_task(self):
+        """L'alarme interrompt une tâche trop longue."""
+        start = time.perf_counter()
+
+        with pytest.raises(RenderTimeout):
+            module._run_with_time_limit(1, time.sleep, 5)
+
+        assert time.perf_counter() - start < 2
+
+    def test_inline_render_time_limit(self, monkeypatch):
+        """Sans pool, la limite de temps s'applique aussi (worker Celery daemon)."""
+        start = time.perf_counter()
+
+        with pytest.raises(RenderTimeout):
+            run_render_task(time.sleep, 5, timeout=1)
+
+        assert time.perf_counter() - start < 2
+
+    @pytest.mark.skipif(module.resource is None, reason="resource indisponible")
+    def test_inline_memory_limit_restored(self):
+        """La limite mémoire du rendu est temporaire et bornée à l'usage courant + budget."""
+        before = module.resource.getrlimit(module.resource.RLIMIT_AS)
+        seen = {}
+
+        def capture():
+            seen["limit"] = module.resource.getrlimit(module.resource.RLIMIT_AS)[0]
+            seen["usage"] = module._address_space_bytes()
+
+        run_render_task(capture)
+
+        assert module.resource.getrlimit(module.resource.RLIMIT_AS) == before
+        if seen["usage"] is not None:
+            assert seen["limit"] != module.resource.RLIM_INFINITY
+            assert seen["limit"] <= seen["usage"] + module.RENDER_MAX_MEMORY_MB * 1024 * 1024
+
+
+def _render_in_daemon(queue):
+    """Rendu depuis un process daemon (comme un worker Celery prefork)."""
+    from src.services import render_pool
+
+    try:
+        queue.put(("ok", render_pool.run_render_task(len, "abc"), render_pool._pool_unavailable))
+    except BaseException as e:
+        queue.put(("error", repr(e), None))
+
+
+class TestDaemonCaller:
+    """Tests pour run_render_task appelé depuis un process daemon."""
+
+    def test_daemon_process_renders_inline(self, monkeypatch):
+        """Process daemon: pas de pool (ni Manager), rendu dans le process appelant."""
+        monkeypatch.setattr(module, "RENDER_POOL_WORKERS", 2)
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        process = context.Process(target=_render_in_daemon, args=(queue,), daemon=True)
+
+        process.start()
+        result = queue.get(timeout=30)
+        process.join(timeout=10)
+
+        assert result == ("ok", 3, True)
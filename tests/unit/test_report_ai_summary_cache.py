@@ -0,0 +1,120 @@
+"""
+Tests unitaires pour le cache des résumés IA des rapports.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.services import report_ai_summary_service as module
+from src.services.report_ai_summary_service import ReportAISummaryService
+from src.utils.event_loop import run_sync
+
+
+class FakeResponse:
+    """Réponse Ollama simulée."""
+
+    status_code = 200
+    text = ""
+
+    def __init__(self, summary):
+        self._summary = summary
+
+    def json(self):
+        return {"message": {"content": json.dumps({"summary": self._summary})}}
+
+
+class FakeClient:
+    """Client HTTP simulé (compte les appels au modèle)."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    async def post(self, url, json):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("Ollama injoignable")
+        return FakeResponse(f"Résumé {self.calls}")
+
+
+class TestSummaryCache:
+    """Tests pour ReportAISummaryService._summarize."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        """Redis simulé par un dictionnaire."""
+        store = {}
+        monkeypatch.setattr(type(module.redis_manager), "is_connected", property(lambda self: True))
+        monkeypatch.setattr(module.redis_manager, "get", lambda key: store.get(key))
+        monkeypatch.setattr(
+            module.redis_manager, "set",
+            lambda key, value, ttl=None: store.__setitem__(key, value) or True
+        )
+        return store
+
+    @pytest.fixture
+    def service(self):
+        return ReportAISummaryService(db=None)
+
+    def test_same_prompts_and_tone_reuse_summary(self, monkeypatch, service):
+        """Prompts et ton identiques: un seul appel au modèle."""
+        client = FakeClient()
+        monkeypatch.setattr(module, "get_http_client", lambda: client)
+
+        first = run_sync(service._summarize("système", "données", "executive"))
+        second = run_sync(service._summarize("système", "données", "executive"))
+        other_tone = run_sync(service._summarize("système", "données", "technical"))
+
+        assert first == second == "Résumé 1"
+        assert other_tone == "Résumé 2"
+        assert client.calls == 2
+
+    def test_fallback_summary_not_cached(self, monkeypatch, service, cache):
+        """Le résumé de repli (modèle injoignable) n'est pas mis en cache."""
+        monkeypatch.setattr(module, "get_http_client", lambda: FakeClient(fail=True))
+
+        run_sync(service._summarize("système", "données", "executive"))
+
+        assert cache == {}
+
+    def test_consolidated_prompt_is_date_independent(self, service):
+        """Le prompt consolidé ne contient pas la date du jour (clé de cache stable)."""
+        from datetime import date
+
+        data = {
+            "campaign": {"title": "Campagne 2026", "framework_name": "ISO 27001"},
+            "stats": {"entities_count": 2, "conformity_rate": 71.5, "nc_critical": 1, "nc_major": 0},
+        }
+        prompt = service._build_consolidated_prompt(data)
+
+        assert date.today().strftime("%d/%m/%Y") not in prompt
+        assert service._build_consolidated_prompt(data) == prompt
+
+
+class TestHttpClient:
+    """Tests pour get_http_client (un client par boucle d'événements)."""
+
+    def test_one_client_per_loop(self):
+        """Même boucle: client réutilisé; autre boucle: client distinct, l'ancien reste ouvert."""
+        async def current_client():
+            return module.get_http_client()
+
+        first_loop, second_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            first = first_loop.run_until_complete(current_client())
+            again = first_loop.run_until_complete(current_client())
+            other = second_loop.run_until_complete(current_client())
+
+            assert first is again
+            assert other is not first
+            assert not first.is_closed
+
+            first_loop.run_until_complete(module.close_http_client())
+            second_loop.run_until_complete(module.close_http_client())
+            assert first.is_closed and other.is_closed
+        finally:
+            first_loop.close()
+            second_loop.close()
+
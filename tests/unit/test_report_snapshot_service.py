@@ -0,0 +1,135 @@
+"""
+Tests unitaires pour les snapshots versionnés des données de rapport.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import report_snapshot_service as module
+from src.services.report_snapshot_service import (
+    campaign_data_version,
+    get_snapshot,
+    record_collection_error,
+)
+
+
+class TestGetSnapshot:
+    """Tests pour get_snapshot."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        """Redis simulé par un dictionnaire, version de données pilotable."""
+        store = {}
+        self.version = ("live:2026-01-01:10:None", False)
+        monkeypatch.setattr(type(module.redis_manager), "is_connected", property(lambda self: True))
+        monkeypatch.setattr(module.redis_manager, "get", lambda key: store.get(key))
+        monkeypatch.setattr(
+            module.redis_manager, "set",
+            lambda key, value, ttl=None: store.__setitem__(key, value) or True
+        )
+        monkeypatch.setattr(
+            module, "campaign_data_version",
+            lambda db, campaign_id, entity_id=None: self.version
+        )
+        return store
+
+    def collect(self):
+        self.builds += 1
+        return {"stats": {"compliance_rate": 72.5}, "domains": [{"name": "GOV", "score": 80}]}
+
+    def test_collected_once_per_version(self):
+        """Même version: une seule collecte; nouvelle version: nouvelle collecte."""
+        self.builds = 0
+
+        first = get_snapshot(None, "entity", "c1", "e1", self.collect)
+        second = get_snapshot(None, "entity", "c1", "e1", self.collect)
+        assert self.builds == 1
+        assert second == first
+
+        self.version = ("live:2026-01-02:11:None", False)
+        get_snapshot(None, "entity", "c1", "e1", self.collect)
+        assert self.builds == 2
+
+    def test_callers_get_independent_copies(self):
+        """Modifier les données lues ne modifie pas le snapshot."""
+        self.builds = 0
+
+        data = get_snapshot(None, "consolidated", "c1", None, self.collect)
+        data["stats"]["nc_count"] = 3
+        data["domains"].clear()
+
+        again = get_snapshot(None, "consolidated", "c1", None, self.collect)
+        assert again == {"stats": {"compliance_rate": 72.5}, "domains": [{"name": "GOV", "score": 80}]}
+
+    def test_build_errors_not_cached(self, cache):
+        """Une collecte en échec n'est pas mise en cache."""
+        def failing():
+            raise ValueError("Campagne non trouvée")
+
+        with pytest.raises(ValueError):
+            get_snapshot(None, "entity", "c1", "e1", failing)
+        assert cache == {}
+
+    def test_partial_collection_not_cached(self, cache):
+        """Une erreur avalée par un helper: données renvoyées, pas de snapshot."""
+        self.builds = 0
+
+        def partial():
+            self.builds += 1
+            record_collection_error("_calculate_domain_scores")
+            return {"stats": {"compliance_rate": 72.5}, "domains": []}
+
+        data = get_snapshot(None, "entity", "c1", "e1", partial)
+        assert data["domains"] == []
+        assert cache == {}
+
+        # La collecte suivante (complète) est mise en cache
+        get_snapshot(None, "entity", "c1", "e1", self.collect)
+        assert self.builds == 2
+        assert len(cache) == 1
+
+    def test_record_outside_collection_is_noop(self):
+        """Hors get_snapshot, le signalement est sans effet."""
+        record_collection_error("_get_logos_data")
+
+
+class TestCampaignDataVersion:
+    """Tests pour campaign_data_version."""
+
+    class FakeDb:
+        def __init__(self, row):
+            self.row = row
+            self.params = None
+
+        def execute(self, query, params):
+            self.params = params
+            return SimpleNamespace(fetchone=lambda: self.row)
+
+    @staticmethod
+    def row(**overrides):
+        values = dict(
+            status="frozen", frozen_date="2026-01-01", answers_updated_at=None, answers_count=None,
+            actions_updated_at=None, tenant_context="t1", organization_context="o1",
+            entity_context="e1", framework_context="f1",
+        )
+        values.update(overrides)
+        return SimpleNamespace(**values)
+
+    def test_logo_change_changes_version(self):
+        """Un changement de logo ou de référentiel produit une nouvelle version."""
+        base, frozen = campaign_data_version(self.FakeDb(self.row()), "c1", "e1")
+        assert frozen is True
+
+        for field in ("tenant_context", "organization_context", "entity_context", "framework_context"):
+            version, _ = campaign_data_version(self.FakeDb(self.row(**{field: "changed"})), "c1", "e1")
+            assert version != base, field
+
+    def test_entity_id_passed_to_query(self):
+        """L'entité est transmise à la requête de version."""
+        db = self.FakeDb(self.row())
+        campaign_data_version(db, "c1", "e1")
+        assert db.params == {"campaign_id": "c1", "entity_id": "e1"}
+
+        campaign_data_version(db, "c1")
+        assert db.params["entity_id"] is None
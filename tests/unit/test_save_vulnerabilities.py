@@ -0,0 +1,107 @@
+"""
+Tests d'intégration pour l'insertion en masse des vulnérabilités de scan.
+
+Exécutés sur PostgreSQL (TEST_DATABASE_URL), dans un schéma temporaire, pour
+les deux définitions de la table : énumérations vulnerabilitytype /
+severitylevel (migrations/create_external_scan_tables.sql) et VARCHAR
+(migration Alembic). Ignorés sans base de test.
+"""
+
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL non défini")
+
+ENUM_TYPES = """
+    CREATE TYPE severitylevel AS ENUM ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO');
+    CREATE TYPE vulnerabilitytype AS ENUM (
+        'PORT_EXPOSED', 'SERVICE_VULN', 'TLS_WEAK', 'CERT_ISSUE', 'HEADER_MISSING', 'MISCONFIGURATION'
+    );
+"""
+
+TABLE = """
+    CREATE TABLE external_service_vulnerability (
+        id UUID PRIMARY KEY,
+        external_scan_id UUID NOT NULL,
+        tenant_id UUID NOT NULL,
+        port INTEGER,
+        protocol VARCHAR(20),
+        service_name VARCHAR(100),
+        service_version VARCHAR(100),
+        service_banner TEXT,
+        vulnerability_type {vulnerability_type} NOT NULL,
+        severity {severity} NOT NULL,
+        cve_ids JSONB,
+        cvss_score FLOAT,
+        cvss_vector VARCHAR(100),
+        title VARCHAR(255) NOT NULL,
+        description TEXT,
+        recommendation TEXT,
+        "references" JSONB,
+        is_remediated BOOLEAN DEFAULT false,
+        remediated_at TIMESTAMP,
+        remediated_by UUID,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+"""
+
+
+@pytest.fixture(params=["enum", "varchar"])
+def db(request):
+    """Session dans un schéma temporaire (annulé en fin de test)."""
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        schema = f"test_vuln_{uuid.uuid4().hex[:8]}"
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        conn.execute(text(f"SET LOCAL search_path TO {schema}, public"))
+        if request.param == "enum":
+            conn.execute(text(ENUM_TYPES))
+            conn.execute(text(TABLE.format(vulnerability_type="vulnerabilitytype", severity="severitylevel")))
+        else:
+            conn.execute(text(TABLE.format(vulnerability_type="VARCHAR(50)", severity="VARCHAR(20)")))
+        try:
+            yield Session(bind=conn)
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+class TestSaveVulnerabilities:
+    """Tests pour _save_vulnerabilities."""
+
+    def test_bulk_insert(self, db):
+        """Types et sévérités (normalisés) insérés avec le type réel des colonnes."""
+        from src.tasks.external_scan_tasks import _save_vulnerabilities
+
+        scan_id, tenant_id = str(uuid.uuid4()), str(uuid.uuid4())
+        vulnerabilities = [
+            {"port": 443, "vulnerability_type": "SERVICE_VULN", "severity": "high",
+             "title": "CVE-2021-23017", "cve_ids": ["CVE-2021-23017"], "cvss_score": 7.7,
+             "service_version": "nginx 1.18.0 " + "x" * 200},
+            {"port": "n/a", "vulnerability_type": "UNKNOWN", "severity": "bogus", "title": None},
+        ]
+
+        inserted = _save_vulnerabilities(db, scan_id, tenant_id, vulnerabilities)
+
+        rows = db.execute(text("""
+            SELECT port, vulnerability_type::text AS vulnerability_type, severity::text AS severity,
+                   title, cve_ids, length(service_version) AS version_length
+            FROM external_service_vulnerability
+            WHERE external_scan_id = CAST(:scan_id AS uuid)
+            ORDER BY title
+        """), {"scan_id": scan_id}).mappings().all()
+
+        assert inserted == 2
+        assert [(r["port"], r["vulnerability_type"], r["severity"]) for r in rows] == [
+            (443, "SERVICE_VULN", "HIGH"),
+            (None, "MISCONFIGURATION", "INFO"),
+        ]
+        assert rows[0]["cve_ids"] == ["CVE-2021-23017"]
+        assert rows[0]["version_length"] == 100
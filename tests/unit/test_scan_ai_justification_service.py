@@ -0,0 +1,189 @@
+"""
+Tests unitaires pour la génération par lots des justifications IA du scanner
+(déduplication, cache et parallélisme des appels).
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.services import scan_ai_justification_service as module
+from src.services.scan_ai_justification_service import ScanAIJustificationService
+
+
+def _vuln(title, host="www.example.org", port=443):
+    return {
+        "title": f"{title} sur {host}",
+        "description": f"Service exposé sur {host}",
+        "recommendation": "Mettre à jour le service.",
+        "severity": "HIGH",
+        "cvss_score": 7.5,
+        "cve_ids": ["CVE-2024-0001"],
+        "port": port,
+        "service_name": "https",
+        "priority": "P1",
+        "recommended_due_days": 14,
+    }
+
+
+class FakeAI(ScanAIJustificationService):
+    """Service dont l'appel IA est simulé (compte les appels et le parallélisme)."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _call_ai(self, user_prompt: str) -> str:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        count = user_prompt.count("VULN_")
+        return json.dumps([
+            {"vuln_index": i + 1, "why_action": f"IA {i + 1}", "why_severity": "s",
+             "why_priority": "p", "why_role": "r", "why_due_days": "d"}
+            for i in range(count)
+        ])
+
+
+class TestBatchJustifications:
+    """Tests pour generate_batch_justifications."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        """Cache Redis simulé par un dictionnaire."""
+        store = {}
+        monkeypatch.setattr(
+            module.redis_manager, "get_cached_ai_result",
+            lambda model, prompt_hash: store.get((model, prompt_hash))
+        )
+        monkeypatch.setattr(
+            module.redis_manager, "cache_ai_result",
+            lambda model, prompt_hash, result, ttl=3600: store.__setitem__((model, prompt_hash), result)
+        )
+        return store
+
+    def test_identical_findings_justified_once(self, cache):
+        """Une même vulnérabilité sur plusieurs hôtes ne donne qu'un appel IA."""
+        service = FakeAI(concurrency=2)
+        vulns = [_vuln("CVE-2024-0001", host=f"host{i}.example.org") for i in range(40)]
+
+        results = asyncio.run(service.generate_batch_justifications(vulns))
+
+        assert service.calls == 1
+        assert len(results) == 40
+        assert all(r["why_action"] == "IA 1" for r in results)
+
+    def test_cached_justifications_reused(self, cache):
+        """Les justifications en cache ne sont pas regénérées."""
+        vulns = [_vuln(f"Finding {i}") for i in range(7)]
+        asyncio.run(FakeAI().generate_batch_justifications(vulns))
+
+        service = FakeAI()
+        results = asyncio.run(service.generate_batch_justifications(vulns))
+
+        assert service.calls == 0
+        assert len(results) == 7
+
+    def test_batches_dispatched_concurrently(self, cache):
+        """Les lots sont envoyés en parallèle, dans la limite configurée."""
+        service = FakeAI(concurrency=3)
+        vulns = [_vuln(f"Finding {i}") for i in range(30)]
+
+        results = asyncio.run(service.generate_batch_justifications(vulns, batch_size=5))
+
+        assert service.calls == 6
+        assert service.max_in_flight == 3
+        assert [r["why_action"] for r in results[:6]] == ["IA 1", "IA 2", "IA 3", "IA 4", "IA 5", "IA 1"]
+
+
+class ScriptedAI(ScanAIJustificationService):
+    """Service dont l'IA renvoie une réponse fixée."""
+
+    def __init__(self, items, **kwargs):
+        super().__init__(**kwargs)
+        self.items = items
+
+    async def _call_ai(self, user_prompt: str) -> str:
+        return json.dumps(self.items)
+
+
+def _item(text, index=None, **overrides):
+    item = {"why_action": text, "why_severity": "s", "why_priority": "p", "why_role": "r", "why_due_days": "d"}
+    if index is not None:
+        item["vuln_index"] = index
+    item.update(overrides)
+    return item
+
+
+class TestBatchResponseValidation:
+    """Tests pour la validation de la réponse batch avant mise en cache."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        store = {}
+        monkeypatch.setattr(module.redis_manager, "get_cached_ai_result", lambda model, prompt_hash: None)
+        monkeypatch.setattr(
+            module.redis_manager, "cache_ai_result",
+            lambda model, prompt_hash, result, ttl=3600: store.__setitem__(prompt_hash, result)
+        )
+        return store
+
+    def test_out_of_order_items_mapped_by_index(self, cache):
+        """Les éléments renvoyés dans le désordre sont associés par vuln_index."""
+        vulns = [_vuln("A"), _vuln("B"), _vuln("C")]
+        service = ScriptedAI([_item("C", 3), _item("A", 1), _item("B", 2)])
+
+        results = asyncio.run(service.generate_batch_justifications(vulns))
+
+        assert [r["why_action"] for r in results] == ["A", "B", "C"]
+        assert len(cache) == 3
+        assert all("vuln_index" not in r for r in cache.values())
+
+    def test_incomplete_items_not_cached(self, cache):
+        """Un élément sans tous les champs why_* reçoit le défaut et n'est pas mis en cache."""
+        vulns = [_vuln("A"), _vuln("B")]
+        service = ScriptedAI([_item("A", 1), _item("B", 2, why_role="")])
+
+        results = asyncio.run(service.generate_batch_justifications(vulns))
+
+        assert results[0]["why_action"] == "A"
+        assert results[1]["why_action"] != "B"
+        assert len(cache) == 1
+
+    def test_unindexed_count_mismatch_not_cached(self, cache):
+        """Sans vuln_index et avec un nombre d'éléments différent, rien n'est associé."""
+        vulns = [_vuln("A"), _vuln("B"), _vuln("C")]
+        service = ScriptedAI([_item("B"), _item("C")])
+
+        results = asyncio.run(service.generate_batch_justifications(vulns))
+
+        assert cache == {}
+        assert len(results) == 3
+
+
+class TestCacheKey:
+    """Tests pour la clé de cache des justifications."""
+
+    def test_key_changes_with_prompt_and_model(self, monkeypatch):
+        """Modifier le prompt système, le gabarit de lot ou le modèle change la clé."""
+        signature = "abc"
+        base = ScanAIJustificationService(model="model-a")._cache_hash(signature)
+
+        assert ScanAIJustificationService(model="model-a")._cache_hash(signature) == base
+        assert ScanAIJustificationService(model="model-b")._cache_hash(signature) != base
+
+        monkeypatch.setattr(ScanAIJustificationService, "SYSTEM_PROMPT", "Nouveau prompt")
+        assert ScanAIJustificationService(model="model-a")._cache_hash(signature) != base
+        monkeypatch.undo()
+
+        original = ScanAIJustificationService._build_batch_prompt
+        monkeypatch.setattr(
+            ScanAIJustificationService, "_build_batch_prompt",
+            lambda self, vulns: original(self, vulns) + "\nRéponds en anglais."
+        )
+        assert ScanAIJustificationService(model="model-a")._cache_hash(signature) != base
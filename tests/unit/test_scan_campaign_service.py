@@ -0,0 +1,95 @@
+"""
+Tests unitaires pour la planification des campagnes de scan
+(déduplication des cibles et créneaux de politesse).
+"""
+
+from src.services.scan_campaign_service import (
+    network_key,
+    plan_targets,
+    resolve_addresses,
+    acquire_scan_slots,
+    scan_slot_limits,
+    target_slot_limits,
+)
+
+
+def _target(target_id, target_type, value, addresses):
+    return {"id": target_id, "type": target_type, "value": value, "entity_id": None, "addresses": addresses}
+
+
+class TestPlanTargets:
+    """Tests pour plan_targets."""
+
+    def test_same_ip_scanned_once(self):
+        """Les cibles d'une même IP ne donnent qu'un scan, de préférence sur le nom d'hôte."""
+        targets = [
+            _target("t1", "IP", "203.0.113.10", ["203.0.113.10"]),
+            _target("t2", "DOMAIN", "example.org", ["203.0.113.10", "2001:db8::1"]),
+            _target("t3", "SUBDOMAIN", "www.example.org", ["203.0.113.10"]),
+            _target("t4", "DOMAIN", "other.org", ["198.51.100.7"]),
+        ]
+
+        to_scan, duplicates = plan_targets(targets)
+
+        assert sorted(t["id"] for t in to_scan) == ["t2", "t4"]
+        assert sorted((d["target_id"], d["duplicate_of"]) for d in duplicates) == [("t1", "t2"), ("t3", "t2")]
+
+    def test_unresolved_targets_kept(self):
+        """Une cible non résolue est scannée individuellement."""
+        targets = [
+            _target("t1", "DOMAIN", "a.invalid", []),
+            _target("t2", "DOMAIN", "b.invalid", []),
+        ]
+
+        to_scan, duplicates = plan_targets(targets)
+
+        assert len(to_scan) == 2
+        assert duplicates == []
+
+
+class TestAddresses:
+    """Tests de résolution et de regroupement réseau."""
+
+    def test_ip_and_range(self):
+        """IP et plage CIDR sont normalisées sans résolution DNS."""
+        assert resolve_addresses("IP", " 2001:DB8::1 ") == ["2001:db8::1"]
+        assert resolve_addresses("IP_RANGE", "192.0.2.17/28") == ["192.0.2.16/28"]
+        assert resolve_addresses("IP", "not-an-ip") == []
+
+    def test_network_key(self):
+        """/24 en IPv4, /48 en IPv6 ; une plage plus large est conservée."""
+        assert network_key("203.0.113.10") == "203.0.113.0/24"
+        assert network_key("2001:db8:1:2::1") == "2001:db8:1::/48"
+        assert network_key("10.0.0.0/16") == "10.0.0.0/16"
+
+    def test_slot_limits(self):
+        """Créneaux global et tenant, plus IP et groupe si l'adresse est connue."""
+        limits = scan_slot_limits("tenant-1", "203.0.113.10", group="asn:64500")
+
+        assert set(limits) == {
+            "scan:slots:global",
+            "scan:slots:tenant:tenant-1",
+            "scan:slots:ip:203.0.113.10",
+            "scan:slots:asn:64500",
+        }
+        assert set(scan_slot_limits("tenant-1", None)) == {"scan:slots:global", "scan:slots:tenant:tenant-1"}
+
+    def test_target_slot_limits(self, monkeypatch):
+        """Un scan ponctuel prend les mêmes créneaux qu'un scan de campagne."""
+        monkeypatch.setattr("src.services.scan_campaign_service.SCAN_ASN_LOOKUP", False)
+
+        assert set(target_slot_limits("tenant-1", "IP", "203.0.113.10")) == {
+            "scan:slots:global",
+            "scan:slots:tenant:tenant-1",
+            "scan:slots:ip:203.0.113.10",
+            "scan:slots:net:203.0.113.0/24",
+        }
+
+    def test_acquire_without_redis_warns(self, monkeypatch, caplog):
+        """Sans Redis, le créneau est accordé mais le mode dégradé est signalé."""
+        monkeypatch.setattr("src.utils.redis_manager.redis_manager._connected", False)
+
+        with caplog.at_level("WARNING"):
+            assert acquire_scan_slots("scan-1", scan_slot_limits("tenant-1", None)) is True
+
+        assert "scan-1" in caplog.text
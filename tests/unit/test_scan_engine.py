@@ -0,0 +1,151 @@
+"""
+Tests unitaires pour l'orchestration des étapes du moteur de scan
+(audit TLS et enrichissement CVE en parallèle, durées par étape).
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.external_scanner import engine as engine_module
+from src.services.external_scanner.engine import ScanComponents, ScanConfig, ScanEngine
+from src.services.external_scanner.nmap_client import NmapScanResult, ServiceInfo
+from src.services.external_scanner.scoring import ExposureScoring
+
+STAGE_DELAY = 0.2
+
+
+class FakeNmap:
+    """Client nmap en flux simulé (services transmis au callback)."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    async def quick_scan(self, target, detect_os=True, on_service=None):
+        if self.error:
+            raise self.error
+        result = NmapScanResult(target=target, target_ip="192.0.2.1", state="up")
+        for port, name in ((443, "https"), (8443, "https"), (22, "ssh")):
+            service = ServiceInfo(
+                port=port, protocol="tcp", state="open", service_name=name,
+                service_product="nginx" if name == "https" else "OpenSSH",
+                service_version="1.18.0" if name == "https" else "8.2p1",
+            )
+            result.services.append(service)
+            if on_service is not None:
+                on_service(service)
+        return result
+
+
+class FakeTLSAuditor:
+    """Audit TLS simulé (bloquant, mesure le parallélisme entre threads)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def audit(self, target, port):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(STAGE_DELAY)
+        with self.lock:
+            self.in_flight -= 1
+        return SimpleNamespace(
+            error=None, grade="A" if port == 443 else "B", certificate=None, vulnerabilities=[],
+            supports_ssl2=False, supports_ssl3=False, supports_tls10=False,
+            supports_tls11=False, supports_tls12=True, supports_tls13=True,
+            strong_ciphers=[], weak_ciphers=[],
+        )
+
+
+@pytest.fixture
+def cve_lookups(monkeypatch):
+    """Recherche CVE simulée (une par service, STAGE_DELAY chacune)."""
+    calls = []
+
+    async def fake_enrich(svc, raise_errors=False):
+        calls.append(svc["port"])
+        await asyncio.sleep(STAGE_DELAY)
+        return []
+
+    monkeypatch.setattr(engine_module, "enrich_with_vulns", fake_enrich)
+    return calls
+
+
+def _engine(nmap=None, tls_auditor=None, **config):
+    components = ScanComponents(
+        nmap_client=None,
+        nmap_stream_client=nmap or FakeNmap(),
+        tls_auditor=tls_auditor or FakeTLSAuditor(),
+        cve_enricher=None,
+        scorer=ExposureScoring(),
+    )
+    return ScanEngine(ScanConfig(**config), components)
+
+
+class TestStageOrchestration:
+    """Tests pour ScanEngine.run_scan (étapes TLS / CVE concurrentes)."""
+
+    def test_tls_and_cve_stages_run_concurrently(self, cve_lookups):
+        """Audits TLS par port et recherches CVE par service se chevauchent."""
+        auditor = FakeTLSAuditor()
+        engine = _engine(tls_auditor=auditor, tls_concurrency=2, cve_concurrency=3)
+
+        start = time.perf_counter()
+        result = asyncio.run(engine.run_scan("DOMAIN", "example.org"))
+        elapsed = time.perf_counter() - start
+
+        assert result.status == "SUCCESS"
+        assert sorted(cve_lookups) == [22, 443, 8443]
+        assert auditor.max_in_flight == 2
+        # Séquentiel: 2 audits TLS + 3 recherches CVE = 5 x STAGE_DELAY
+        assert elapsed < 3 * STAGE_DELAY
+        # Fusion dans l'ordre des ports: grade du dernier port audité
+        assert result.tls_grade == "B"
+
+    def test_concurrency_limits_respected(self, cve_lookups):
+        """tls_concurrency=1: les audits TLS restent séquentiels."""
+        auditor = FakeTLSAuditor()
+        engine = _engine(tls_auditor=auditor, tls_concurrency=1)
+
+        result = asyncio.run(engine.run_scan("DOMAIN", "example.org"))
+
+        assert auditor.max_in_flight == 1
+        assert result.summary["stage_timings"]["tls"] >= 2 * STAGE_DELAY
+
+    def test_stage_timings_reported(self, cve_lookups):
+        """Durée de chaque étape dans summary["stage_timings"]."""
+        result = asyncio.run(_engine().run_scan("DOMAIN", "example.org"))
+
+        timings = result.summary["stage_timings"]
+        assert set(timings) == {"nmap", "tls", "cve", "scoring"}
+        assert timings["tls"] >= STAGE_DELAY
+        assert all(isinstance(value, float) for value in timings.values())
+        # Dates de collecte réelle (rescans différentiels suivants)
+        assert result.scan_data["tls_audited_at"]
+        assert set(result.scan_data["cve_checked_at"]) == {"https|nginx 1.18.0", "ssh|OpenSSH 8.2p1"}
+
+    def test_disabled_stages_not_timed(self, cve_lookups):
+        """Étapes désactivées: ni exécutées ni chronométrées."""
+        result = asyncio.run(
+            _engine(enable_tls_audit=False, enable_cve_enrichment=False).run_scan("DOMAIN", "example.org")
+        )
+
+        assert result.status == "SUCCESS"
+        assert cve_lookups == []
+        assert set(result.summary["stage_timings"]) == {"nmap", "scoring"}
+
+    def test_stage_timings_on_failed_scan(self, cve_lookups):
+        """Scan en erreur: les durées des étapes exécutées sont conservées."""
+        engine = _engine(nmap=FakeNmap(error=RuntimeError("nmap introuvable")))
+
+        result = asyncio.run(engine.run_scan("DOMAIN", "example.org"))
+
+        assert result.status == "ERROR"
+        assert result.error_message == "nmap introuvable"
+        assert set(result.summary["stage_timings"]) == {"nmap"}
@@ -0,0 +1,227 @@
+"""
+Tests unitaires pour le rescan différentiel (réutilisation TLS / CVE et
+comparaison des constats).
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services.external_scanner import engine as engine_module
+from src.services.external_scanner.engine import ScanComponents, ScanConfig, ScanEngine
+from src.services.external_scanner.incremental import (
+    PreviousScan,
+    diff_findings,
+    previous_cve_findings,
+    reusable_tls_details,
+    service_fingerprint,
+    tls_ports,
+)
+
+NOT_AFTER = (datetime.now(timezone.utc) + timedelta(days=90)).isoformat()
+RECENT = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+OLD = (datetime.now(timezone.utc) - timedelta(days=45)).isoformat()
+
+SERVICES = [
+    {"port": 22, "protocol": "tcp", "service_name": "ssh", "service_version": "OpenSSH 8.2p1", "cpe": None},
+    {"port": 443, "protocol": "tcp", "service_name": "https", "service_version": "nginx 1.18.0", "cpe": None},
+]
+
+
+def _cve(title, port=443, service_name="https", service_version="nginx 1.18.0"):
+    return {
+        "vulnerability_type": "SERVICE_VULN", "port": port, "title": title, "severity": "HIGH",
+        "service_name": service_name, "service_version": service_version, "cve_ids": [title],
+    }
+
+
+def _previous(tls_audited_at=RECENT, cve_checked_at=RECENT, **tls_overrides):
+    tls_details = {
+        "grade": "A",
+        "error": None,
+        "protocols": {"ssl2": False, "ssl3": False, "tls10": False, "tls11": False, "tls12": True, "tls13": True},
+        "certificate": {"serial_number": "0A1B", "not_after": NOT_AFTER, "is_expired": False, "days_until_expiry": 1},
+        "ciphers": {"strong": [], "weak": []},
+    }
+    tls_details.update(tls_overrides)
+    return PreviousScan(
+        scan_id="prev",
+        finished_at=datetime.now(timezone.utc),
+        scan_data={
+            "services": SERVICES,
+            "tls_details": tls_details,
+            "tls_audited_at": tls_audited_at,
+            "cve_checked_at": {
+                "ssh|OpenSSH 8.2p1": cve_checked_at,
+                "https|nginx 1.18.0": cve_checked_at,
+            },
+        },
+        vulnerabilities=[
+            _cve("CVE-2021-23017"),
+            _cve("CVE-2021-23017", port=8443),
+            {"vulnerability_type": "TLS_WEAK", "port": 443, "title": "TLS 1.0", "severity": "MEDIUM"},
+        ],
+    )
+
+
+FINGERPRINT = {
+    "serial_number": "0A1B",
+    "protocols": {"tls10": False, "tls11": False, "tls12": True, "tls13": True},
+}
+
+
+class TestFingerprints:
+    """Tests pour tls_ports et service_fingerprint."""
+
+    def test_tls_ports(self):
+        """Ports TLS connus ou services https/ssl; 443 par défaut."""
+        assert tls_ports(SERVICES) == [443]
+        assert tls_ports([{"port": 8000, "service_name": "ssl/http"}]) == [8000]
+        assert tls_ports([{"port": 22, "service_name": "ssh"}]) == [443]
+
+    def test_service_fingerprint_ignores_order(self):
+        """L'empreinte ne dépend pas de l'ordre des services, mais de leur version."""
+        upgraded = [dict(SERVICES[1], service_version="nginx 1.25.0"), SERVICES[0]]
+
+        assert service_fingerprint(list(reversed(SERVICES))) == service_fingerprint(SERVICES)
+        assert service_fingerprint(upgraded) != service_fingerprint(SERVICES)
+
+
+class TestReusableTLS:
+    """Tests pour reusable_tls_details (décision de réutilisation de l'audit TLS)."""
+
+    def test_unchanged_fingerprint_reused(self):
+        """Empreinte identique: détails repris, expiration recalculée."""
+        details = reusable_tls_details(_previous(), [443], [FINGERPRINT])
+
+        assert details["grade"] == "A"
+        assert details["certificate"]["days_until_expiry"] in (88, 89)
+
+    @pytest.mark.parametrize("fingerprint", [
+        None,
+        dict(FINGERPRINT, serial_number="FFFF"),
+        dict(FINGERPRINT, protocols=dict(FINGERPRINT["protocols"], tls10=True)),
+    ])
+    def test_changed_fingerprint_reaudited(self, fingerprint):
+        """Port injoignable, nouveau certificat ou nouvelle version TLS: audit complet."""
+        assert reusable_tls_details(_previous(), [443], [fingerprint]) is None
+
+    def test_other_ports_or_failed_audit_reaudited(self):
+        """Ports TLS différents ou audit précédent en erreur: audit complet."""
+        assert reusable_tls_details(_previous(), [443, 8443], [FINGERPRINT, FINGERPRINT]) is None
+        assert reusable_tls_details(_previous(error="timeout"), [443], [FINGERPRINT]) is None
+
+    def test_old_audit_reaudited(self):
+        """Audit complet plus ancien que l'âge maximal (même repris depuis): audit complet."""
+        assert reusable_tls_details(_previous(tls_audited_at=OLD), [443], [FINGERPRINT], max_age_days=30) is None
+        assert reusable_tls_details(_previous(tls_audited_at=None), [443], [FINGERPRINT]) is None
+
+    def test_certificate_expired_since_last_audit(self):
+        """Certificat expiré depuis le dernier audit: constats à recalculer."""
+        expired = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        previous = _previous(certificate={"serial_number": "0A1B", "not_after": expired, "is_expired": False})
+
+        assert reusable_tls_details(previous, [443], [FINGERPRINT]) is None
+
+
+class TestFindings:
+    """Tests pour previous_cve_findings et diff_findings."""
+
+    def test_previous_cve_findings(self):
+        """CVE uniques par (service, version); couple enrichi sans CVE -> liste vide."""
+        findings = previous_cve_findings(_previous())
+
+        assert [v["title"] for v in findings[("https", "nginx 1.18.0")]] == ["CVE-2021-23017"]
+        assert findings[("ssh", "OpenSSH 8.2p1")] == []
+
+    def test_old_or_unknown_checks_not_reused(self):
+        """Recherche NVD trop ancienne ou non datée: le couple est de nouveau recherché."""
+        assert previous_cve_findings(_previous(cve_checked_at=OLD), max_age_days=30) == {}
+        assert previous_cve_findings(_previous(cve_checked_at=None)) == {}
+
+    def test_truncated_version_matches_persisted_findings(self):
+        """Version de plus de 100 caractères: même clé que les constats relus (tronqués)."""
+        long_version = "nginx 1.18.0 " + "x" * 120
+        previous = _previous()
+        previous.scan_data["services"] = [dict(SERVICES[1], service_version=long_version)]
+        previous.scan_data["cve_checked_at"] = {f"https|{long_version[:100]}": RECENT}
+        previous.vulnerabilities = [_cve("CVE-2021-23017", service_version=long_version[:100])]
+
+        findings = previous_cve_findings(previous)
+
+        assert [v["title"] for v in findings[("https", long_version[:100])]] == ["CVE-2021-23017"]
+
+    def test_diff_findings(self):
+        """Nouveaux, corrigés et inchangés par (type, port, titre)."""
+        previous = _previous().vulnerabilities
+        current = [_cve("CVE-2021-23017"), _cve("CVE-2023-44487")]
+
+        diff = diff_findings(previous, current)
+
+        assert [(v["port"], v["title"]) for v in diff["new"]] == [(443, "CVE-2023-44487")]
+        assert [(v["port"], v["title"]) for v in diff["fixed"]] == [(8443, "CVE-2021-23017"), (443, "TLS 1.0")]
+        assert [(v["port"], v["title"]) for v in diff["unchanged"]] == [(443, "CVE-2021-23017")]
+
+
+class TestIncrementalCVE:
+    """Tests pour ScanEngine._enrich_cve en mode différentiel."""
+
+    def test_known_services_not_queried(self, monkeypatch):
+        """Seul le service dont la version a changé est recherché; les CVE reprises suivent le port courant."""
+        queried = []
+
+        async def fake_enrich(svc, raise_errors=False):
+            queried.append(svc["service_version"])
+            return [_cve("CVE-2024-0001", port=svc["port"], service_name="ssh", service_version=svc["service_version"])]
+
+        monkeypatch.setattr(engine_module, "enrich_with_vulns", fake_enrich)
+        services = [
+            dict(SERVICES[0], service_version="OpenSSH 9.6p1"),
+            dict(SERVICES[1], port=8443),
+        ]
+        engine = ScanEngine(ScanConfig(), ScanComponents(
+            nmap_client=None, nmap_stream_client=None, tls_auditor=None, cve_enricher=None, scorer=None
+        ))
+        stats = {}
+
+        vulns = asyncio.run(engine._enrich_cve(services, _previous(), stats))
+
+        assert queried == ["OpenSSH 9.6p1"]
+        assert stats == {"cve_services_reused": 1, "cve_services_queried": 1}
+        assert sorted((v["port"], v["title"]) for v in vulns) == [(22, "CVE-2024-0001"), (8443, "CVE-2021-23017")]
+
+    def test_stale_check_queried_again(self, monkeypatch):
+        """Couple repris depuis plus de l'âge maximal: nouvelle recherche, nouvelle date."""
+        queried = []
+
+        async def fake_enrich(svc, raise_errors=False):
+            queried.append(svc["port"])
+            return []
+
+        monkeypatch.setattr(engine_module, "enrich_with_vulns", fake_enrich)
+        engine = ScanEngine(ScanConfig(incremental_max_age_days=30), ScanComponents(
+            nmap_client=None, nmap_stream_client=None, tls_auditor=None, cve_enricher=None, scorer=None
+        ))
+        checked_at = {}
+
+        asyncio.run(engine._enrich_cve(SERVICES, _previous(cve_checked_at=OLD), {}, checked_at=checked_at))
+
+        assert sorted(queried) == [22, 443]
+        assert all(value > OLD for value in checked_at.values())
+
+    def test_failed_lookup_not_dated(self, monkeypatch):
+        """Recherche en échec (NVD injoignable): pas de date, le couple sera recherché au prochain scan."""
+        async def failing_enrich(svc, raise_errors=False):
+            raise RuntimeError("NVD 503")
+
+        monkeypatch.setattr(engine_module, "enrich_with_vulns", failing_enrich)
+        engine = ScanEngine(ScanConfig(), ScanComponents(
+            nmap_client=None, nmap_stream_client=None, tls_auditor=None, cve_enricher=None, scorer=None
+        ))
+        checked_at = {}
+
+        vulns = asyncio.run(engine._enrich_cve(SERVICES, None, None, checked_at=checked_at))
+
+        assert vulns == []
+        assert checked_at == {}
@@ -0,0 +1,66 @@
+"""
+Tests unitaires pour les métriques des workers de scan externe.
+"""
+
+from collections import defaultdict
+
+import pytest
+
+from src.services import scan_metrics_service as module
+from src.services.scan_metrics_service import record_scan_metrics, render_prometheus
+
+
+class FakeRedis:
+    """Hash Redis simulé (hincrby / hincrbyfloat via pipeline)."""
+
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def hincrby(self, key, field, amount):
+        self.hashes[key][field] = str(int(self.hashes[key].get(field, 0)) + amount)
+
+    def hincrbyfloat(self, key, field, amount):
+        self.hashes[key][field] = str(float(self.hashes[key].get(field, 0)) + amount)
+
+    def execute(self):
+        return []
+
+    def hgetall(self, key):
+        return dict(self.hashes[key])
+
+
+class TestScanMetrics:
+    """Tests pour record_scan_metrics et render_prometheus."""
+
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        fake = FakeRedis()
+        monkeypatch.setattr(type(module.redis_manager), "client", property(lambda self: fake))
+        return fake
+
+    def test_histogram_buckets_are_cumulative(self, redis):
+        """Une durée est comptée dans tous les buckets de borne supérieure."""
+        record_scan_metrics({"nmap": 4.0, "persist": 0.05, "unknown": 1.0}, "SUCCESS")
+        record_scan_metrics({"nmap": 45.0}, "ERROR")
+
+        text = render_prometheus()
+
+        assert 'scan_stage_duration_seconds_bucket{stage="nmap",le="2.5"} 0' in text
+        assert 'scan_stage_duration_seconds_bucket{stage="nmap",le="5.0"} 1' in text
+        assert 'scan_stage_duration_seconds_bucket{stage="nmap",le="60.0"} 2' in text
+        assert 'scan_stage_duration_seconds_bucket{stage="nmap",le="+Inf"} 2' in text
+        assert 'scan_stage_duration_seconds_sum{stage="nmap"} 49.0' in text
+        assert 'scan_stage_duration_seconds_count{stage="persist"} 1' in text
+        assert 'stage="unknown"' not in text
+        assert 'scan_tasks_total{status="ERROR"} 1' in text
+        assert 'scan_tasks_total{status="SUCCESS"} 1' in text
+
+    def test_stages_without_samples_are_omitted(self):
+        """Les étapes jamais mesurées n'apparaissent pas."""
+        text = render_prometheus({})
+
+        assert "scan_stage_duration_seconds_bucket" not in text
+        assert text.endswith("\n")
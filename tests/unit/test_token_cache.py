@@ -0,0 +1,72 @@
+"""
+Tests unitaires pour TokenClaimsCache.
+
+Tests du fast path d'authentification :
+- Cache des payloads vérifiés borné par exp
+- Éviction LRU
+- Décision de synchronisation des rôles
+"""
+
+import time
+
+import pytest
+
+from src.utils.token_cache import TokenClaimsCache, hash_token, roles_digest
+
+
+class TestTokenClaimsCache:
+    """Tests pour TokenClaimsCache (sans Redis)."""
+
+    @pytest.fixture
+    def cache(self):
+        """Cache local de petite taille."""
+        return TokenClaimsCache(max_entries=2, max_ttl=300)
+
+    def test_hit_after_set(self, cache):
+        """Un token vérifié est servi depuis le cache."""
+        payload = {"sub": "u1", "exp": time.time() + 60}
+        cache.set("tok-1", payload)
+
+        assert cache.get("tok-1") == payload
+        assert cache.get_stats()["hits"] == 1
+
+    def test_expired_token_not_cached(self, cache):
+        """Un token expiré ou sans exp n'est jamais mis en cache."""
+        cache.set("expired", {"sub": "u1", "exp": time.time() - 1})
+        cache.set("no-exp", {"sub": "u1"})
+
+        assert cache.get("expired") is None
+        assert cache.get("no-exp") is None
+
+    def test_lru_eviction(self, cache):
+        """Le token le moins récemment utilisé est évincé."""
+        exp = time.time() + 60
+        cache.set("a", {"exp": exp})
+        cache.set("b", {"exp": exp})
+        cache.get("a")
+        cache.set("c", {"exp": exp})
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_role_sync_skipped_when_roles_unchanged(self, cache):
+        """Pas de resynchronisation si le jeu de rôles est identique."""
+        assert cache.needs_role_sync("user-1", ["rssi", "admin"], window=900)
+
+        cache.mark_role_synced("user-1", ["rssi", "admin"], window=900)
+
+        assert not cache.needs_role_sync("user-1", ["admin", "rssi"], window=900)
+        assert cache.needs_role_sync("user-1", ["admin"], window=900)
+
+    def test_role_sync_required_after_window(self, cache):
+        """Resynchronisation une fois la fenêtre de session écoulée."""
+        cache.mark_role_synced("user-1", ["rssi"], window=900)
+
+        assert cache.needs_role_sync("user-1", ["rssi"], window=0)
+
+
+def test_hash_and_digest_are_stable():
+    """Les clés ne contiennent jamais le token brut et ignorent l'ordre des rôles."""
+    assert "secret" not in hash_token("secret")
+    assert roles_digest(["a", "b"]) == roles_digest(["b", "a", "a"])
@@ -0,0 +1,69 @@
+"""
+Tests unitaires pour les plans de rendu compilés des templates de rapport.
+"""
+
+import pytest
+
+from src.services.widget_renderer import (
+    WidgetRenderer,
+    clear_render_plans,
+    get_render_plan
+)
+
+
+@pytest.fixture
+def renderer():
+    fonts = {name: {"family": "Arial", "size": 10, "weight": "normal"}
+             for name in ("title", "heading1", "heading2", "heading3", "body")}
+    return WidgetRenderer({"primary": "#000000", "danger": "#ff0000", "text": "#111111"}, fonts)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_render_plans()
+    yield
+    clear_render_plans()
+
+
+class TestResolveVariable:
+    """Tests pour la substitution des variables %xxx.yyy%."""
+
+    def test_resolves_nested_and_keeps_unknown(self, renderer):
+        """Les chemins connus sont remplacés, les inconnus conservés."""
+        data = {"org": {"name": "ACME"}, "score": 0, "empty": None}
+
+        text = renderer._resolve_variable("%org.name% %score% %org.missing% %score.x% %empty%", data)
+
+        assert text == "ACME 0 %org.missing% %score.x% %empty%"
+
+
+class TestRenderPlan:
+    """Tests pour get_render_plan et RenderPlan.render_widgets."""
+
+    def test_plan_cached_per_template_version(self):
+        """Un plan est réutilisé pour la même version (updated_at), recompilé sinon."""
+        structure = [{"id": "w1", "widget_type": "title", "position": 0, "config": {"text": "A"}}]
+        edited = [{"id": "w1", "widget_type": "title", "position": 0, "config": {"text": "B"}}]
+
+        plan = get_render_plan("tpl", "v1", structure)
+
+        assert get_render_plan("tpl", "v1", [dict(structure[0])]) is plan
+        assert get_render_plan("tpl", "v2", edited) is not plan
+        assert get_render_plan("other", "v1", structure) is not plan
+        assert get_render_plan("tpl", None, structure) is not plan
+
+    def test_widgets_sorted_with_ids_and_config_untouched(self, renderer):
+        """Widgets rendus par position, ID injecté sans modifier le template."""
+        structure = [
+            {"id": "second", "widget_type": "paragraph", "position": 2, "config": {"text": "Deux %org.name%"}},
+            {"widget_key": "first", "widget_type": "paragraph", "position": 1, "config": {"text": "Un"}},
+        ]
+        plan = get_render_plan("tpl", "v1", structure, widget_key_as_id=True)
+        data = {"org": {"name": "ACME"}}
+
+        parts = plan.render_widgets(renderer, data)
+
+        assert [config["id"] for _, config in plan.widgets] == ["first", "second"]
+        assert "Un" in parts[0] and "Deux ACME" in parts[1]
+        assert "id" not in structure[0]["config"]
+        assert data["_template_structure"][0]["widget_key"] == "first"
@@ -0,0 +1,37 @@
+"""
+Tests unitaires pour l'environnement d'exécution des process workers Celery.
+"""
+
+from celery.signals import worker_process_init
+
+from src.tasks import worker_runtime
+
+
+class TestInitWorkerProcess:
+    """Tests pour l'initialisation du process worker après le fork."""
+
+    def test_connects_redis_once(self, monkeypatch):
+        """Un seul hook d'initialisation : Redis est connecté une fois par process."""
+        from src.database import engine
+        from src.utils.redis_manager import redis_manager
+
+        calls = []
+        monkeypatch.setattr(redis_manager, "connect", lambda: calls.append("connect"))
+        monkeypatch.setattr(engine, "dispose", lambda close=True: None)
+
+        worker_process_init.send(sender=None)
+
+        assert calls == ["connect"]
+
+    def test_components_reset(self, monkeypatch):
+        """Les composants de scan hérités du parent sont oubliés."""
+        from src.database import engine
+        from src.utils.redis_manager import redis_manager
+
+        monkeypatch.setattr(redis_manager, "connect", lambda: None)
+        monkeypatch.setattr(engine, "dispose", lambda close=True: None)
+        worker_runtime._components[("parent",)] = object()
+
+        worker_runtime._init_worker_process()
+
+        assert worker_runtime._components == {}